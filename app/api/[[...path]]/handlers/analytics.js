@@ -0,0 +1,166 @@
+/**
+ * HANDLERS - RELATÓRIOS (comparação, dashboard, estatísticas, exportação)
+ */
+
+import { NextResponse } from 'next/server';
+import crypto from 'crypto';
+import { getMonthRollupSummary, getPeriodRollupTotals, countRollupEntries } from '@/lib/entry-rollups';
+import {
+  COST_COLUMNS,
+  ENTRY_COLUMNS,
+  buildCostRangeFilter,
+  buildEntryRangeFilter,
+  resolveExportRange,
+  streamCsv
+} from '@/lib/csv-export';
+import { recordAudit } from '@/lib/audit-writer';
+import { getAnalyticsDb } from '@/lib/mongo-connection';
+import { buildMonthScopeFilter, buildScopeFilter } from '@/lib/access-scope';
+import { getBrazilTime } from '../shared';
+
+// COMPARE MONTHS
+async function compareMonths({ request, userData }) {
+  const { month1, year1, month2, year2 } = await request.json();
+
+  // Build filter baseado nas permissões
+  const filter = buildScopeFilter(userData);
+
+  console.log('[COMPARE] User:', userData.userId, 'Filter:', JSON.stringify(filter));
+
+  // Totais dos dois meses em uma única agregação sobre o rollup
+  // Leitura analítica: secundários quando MONGO_ANALYTICS_READ_PREFERENCE permitir
+  const [period1, period2] = await getPeriodRollupTotals(getAnalyticsDb(), filter, [
+    { month: month1, year: year1 },
+    { month: month2, year: year2 }
+  ]);
+
+  const total1 = period1.total;
+  const total2 = period2.total;
+
+  const difference = total2 - total1;
+  const percentChange = total1 > 0 ? ((difference / total1) * 100) : 0;
+
+  return NextResponse.json({
+    period1: { month: month1, year: year1, total: total1, entries: period1.entryCount },
+    period2: { month: month2, year: year2, total: total2, entries: period2.entryCount },
+    difference,
+    percentChange,
+    analysis: percentChange > 0 ? 'crescimento' : percentChange < 0 ? 'queda' : 'estável'
+  });
+}
+
+// GET DASHBOARD DATA
+async function dashboardData({ request, userData }) {
+  const { month, year } = await request.json();
+
+  // Build filter baseado nas permissões (igual stats/overview)
+  const filter = buildMonthScopeFilter(userData, month, year);
+
+  console.log('[DASHBOARD] User:', userData.userId, 'Role:', userData.role, 'Filter:', JSON.stringify(filter));
+
+  // Agrupar por dia e por horário direto no rollup
+  const { dailyData, timeSlotData, total, entryCount } = await getMonthRollupSummary(getAnalyticsDb(), filter);
+  const average = entryCount > 0 ? total / entryCount : 0;
+
+  return NextResponse.json({
+    dailyData,
+    timeSlotData,
+    total,
+    average,
+    entryCount
+  });
+}
+
+// EXPORT CSV
+async function exportCsv({ request, db, user, userData }) {
+  if (!userData?.permissions?.canExport && user.role !== 'master') {
+    return NextResponse.json({ error: 'Sem permissão para exportar' }, { status: 403 });
+  }
+
+  const body = await request.json();
+  const range = resolveExportRange(body);
+  if (!range) {
+    return NextResponse.json({ error: 'Período de exportação inválido' }, { status: 400 });
+  }
+
+  const type = body.type === 'costs' ? 'costs' : 'entries';
+  const churchIds = Array.isArray(body.churchIds) && body.churchIds.length > 0 ? body.churchIds : null;
+
+  // Cursor em lotes: as linhas são geradas sob demanda, sem carregar o período em memória
+  let cursor;
+  if (type === 'costs') {
+    const filter = buildCostRangeFilter(range);
+    if (churchIds) filter.churchId = { $in: churchIds };
+    cursor = db.collection('costs_entries').find(filter).sort({ dueDate: 1 }).batchSize(500);
+  } else {
+    const filter = buildEntryRangeFilter(range);
+    if (churchIds) filter.churchId = { $in: churchIds };
+    cursor = db.collection('entries').find(filter).sort({ year: 1, month: 1, day: 1, timeSlot: 1 }).batchSize(500);
+  }
+
+  const { start, end } = range;
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'export_csv',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { type, month: start.month, year: start.year, endMonth: end.month, endYear: end.year, churchIds }
+  });
+
+  const sameMonth = start.month === end.month && start.year === end.year;
+  const period = sameMonth
+    ? `${start.year}-${start.month}`
+    : `${start.year}-${start.month}_${end.year}-${end.month}`;
+  const prefix = type === 'costs' ? 'iudp-custos' : 'iudp';
+
+  return new NextResponse(streamCsv(cursor, type === 'costs' ? COST_COLUMNS : ENTRY_COLUMNS), {
+    headers: {
+      'Content-Type': 'text/csv; charset=utf-8',
+      'Content-Disposition': `attachment; filename="${prefix}-${period}.csv"`
+    }
+  });
+}
+
+// GET STATISTICS
+async function statsOverview({ userData }) {
+  // Build filter baseado nas permissões
+  const filter = buildScopeFilter(userData);
+
+  console.log('[STATS] User:', userData.userId, 'Role:', userData.role, 'Filter:', JSON.stringify(filter));
+
+  // Contagens e totais: secundários quando MONGO_ANALYTICS_READ_PREFERENCE permitir
+  const analyticsDb = getAnalyticsDb();
+  const totalUsers = userData.role === 'master' 
+    ? await analyticsDb.collection('users').countDocuments()
+    : 1; // Usuário comum vê apenas ele mesmo
+
+  const totalEntries = await countRollupEntries(analyticsDb, filter);
+  const pendingRequests = await analyticsDb.collection('unlock_requests').countDocuments({ 
+    ...filter,
+    status: 'pending' 
+  });
+
+  const now = getBrazilTime();
+  const currentMonth = now.month() + 1;
+  const currentYear = now.year();
+
+  const [{ total: currentMonthTotal }] = await getPeriodRollupTotals(analyticsDb, filter, [
+    { month: currentMonth, year: currentYear }
+  ]);
+
+  return NextResponse.json({
+    totalUsers,
+    totalEntries,
+    pendingRequests,
+    currentMonthTotal,
+    currentMonth,
+    currentYear
+  });
+}
+
+export const POST = {
+  'compare/months': compareMonths,
+  'dashboard/data': dashboardData,
+  'export/csv': exportCsv,
+  'stats/overview': statsOverview
+};
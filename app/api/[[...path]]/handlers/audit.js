@@ -0,0 +1,61 @@
+/**
+ * HANDLERS - AUDITORIA (audit/*)
+ */
+
+import { NextResponse } from 'next/server';
+import crypto from 'crypto';
+import { buildDateRangeFilter, resolvePageSize } from '@/lib/keyset-pagination';
+import { flushAuditLog, recordAudit } from '@/lib/audit-writer';
+import { repositoriesFor } from '@/lib/repositories';
+import { resolveFields, toProjection } from '@/lib/response-fields';
+import { jsonResponse } from '@/lib/json-response';
+import { getBrazilTime } from '../shared';
+
+// POST AUDIT LOG (para qualquer usuário registrar ação)
+async function auditLog({ request, db, user }) {
+  const { action, details } = await request.json();
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action,
+    userId: user.userId,
+    userEmail: user.email,
+    timestamp: getBrazilTime().toISOString(),
+    details: details || {}
+  });
+
+  return NextResponse.json({ success: true });
+}
+
+// GET AUDIT LOGS
+async function auditLogs({ request, db }) {
+  const body = await request.json();
+  const { action, userId, from, to, cursor, fields } = body;
+
+  // Registros ainda no buffer entram antes da leitura
+  await flushAuditLog();
+
+  const filter = {};
+  if (action) filter.action = action;
+  if (userId) filter.userId = userId;
+  const timestampRange = buildDateRangeFilter(from, to);
+  if (timestampRange) filter.timestamp = timestampRange;
+
+  const page = await repositoriesFor(db).audit.listPage(filter, {
+    limit: resolvePageSize(body.limit, 100),
+    cursor,
+    projection: toProjection('audit/logs', resolveFields('audit/logs', fields))
+  });
+
+  return jsonResponse(request, {
+    logs: page.items,
+    total: page.total,
+    hasMore: page.hasMore,
+    nextCursor: page.nextCursor
+  }, { name: 'audit/logs' });
+}
+
+export const POST = {
+  'audit/log': auditLog,
+  'audit/logs': auditLogs
+};
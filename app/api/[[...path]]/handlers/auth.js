@@ -0,0 +1,187 @@
+/**
+ * HANDLERS - AUTENTICAÇÃO (auth/*)
+ */
+
+import { NextResponse } from 'next/server';
+import jwt from 'jsonwebtoken';
+import crypto from 'crypto';
+import { recordAudit } from '@/lib/audit-writer';
+import { repositoriesFor } from '@/lib/repositories';
+import { timePasswordHashing } from '@/lib/request-metrics';
+import { hashPassword, needsRehash, rehashPassword, verifyPassword } from '@/lib/password-hashing';
+import { markOffline, touchPresence } from '@/lib/presence';
+import { JWT_SECRET, verifyToken, getBrazilTime } from '../shared';
+
+// REGISTER
+async function authRegister({ request, db }) {
+  const { name, email, password, role, church, region, state, telefone, cep, endereco, numero, complemento, cidade, pais, cargo, churchId } = await request.json();
+
+  const existing = await repositoriesFor(db).users.findByEmail(email);
+  if (existing) {
+    return NextResponse.json({ error: 'Email já cadastrado' }, { status: 400 });
+  }
+
+  const hashedPassword = await timePasswordHashing(() => hashPassword(password));
+
+  // Buscar nome da igreja se tiver churchId
+  let churchName = church || '';
+  if (churchId) {
+    const churchDoc = await db.collection('churches').findOne({ churchId });
+    churchName = churchDoc?.name || '';
+  }
+
+  const user = {
+    userId: crypto.randomUUID(),
+    name,
+    email,
+    password: hashedPassword,
+    role: role || 'pastor',
+    church: churchName,
+    churchId: churchId || null,
+    region: region || '',
+    state: state || '',
+    telefone: telefone || '',
+    cep: cep || '',
+    endereco: endereco || '',
+    numero: numero || '',
+    complemento: complemento || '',
+    cidade: cidade || '',
+    pais: pais || 'Brasil',
+    cargo: cargo || '',
+    photoUrl: null,
+    isActive: true, // NOVO: Usuário ativo por padrão
+    isOnline: false,
+    lastActivity: null,
+    permissions: {
+      canView: true,
+      canEdit: role === 'master',
+      canPrint: false,
+      canExport: false,
+      canShare: false
+    },
+    scope: role === 'master' ? 'global' : (state ? 'state' : (region ? 'region' : 'church')),
+    createdAt: getBrazilTime().toISOString()
+  };
+
+  await db.collection('users').insertOne(user);
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'register',
+    userId: user.userId,
+    userName: user.name,
+    timestamp: getBrazilTime().toISOString(),
+    details: { email, role }
+  });
+
+  const token = jwt.sign({ userId: user.userId, email, role: user.role }, JWT_SECRET, { expiresIn: '7d' });
+
+  return NextResponse.json({ 
+    token, 
+    user: { 
+      userId: user.userId,
+      name: user.name, 
+      email: user.email, 
+      role: user.role,
+      permissions: user.permissions,
+      scope: user.scope,
+      church: user.church,
+      region: user.region,
+      state: user.state
+    } 
+  });
+}
+
+// LOGIN
+async function authLogin({ request, db }) {
+  const { email, password } = await request.json();
+
+  const user = await repositoriesFor(db).users.findByEmail(email);
+  if (!user) {
+    return NextResponse.json({ error: 'Credenciais inválidas' }, { status: 401 });
+  }
+
+  const valid = await timePasswordHashing(() => verifyPassword(password, user.password));
+  if (!valid) {
+    return NextResponse.json({ error: 'Credenciais inválidas' }, { status: 401 });
+  }
+
+  // Hash bcrypt antigo → argon2id, sem atrasar a resposta do login
+  if (needsRehash(user.password)) {
+    rehashPassword(db, user, password).catch(error => {
+      console.error('[PASSWORD] Erro ao migrar hash:', error);
+    });
+  }
+
+  // Verificar se o usuário está ativo (se o campo existir)
+  if (user.hasOwnProperty('isActive') && user.isActive === false) {
+    return NextResponse.json({ 
+      error: 'Sua conta está desativada. Entre em contato com o administrador do sistema.' 
+    }, { status: 403 });
+  }
+
+  // Marcar como online (gravado no próximo flush da presença)
+  touchPresence(user.userId, getBrazilTime().toISOString());
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'login',
+    userId: user.userId,
+    userName: user.name,
+    timestamp: getBrazilTime().toISOString(),
+    details: { email }
+  });
+
+  const token = jwt.sign({ userId: user.userId, email, role: user.role }, JWT_SECRET, { expiresIn: '7d' });
+
+  return NextResponse.json({ 
+    token, 
+    user: { 
+      userId: user.userId,
+      name: user.name, 
+      email: user.email, 
+      role: user.role,
+      permissions: user.permissions,
+      scope: user.scope,
+      church: user.church,
+      region: user.region,
+      state: user.state
+    } 
+  });
+}
+
+// LOGOUT
+async function authLogout({ request, db }) {
+  const user = verifyToken(request);
+  if (user) {
+    // Marcar como offline (gravado no próximo flush da presença)
+    markOffline(user.userId, getBrazilTime().toISOString());
+
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'logout',
+      userId: user.userId,
+      timestamp: getBrazilTime().toISOString(),
+      details: {}
+    });
+  }
+
+  return NextResponse.json({ success: true, message: 'Logout realizado com sucesso!' });
+}
+
+// HEARTBEAT - Manter usuário online
+async function authHeartbeat({ request }) {
+  const user = verifyToken(request);
+  if (user) {
+    touchPresence(user.userId, getBrazilTime().toISOString());
+  }
+
+  return NextResponse.json({ success: true });
+}
+
+export const POST = {
+  'auth/register': authRegister,
+  'auth/login': authLogin,
+  'auth/logout': authLogout,
+  'auth/heartbeat': authHeartbeat
+};
@@ -0,0 +1,218 @@
+/**
+ * HANDLERS - IGREJAS (churches/*)
+ */
+
+import { NextResponse } from 'next/server';
+import crypto from 'crypto';
+import { invalidateUser } from '@/lib/lookup-cache';
+import { recordAudit } from '@/lib/audit-writer';
+import { repositoriesFor } from '@/lib/repositories';
+import { enqueueDerivatives } from '@/lib/image-derivatives';
+import { commitBlob, releaseBlobUrl } from '@/lib/blob-store';
+import { receiveUpload } from '@/lib/multipart-upload';
+import { projectList, resolveFields } from '@/lib/response-fields';
+import { jsonResponse } from '@/lib/json-response';
+import { UPLOAD_AREAS, PHOTO_UPLOAD, uploadErrorResponse, getBrazilTime } from '../shared';
+
+// GET ALL CHURCHES
+async function churchesList({ request, db }) {
+  const body = await request.json().catch(() => ({}));
+  const fields = resolveFields('churches/list', body.fields);
+
+  // Igrejas + dados do pastor num único aggregate ($lookup)
+  const churches = await repositoriesFor(db).churches.listWithPastor();
+
+  return jsonResponse(request, {
+    churches: projectList('churches/list', churches, fields)
+  }, { name: 'churches/list' });
+}
+
+// CREATE CHURCH
+async function churchesCreate({ request, db, user }) {
+  const churchData = await request.json();
+
+  const newChurch = {
+    churchId: crypto.randomUUID(),
+    ...churchData,
+    createdAt: getBrazilTime().toISOString(),
+    updatedAt: getBrazilTime().toISOString()
+  };
+
+  await db.collection('churches').insertOne(newChurch);
+
+  // Se tem pastor, atualizar user
+  if (churchData.pastorId) {
+    await db.collection('users').updateOne(
+      { userId: churchData.pastorId },
+      { $set: { church: churchData.name, churchId: newChurch.churchId } }
+    );
+    invalidateUser(churchData.pastorId);
+  }
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'create_church',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { churchId: newChurch.churchId, churchName: churchData.name }
+  });
+
+  return NextResponse.json({ success: true, church: newChurch, message: 'Igreja cadastrada com sucesso!' });
+}
+
+// UPDATE CHURCH
+async function churchesUpdate({ request, db, user }) {
+  const { churchId, churchData } = await request.json();
+
+  await db.collection('churches').updateOne(
+    { churchId },
+    { $set: { ...churchData, updatedAt: getBrazilTime().toISOString() } }
+  );
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'update_church',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { churchId, updates: Object.keys(churchData) }
+  });
+
+  return NextResponse.json({ success: true, message: 'Igreja atualizada com sucesso!' });
+}
+
+// DELETE CHURCH
+async function churchesDelete({ request, db, user }) {
+  const { churchId } = await request.json();
+
+  const church = await db.collection('churches').findOne({ churchId });
+
+  // Remover associação de usuários com esta igreja
+  await db.collection('users').updateMany(
+    { churchId },
+    { $unset: { church: '', churchId: '' } }
+  );
+  invalidateUser();
+
+  await db.collection('churches').deleteOne({ churchId });
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'delete_church',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { deletedChurchId: churchId, deletedChurchName: church?.name }
+  });
+
+  return NextResponse.json({ success: true, message: 'Igreja excluída com sucesso!' });
+}
+
+// UPLOAD CHURCH PHOTO
+async function churchesUploadPhoto({ request, db }) {
+  // Tipo (pela assinatura) e tamanho (max 2MB) validados durante a gravação
+  let upload;
+  try {
+    upload = await receiveUpload(request, { dir: UPLOAD_AREAS.churches, fileField: 'photo', ...PHOTO_UPLOAD });
+  } catch (error) {
+    return uploadErrorResponse(error);
+  }
+  const { file } = upload;
+  const churchId = upload.fields.churchId;
+
+  if (!file) {
+    return NextResponse.json({ error: 'Nenhum arquivo enviado' }, { status: 400 });
+  }
+
+  const blob = await commitBlob(UPLOAD_AREAS.churches, file.tempPath, file.hash, file.originalName);
+  if (!blob.deduplicated) enqueueDerivatives(blob.filepath);
+
+  // Atualizar igreja com URL da foto
+  const photoUrl = `/api/uploads/churches/${blob.filename}`;
+  const previousChurch = await db.collection('churches').findOneAndUpdate(
+    { churchId },
+    { $set: { photoUrl, updatedAt: getBrazilTime().toISOString() } },
+    { projection: { photoUrl: 1 } }
+  );
+
+  // Foto anterior sai do disco se ninguém mais a usa
+  if (previousChurch?.photoUrl && previousChurch.photoUrl !== photoUrl) {
+    await releaseBlobUrl(db, UPLOAD_AREAS, previousChurch.photoUrl);
+  }
+
+  return NextResponse.json({ 
+    success: true, 
+    photoUrl,
+    message: 'Foto da igreja enviada com sucesso!' 
+  });
+}
+
+// GET AVAILABLE PASTORS (pastores, bispos e masters disponíveis para trocar)
+async function churchesAvailablePastors({ db }) {
+  // Buscar todos os usuários com role pastor/leader/bispo/master
+  const pastors = await db.collection('users')
+    .find(
+      { role: { $in: ['pastor', 'leader', 'bispo', 'master'] } },
+      { projection: { password: 0 } }
+    )
+    .sort({ name: 1 })
+    .toArray();
+
+  // Marcar quais têm igreja e quais estão livres
+  for (let pastor of pastors) {
+    pastor.hasChurch = !!pastor.churchId;
+    pastor.available = !pastor.churchId;
+  }
+
+  return NextResponse.json({ pastors });
+}
+
+// CHANGE PASTOR (trocar pastor de uma igreja)
+async function churchesChangePastor({ request, db, user }) {
+  const { churchId, newPastorId } = await request.json();
+
+  const church = await db.collection('churches').findOne({ churchId });
+  const oldPastorId = church?.pastorId;
+
+  // Remover associação do pastor antigo
+  if (oldPastorId) {
+    await db.collection('users').updateOne(
+      { userId: oldPastorId },
+      { $unset: { church: '', churchId: '' } }
+    );
+    invalidateUser(oldPastorId);
+  }
+
+  // Atualizar igreja com novo pastor
+  await db.collection('churches').updateOne(
+    { churchId },
+    { $set: { pastorId: newPastorId, updatedAt: getBrazilTime().toISOString() } }
+  );
+
+  // Atualizar novo pastor com igreja
+  if (newPastorId) {
+    await db.collection('users').updateOne(
+      { userId: newPastorId },
+      { $set: { church: church.name, churchId } }
+    );
+    invalidateUser(newPastorId);
+  }
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'change_pastor',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { churchId, oldPastorId, newPastorId }
+  });
+
+  return NextResponse.json({ success: true, message: 'Pastor alterado com sucesso!' });
+}
+
+export const POST = {
+  'churches/list': churchesList,
+  'churches/create': churchesCreate,
+  'churches/update': churchesUpdate,
+  'churches/delete': churchesDelete,
+  'churches/upload-photo': churchesUploadPhoto,
+  'churches/available-pastors': churchesAvailablePastors,
+  'churches/change-pastor': churchesChangePastor
+};
@@ -0,0 +1,511 @@
+/**
+ * HANDLERS - LANÇAMENTOS DE CUSTOS (costs-entries/*, upload/cost-file)
+ */
+
+import { NextResponse } from 'next/server';
+import crypto from 'crypto';
+import { buildCostRangeFilter, resolveExportRange } from '@/lib/csv-export';
+import { buildDateRangeFilter, resolvePageSize } from '@/lib/keyset-pagination';
+import { publishEvent } from '@/lib/event-bus';
+import { getCachedUser } from '@/lib/lookup-cache';
+import { recordAudit } from '@/lib/audit-writer';
+import { repositoriesFor } from '@/lib/repositories';
+import { enqueueDerivatives } from '@/lib/image-derivatives';
+import { commitBlob, releaseBlobUrl } from '@/lib/blob-store';
+import { discardUpload, receiveUpload } from '@/lib/multipart-upload';
+import { resolveFields, toProjection } from '@/lib/response-fields';
+import { jsonResponse } from '@/lib/json-response';
+import {
+  COST_UPLOAD_DIR,
+  UPLOAD_AREAS,
+  DOCUMENT_UPLOAD,
+  costEventTarget,
+  uploadErrorResponse,
+  getBrazilTime
+} from '../shared';
+
+// CREATE COST ENTRY (Pastor/Bispo)
+async function costsEntriesCreate({ request, db, user }) {
+  try {
+    const userData = await getCachedUser(db, user.userId);
+    const body = await request.json();
+    const { costTypeId, costTypeName, dueDate, value, billFile, paymentDate, valuePaid, proofFile, description } = body;
+
+    // Validações
+    if (!costTypeId || !dueDate || !value) {
+      return NextResponse.json({ error: 'Campos obrigatórios: tipo de custo, vencimento e valor' }, { status: 400 });
+    }
+
+    // Calcular diferença (juros/multa)
+    const difference = (parseFloat(valuePaid) || 0) - parseFloat(value);
+
+    const costEntry = {
+      costId: crypto.randomUUID(),
+      churchId: userData.churchId,
+      churchName: userData.church,
+      userId: user.userId,
+      userName: userData.name,
+      costTypeId,
+      costTypeName,
+      dueDate,
+      value: parseFloat(value),
+      billFile: billFile || null,
+      paymentDate: null, // Pastor não pode preencher na criação
+      valuePaid: 0, // Será preenchido após aprovação
+      difference: 0,
+      proofFile: null, // Será preenchido após aprovação
+      description: description || null, // Para custos especiais
+      status: 'PENDING',
+      reviewedBy: null,
+      reviewedAt: null,
+      rejectionReason: null,
+      paidAt: null,
+      paidBy: null,
+      createdAt: getBrazilTime().toISOString(),
+      updatedAt: getBrazilTime().toISOString()
+    };
+
+    await db.collection('costs_entries').insertOne(costEntry);
+
+    // Audit log
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'create_cost_entry',
+      userId: user.userId,
+      timestamp: getBrazilTime().toISOString(),
+      details: { costId: costEntry.costId, costTypeName, value }
+    });
+
+    publishEvent('cost.created', costEventTarget(costEntry), { costId: costEntry.costId, status: costEntry.status });
+
+    return NextResponse.json({ success: true, message: 'Custo registrado com sucesso!', costEntry });
+  } catch (error) {
+    console.error('Erro ao criar custo:', error);
+    return NextResponse.json({ error: 'Erro ao criar custo' }, { status: 500 });
+  }
+}
+
+// LIST COST ENTRIES
+async function costsEntriesList({ request, db, user }) {
+  try {
+    const userData = await getCachedUser(db, user.userId);
+    const body = await request.json();
+    const { status: filterStatus, churchId: filterChurch, month, year, from, to, limit, cursor, fields } = body;
+
+    let filter = {};
+
+    // Se for Master, vê tudo; se for Pastor, vê apenas da sua igreja
+    if (userData.role !== 'master') {
+      filter.churchId = userData.churchId;
+    } else if (filterChurch) {
+      // Master pode filtrar por igreja específica
+      filter.churchId = filterChurch;
+    }
+
+    // Filtro por status (se fornecido)
+    if (filterStatus && filterStatus !== 'ALL') {
+      filter.status = filterStatus;
+    }
+
+    // Filtro por mês/ano de vencimento (dueDate 'YYYY-MM-DD')
+    if (month && month !== 'ALL' && year) {
+      const range = resolveExportRange({ month, year });
+      if (range) Object.assign(filter, buildCostRangeFilter(range));
+    }
+
+    const createdRange = buildDateRangeFilter(from, to);
+    if (createdRange) filter.createdAt = createdRange;
+
+    // Sem limit devolve todos os custos do filtro (telas que somam por status/igreja)
+    const page = await repositoriesFor(db).costs.listPage(filter, {
+      limit: resolvePageSize(limit, null),
+      cursor,
+      projection: toProjection('costs-entries/list', resolveFields('costs-entries/list', fields))
+    });
+
+    return jsonResponse(request, {
+      success: true,
+      costs: page.items,
+      total: page.total,
+      hasMore: page.hasMore,
+      nextCursor: page.nextCursor
+    }, { name: 'costs-entries/list' });
+  } catch (error) {
+    console.error('Erro ao listar custos:', error);
+    return NextResponse.json({ error: 'Erro ao listar custos' }, { status: 500 });
+  }
+}
+
+// UPDATE COST ENTRY (Pastor - com regras de janela de 60 min)
+async function costsEntriesUpdate({ request, db, user }) {
+  try {
+    const body = await request.json();
+    const { costId, costData } = body;
+
+    const existingCost = await repositoriesFor(db).costs.findById(costId);
+    if (!existingCost) {
+      return NextResponse.json({ error: 'Custo não encontrado' }, { status: 404 });
+    }
+
+    // Verificar permissão
+    const userData = await getCachedUser(db, user.userId);
+    if (userData.role !== 'master' && existingCost.userId !== user.userId) {
+      return NextResponse.json({ error: 'Sem permissão para editar este custo' }, { status: 403 });
+    }
+
+    // Se não for Master, verificar regras de edição
+    if (userData.role !== 'master') {
+      // Se status = PENDING, não pode editar (custo ainda não foi aprovado)
+      if (existingCost.status === 'PENDING') {
+        return NextResponse.json({ error: 'Custo pendente de aprovação. Aguarde aprovação do Líder Máximo.' }, { status: 403 });
+      }
+
+      // Se status = PAID, verificar janela de 60 minutos
+      if (existingCost.status === 'PAID' && existingCost.paidAt) {
+        const paidTime = new Date(existingCost.paidAt);
+        const now = getBrazilTime();
+        const diffMinutes = (now - paidTime) / (1000 * 60);
+
+        if (diffMinutes > 60) {
+          return NextResponse.json({ error: 'Prazo de 60 minutos para edição expirado. Entre em contato com o Líder Máximo.' }, { status: 403 });
+        }
+      }
+    }
+
+    // Calcular diferença se valuePaid ou value mudaram
+    let difference = existingCost.difference;
+    if (costData.valuePaid !== undefined || costData.value !== undefined) {
+      const newValuePaid = costData.valuePaid !== undefined ? parseFloat(costData.valuePaid) : existingCost.valuePaid;
+      const newValue = costData.value !== undefined ? parseFloat(costData.value) : existingCost.value;
+      difference = newValuePaid - newValue;
+    }
+
+    const updateData = {
+      ...costData,
+      difference,
+      updatedAt: getBrazilTime().toISOString()
+    };
+
+    // Se não for Master e estava APPROVED, não altera o status
+    if (userData.role !== 'master') {
+      delete updateData.status; // Mantém o status atual
+    }
+
+    await db.collection('costs_entries').updateOne(
+      { costId },
+      { $set: updateData }
+    );
+
+    // Audit log
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'update_cost_entry',
+      userId: user.userId,
+      timestamp: getBrazilTime().toISOString(),
+      details: { costId, changes: costData }
+    });
+
+    publishEvent('cost.updated', costEventTarget(existingCost), { costId });
+
+    return NextResponse.json({ success: true, message: 'Custo atualizado com sucesso!' });
+  } catch (error) {
+    console.error('Erro ao atualizar custo:', error);
+    return NextResponse.json({ error: 'Erro ao atualizar custo' }, { status: 500 });
+  }
+}
+
+// PAY COST ENTRY (Pastor submete pagamento após aprovação)
+async function costsEntriesPay({ request, db, user }) {
+  try {
+    const body = await request.json();
+    const { costId, paymentDate, valuePaid, proofFile } = body;
+
+    const existingCost = await repositoriesFor(db).costs.findById(costId);
+    if (!existingCost) {
+      return NextResponse.json({ error: 'Custo não encontrado' }, { status: 404 });
+    }
+
+    // Verificar se é o dono do custo
+    if (existingCost.userId !== user.userId) {
+      return NextResponse.json({ error: 'Sem permissão para pagar este custo' }, { status: 403 });
+    }
+
+    // Verificar se status = APPROVED
+    if (existingCost.status !== 'APPROVED') {
+      return NextResponse.json({ error: 'Custo precisa estar APROVADO para registrar pagamento' }, { status: 403 });
+    }
+
+    // Validar campos obrigatórios
+    if (!paymentDate || !valuePaid) {
+      return NextResponse.json({ error: 'Data de pagamento e valor pago são obrigatórios' }, { status: 400 });
+    }
+
+    // Calcular diferença
+    const difference = parseFloat(valuePaid) - parseFloat(existingCost.value);
+
+    const updateData = {
+      paymentDate,
+      valuePaid: parseFloat(valuePaid),
+      proofFile: proofFile || null,
+      difference,
+      status: 'PAID',
+      paidAt: getBrazilTime().toISOString(),
+      paidBy: user.userId,
+      updatedAt: getBrazilTime().toISOString()
+    };
+
+    await db.collection('costs_entries').updateOne(
+      { costId },
+      { $set: updateData }
+    );
+
+    // Audit log
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'pay_cost_entry',
+      userId: user.userId,
+      timestamp: getBrazilTime().toISOString(),
+      details: { costId, valuePaid, paymentDate }
+    });
+
+    publishEvent('cost.paid', costEventTarget(existingCost), { costId, status: 'PAID' });
+
+    return NextResponse.json({ success: true, message: 'Pagamento registrado com sucesso! Você tem 60 minutos para editar.' });
+  } catch (error) {
+    console.error('Erro ao registrar pagamento:', error);
+    return NextResponse.json({ error: 'Erro ao registrar pagamento' }, { status: 500 });
+  }
+}
+
+// DELETE COST ENTRY
+async function costsEntriesDelete({ request, db, user }) {
+  try {
+    const body = await request.json();
+    const { costId } = body;
+
+    const existingCost = await repositoriesFor(db).costs.findById(costId);
+    if (!existingCost) {
+      return NextResponse.json({ error: 'Custo não encontrado' }, { status: 404 });
+    }
+
+    // Verificar permissão
+    const userData = await getCachedUser(db, user.userId);
+    if (userData.role !== 'master' && existingCost.userId !== user.userId) {
+      return NextResponse.json({ error: 'Sem permissão' }, { status: 403 });
+    }
+
+    await db.collection('costs_entries').deleteOne({ costId });
+    await releaseBlobUrl(db, UPLOAD_AREAS, existingCost.billFile);
+    await releaseBlobUrl(db, UPLOAD_AREAS, existingCost.proofFile);
+
+    // Audit log
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'delete_cost_entry',
+      userId: user.userId,
+      timestamp: getBrazilTime().toISOString(),
+      details: { costId, costTypeName: existingCost.costTypeName }
+    });
+
+    publishEvent('cost.deleted', costEventTarget(existingCost), { costId });
+
+    return NextResponse.json({ success: true, message: 'Custo excluído com sucesso!' });
+  } catch (error) {
+    console.error('Erro ao deletar custo:', error);
+    return NextResponse.json({ error: 'Erro ao deletar custo' }, { status: 500 });
+  }
+}
+
+// APPROVE COST ENTRY (Master apenas)
+async function costsEntriesApprove({ request, db, user }) {
+  try {
+    const body = await request.json();
+    const { costId } = body;
+
+    const approvedCost = await db.collection('costs_entries').findOneAndUpdate(
+      { costId },
+      { 
+        $set: { 
+          status: 'APPROVED',
+          reviewedBy: user.userId,
+          reviewedAt: getBrazilTime().toISOString(),
+          updatedAt: getBrazilTime().toISOString()
+        }
+      }
+    );
+
+    // Audit log
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'approve_cost_entry',
+      userId: user.userId,
+      timestamp: getBrazilTime().toISOString(),
+      details: { costId }
+    });
+
+    publishEvent('cost.approved', costEventTarget(approvedCost), { costId, status: 'APPROVED' });
+
+    return NextResponse.json({ success: true, message: 'Custo aprovado com sucesso!' });
+  } catch (error) {
+    console.error('Erro ao aprovar custo:', error);
+    return NextResponse.json({ error: 'Erro ao aprovar custo' }, { status: 500 });
+  }
+}
+
+// REJECT COST ENTRY (Master apenas)
+async function costsEntriesReject({ request, db, user }) {
+  try {
+    const body = await request.json();
+    const { costId, reason } = body;
+
+    const rejectedCost = await db.collection('costs_entries').findOneAndUpdate(
+      { costId },
+      { 
+        $set: { 
+          status: 'REJECTED',
+          reviewedBy: user.userId,
+          reviewedAt: getBrazilTime().toISOString(),
+          rejectionReason: reason || 'Sem motivo especificado',
+          updatedAt: getBrazilTime().toISOString()
+        }
+      }
+    );
+
+    // Audit log
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'reject_cost_entry',
+      userId: user.userId,
+      timestamp: getBrazilTime().toISOString(),
+      details: { costId, reason }
+    });
+
+    publishEvent('cost.rejected', costEventTarget(rejectedCost), { costId, status: 'REJECTED', reason });
+
+    return NextResponse.json({ success: true, message: 'Custo reprovado!' });
+  } catch (error) {
+    console.error('Erro ao reprovar custo:', error);
+    return NextResponse.json({ error: 'Erro ao reprovar custo' }, { status: 500 });
+  }
+}
+
+// UPDATE COST ENTRY (Master pode editar qualquer campo, incluindo status)
+async function costsEntriesUpdateMaster({ request, db, user }) {
+  try {
+    const body = await request.json();
+    const { costId, costTypeId, costTypeName, dueDate, value, billFile, paymentDate, valuePaid, proofFile, status } = body;
+
+    const existingCost = await repositoriesFor(db).costs.findById(costId);
+
+    const updateData = {
+      costTypeId,
+      costTypeName,
+      dueDate,
+      value: parseFloat(value),
+      billFile,
+      paymentDate,
+      valuePaid: valuePaid ? parseFloat(valuePaid) : 0,
+      proofFile,
+      status,
+      updatedAt: getBrazilTime().toISOString(),
+      updatedBy: user.userId
+    };
+
+    // Calcular diferença
+    if (valuePaid) {
+      const diff = parseFloat(valuePaid) - parseFloat(value);
+      updateData.difference = diff;
+    } else {
+      updateData.difference = 0;
+    }
+
+    // Se Master está mudando status para PAID e ainda não tem paidAt, adicionar
+    if (status === 'PAID' && (!existingCost.paidAt || !existingCost.paidBy)) {
+      updateData.paidAt = getBrazilTime().toISOString();
+      updateData.paidBy = user.userId;
+    }
+
+    await db.collection('costs_entries').updateOne(
+      { costId },
+      { $set: updateData }
+    );
+
+    // Audit log
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'update_cost_entry_master',
+      userId: user.userId,
+      timestamp: getBrazilTime().toISOString(),
+      details: { costId, changes: updateData }
+    });
+
+    publishEvent('cost.updated', costEventTarget(existingCost), { costId, status });
+
+    return NextResponse.json({ success: true, message: 'Custo atualizado com sucesso!' });
+  } catch (error) {
+    console.error('Erro ao atualizar custo:', error);
+    return NextResponse.json({ error: 'Erro ao atualizar custo' }, { status: 500 });
+  }
+}
+
+// UPLOAD COST FILE (Bill or Proof)
+async function uploadCostFile({ request, db, user }) {
+  try {
+    // Arquivo vai direto do corpo da requisição para o disco (tipo e tamanho checados no caminho)
+    let upload;
+    try {
+      upload = await receiveUpload(request, { dir: COST_UPLOAD_DIR, ...DOCUMENT_UPLOAD });
+    } catch (error) {
+      return uploadErrorResponse(error);
+    }
+    const { file } = upload;
+    const fileType = upload.fields.fileType; // 'bill' ou 'proof'
+
+    if (!file) {
+      return NextResponse.json({ error: 'Arquivo não enviado' }, { status: 400 });
+    }
+
+    if (!fileType || !['bill', 'proof'].includes(fileType)) {
+      await discardUpload(file);
+      return NextResponse.json({ error: 'Tipo de arquivo inválido' }, { status: 400 });
+    }
+
+    // Nome = hash do conteúdo: a mesma conta enviada de novo reaproveita o arquivo
+    const blob = await commitBlob(COST_UPLOAD_DIR, file.tempPath, file.hash, file.originalName);
+    console.log('[UPLOAD COST] Arquivo salvo:', blob.filepath, blob.deduplicated ? '(já existente)' : '');
+    if (!blob.deduplicated) enqueueDerivatives(blob.filepath);
+
+    // Retornar caminho relativo para salvar no banco
+    const relativePath = `/api/uploads/costs/${blob.filename}`;
+
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'upload_cost_file',
+      userId: user.userId,
+      timestamp: getBrazilTime().toISOString(),
+      details: { filename: file.originalName, fileType, hash: blob.hash, deduplicated: blob.deduplicated }
+    });
+
+    return NextResponse.json({ 
+      success: true, 
+      filePath: relativePath,
+      fileName: file.originalName,
+      message: 'Arquivo enviado com sucesso'
+    });
+  } catch (error) {
+    console.error('Erro ao fazer upload de arquivo de custo:', error);
+    return NextResponse.json({ error: 'Erro ao fazer upload' }, { status: 500 });
+  }
+}
+
+export const POST = {
+  'costs-entries/create': costsEntriesCreate,
+  'costs-entries/list': costsEntriesList,
+  'costs-entries/update': costsEntriesUpdate,
+  'costs-entries/pay': costsEntriesPay,
+  'costs-entries/delete': costsEntriesDelete,
+  'costs-entries/approve': costsEntriesApprove,
+  'costs-entries/reject': costsEntriesReject,
+  'costs-entries/update-master': costsEntriesUpdateMaster,
+  'upload/cost-file': uploadCostFile
+};
@@ -0,0 +1,95 @@
+/**
+ * HANDLERS - TIPOS DE CUSTO (custos/*)
+ */
+
+import { NextResponse } from 'next/server';
+import crypto from 'crypto';
+import { recordAudit } from '@/lib/audit-writer';
+import { getBrazilTime } from '../shared';
+
+// CREATE CUSTO
+async function custosCreate({ request, db, user }) {
+  const { name, documentOptional } = await request.json();
+
+  if (!name || !name.trim()) {
+    return NextResponse.json({ error: 'Nome do custo é obrigatório' }, { status: 400 });
+  }
+
+  const custo = {
+    custoId: crypto.randomUUID(),
+    name: name.trim(),
+    documentOptional: documentOptional || false,
+    createdAt: getBrazilTime().toISOString()
+  };
+
+  await db.collection('custos').insertOne(custo);
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'create_custo',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { custoId: custo.custoId, name: custo.name }
+  });
+
+  return NextResponse.json({ success: true, message: 'Custo cadastrado com sucesso!', custo });
+}
+
+// LIST CUSTOS
+async function custosList({ db }) {
+  // Todos os usuários autenticados podem listar tipos de custos
+  const custos = await db.collection('custos')
+    .find({})
+    .sort({ name: 1 })
+    .toArray();
+
+  return NextResponse.json({ custos });
+}
+
+// UPDATE CUSTO
+async function custosUpdate({ request, db, user }) {
+  const { custoId, custoData } = await request.json();
+
+  console.log('[CUSTOS/UPDATE] Received data:', { custoId, custoData });
+
+  const updateResult = await db.collection('custos').updateOne(
+    { custoId },
+    { $set: { ...custoData, updatedAt: getBrazilTime().toISOString() } }
+  );
+
+  console.log('[CUSTOS/UPDATE] Update result:', updateResult);
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'update_custo',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { custoId, updates: Object.keys(custoData) }
+  });
+
+  return NextResponse.json({ success: true, message: 'Custo atualizado com sucesso!' });
+}
+
+// DELETE CUSTO
+async function custosDelete({ request, db, user }) {
+  const { custoId } = await request.json();
+
+  await db.collection('custos').deleteOne({ custoId });
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'delete_custo',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { custoId }
+  });
+
+  return NextResponse.json({ success: true, message: 'Custo excluído com sucesso!' });
+}
+
+export const POST = {
+  'custos/create': custosCreate,
+  'custos/list': custosList,
+  'custos/update': custosUpdate,
+  'custos/delete': custosDelete
+};
@@ -0,0 +1,499 @@
+/**
+ * HANDLERS - LANÇAMENTOS (entries/*, upload/receipt)
+ */
+
+import { NextResponse } from 'next/server';
+import crypto from 'crypto';
+import dayjs from 'dayjs';
+import { applyEntryRollupDelta, applyEntryRollupDeltas } from '@/lib/entry-rollups';
+import { isTimeWindowClosed } from '@/lib/time-window-lock';
+import { publishEvent } from '@/lib/event-bus';
+import { getCachedMonthStatus, getCachedUser } from '@/lib/lookup-cache';
+import { recordAudit } from '@/lib/audit-writer';
+import { repositoriesFor } from '@/lib/repositories';
+import { enqueueDerivatives } from '@/lib/image-derivatives';
+import { commitBlob, releaseBlob } from '@/lib/blob-store';
+import { discardUpload, receiveUpload } from '@/lib/multipart-upload';
+import { projectList, resolveFields, toProjection } from '@/lib/response-fields';
+import { jsonResponse } from '@/lib/json-response';
+import { aggregateCalendarEntries, getCalendarView, syncCalendarSlots, viewToEntries } from '@/lib/calendar-view';
+import { buildMonthScopeFilter } from '@/lib/access-scope';
+import {
+  UPLOAD_DIR,
+  UPLOAD_AREAS,
+  DOCUMENT_UPLOAD,
+  ENTRY_BATCH_LIMIT,
+  uploadErrorResponse,
+  getBrazilTime,
+  getBrazilClock,
+  loadEntryTimingSnapshot,
+  loadEntryTimingSnapshots,
+  entryIdFor,
+  buildEntryDocument,
+  validateEntryTiming
+} from '../shared';
+
+// UPLOAD RECEIPT - PATCH 3: Validação robusta
+async function uploadReceipt({ request, db, user }) {
+  // PATCH 3: tipo e tamanho validados enquanto o arquivo é gravado (sem carregar na memória)
+  let upload;
+  try {
+    upload = await receiveUpload(request, { dir: UPLOAD_DIR, ...DOCUMENT_UPLOAD });
+  } catch (error) {
+    return uploadErrorResponse(error);
+  }
+  const { file } = upload;
+  const entryId = upload.fields.entryId;
+
+  console.log('[UPLOAD] EntryID recebido:', entryId);
+
+  if (!file) {
+    return NextResponse.json({ error: 'Arquivo não enviado' }, { status: 400 });
+  }
+
+  if (!entryId) {
+    await discardUpload(file);
+    return NextResponse.json({ error: 'EntryID não fornecido' }, { status: 400 });
+  }
+
+  // Verificar se entry existe
+  const existingEntry = await repositoriesFor(db).entries.findByEntryId(entryId);
+  if (!existingEntry) {
+    await discardUpload(file);
+    console.log('[UPLOAD] Entry não encontrado:', entryId);
+    return NextResponse.json({ 
+      error: '❌ Lançamento não encontrado',
+      details: `EntryID: ${entryId}`
+    }, { status: 404 });
+  }
+
+  console.log('[UPLOAD] Entry encontrado:', existingEntry.entryId);
+
+  // Nome = hash do conteúdo: reenvio do mesmo comprovante reaproveita o arquivo
+  const blob = await commitBlob(UPLOAD_DIR, file.tempPath, file.hash, file.originalName);
+  console.log('[UPLOAD] Arquivo salvo:', blob.filepath, blob.deduplicated ? '(já existente)' : '');
+  if (!blob.deduplicated) enqueueDerivatives(blob.filepath);
+
+  const fileId = crypto.randomUUID();
+  const receipt = {
+    receiptId: fileId,
+    filename: file.originalName,
+    filepath: blob.filename,
+    fileType: file.mimeType,
+    fileSize: file.size,
+    uploadedBy: user.userId,
+    uploadedAt: getBrazilTime().toISOString()
+  };
+
+  // Atualizar entry com receipt
+  const updateResult = await db.collection('entries').updateOne(
+    { entryId },
+    { $push: { receipts: receipt } }
+  );
+
+  console.log('[UPLOAD] Update result:', updateResult.modifiedCount, 'docs modificados');
+  await syncCalendarSlots(db, [existingEntry]);
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'upload_receipt',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { entryId, filename: file.originalName, receiptId: fileId, hash: blob.hash, deduplicated: blob.deduplicated }
+  });
+
+  return NextResponse.json({ 
+    success: true, 
+    receipt,
+    message: 'Comprovante enviado e salvo com sucesso'
+  });
+}
+
+// SAVE ENTRY
+async function entriesSave({ request, db, user }) {
+  const [userData, body] = await Promise.all([getCachedUser(db, user.userId), request.json()]);
+  const { month, year, day, timeSlot, value } = body;
+
+  const entryId = entryIdFor(body);
+  const timingParams = {
+    userId: user.userId,
+    churchId: userData.church,
+    month,
+    year,
+    day,
+    timeSlot,
+    entryId
+  };
+
+  // Lançamento existente + regras de horário numa única rodada de consultas paralelas
+  const snapshot = await loadEntryTimingSnapshot(db, timingParams, new Date().toISOString());
+  const existing = snapshot.existing;
+  const isEdit = existing && existing.value !== null;
+
+  // VALIDAÇÃO COMPLETA COM NOVA FUNÇÃO
+  const validation = await validateEntryTiming(db, {
+    ...timingParams,
+    isEdit,
+    createdAt: existing?.createdAt
+  }, snapshot);
+
+  if (!validation.allowed) {
+    return NextResponse.json({ 
+      error: validation.message,
+      locked: true,
+      reason: validation.reason,
+      windowEnd: validation.windowEnd
+    }, { status: 403 });
+  }
+
+  const currentTime = getBrazilTime();
+  const entry = buildEntryDocument(body, user.userId, userData, existing, currentTime);
+
+  // Grava e recebe o documento anterior na mesma operação: o delta do rollup sai dele (e não do
+  // snapshot lido antes), então duas gravações simultâneas não somam o lançamento duas vezes
+  const [previous] = await repositoriesFor(db).entries.upsertReturningPrevious([entry]);
+
+  await applyEntryRollupDelta(db, previous, entry);
+  await syncCalendarSlots(db, [entry]);
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: isEdit ? 'ENTRY_UPDATED' : 'ENTRY_CREATED',
+    userId: user.userId,
+    timestamp: currentTime.toISOString(),
+    details: { 
+      entryId, 
+      value, 
+      timeSlot,
+      validationReason: validation.reason
+    }
+  });
+
+  publishEvent('entry.changed', { all: true }, { entryId, year, month, day, timeSlot });
+
+  return NextResponse.json({ 
+    success: true, 
+    entry,
+    message: validation.message
+  });
+}
+
+// SAVE ENTRIES IN BATCH (vários dias/horários numa requisição; resultado por horário)
+async function entriesSaveBatch({ request, db, user }) {
+  const [userData, body] = await Promise.all([getCachedUser(db, user.userId), request.json()]);
+  const items = Array.isArray(body.entries) ? body.entries : [];
+
+  if (items.length === 0) {
+    return NextResponse.json({ error: 'Nenhum lançamento enviado' }, { status: 400 });
+  }
+
+  if (items.length > ENTRY_BATCH_LIMIT) {
+    return NextResponse.json({ error: `Máximo de ${ENTRY_BATCH_LIMIT} lançamentos por envio` }, { status: 400 });
+  }
+
+  const slots = items.map(item => ({ ...item, entryId: entryIdFor(item) }));
+
+  // Todas as consultas de validação de uma vez (lançamentos, overrides, status dos meses)
+  const snapshots = await loadEntryTimingSnapshots(db, {
+    userId: user.userId,
+    churchId: userData.church
+  }, slots, new Date().toISOString());
+
+  const currentTime = getBrazilTime();
+  const results = [];
+  const accepted = [];
+  const seen = new Set();
+
+  for (const [index, slot] of slots.entries()) {
+    const { entryId, month, year, day, timeSlot } = slot;
+
+    if (seen.has(entryId)) {
+      results.push({ index, entryId, saved: false, reason: 'DUPLICATE', error: 'Horário repetido no mesmo envio' });
+      continue;
+    }
+    seen.add(entryId);
+
+    const snapshot = snapshots.get(entryId);
+    const existing = snapshot.existing;
+    const isEdit = existing && existing.value !== null;
+
+    const validation = await validateEntryTiming(db, {
+      userId: user.userId,
+      churchId: userData.church,
+      month,
+      year,
+      day,
+      timeSlot,
+      entryId,
+      isEdit,
+      createdAt: existing?.createdAt
+    }, snapshot);
+
+    if (!validation.allowed) {
+      results.push({
+        index,
+        entryId,
+        saved: false,
+        locked: true,
+        reason: validation.reason,
+        error: validation.message,
+        windowEnd: validation.windowEnd
+      });
+      continue;
+    }
+
+    const entry = buildEntryDocument(slot, user.userId, userData, existing, currentTime);
+    accepted.push({ entry, existing, isEdit, validation, value: slot.value });
+    results.push({ index, entryId, saved: true, reason: validation.reason, message: validation.message, entry });
+  }
+
+  if (accepted.length > 0) {
+    // Lançamentos gravados com o documento anterior de cada um (delta atômico do rollup) e
+    // uma escrita para os totais
+    const previous = await repositoriesFor(db).entries.upsertReturningPrevious(accepted.map(({ entry }) => entry));
+
+    await applyEntryRollupDeltas(db, accepted.map(({ entry }, i) => [previous[i], entry]));
+    await syncCalendarSlots(db, accepted.map(({ entry }) => entry));
+
+    // Registros de auditoria vão juntos no próximo insertMany do audit-writer
+    for (const { entry, isEdit, validation, value } of accepted) {
+      recordAudit(db, {
+        logId: crypto.randomUUID(),
+        action: isEdit ? 'ENTRY_UPDATED' : 'ENTRY_CREATED',
+        userId: user.userId,
+        timestamp: currentTime.toISOString(),
+        details: {
+          entryId: entry.entryId,
+          value,
+          timeSlot: entry.timeSlot,
+          validationReason: validation.reason,
+          batch: true
+        }
+      });
+    }
+
+    // Um evento por mês afetado
+    const byMonth = new Map();
+    for (const { entry } of accepted) {
+      const key = `${entry.year}-${entry.month}`;
+      if (!byMonth.has(key)) byMonth.set(key, { year: entry.year, month: entry.month, entryIds: [] });
+      byMonth.get(key).entryIds.push(entry.entryId);
+    }
+    for (const data of byMonth.values()) {
+      publishEvent('entry.changed', { all: true }, data);
+    }
+  }
+
+  return NextResponse.json({
+    success: accepted.length > 0,
+    saved: accepted.length,
+    rejected: results.length - accepted.length,
+    results
+  });
+}
+
+// DELETE RECEIPT FROM ENTRY (Pastor/Bispo - dono da oferta)
+async function entriesDeleteReceipt({ request, db, user }) {
+  try {
+    const body = await request.json();
+    const { entryId, receiptFilepath } = body;
+
+    // Buscar entry
+    const entry = await repositoriesFor(db).entries.findByEntryId(entryId);
+
+    if (!entry) {
+      return NextResponse.json({ error: 'Oferta não encontrada' }, { status: 404 });
+    }
+
+    // Verificar se é o dono da oferta (ou Master)
+    const userData = await getCachedUser(db, user.userId);
+    if (userData.role !== 'master' && entry.userId !== user.userId) {
+      return NextResponse.json({ error: 'Você não tem permissão para excluir este comprovante' }, { status: 403 });
+    }
+
+    // Verificar se período está fechado
+    const currentTime = getBrazilTime();
+    const monthStatus = await getCachedMonthStatus(db, entry.month, entry.year);
+
+    if (monthStatus?.closed && userData.role !== 'master') {
+      return NextResponse.json({ error: 'Período fechado. Não é possível excluir comprovantes.' }, { status: 403 });
+    }
+
+    // Verificar bloqueio de janela de tempo
+    const entryDate = dayjs.tz(`${entry.year}-${String(entry.month).padStart(2, '0')}-${String(entry.day).padStart(2, '0')}`, 'America/Sao_Paulo');
+    const [hour, minute] = entry.timeSlot.split(':');
+    const entryDateTime = entryDate.hour(parseInt(hour)).minute(parseInt(minute));
+    const lockTime = entryDateTime.add(2, 'hour');
+
+    // Verificar se há um time_override ativo (liberação do Master)
+    const activeOverride = await db.collection('time_overrides').findOne({
+      userId: user.userId,
+      month: entry.month,
+      year: entry.year,
+      day: entry.day,
+      timeSlot: entry.timeSlot,
+      expiresAt: { $gt: currentTime.toISOString() }
+    });
+
+    // Se NÃO há override ativo E o tempo passou E não é Master → BLOQUEAR
+    if (currentTime.isAfter(lockTime) && !activeOverride && !entry.masterUnlocked && userData.role !== 'master') {
+      return NextResponse.json({ error: 'Período de edição encerrado (2 horas após o horário)' }, { status: 403 });
+    }
+
+    // Remover comprovante da lista
+    const updatedReceipts = (entry.receipts || []).filter(r => r.filepath !== receiptFilepath);
+
+    await db.collection('entries').updateOne(
+      { entryId },
+      { 
+        $set: { 
+          receipts: updatedReceipts,
+          updatedAt: currentTime.toISOString()
+        }
+      }
+    );
+
+    await syncCalendarSlots(db, [entry]);
+
+    // Arquivo físico só sai se nenhum outro lançamento usa o mesmo conteúdo
+    await releaseBlob(db, UPLOAD_AREAS, 'receipts', receiptFilepath);
+
+    // Audit log
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'delete_receipt',
+      userId: user.userId,
+      timestamp: currentTime.toISOString(),
+      details: {
+        entryId,
+        receiptFilepath,
+        remainingReceipts: updatedReceipts.length
+      }
+    });
+
+    publishEvent('entry.changed', { all: true }, { entryId, year: entry.year, month: entry.month, day: entry.day, timeSlot: entry.timeSlot });
+
+    return NextResponse.json({ 
+      success: true, 
+      message: 'Comprovante excluído com sucesso!',
+      remainingReceipts: updatedReceipts 
+    });
+  } catch (error) {
+    console.error('Erro ao deletar comprovante:', error);
+    return NextResponse.json({ error: 'Erro ao deletar comprovante' }, { status: 500 });
+  }
+}
+
+// DELETE SPECIFIC ENTRY (Master apenas)
+async function entriesDeleteSpecific({ request, db, user }) {
+  try {
+    const body = await request.json();
+    const { entryId, userId } = body;
+
+    // Buscar e deletar numa única operação: exclusões simultâneas não descontam o rollup duas vezes
+    const entry = await db.collection('entries').findOneAndDelete({ entryId, userId });
+
+    if (!entry) {
+      return NextResponse.json({ error: 'Oferta não encontrada' }, { status: 404 });
+    }
+
+    await applyEntryRollupDelta(db, entry, null);
+    await syncCalendarSlots(db, [entry]);
+
+    // Audit log
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'delete_entry_by_master',
+      userId: user.userId,
+      timestamp: getBrazilTime().toISOString(),
+      details: {
+        entryId,
+        deletedUserId: userId,
+        church: entry.church,
+        value: entry.value
+      }
+    });
+
+    publishEvent('entry.changed', { all: true }, { entryId, year: entry.year, month: entry.month, day: entry.day, timeSlot: entry.timeSlot });
+
+    return NextResponse.json({ success: true, message: 'Oferta excluída com sucesso!' });
+  } catch (error) {
+    console.error('Erro ao deletar oferta:', error);
+    return NextResponse.json({ error: 'Erro ao deletar oferta' }, { status: 500 });
+  }
+}
+
+// GET MONTH DATA (with observations)
+async function entriesMonth({ request, db, userData }) {
+  const body = await request.json();
+  const { month, year, churchFilter } = body;
+  const fields = resolveFields('entries/month', body.fields);
+
+  // Build filter based on user scope
+  const filter = buildMonthScopeFilter(userData, month, year);
+
+  // MASTER vê tudo (ou filtra por igreja se especificado)
+  if ((userData.role === 'master' || userData.scope === 'global') && churchFilter && churchFilter !== 'all') {
+    filter.churchId = churchFilter;
+  }
+
+  console.log('[ENTRIES/MONTH] User:', userData.userId, 'Role:', userData.role, 'Filter:', JSON.stringify(filter));
+
+  let entries;
+
+  // MASTER sem filtro de igreja: buckets do mês em calendar_views (atualizados a cada gravação)
+  const calendarView = userData.role === 'master' && !filter.churchId
+    ? await getCalendarView(db, month, year)
+    : null;
+
+  if (calendarView) {
+    entries = viewToEntries(calendarView);
+  } else {
+    // MASTER agrega por horário (dia + timeSlot) e precisa de todos os campos dos lançamentos
+    const projection = userData.role === 'master'
+      ? toProjection('entries/month', resolveFields('entries/month'))
+      : toProjection('entries/month', fields);
+    entries = await repositoriesFor(db).entries.find(filter, { projection });
+
+    if (userData.role === 'master') {
+      entries = aggregateCalendarEntries(entries);
+    }
+  }
+
+  // Get month status
+  const monthStatus = await getCachedMonthStatus(db, month, year);
+
+  // Get day observations
+  const dayObservations = await db.collection('day_observations')
+    .find({ month: parseInt(month), year: parseInt(year) })
+    .toArray();
+
+  // Get month observation
+  const monthObservation = await db.collection('month_observations')
+    .findOne({ month: parseInt(month), year: parseInt(year) });
+
+  // Trava de janela calculada na leitura; a gravação é feita pelo agendador em lote
+  const clock = getBrazilClock();
+  for (const entry of entries) {
+    entry.timeWindowLocked = isTimeWindowClosed(entry, clock, monthStatus?.closed);
+  }
+
+  return jsonResponse(request, { 
+    entries: projectList('entries/month', entries, fields), 
+    monthClosed: monthStatus?.closed || false,
+    dayObservations,
+    monthObservation: monthObservation ? {
+      observation: monthObservation.observation || '',
+      active: monthObservation.active || false
+    } : { observation: '', active: false }
+  }, { name: 'entries/month' });
+}
+
+export const POST = {
+  'upload/receipt': uploadReceipt,
+  'entries/save': entriesSave,
+  'entries/save-batch': entriesSaveBatch,
+  'entries/delete-receipt': entriesDeleteReceipt,
+  'entries/delete-specific': entriesDeleteSpecific,
+  'entries/month': entriesMonth
+};
@@ -0,0 +1,75 @@
+/**
+ * HANDLERS - ARQUIVOS (comprovantes e uploads)
+ */
+
+import { NextResponse } from 'next/server';
+import { existsSync } from 'fs';
+import path from 'path';
+import { resolveDerivative } from '@/lib/image-derivatives';
+import { resolveInside, serveFile } from '@/lib/file-server';
+import { UPLOAD_DIR } from '../shared';
+
+// VIEW RECEIPT (serve arquivo para visualização)
+async function viewReceipt({ request, url, endpoint }) {
+  const filename = endpoint.replace('view/receipt/', '');
+  const filepath = resolveInside(UPLOAD_DIR, filename);
+
+  if (!filepath || !existsSync(filepath)) {
+    console.log('[VIEW RECEIPT] Arquivo não encontrado:', filepath || filename);
+    return NextResponse.json({ error: 'Arquivo não encontrado' }, { status: 404 });
+  }
+
+  // ?size=thumb|preview: serve o derivado WebP se já foi gerado; senão, o original
+  const size = url.searchParams.get('size');
+  const derivative = resolveDerivative(filepath, size);
+
+  const response = await serveFile(request, derivative || filepath, {
+    // Original no lugar de um derivado ainda pendente: cache curto para pegar a miniatura depois
+    cacheControl: size && !derivative ? 'public, max-age=60' : 'public, max-age=31536000'
+  });
+  return response || NextResponse.json({ error: 'Arquivo não encontrado' }, { status: 404 });
+}
+
+async function downloadReceipt({ request, endpoint }) {
+  const filename = endpoint.replace('download/receipt/', '');
+  const filepath = resolveInside(UPLOAD_DIR, filename);
+
+  console.log('[DOWNLOAD] Tentando baixar:', filepath || filename);
+
+  const response = filepath && await serveFile(request, filepath, {
+    disposition: `attachment; filename="${path.basename(filepath)}"`
+  });
+  if (!response) {
+    console.log('[DOWNLOAD] Arquivo não encontrado:', filepath || filename);
+    return NextResponse.json({ error: 'Arquivo não encontrado' }, { status: 404 });
+  }
+  return response;
+}
+
+// SERVE UPLOADED FILES (churches, users, costs)
+async function uploads({ request, url, endpoint }) {
+  const filepath = resolveInside(path.join(process.cwd(), 'uploads'), endpoint.replace('uploads/', ''));
+
+  try {
+    if (!filepath || !existsSync(filepath)) {
+      return NextResponse.json({ error: 'Arquivo não encontrado' }, { status: 404 });
+    }
+
+    const size = url.searchParams.get('size');
+    const derivative = resolveDerivative(filepath, size);
+
+    const response = await serveFile(request, derivative || filepath, {
+      cacheControl: size && !derivative ? 'public, max-age=60' : 'public, max-age=31536000'
+    });
+    return response || NextResponse.json({ error: 'Arquivo não encontrado' }, { status: 404 });
+  } catch (error) {
+    console.error('Erro ao servir arquivo:', error);
+    return NextResponse.json({ error: 'Erro ao carregar arquivo' }, { status: 500 });
+  }
+}
+
+export const GET = {
+  'view/receipt/*': viewReceipt,
+  'download/receipt/*': downloadReceipt,
+  'uploads/*': uploads
+};
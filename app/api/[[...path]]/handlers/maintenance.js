@@ -0,0 +1,166 @@
+/**
+ * HANDLERS - MANUTENÇÃO (limpeza de lançamentos e uploads)
+ */
+
+import { NextResponse } from 'next/server';
+import crypto from 'crypto';
+import { ROLLUP_COLLECTION, rebuildEntryRollups } from '@/lib/entry-rollups';
+import { publishEvent } from '@/lib/event-bus';
+import { syncCalendarSlots } from '@/lib/calendar-view';
+import { recordAudit } from '@/lib/audit-writer';
+import { sweepUploads } from '@/lib/blob-store';
+import { UPLOAD_AREAS, getBrazilTime } from '../shared';
+
+// LIMPAR TODAS AS OFERTAS (Master apenas)
+async function entriesClearAll({ db, user }) {
+  try {
+    // Primeiro, vamos verificar quantas ofertas existem
+    const entriesCount = await db.collection('entries').countDocuments();
+
+    // Verificar ofertas órfãs (ligadas a igrejas que não existem)
+    const entries = await db.collection('entries').find({}).toArray();
+    const churches = await db.collection('churches').find({}).toArray();
+    const churchIds = new Set(churches.map(c => c.churchId));
+
+    const orphanEntries = entries.filter(e => e.churchId && !churchIds.has(e.churchId));
+
+    // Deletar TODAS as ofertas
+    const deleteResult = await db.collection('entries').deleteMany({});
+    await db.collection(ROLLUP_COLLECTION).deleteMany({});
+    await syncCalendarSlots(db, entries);
+
+    // Registrar no audit log
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'clear_all_entries',
+      userId: user.userId,
+      timestamp: getBrazilTime().toISOString(),
+      details: {
+        totalDeleted: deleteResult.deletedCount,
+        entriesCount: entriesCount,
+        orphanEntries: orphanEntries.length,
+        orphanDetails: orphanEntries.map(e => ({
+          entryId: e.entryId,
+          churchId: e.churchId,
+          date: e.date,
+          value: e.value
+        }))
+      }
+    });
+
+    publishEvent('entry.changed', { all: true }, { cleared: true });
+
+    return NextResponse.json({
+      success: true,
+      message: `✅ Todas as ofertas foram excluídas com sucesso!`,
+      details: {
+        totalDeleted: deleteResult.deletedCount,
+        orphanEntriesFound: orphanEntries.length
+      }
+    });
+  } catch (error) {
+    console.error('Erro ao limpar ofertas:', error);
+    return NextResponse.json({ error: 'Erro ao limpar ofertas' }, { status: 500 });
+  }
+}
+
+// VARRER UPLOADS SEM REFERÊNCIA (Master apenas; dryRun só relata)
+async function uploadsSweep({ request, db, user }) {
+  try {
+    const body = await request.json().catch(() => ({}));
+    const report = await sweepUploads(db, UPLOAD_AREAS, { dryRun: body.dryRun === true });
+
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'sweep_uploads',
+      userId: user.userId,
+      timestamp: getBrazilTime().toISOString(),
+      details: report
+    });
+
+    return NextResponse.json({ success: true, report });
+  } catch (error) {
+    console.error('Erro ao varrer uploads:', error);
+    return NextResponse.json({ error: 'Erro ao varrer uploads' }, { status: 500 });
+  }
+}
+
+// LIMPAR APENAS OFERTAS ÓRFÃS (Master apenas)
+async function entriesCleanupOrphans({ db, user }) {
+  try {
+    // Buscar todas as igrejas válidas
+    const churches = await db.collection('churches').find({}).toArray();
+    const validChurchIds = new Set(churches.map(c => c.churchId));
+
+    console.log('[CLEANUP ORPHANS] Igrejas válidas:', Array.from(validChurchIds));
+
+    // Buscar todas as ofertas
+    const allEntries = await db.collection('entries').find({}).toArray();
+
+    // Identificar ofertas órfãs
+    const orphanEntries = allEntries.filter(entry => {
+      // Oferta órfã se:
+      // 1. Não tem churchId OU
+      // 2. churchId não está na lista de igrejas válidas
+      return !entry.churchId || !validChurchIds.has(entry.churchId);
+    });
+
+    console.log('[CLEANUP ORPHANS] Total de ofertas:', allEntries.length);
+    console.log('[CLEANUP ORPHANS] Ofertas órfãs encontradas:', orphanEntries.length);
+
+    // Deletar ofertas órfãs
+    const orphanEntryIds = orphanEntries.map(e => e.entryId);
+    let deleteResult = { deletedCount: 0 };
+
+    if (orphanEntryIds.length > 0) {
+      deleteResult = await db.collection('entries').deleteMany({
+        entryId: { $in: orphanEntryIds }
+      });
+      await rebuildEntryRollups(db);
+      await syncCalendarSlots(db, orphanEntries);
+    }
+
+    // Registrar no audit log
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'cleanup_orphan_entries',
+      userId: user.userId,
+      timestamp: getBrazilTime().toISOString(),
+      details: {
+        totalChecked: allEntries.length,
+        orphansFound: orphanEntries.length,
+        orphansDeleted: deleteResult.deletedCount,
+        validChurches: Array.from(validChurchIds),
+        validEntriesRemaining: allEntries.length - orphanEntries.length,
+        orphanDetails: orphanEntries.map(e => ({
+          entryId: e.entryId,
+          churchId: e.churchId || 'SEM_CHURCH_ID',
+          churchName: e.church || 'SEM_CHURCH_NAME',
+          value: e.value,
+          date: `${e.year}-${String(e.month).padStart(2, '0')}-${String(e.day).padStart(2, '0')}`
+        }))
+      }
+    });
+
+    return NextResponse.json({
+      success: true,
+      message: `✅ Limpeza concluída! ${deleteResult.deletedCount} ofertas órfãs removidas.`,
+      stats: {
+        totalChecked: allEntries.length,
+        orphansFound: orphanEntries.length,
+        orphansDeleted: deleteResult.deletedCount,
+        validChurches: churches.map(c => c.name),
+        validEntriesRemaining: allEntries.length - orphanEntries.length
+      }
+    });
+  } catch (error) {
+    console.error('Erro ao limpar ofertas órfãs:', error);
+    return NextResponse.json({ error: 'Erro ao limpar ofertas órfãs' }, { status: 500 });
+  }
+}
+
+export const POST = {
+  'entries/clear-all': entriesClearAll,
+  'uploads/sweep': uploadsSweep,
+  'entries/cleanup-orphans': entriesCleanupOrphans
+};
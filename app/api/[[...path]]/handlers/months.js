@@ -0,0 +1,73 @@
+/**
+ * HANDLERS - FECHAMENTO DE MÊS (month/*)
+ */
+
+import { NextResponse } from 'next/server';
+import crypto from 'crypto';
+import { invalidateMonthStatus } from '@/lib/lookup-cache';
+import { recordAudit } from '@/lib/audit-writer';
+import { getBrazilTime } from '../shared';
+
+// CLOSE MONTH
+async function monthClose({ request, db, user }) {
+  const { month, year } = await request.json();
+
+  await db.collection('month_status').updateOne(
+    { month, year },
+    { 
+      $set: { 
+        month,
+        year,
+        closed: true,
+        closedBy: user.userId,
+        closedAt: getBrazilTime().toISOString()
+      } 
+    },
+    { upsert: true }
+  );
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'close_month',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { month, year }
+  });
+
+  invalidateMonthStatus(month, year);
+
+  return NextResponse.json({ success: true });
+}
+
+// REOPEN MONTH
+async function monthReopen({ request, db, user }) {
+  const { month, year } = await request.json();
+
+  await db.collection('month_status').updateOne(
+    { month, year },
+    { 
+      $set: { 
+        closed: false,
+        reopenedBy: user.userId,
+        reopenedAt: getBrazilTime().toISOString()
+      } 
+    }
+  );
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'reopen_month',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { month, year }
+  });
+
+  invalidateMonthStatus(month, year);
+
+  return NextResponse.json({ success: true });
+}
+
+export const POST = {
+  'month/close': monthClose,
+  'month/reopen': monthReopen
+};
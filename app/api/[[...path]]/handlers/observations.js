@@ -0,0 +1,116 @@
+/**
+ * HANDLERS - OBSERVAÇÕES (observations/*)
+ */
+
+import { NextResponse } from 'next/server';
+import crypto from 'crypto';
+import { recordAudit } from '@/lib/audit-writer';
+import { getBrazilTime } from '../shared';
+
+// SAVE DAY OBSERVATION
+async function observationsDay({ request, db, user }) {
+  const { month, year, day, observation } = await request.json();
+
+  const obsId = `${year}-${String(month).padStart(2, '0')}-${String(day).padStart(2, '0')}`;
+
+  await db.collection('day_observations').updateOne(
+    { obsId },
+    { 
+      $set: { 
+        obsId,
+        month,
+        year,
+        day,
+        observation,
+        updatedBy: user.userId,
+        updatedAt: getBrazilTime().toISOString()
+      } 
+    },
+    { upsert: true }
+  );
+
+  return NextResponse.json({ success: true });
+}
+
+// GET - Buscar observação do mês
+async function observationsMonthGet({ request, db }) {
+  try {
+    const { month, year } = await request.json();
+    const obsId = `${year}-${String(month).padStart(2, '0')}`;
+
+    const observation = await db.collection('month_observations').findOne({ obsId });
+
+    return NextResponse.json({ 
+      observation: observation || null
+    });
+  } catch (error) {
+    console.error('Erro ao buscar observação:', error);
+    return NextResponse.json({ error: 'Erro ao buscar' }, { status: 500 });
+  }
+}
+
+// SAVE MONTH OBSERVATION (APENAS MASTER)
+async function observationsMonth({ request, db, user }) {
+  // APENAS MASTER PODE CRIAR/EDITAR
+  if (user.role !== 'master') {
+    return NextResponse.json({ 
+      error: 'Apenas o Líder Máximo pode criar/editar observações do mês' 
+    }, { status: 403 });
+  }
+
+  const { month, year, observation, active } = await request.json();
+
+  const obsId = `${year}-${String(month).padStart(2, '0')}`;
+
+  // GARANTIR QUE observation É STRING
+  let observationText = '';
+  if (typeof observation === 'string') {
+    observationText = observation;
+  } else if (observation && typeof observation === 'object') {
+    // Se for objeto, tentar extrair campo observation
+    observationText = observation.observation || '';
+    console.warn('[OBSERVATION] ⚠️ Recebido objeto, extraindo campo observation');
+  }
+
+  console.log('[OBSERVATION] Salvando:', { 
+    obsId, 
+    active, 
+    length: observationText.length,
+    tipo: typeof observationText 
+  });
+
+  await db.collection('month_observations').updateOne(
+    { obsId },
+    { 
+      $set: { 
+        obsId,
+        month: parseInt(month),
+        year: parseInt(year),
+        observation: observationText,
+        active: active === true, // Force boolean
+        updatedBy: user.userId,
+        updatedAt: getBrazilTime().toISOString()
+      } 
+    },
+    { upsert: true }
+  );
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'update_month_observation',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { obsId, active, textLength: observation?.length || 0 }
+  });
+
+  return NextResponse.json({ 
+    success: true,
+    message: active ? 'Mensagem salva e ativada' : 'Mensagem salva (inativa)'
+  });
+}
+
+export const POST = {
+  'observations/day': observationsDay,
+  'observations/month/get': observationsMonthGet,
+  'observations/month': observationsMonth
+};
@@ -0,0 +1,146 @@
+/**
+ * HANDLERS - PRIVACIDADE (privacy/*)
+ */
+
+import { NextResponse } from 'next/server';
+import crypto from 'crypto';
+import { getCachedPrivacyConfig, getCachedPrivacyConfigs, invalidatePrivacyConfig } from '@/lib/lookup-cache';
+import { recordAudit } from '@/lib/audit-writer';
+import { getBrazilTime } from '../shared';
+
+// GET - Buscar configuração de privacidade de uma função
+async function privacyGet({ request, db }) {
+  try {
+    const { roleId } = await request.json();
+
+    // Qualquer usuário autenticado pode buscar configurações de privacidade
+    // Isso é necessário para que o sistema aplique as permissões no login
+    const config = await getCachedPrivacyConfig(db, roleId);
+
+    return NextResponse.json({ 
+      config: config || { roleId, allowedTabs: [] }
+    });
+  } catch (error) {
+    console.error('Erro ao buscar configuração de privacidade:', error);
+    return NextResponse.json({ error: 'Erro ao buscar configuração' }, { status: 500 });
+  }
+}
+
+// LIST - Listar todas as configurações de privacidade
+async function privacyList({ db }) {
+  try {
+    const configs = (await getCachedPrivacyConfigs(db))
+      .sort((a, b) => (a.roleName || '').localeCompare(b.roleName || ''));
+
+    return NextResponse.json({ 
+      configs: configs.map(c => ({
+        roleId: c.roleId,
+        roleName: c.roleName,
+        allowedTabs: c.allowedTabs || [],
+        updatedAt: c.updatedAt
+      }))
+    });
+  } catch (error) {
+    console.error('Erro ao listar configurações de privacidade:', error);
+    return NextResponse.json({ error: 'Erro ao listar configurações' }, { status: 500 });
+  }
+}
+
+// DELETE - Excluir configuração de privacidade
+async function privacyDelete({ request, db, user }) {
+  try {
+    const { roleId } = await request.json();
+
+    await db.collection('privacy_config').deleteOne({ roleId });
+    invalidatePrivacyConfig();
+
+    // Registrar log de auditoria
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'PRIVACY_DELETE',
+      userId: user.userId,
+      userName: user.name,
+      timestamp: new Date().toISOString(),
+      details: { roleId }
+    });
+
+    return NextResponse.json({ 
+      success: true,
+      message: 'Configuração removida com sucesso!' 
+    });
+  } catch (error) {
+    console.error('Erro ao excluir configuração de privacidade:', error);
+    return NextResponse.json({ error: 'Erro ao excluir configuração' }, { status: 500 });
+  }
+}
+
+// SAVE - Salvar configuração de privacidade
+async function privacySave({ request, db, user }) {
+  try {
+    const { roleId, roleName, allowedTabs } = await request.json();
+
+    if (!roleId || !roleName) {
+      return NextResponse.json({ error: 'Dados inválidos' }, { status: 400 });
+    }
+
+    console.log('[PRIVACY/SAVE] Saving config:', { roleId, roleName, allowedTabs });
+
+    const configData = {
+      roleId,
+      roleName,
+      allowedTabs: allowedTabs || [],
+      updatedAt: getBrazilTime().toISOString(),
+      updatedBy: user.userId
+    };
+
+    // Usar upsert para criar ou atualizar
+    const result = await db.collection('privacy_config').updateOne(
+      { roleId },
+      { 
+        $set: configData,
+        $setOnInsert: { createdAt: getBrazilTime().toISOString() }
+      },
+      { upsert: true }
+    );
+    invalidatePrivacyConfig();
+
+    console.log('[PRIVACY/SAVE] Result:', result);
+
+    // Audit log
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'update_privacy_config',
+      userId: user.userId,
+      timestamp: getBrazilTime().toISOString(),
+      details: { roleId, roleName, allowedTabs }
+    });
+
+    return NextResponse.json({ 
+      success: true, 
+      message: 'Configuração de privacidade salva com sucesso!' 
+    });
+  } catch (error) {
+    console.error('Erro ao salvar configuração de privacidade:', error);
+    return NextResponse.json({ error: 'Erro ao salvar configuração' }, { status: 500 });
+  }
+}
+
+// LIST ALL - Listar todas as configurações
+async function privacyListAll({ db }) {
+  try {
+    const configs = await getCachedPrivacyConfigs(db);
+
+    return NextResponse.json({ configs });
+  } catch (error) {
+    console.error('Erro ao listar configurações:', error);
+    return NextResponse.json({ error: 'Erro ao listar configurações' }, { status: 500 });
+  }
+}
+
+export const POST = {
+  'privacy/get': privacyGet,
+  'privacy/list': privacyList,
+  'privacy/delete': privacyDelete,
+  'privacy/save': privacySave,
+  'privacy/list-all': privacyListAll
+};
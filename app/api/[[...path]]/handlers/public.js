@@ -0,0 +1,52 @@
+/**
+ * HANDLERS - ROTAS PÚBLICAS (cadastro)
+ */
+
+import { NextResponse } from 'next/server';
+import crypto from 'crypto';
+import { getCachedRoles, invalidateRoles } from '@/lib/lookup-cache';
+import { getBrazilTime } from '../shared';
+
+// PUBLIC: GET ALL CHURCHES (para cadastro público)
+async function publicChurches({ db }) {
+  try {
+    const churches = await db.collection('churches')
+      .find({}, { projection: { name: 1, churchId: 1, city: 1, state: 1 } })
+      .sort({ name: 1 })
+      .toArray();
+
+    return NextResponse.json({ churches });
+  } catch (error) {
+    return NextResponse.json({ error: 'Erro ao buscar igrejas' }, { status: 500 });
+  }
+}
+
+// PUBLIC: GET ALL ROLES (para cadastro público)
+async function publicRoles({ db }) {
+  try {
+    let roles = (await getCachedRoles(db)).sort((a, b) => (a.name || '').localeCompare(b.name || ''));
+
+    // Se não houver roles no banco, criar os padrões
+    if (roles.length === 0) {
+      const defaultRoles = [
+        { roleId: crypto.randomUUID(), name: 'Secretário(a)', createdAt: getBrazilTime().toISOString() },
+        { roleId: crypto.randomUUID(), name: 'Tesoureiro(a)', createdAt: getBrazilTime().toISOString() },
+        { roleId: crypto.randomUUID(), name: 'Pastor(a)', createdAt: getBrazilTime().toISOString() },
+        { roleId: crypto.randomUUID(), name: 'Bispo(a)', createdAt: getBrazilTime().toISOString() }
+      ];
+
+      await db.collection('roles').insertMany(defaultRoles);
+      invalidateRoles();
+      roles = defaultRoles;
+    }
+
+    return NextResponse.json({ roles });
+  } catch (error) {
+    return NextResponse.json({ error: 'Erro ao buscar funções' }, { status: 500 });
+  }
+}
+
+export const POST = {
+  'public/churches': publicChurches,
+  'public/roles': publicRoles
+};
@@ -0,0 +1,89 @@
+/**
+ * HANDLERS - FUNÇÕES (roles/*)
+ */
+
+import { NextResponse } from 'next/server';
+import crypto from 'crypto';
+import { getCachedRoles, invalidateRoles } from '@/lib/lookup-cache';
+import { recordAudit } from '@/lib/audit-writer';
+import { getBrazilTime } from '../shared';
+
+// GET ALL ROLES
+async function rolesList({ db }) {
+  const roles = (await getCachedRoles(db)).sort((a, b) => (b.createdAt || '').localeCompare(a.createdAt || ''));
+
+  return NextResponse.json({ roles });
+}
+
+// CREATE ROLE
+async function rolesCreate({ request, db, user }) {
+  const { name, description } = await request.json();
+
+  const newRole = {
+    roleId: crypto.randomUUID(),
+    name,
+    description,
+    createdAt: getBrazilTime().toISOString(),
+    updatedAt: getBrazilTime().toISOString()
+  };
+
+  await db.collection('roles').insertOne(newRole);
+  invalidateRoles();
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'create_role',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { roleId: newRole.roleId, roleName: name }
+  });
+
+  return NextResponse.json({ success: true, role: newRole, message: 'Função criada com sucesso!' });
+}
+
+// UPDATE ROLE
+async function rolesUpdate({ request, db, user }) {
+  const { roleId, roleData } = await request.json();
+
+  await db.collection('roles').updateOne(
+    { roleId },
+    { $set: { ...roleData, updatedAt: getBrazilTime().toISOString() } }
+  );
+  invalidateRoles();
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'update_role',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { roleId, updates: Object.keys(roleData) }
+  });
+
+  return NextResponse.json({ success: true, message: 'Função atualizada com sucesso!' });
+}
+
+// DELETE ROLE
+async function rolesDelete({ request, db, user }) {
+  const { roleId } = await request.json();
+
+  const role = await db.collection('roles').findOne({ roleId });
+  await db.collection('roles').deleteOne({ roleId });
+  invalidateRoles();
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'delete_role',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { deletedRoleId: roleId, deletedRoleName: role?.name }
+  });
+
+  return NextResponse.json({ success: true, message: 'Função excluída com sucesso!' });
+}
+
+export const POST = {
+  'roles/list': rolesList,
+  'roles/create': rolesCreate,
+  'roles/update': rolesUpdate,
+  'roles/delete': rolesDelete
+};
@@ -0,0 +1,106 @@
+/**
+ * HANDLERS - SISTEMA (métricas, health, eventos, cache, hora)
+ */
+
+import { NextResponse } from 'next/server';
+import jwt from 'jsonwebtoken';
+import { createEventStream } from '@/lib/event-bus';
+import { getCacheStats, getCachedUser } from '@/lib/lookup-cache';
+import { getAuditWriterStats } from '@/lib/audit-writer';
+import { getDerivativeStats } from '@/lib/image-derivatives';
+import { getFileCacheStats } from '@/lib/file-server';
+import { getResponseStats } from '@/lib/json-response';
+import { canReadMetrics, renderMetrics } from '@/lib/request-metrics';
+import { getPasswordHashingStats } from '@/lib/password-hashing';
+import { getPresenceStats } from '@/lib/presence';
+import { checkMongoHealth, getPoolStats, renderPoolMetrics } from '@/lib/mongo-connection';
+import { getCalendarViewStats } from '@/lib/calendar-view';
+import { JWT_SECRET, connectDB, verifyToken, getBrazilTime } from '../shared';
+
+// MÉTRICAS (Prometheus) - não depende do banco; METRICS_TOKEN ou JWT de Master
+async function metrics({ request }) {
+  if (!canReadMetrics(request, verifyToken(request))) {
+    return NextResponse.json({ error: 'Acesso negado' }, { status: 403 });
+  }
+  return new Response(renderMetrics() + renderPoolMetrics(), {
+    headers: { 'Content-Type': 'text/plain; version=0.0.4; charset=utf-8', 'Cache-Control': 'no-store' }
+  });
+}
+
+// HEALTH CHECK (balanceador/orquestrador) - ping no MongoDB, 503 se indisponível
+async function health() {
+  const mongo = await checkMongoHealth(connectDB);
+  return NextResponse.json(
+    { status: mongo.ok ? 'ok' : 'unavailable', mongo },
+    { status: mongo.ok ? 200 : 503, headers: { 'Cache-Control': 'no-store' } }
+  );
+}
+
+// EVENTS STREAM (SSE) - EventSource não envia cabeçalhos, aceita ?token=
+async function eventsStream({ request, db, url }) {
+  let user = verifyToken(request);
+  const queryToken = url.searchParams.get('token');
+  if (!user && queryToken) {
+    try {
+      user = jwt.verify(queryToken, JWT_SECRET);
+    } catch {
+      user = null;
+    }
+  }
+  if (!user) {
+    return NextResponse.json({ error: 'Não autenticado' }, { status: 401 });
+  }
+
+  const userData = await getCachedUser(db, user.userId);
+  if (!userData) {
+    return NextResponse.json({ error: 'Usuário não encontrado' }, { status: 404 });
+  }
+
+  const stream = createEventStream(userData, {
+    lastEventId: request.headers.get('last-event-id') ?? url.searchParams.get('lastEventId'),
+    signal: request.signal
+  });
+
+  return new NextResponse(stream, {
+    headers: {
+      'Content-Type': 'text/event-stream; charset=utf-8',
+      'Cache-Control': 'no-cache, no-transform',
+      'Connection': 'keep-alive',
+      'X-Accel-Buffering': 'no'
+    }
+  });
+}
+
+// CACHE STATS (Master) - acertos/erros do cache de consultas
+async function cacheStats() {
+  return NextResponse.json({
+    caches: getCacheStats(),
+    audit: getAuditWriterStats(),
+    files: getFileCacheStats(),
+    derivatives: getDerivativeStats(),
+    calendarView: getCalendarViewStats(),
+    responses: getResponseStats(),
+    passwordHashing: getPasswordHashingStats(),
+    presence: getPresenceStats(),
+    mongoPool: getPoolStats()
+  });
+}
+
+async function timeCurrent() {
+  // Usa dayjs para garantir America/Sao_Paulo sempre
+  const now = getBrazilTime(); // já retorna dayjs com timezone
+
+  return NextResponse.json({ 
+    time: now.toISOString(),
+    formatted: now.format('DD/MM/YYYY HH:mm:ss'),
+    timezone: 'America/Sao_Paulo'
+  });
+}
+
+export const GET = {
+  'metrics': metrics,
+  'health': health,
+  'events/stream': eventsStream,
+  'cache/stats': cacheStats,
+  'time/current': timeCurrent
+};
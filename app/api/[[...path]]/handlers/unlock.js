@@ -0,0 +1,340 @@
+/**
+ * HANDLERS - LIBERAÇÕES (unlock/*)
+ */
+
+import { NextResponse } from 'next/server';
+import { addHours } from 'date-fns';
+import crypto from 'crypto';
+import { buildDateRangeFilter, findPage, resolvePageSize } from '@/lib/keyset-pagination';
+import { publishEvent } from '@/lib/event-bus';
+import { syncCalendarSlots } from '@/lib/calendar-view';
+import { getCachedMonthStatus } from '@/lib/lookup-cache';
+import { recordAudit } from '@/lib/audit-writer';
+import { repositoriesFor } from '@/lib/repositories';
+import { getListQueryMaxTimeMs } from '@/lib/mongo-connection';
+import { getBrazilTime } from '../shared';
+
+// REQUEST UNLOCK
+async function unlockRequest({ request, db, user, userData }) {
+  const { entryId, reason, day, month, year, timeSlot } = await request.json();
+
+  // Pode ser solicitação para slot vazio OU para entry existente
+  let entryData = null;
+  if (entryId) {
+    entryData = await repositoriesFor(db).entries.findByEntryId(entryId);
+  }
+
+  // Se não tem entryId mas tem day/month/year/timeSlot, é solicitação para slot vazio
+  const requestMonth = entryData?.month || parseInt(month);
+  const requestYear = entryData?.year || parseInt(year);
+  const requestDay = entryData?.day || parseInt(day);
+  const requestTimeSlot = entryData?.timeSlot || timeSlot;
+
+  // Verificar se mês está fechado
+  const monthStatus = await getCachedMonthStatus(db, requestMonth, requestYear);
+  if (monthStatus?.closed) {
+    return NextResponse.json({ 
+      error: 'Mês fechado. Não é possível solicitar liberação. Contate o Líder Máximo.',
+      locked: true
+    }, { status: 403 });
+  }
+
+  const request_record = {
+    requestId: crypto.randomUUID(),
+    entryId: entryId || null,
+    day: requestDay,
+    month: requestMonth,
+    year: requestYear,
+    timeSlot: requestTimeSlot,
+    requesterId: user.userId,
+    requesterName: user.name || user.email,
+    requesterEmail: user.email,
+    requesterRole: userData.role || 'Usuário',
+    requesterChurch: userData.church || '',
+    requesterRegion: userData.region || '',
+    requesterState: userData.state || '',
+    reason: reason || 'Solicitação de liberação para lançamento',
+    status: 'pending',
+    createdAt: getBrazilTime().toISOString()
+  };
+
+  await db.collection('unlock_requests').insertOne(request_record);
+
+  publishEvent('unlock.requested', { masters: true }, { requestId: request_record.requestId });
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'request_unlock',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { 
+      entryId: entryId || 'empty_slot', 
+      day: requestDay,
+      month: requestMonth,
+      year: requestYear,
+      timeSlot: requestTimeSlot,
+      reason 
+    }
+  });
+
+  return NextResponse.json({ success: true, message: 'Solicitação enviada ao Líder Máximo' });
+}
+
+// GET UNLOCK REQUESTS (Master vê todas: pendentes + histórico)
+async function unlockRequests({ request, db }) {
+  const body = await request.json().catch(() => ({}));
+  const { status, requesterId, from, to, limit, cursor } = body;
+
+  // Sem status: todas as solicitações (pendentes, aprovadas e rejeitadas)
+  const filter = {};
+  if (status && status !== 'ALL') filter.status = status;
+  if (requesterId) filter.requesterId = requesterId;
+  const createdRange = buildDateRangeFilter(from, to);
+  if (createdRange) filter.createdAt = createdRange;
+
+  const page = await findPage(db.collection('unlock_requests'), filter, {
+    sortField: 'createdAt',
+    idField: 'requestId',
+    limit: resolvePageSize(limit, null),
+    cursor,
+    maxTimeMS: getListQueryMaxTimeMs()
+  });
+
+  return NextResponse.json({
+    requests: page.items,
+    total: page.total,
+    hasMore: page.hasMore,
+    nextCursor: page.nextCursor
+  });
+}
+
+// GET MY UNLOCK STATUS (usuário vê suas próprias solicitações e overrides ativos)
+async function unlockMyStatus({ db, user }) {
+  // Buscar time_overrides ativos do usuário (não precisa de month/year no filtro)
+  const activeOverrides = await db.collection('time_overrides')
+    .find({
+      userId: user.userId,
+      expiresAt: { $gt: getBrazilTime().toISOString() }
+    })
+    .toArray();
+
+  // Buscar solicitações pendentes do usuário
+  const pendingRequests = await db.collection('unlock_requests')
+    .find({ 
+      requesterId: user.userId,
+      status: 'pending'
+    })
+    .toArray();
+
+  return NextResponse.json({ 
+    pendingRequests,
+    activeOverrides
+  });
+}
+
+// APPROVE UNLOCK
+async function unlockApprove({ request, db, user }) {
+  const { requestId, entryId, durationMinutes } = await request.json();
+
+  // Buscar a solicitação para obter informações
+  const unlockRequest = await db.collection('unlock_requests').findOne({ requestId });
+  if (!unlockRequest) {
+    return NextResponse.json({ error: 'Solicitação não encontrada' }, { status: 404 });
+  }
+
+  // Verificar se mês está fechado
+  const monthStatus = await getCachedMonthStatus(db, unlockRequest.month, unlockRequest.year);
+
+  // Se tem entryId, atualizar o entry existente
+  if (entryId && entryId !== 'null') {
+    await db.collection('entries').updateOne(
+      { entryId },
+      { 
+        $set: { 
+          masterUnlocked: true,
+          unlockedUntil: addHours(getBrazilTime(), Math.ceil(durationMinutes / 60)).toISOString()
+        } 
+      }
+    );
+    await syncCalendarSlots(db, [unlockRequest]);
+  } else {
+    // Se não tem entryId, criar um time override para permitir lançamento no slot vazio
+    const unlockExpiry = addHours(getBrazilTime(), Math.ceil(durationMinutes / 60)).toISOString();
+
+    await repositoriesFor(db).overrides.insertTimeOverride({
+      overrideId: crypto.randomUUID(),
+      day: unlockRequest.day,
+      month: unlockRequest.month,
+      year: unlockRequest.year,
+      timeSlot: unlockRequest.timeSlot,
+      userId: unlockRequest.requesterId,
+      approvedBy: user.userId,
+      expiresAt: unlockExpiry,
+      expiresAtDate: new Date(unlockExpiry),
+      createdAt: getBrazilTime().toISOString()
+    });
+  }
+
+  // Atualizar a solicitação como aprovada
+  await db.collection('unlock_requests').updateOne(
+    { requestId },
+    { 
+      $set: { 
+        status: 'approved',
+        approvedBy: user.userId,
+        approvedAt: getBrazilTime().toISOString()
+      } 
+    }
+  );
+
+  // Registrar no audit log
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'approve_unlock',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { 
+      requestId, 
+      entryId: entryId || 'empty_slot',
+      day: unlockRequest.day,
+      month: unlockRequest.month,
+      year: unlockRequest.year,
+      timeSlot: unlockRequest.timeSlot,
+      requesterId: unlockRequest.requesterId,
+      durationMinutes,
+      monthClosed: monthStatus?.closed || false
+    }
+  });
+
+  publishEvent('unlock.approved', { masters: true, userIds: [unlockRequest.requesterId] }, {
+    requestId,
+    year: unlockRequest.year,
+    month: unlockRequest.month,
+    day: unlockRequest.day,
+    timeSlot: unlockRequest.timeSlot
+  });
+
+  return NextResponse.json({ 
+    success: true,
+    message: entryId ? 'Liberação concedida para edição' : 'Liberação concedida para novo lançamento',
+    warning: monthStatus?.closed ? 'Atenção: Mês está fechado. Liberação concedida pelo Master.' : null
+  });
+}
+
+// REJECT UNLOCK
+async function unlockReject({ request, db, user }) {
+  const { requestId, reason } = await request.json();
+
+  // Buscar a solicitação
+  const unlockRequest = await db.collection('unlock_requests').findOne({ requestId });
+  if (!unlockRequest) {
+    return NextResponse.json({ error: 'Solicitação não encontrada' }, { status: 404 });
+  }
+
+  // Atualizar a solicitação como rejeitada
+  await db.collection('unlock_requests').updateOne(
+    { requestId },
+    { 
+      $set: { 
+        status: 'rejected',
+        rejectedBy: user.userId,
+        rejectedAt: getBrazilTime().toISOString(),
+        rejectionReason: reason || 'Rejeitado pelo Líder Máximo'
+      } 
+    }
+  );
+
+  // Registrar no audit log
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'reject_unlock',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { 
+      requestId, 
+      day: unlockRequest.day,
+      month: unlockRequest.month,
+      year: unlockRequest.year,
+      timeSlot: unlockRequest.timeSlot,
+      requesterId: unlockRequest.requesterId,
+      reason
+    }
+  });
+
+  publishEvent('unlock.rejected', { masters: true, userIds: [unlockRequest.requesterId] }, { requestId, reason });
+
+  return NextResponse.json({ 
+    success: true,
+    message: 'Solicitação rejeitada'
+  });
+}
+
+// DELETE UNLOCK REQUEST (Master pode deletar histórico)
+async function unlockDelete({ request, db, user }) {
+  const { requestId } = await request.json();
+
+  // Buscar a solicitação antes de deletar
+  const unlockRequest = await db.collection('unlock_requests').findOne({ requestId });
+  if (!unlockRequest) {
+    return NextResponse.json({ error: 'Solicitação não encontrada' }, { status: 404 });
+  }
+
+  // Deletar a solicitação
+  await db.collection('unlock_requests').deleteOne({ requestId });
+
+  // Registrar no audit log
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'delete_unlock_request',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { 
+      requestId,
+      requesterName: unlockRequest.requesterName,
+      day: unlockRequest.day,
+      month: unlockRequest.month,
+      year: unlockRequest.year,
+      timeSlot: unlockRequest.timeSlot,
+      status: unlockRequest.status
+    }
+  });
+
+  return NextResponse.json({ 
+    success: true,
+    message: 'Solicitação deletada do histórico'
+  });
+}
+
+async function getUnlockRequests({ db, url }) {
+  const params = url.searchParams;
+  const status = params.get('status') || 'pending';
+  const filter = status === 'ALL' ? {} : { status };
+
+  const page = await findPage(db.collection('unlock_requests'), filter, {
+    sortField: 'createdAt',
+    idField: 'requestId',
+    limit: resolvePageSize(params.get('limit'), null),
+    cursor: params.get('cursor'),
+    maxTimeMS: getListQueryMaxTimeMs()
+  });
+
+  return NextResponse.json({
+    requests: page.items,
+    total: page.total,
+    hasMore: page.hasMore,
+    nextCursor: page.nextCursor
+  });
+}
+
+export const POST = {
+  'unlock/request': unlockRequest,
+  'unlock/requests': unlockRequests,
+  'unlock/my-status': unlockMyStatus,
+  'unlock/approve': unlockApprove,
+  'unlock/reject': unlockReject,
+  'unlock/delete': unlockDelete
+};
+
+export const GET = {
+  'unlock/requests': getUnlockRequests
+};
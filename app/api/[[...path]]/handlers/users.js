@@ -0,0 +1,305 @@
+/**
+ * HANDLERS - USUÁRIOS (users/*)
+ */
+
+import { NextResponse } from 'next/server';
+import crypto from 'crypto';
+import { invalidateUser } from '@/lib/lookup-cache';
+import { recordAudit } from '@/lib/audit-writer';
+import { groupUsersByChurchAndCargo } from '@/lib/admin-lists';
+import { repositoriesFor } from '@/lib/repositories';
+import { enqueueDerivatives } from '@/lib/image-derivatives';
+import { commitBlob, releaseBlobUrl } from '@/lib/blob-store';
+import { receiveUpload } from '@/lib/multipart-upload';
+import { projectList, resolveFields } from '@/lib/response-fields';
+import { jsonResponse } from '@/lib/json-response';
+import { timePasswordHashing } from '@/lib/request-metrics';
+import { hashPassword } from '@/lib/password-hashing';
+import { applyPresence } from '@/lib/presence';
+import { UPLOAD_AREAS, PHOTO_UPLOAD, uploadErrorResponse, getBrazilTime } from '../shared';
+
+// GET ALL USERS WITH ENHANCED DETAILS
+async function usersList({ request, db }) {
+  const body = await request.json().catch(() => ({}));
+  const fields = resolveFields('users/list', body.fields);
+
+  // Usuários + igreja vinculada num único aggregate ($lookup)
+  const usersWithChurch = applyPresence(await repositoriesFor(db).users.listWithChurch());
+
+  // Agrupar por igreja → cargo → alfabético (só userIds; os dados ficam em `users`)
+  const grouped = groupUsersByChurchAndCargo(usersWithChurch);
+
+  return jsonResponse(request, {
+    users: projectList('users/list', usersWithChurch, fields),
+    grouped
+  }, { name: 'users/list' });
+}
+
+// CREATE USER (Master only)
+async function usersCreate({ request, db, user }) {
+  const { name, email, password, telefone, cep, endereco, numero, complemento, cidade, estado, pais, churchId, cargo } = await request.json();
+
+  // Validar email
+  const existing = await repositoriesFor(db).users.findByEmail(email);
+  if (existing) {
+    return NextResponse.json({ error: 'Email já cadastrado' }, { status: 400 });
+  }
+
+  // Hash da senha
+  const hashedPassword = await timePasswordHashing(() => hashPassword(password));
+
+  // Buscar nome da igreja
+  let churchName = 'Sem igreja';
+  if (churchId) {
+    const church = await db.collection('churches').findOne({ churchId });
+    churchName = church?.name || 'Sem igreja';
+  }
+
+  const newUser = {
+    userId: crypto.randomUUID(),
+    name,
+    email,
+    password: hashedPassword,
+    telefone: telefone || '',
+    cep: cep || '',
+    endereco: endereco || '',
+    numero: numero || '',
+    complemento: complemento || '',
+    cidade: cidade || '',
+    estado: estado || '',
+    pais: pais || 'Brasil',
+    churchId: churchId || null,
+    church: churchName,
+    cargo: cargo || '',
+    role: 'pastor', // default
+    photoUrl: null,
+    isActive: true, // NOVO: Usuário ativo por padrão
+    isOnline: false,
+    lastActivity: null,
+    permissions: {
+      canView: true,
+      canEdit: false,
+      canPrint: false,
+      canExport: false,
+      canShare: false
+    },
+    scope: 'church',
+    createdAt: getBrazilTime().toISOString(),
+    updatedAt: getBrazilTime().toISOString()
+  };
+
+  await db.collection('users').insertOne(newUser);
+
+  // Audit log
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'create_user',
+    userId: user.userId,
+    userName: user.name,
+    timestamp: getBrazilTime().toISOString(),
+    details: { newUserId: newUser.userId, email: newUser.email, cargo }
+  });
+
+  return NextResponse.json({ 
+    success: true, 
+    message: 'Usuário criado com sucesso!',
+    user: { ...newUser, password: undefined }
+  });
+}
+
+// UPDATE USER PERMISSIONS
+async function usersPermissions({ request, db, user }) {
+  const { userId, permissions } = await request.json();
+
+  await db.collection('users').updateOne(
+    { userId },
+    { $set: { permissions } }
+  );
+  invalidateUser(userId);
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'update_permissions',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { targetUserId: userId, permissions }
+  });
+
+  return NextResponse.json({ success: true });
+}
+
+// TOGGLE USER ACTIVE STATUS - PATCH 2
+async function usersStatus({ request, db, user }) {
+  const { userId, active } = await request.json();
+
+  await db.collection('users').updateOne(
+    { userId },
+    { $set: { active: active === true } }
+  );
+  invalidateUser(userId);
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: active ? 'activate_user' : 'deactivate_user',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { targetUserId: userId }
+  });
+
+  return NextResponse.json({ 
+    success: true, 
+    message: active ? 'Usuário desbloqueado!' : 'Usuário bloqueado!' 
+  });
+}
+
+// TOGGLE USER ACTIVE STATUS
+async function usersToggleActive({ request, db, user }) {
+  const { userId } = await request.json();
+
+  // Não permitir desativar a si mesmo
+  if (userId === user.userId) {
+    return NextResponse.json({ error: 'Você não pode desativar sua própria conta' }, { status: 400 });
+  }
+
+  // Buscar usuário atual
+  const targetUser = await db.collection('users').findOne({ userId });
+  if (!targetUser) {
+    return NextResponse.json({ error: 'Usuário não encontrado' }, { status: 404 });
+  }
+
+  // Toggle do status (se não existe, assume true e muda para false)
+  const newStatus = !(targetUser.isActive ?? true);
+
+  await db.collection('users').updateOne(
+    { userId },
+    { $set: { isActive: newStatus, updatedAt: getBrazilTime().toISOString() } }
+  );
+  invalidateUser(userId);
+
+  // Audit log
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: newStatus ? 'activate_user' : 'deactivate_user',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { targetUserId: userId, targetUserName: targetUser.name, newStatus }
+  });
+
+  return NextResponse.json({ 
+    success: true, 
+    message: newStatus ? 'Usuário ativado com sucesso!' : 'Usuário desativado com sucesso!',
+    isActive: newStatus
+  });
+}
+
+// UPDATE USER DATA (editar usuário completo)
+async function usersUpdate({ request, db, user }) {
+  const { userId, userData, newPassword } = await request.json();
+
+  // Remover campos que não devem ser atualizados diretamente
+  delete userData.password;
+  delete userData.userId;
+
+  // Se tiver nova senha, fazer hash
+  if (newPassword && newPassword.trim()) {
+    const hashedPassword = await timePasswordHashing(() => hashPassword(newPassword));
+    userData.password = hashedPassword;
+  }
+
+  // Se tiver churchId, buscar nome da igreja
+  if (userData.churchId) {
+    const church = await db.collection('churches').findOne({ churchId: userData.churchId });
+    userData.church = church?.name || 'Sem igreja';
+  }
+
+  await db.collection('users').updateOne(
+    { userId },
+    { $set: { ...userData, updatedAt: getBrazilTime().toISOString() } }
+  );
+  invalidateUser(userId);
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'update_user',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { targetUserId: userId, updates: Object.keys(userData), passwordChanged: !!newPassword }
+  });
+
+  return NextResponse.json({ success: true, message: 'Usuário atualizado com sucesso!' });
+}
+
+// DELETE USER
+async function usersDelete({ request, db, user }) {
+  const { userId } = await request.json();
+
+  // Não permitir deletar a si mesmo
+  if (userId === user.userId) {
+    return NextResponse.json({ error: 'Você não pode excluir seu próprio usuário!' }, { status: 400 });
+  }
+
+  const deletedUser = await db.collection('users').findOne({ userId });
+  await db.collection('users').deleteOne({ userId });
+  invalidateUser(userId);
+
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'delete_user',
+    userId: user.userId,
+    timestamp: getBrazilTime().toISOString(),
+    details: { deletedUserId: userId, deletedUserEmail: deletedUser?.email }
+  });
+
+  return NextResponse.json({ success: true, message: 'Usuário excluído com sucesso!' });
+}
+
+// UPLOAD USER PHOTO
+async function usersUploadPhoto({ request, db }) {
+  // Tipo (pela assinatura) e tamanho (max 2MB) validados durante a gravação
+  let upload;
+  try {
+    upload = await receiveUpload(request, { dir: UPLOAD_AREAS.users, fileField: 'photo', ...PHOTO_UPLOAD });
+  } catch (error) {
+    return uploadErrorResponse(error);
+  }
+  const { file } = upload;
+  const targetUserId = upload.fields.userId;
+
+  if (!file) {
+    return NextResponse.json({ error: 'Nenhum arquivo enviado' }, { status: 400 });
+  }
+
+  const blob = await commitBlob(UPLOAD_AREAS.users, file.tempPath, file.hash, file.originalName);
+  if (!blob.deduplicated) enqueueDerivatives(blob.filepath);
+
+  // Atualizar usuário com URL da foto
+  const photoUrl = `/api/uploads/users/${blob.filename}`;
+  const previousUser = await db.collection('users').findOneAndUpdate(
+    { userId: targetUserId },
+    { $set: { photoUrl, updatedAt: getBrazilTime().toISOString() } },
+    { projection: { photoUrl: 1 } }
+  );
+  invalidateUser(targetUserId);
+
+  // Foto anterior sai do disco se ninguém mais a usa
+  if (previousUser?.photoUrl && previousUser.photoUrl !== photoUrl) {
+    await releaseBlobUrl(db, UPLOAD_AREAS, previousUser.photoUrl);
+  }
+
+  return NextResponse.json({ 
+    success: true, 
+    photoUrl,
+    message: 'Foto enviada com sucesso!' 
+  });
+}
+
+export const POST = {
+  'users/list': usersList,
+  'users/create': usersCreate,
+  'users/permissions': usersPermissions,
+  'users/status': usersStatus,
+  'users/toggle-active': usersToggleActive,
+  'users/update': usersUpdate,
+  'users/delete': usersDelete,
+  'users/upload-photo': usersUploadPhoto
+};
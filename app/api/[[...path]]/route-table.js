@@ -0,0 +1,167 @@
+export const ROUTE_TABLE = {
+  custos: {
+    load: () => import('./handlers/custos'),
+    POST: {
+      'custos/create': 'master',
+      'custos/list': 'user',
+      'custos/update': 'master',
+      'custos/delete': 'master'
+    }
+  },
+  maintenance: {
+    load: () => import('./handlers/maintenance'),
+    POST: {
+      'entries/clear-all': 'master',
+      'uploads/sweep': 'master',
+      'entries/cleanup-orphans': 'master'
+    }
+  },
+  costs: {
+    load: () => import('./handlers/costs'),
+    POST: {
+      'costs-entries/create': 'user',
+      'costs-entries/list': 'user',
+      'costs-entries/update': 'user',
+      'costs-entries/pay': 'user',
+      'costs-entries/delete': 'user',
+      'costs-entries/approve': 'master',
+      'costs-entries/reject': 'master',
+      'costs-entries/update-master': 'master',
+      'upload/cost-file': 'user'
+    }
+  },
+  public: {
+    load: () => import('./handlers/public'),
+    POST: {
+      'public/churches': 'public',
+      'public/roles': 'public'
+    }
+  },
+  auth: {
+    load: () => import('./handlers/auth'),
+    POST: {
+      'auth/register': 'public',
+      'auth/login': 'public',
+      'auth/logout': 'public',
+      'auth/heartbeat': 'public'
+    }
+  },
+  entries: {
+    load: () => import('./handlers/entries'),
+    POST: {
+      'upload/receipt': 'user',
+      'entries/save': 'user',
+      'entries/save-batch': 'user',
+      'entries/delete-receipt': 'user',
+      'entries/delete-specific': 'master',
+      'entries/month': { auth: 'user', userData: true }
+    }
+  },
+  observations: {
+    load: () => import('./handlers/observations'),
+    POST: {
+      'observations/day': 'user',
+      'observations/month/get': 'user',
+      'observations/month': 'user'
+    }
+  },
+  months: {
+    load: () => import('./handlers/months'),
+    POST: {
+      'month/close': 'master',
+      'month/reopen': 'master'
+    }
+  },
+  analytics: {
+    load: () => import('./handlers/analytics'),
+    POST: {
+      'compare/months': { auth: 'user', userData: true },
+      'dashboard/data': { auth: 'user', userData: true },
+      'export/csv': { auth: 'user', userData: true },
+      'stats/overview': { auth: 'user', userData: true }
+    }
+  },
+  unlock: {
+    load: () => import('./handlers/unlock'),
+    POST: {
+      'unlock/request': { auth: 'user', userData: true },
+      'unlock/requests': 'master',
+      'unlock/my-status': 'user',
+      'unlock/approve': 'master',
+      'unlock/reject': 'master',
+      'unlock/delete': 'master'
+    },
+    GET: {
+      'unlock/requests': 'master'
+    }
+  },
+  audit: {
+    load: () => import('./handlers/audit'),
+    POST: {
+      'audit/log': 'user',
+      'audit/logs': 'master'
+    }
+  },
+  users: {
+    load: () => import('./handlers/users'),
+    POST: {
+      'users/list': 'master',
+      'users/create': 'master',
+      'users/permissions': 'master',
+      'users/status': 'master',
+      'users/toggle-active': 'master',
+      'users/update': 'master',
+      'users/delete': 'master',
+      'users/upload-photo': 'user'
+    }
+  },
+  churches: {
+    load: () => import('./handlers/churches'),
+    POST: {
+      'churches/list': 'master',
+      'churches/create': 'master',
+      'churches/update': 'master',
+      'churches/delete': 'master',
+      'churches/upload-photo': 'master',
+      'churches/available-pastors': 'master',
+      'churches/change-pastor': 'master'
+    }
+  },
+  roles: {
+    load: () => import('./handlers/roles'),
+    POST: {
+      'roles/list': 'master',
+      'roles/create': 'master',
+      'roles/update': 'master',
+      'roles/delete': 'master'
+    }
+  },
+  privacy: {
+    load: () => import('./handlers/privacy'),
+    POST: {
+      'privacy/get': 'user',
+      'privacy/list': 'master',
+      'privacy/delete': 'master',
+      'privacy/save': 'master',
+      'privacy/list-all': 'master'
+    }
+  },
+  system: {
+    load: () => import('./handlers/system'),
+    GET: {
+      'metrics': { auth: 'public', db: false },
+      'health': { auth: 'public', db: false },
+      'events/stream': 'public',
+      'cache/stats': 'master',
+      'time/current': 'public'
+    }
+  },
+  files: {
+    load: () => import('./handlers/files'),
+    GET: {
+      'view/receipt/*': 'public',
+      'download/receipt/*': 'public',
+      'uploads/*': 'public'
+    }
+  }
+};
@@ -0,0 +1,426 @@
+/**
+ * CONSTANTES E HELPERS COMPARTILHADOS PELOS HANDLERS DA API
+ */
+
+import { NextResponse } from 'next/server';
+import { MongoClient } from 'mongodb';
+import jwt from 'jsonwebtoken';
+import { addHours, isAfter } from 'date-fns';
+import path from 'path';
+import crypto from 'crypto';
+import dayjs from 'dayjs';
+import utc from 'dayjs/plugin/utc.js';
+import timezone from 'dayjs/plugin/timezone.js';
+import { ensureEntryRollups } from '@/lib/entry-rollups';
+import { getSlotWindow } from '@/lib/time-slots';
+import { startTimeWindowLockScheduler } from '@/lib/time-window-lock';
+import { ensureIndexes } from '@/lib/db-indexes';
+import { getCachedMonthStatus } from '@/lib/lookup-cache';
+import { recordAudit, stopAuditWriter } from '@/lib/audit-writer';
+import { repositoriesFor } from '@/lib/repositories';
+import { startUploadSweeper } from '@/lib/blob-store';
+import { UploadError } from '@/lib/multipart-upload';
+import { instrumentMongoClient } from '@/lib/request-metrics';
+import { flushPresence, startPresenceFlusher } from '@/lib/presence';
+import { connectMongo, onMongoShutdown } from '@/lib/mongo-connection';
+import { startCalendarViewSync } from '@/lib/calendar-view';
+
+// Configurar dayjs com timezone
+dayjs.extend(utc);
+dayjs.extend(timezone);
+
+// FIXAR TIMEZONE DO SERVIDOR PARA AMERICA/SAO_PAULO
+process.env.TZ = 'America/Sao_Paulo';
+
+export const TIMEZONE = 'America/Sao_Paulo';
+export const JWT_SECRET = process.env.JWT_SECRET || 'iudp-secret-key-2025';
+export const DB_NAME = process.env.DB_NAME || 'iudp_control';
+export const UPLOAD_DIR = '/app/uploads/receipts';
+export const COST_UPLOAD_DIR = '/app/uploads/costs';
+
+// Pastas de upload por área (a área é o segmento de /api/uploads/<área>/...)
+export const UPLOAD_AREAS = {
+  receipts: UPLOAD_DIR,
+  costs: COST_UPLOAD_DIR,
+  users: path.join(process.cwd(), 'uploads', 'users'),
+  churches: path.join(process.cwd(), 'uploads', 'churches')
+};
+
+// Tipos conferidos pela assinatura do conteúdo durante o upload
+export const DOCUMENT_UPLOAD = {
+  allowedTypes: ['image/jpeg', 'image/png', 'image/webp', 'application/pdf'],
+  maxSize: 5 * 1024 * 1024, // 5MB
+  formatHint: 'Use: JPEG, PNG, WEBP ou PDF'
+};
+export const PHOTO_UPLOAD = {
+  allowedTypes: ['image/jpeg', 'image/png', 'image/webp'],
+  maxSize: 2 * 1024 * 1024, // 2MB
+  formatHint: 'Use JPG, PNG ou WebP.'
+};
+
+// Horários por envio em entries/save-batch (uma semana inteira cabe com folga)
+export const ENTRY_BATCH_LIMIT = 50;
+
+/**
+ * Conexão única por processo (lib/mongo-connection): pool configurável, inicialização
+ * single-flight e encerramento gracioso
+ */
+export function connectDB() {
+  return connectMongo({
+    createClient: (options) => new MongoClient(process.env.MONGO_URL, options),
+    dbName: DB_NAME,
+    onConnect: initializeDatabase
+  });
+}
+
+/**
+ * Roda uma vez, na primeira conexão (requisições concorrentes esperam o término)
+ */
+export async function initializeDatabase(db, client) {
+  instrumentMongoClient(client);
+  
+  // Índices para os filtros usados nos endpoints (idempotente)
+  await ensureIndexes(db);
+  
+  try {
+    await ensureEntryRollups(db);
+  } catch (error) {
+    console.error('Erro ao inicializar rollup de ofertas:', error);
+  }
+  
+  // Agendador que trava as janelas de culto encerradas
+  startTimeWindowLockScheduler(db, getBrazilClock);
+  
+  // Varredura diária de uploads sem referência
+  startUploadSweeper(db, UPLOAD_AREAS);
+  
+  // Calendário do Master materializado via change stream (só com replica set)
+  startCalendarViewSync(db);
+  
+  // Presença (heartbeat/login/logout) gravada em lote; offline por tempo sem heartbeat
+  startPresenceFlusher(db);
+  
+  // Antes de fechar o cliente: auditoria e presença ainda em memória
+  onMongoShutdown(stopAuditWriter);
+  onMongoShutdown(flushPresence);
+}
+
+export function verifyToken(request) {
+  const authHeader = request.headers.get('authorization');
+  if (!authHeader) return null;
+  
+  const token = authHeader.replace('Bearer ', '');
+  try {
+    return jwt.verify(token, JWT_SECRET);
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Destino dos eventos de custo: dono, igreja e Masters
+ */
+export function costEventTarget(cost) {
+  return { masters: true, userIds: [cost?.userId], churchIds: [cost?.churchId] };
+}
+
+/**
+ * Erro de validação do upload em streaming → resposta 400 no formato de sempre
+ */
+export function uploadErrorResponse(error) {
+  if (!(error instanceof UploadError)) throw error;
+  return NextResponse.json(
+    error.details ? { error: error.message, details: error.details } : { error: error.message },
+    { status: error.status }
+  );
+}
+
+/**
+ * Retorna horário atual de Brasília usando dayjs
+ * Sempre retorna America/Sao_Paulo (UTC-3)
+ */
+export function getBrazilTime() {
+  return dayjs().tz('America/Sao_Paulo');
+}
+
+/**
+ * Relógio de Brasília como campos numéricos (usado nas regras de trava de janela)
+ */
+export function getBrazilClock() {
+  const now = getBrazilTime();
+  return {
+    year: now.year(),
+    month: now.month() + 1,
+    day: now.date(),
+    minutes: now.hour() * 60 + now.minute(),
+    seconds: now.second()
+  };
+}
+
+/**
+ * Converte um objeto dayjs para Date JavaScript
+ */
+export function toJSDate(dayjsObj) {
+  return dayjsObj.toDate();
+}
+
+/**
+ * Busca em paralelo tudo que a validação de horário precisa (um round trip de latência):
+ * lançamento existente, override de tempo, override de edição e status do mês (cache)
+ */
+export async function loadEntryTimingSnapshot(db, { userId, churchId, month, year, day, timeSlot, entryId }, nowISO) {
+  const m = parseInt(month);
+  const y = parseInt(year);
+  const d = parseInt(day);
+  const repos = repositoriesFor(db);
+
+  const [existing, override, editOverride, monthStatus] = await Promise.all([
+    entryId ? repos.entries.findByEntryId(entryId) : null,
+    repos.overrides.findActiveTimeOverride({ churchId, userId, month: m, year: y, day: d, timeSlot }, nowISO),
+    entryId ? repos.overrides.findActiveEditOverride(entryId, nowISO) : null,
+    getCachedMonthStatus(db, month, year)
+  ]);
+
+  return { existing, override, editOverride, monthStatus };
+}
+
+/**
+ * Mesma coisa para vários horários de uma vez (entries/save-batch): uma consulta por coleção
+ * em vez de uma rodada por horário. Devolve Map entryId → snapshot.
+ */
+export async function loadEntryTimingSnapshots(db, { userId, churchId }, slots, nowISO) {
+  const entryIds = slots.map(s => s.entryId);
+  const periods = [...new Map(slots.map(s => [`${parseInt(s.year)}-${parseInt(s.month)}`, s])).values()];
+  const repos = repositoriesFor(db);
+
+  const [existingEntries, overrides, editOverrides, monthStatuses] = await Promise.all([
+    repos.entries.findByEntryIds(entryIds),
+    repos.overrides.findActiveTimeOverrides({ churchId, userId }, nowISO),
+    repos.overrides.findActiveEditOverrides(entryIds, nowISO),
+    Promise.all(periods.map(s => getCachedMonthStatus(db, s.month, s.year)))
+  ]);
+
+  const existingById = new Map(existingEntries.map(e => [e.entryId, e]));
+  const monthStatusByPeriod = new Map(periods.map((s, i) => [`${parseInt(s.year)}-${parseInt(s.month)}`, monthStatuses[i]]));
+
+  return new Map(slots.map(s => {
+    const m = parseInt(s.month);
+    const y = parseInt(s.year);
+    const d = parseInt(s.day);
+    const override = overrides.find(o =>
+      (o.churchId === churchId || o.userId === userId) &&
+      o.month === m && o.year === y && o.day === d && o.timeSlot === s.timeSlot
+    ) || null;
+
+    return [s.entryId, {
+      existing: existingById.get(s.entryId) || null,
+      override,
+      editOverride: editOverrides.find(o => o.entryId === s.entryId) || null,
+      monthStatus: monthStatusByPeriod.get(`${y}-${m}`) || null
+    }];
+  }));
+}
+
+export function entryIdFor({ year, month, day, timeSlot }) {
+  return `${year}-${String(month).padStart(2, '0')}-${String(day).padStart(2, '0')}-${timeSlot}`;
+}
+
+/**
+ * Documento do lançamento a partir do corpo de entries/save (ou de um item de entries/save-batch)
+ */
+export function buildEntryDocument({ month, year, day, timeSlot, value, notes, dinheiro, pix, maquineta }, userId, userData, existing, currentTime) {
+  // Calcular valor total a partir dos 3 campos (se fornecidos) ou usar o campo value (compatibilidade)
+  const valorDinheiro = parseFloat(dinheiro) || 0;
+  const valorPix = parseFloat(pix) || 0;
+  const valorMaquineta = parseFloat(maquineta) || 0;
+  const valorTotal = value !== undefined ? parseFloat(value) : (valorDinheiro + valorPix + valorMaquineta);
+
+  return {
+    entryId: entryIdFor({ year, month, day, timeSlot }),
+    month,
+    year,
+    day,
+    timeSlot,
+    value: valorTotal,
+    dinheiro: valorDinheiro,
+    pix: valorPix,
+    maquineta: valorMaquineta,
+    notes: notes || '',
+    userId,
+    userName: userData.name,
+    church: userData.church,
+    churchId: userData.churchId || null,
+    region: userData.region,
+    state: userData.state,
+    createdAt: existing?.createdAt || currentTime.toISOString(),
+    updatedAt: currentTime.toISOString(),
+    timeWindowLocked: false,
+    masterUnlocked: existing?.masterUnlocked || false,
+    receipts: existing?.receipts || []
+  };
+}
+
+/**
+ * Valida se um lançamento pode ser salvo considerando:
+ * - Override de tempo (prioridade 1)
+ * - Mês fechado (prioridade 2)
+ * - Janela de culto com tolerância (prioridade 3)
+ * - Trava de 1h para edições (prioridade 4)
+ *
+ * snapshot: resultado de loadEntryTimingSnapshot (carregado aqui se não for informado)
+ */
+export async function validateEntryTiming(db, {
+  userId,
+  churchId,
+  month,
+  year,
+  day,
+  timeSlot,
+  isEdit = false,
+  createdAt = null,
+  entryId = null
+}, snapshot = null) {
+  const nowMs = Date.now();
+  const nowISO = new Date(nowMs).toISOString();
+  const { override, editOverride, monthStatus } = snapshot ||
+    await loadEntryTimingSnapshot(db, { userId, churchId, month, year, day, timeSlot, entryId }, nowISO);
+  
+  // 1. VERIFICAR OVERRIDE DE TEMPO (PRIORIDADE MÁXIMA)
+  if (override) {
+    // Override ativo - permitir e logar
+    recordAudit(db, {
+      logId: crypto.randomUUID(),
+      action: 'TIME_OVERRIDE_USED',
+      userId,
+      timestamp: nowISO,
+      details: {
+        overrideId: override.overrideId,
+        entryId: entryId || 'new',
+        expiresAt: override.expiresAt
+      }
+    });
+    
+    const expiresTime = dayjs(override.expiresAt).tz('America/Sao_Paulo');
+    return {
+      allowed: true,
+      reason: 'OVERRIDE_ACTIVE',
+      message: `Liberado pelo Master até ${expiresTime.format('HH:mm')}`
+    };
+  }
+  
+  // 2. VERIFICAR MÊS FECHADO
+  if (monthStatus?.closed) {
+    logTimeValidationFail(db, {
+      userId, churchId, month, year, day, timeSlot,
+      reason: 'MONTH_CLOSED',
+      nowISO
+    });
+    
+    return {
+      allowed: false,
+      reason: 'MONTH_CLOSED',
+      message: 'Mês fechado. Contate o Líder Máximo para reabrir.'
+    };
+  }
+  
+  // 3. VERIFICAR TRAVA DE 1H PARA EDIÇÕES (salvo override de edição)
+  if (isEdit && createdAt) {
+    const oneHourLaterMs = new Date(createdAt).getTime() + 60 * 60 * 1000;
+    const isLocked = nowMs > oneHourLaterMs;
+    
+    if (isLocked && !editOverride) {
+      logTimeValidationFail(db, {
+        userId, churchId, month, year, day, timeSlot,
+        reason: 'EDIT_LOCKED',
+        nowISO,
+        createdAt,
+        oneHourExpiry: new Date(oneHourLaterMs).toISOString()
+      });
+      
+      return {
+        allowed: false,
+        reason: 'EDIT_LOCKED',
+        message: 'Lançamento travado após 1h. Peça liberação ao Master para correção.'
+      };
+    }
+  }
+  
+  // 4. VERIFICAR JANELA DE CULTO COM TOLERÂNCIA (limites pré-calculados em lib/time-slots)
+  const slotWindow = getSlotWindow(year, month, day, timeSlot);
+  
+  if (!slotWindow) {
+    return {
+      allowed: false,
+      reason: 'INVALID_TIMESLOT',
+      message: 'Horário de culto inválido.'
+    };
+  }
+  
+  const isInWindow = nowMs > slotWindow.startMs && nowMs < slotWindow.cutoffMs;
+  
+  if (!isInWindow) {
+    logTimeValidationFail(db, {
+      userId, churchId, month, year, day, timeSlot,
+      reason: 'WINDOW_CLOSED',
+      nowISO,
+      startISO: new Date(slotWindow.startMs).toISOString(),
+      cutoffISO: new Date(slotWindow.cutoffMs).toISOString(),
+      tz: 'America/Sao_Paulo'
+    });
+    
+    return {
+      allowed: false,
+      reason: 'WINDOW_CLOSED',
+      message: `Janela encerrada às ${slotWindow.end} (Horário de Brasília). Clique em Solicitar liberação para registrar este culto.`,
+      windowEnd: slotWindow.end
+    };
+  }
+  
+  // TUDO OK - PERMITIR
+  return {
+    allowed: true,
+    reason: 'IN_WINDOW',
+    message: 'Lançamento permitido dentro da janela de culto.'
+  };
+}
+
+/**
+ * Registra falha de validação de tempo no audit log
+ */
+export function logTimeValidationFail(db, details) {
+  recordAudit(db, {
+    logId: crypto.randomUUID(),
+    action: 'TIME_VALIDATION_FAIL',
+    timestamp: getBrazilTime().toISOString(),
+    details
+  });
+}
+
+export function isEntryLocked(entry, currentTime) {
+  // PATCH 2: Verificar override PRIMEIRO (antes de qualquer bloqueio)
+  if (entry.masterUnlocked) {
+    // Verificar se ainda está dentro do prazo de override
+    if (entry.unlockedUntil) {
+      const unlockExpiry = new Date(entry.unlockedUntil);
+      if (isAfter(currentTime, unlockExpiry)) {
+        // Override expirou
+        return { locked: true, reason: 'override_expired' };
+      }
+    }
+    // Override ativo - permitir edição
+    return { locked: false, reason: 'override_active' };
+  }
+  
+  // Se não tem override, aplicar regras normais
+  if (entry.timeWindowLocked) return { locked: true, reason: 'time_window' };
+  
+  if (entry.createdAt && entry.value !== null && entry.value !== undefined && entry.value !== '') {
+    const createdTime = new Date(entry.createdAt);
+    const oneHourLater = addHours(createdTime, 1);
+    if (isAfter(currentTime, oneHourLater)) {
+      return { locked: true, reason: 'one_hour_edit' };
+    }
+  }
+  
+  return { locked: false };
+}
@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { toast } from 'sonner';
 import dayjs from 'dayjs';
 import utc from 'dayjs/plugin/utc';
@@ -26,6 +26,9 @@ import { format, addMonths, subMonths } from 'date-fns';
 import { ptBR } from 'date-fns/locale';
 import { BarChart, Bar, LineChart, Line, PieChart, Pie, Cell, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 
+// Miniatura/prévia WebP gerada no servidor (cai no original enquanto não existir)
+const sizedImage = (src, size) => (src && src.startsWith('/api/') && !src.includes('?') ? `${src}?size=${size}` : src);
+
 export default function App() {
   const [isAuthenticated, setIsAuthenticated] = useState(false);
   const [user, setUser] = useState(null);
@@ -123,6 +126,10 @@ export default function App() {
   const [costsFilterMonth, setCostsFilterMonth] = useState(new Date().getMonth() + 1); // 1-12
   const [costsFilterYear, setCostsFilterYear] = useState(new Date().getFullYear());
   
+  // Canal de eventos (SSE): enquanto conectado, os pollers abaixo ficam em espera
+  const liveConnectedRef = useRef(false);
+  const liveHandlersRef = useRef({});
+  
   // Estados para Solicitações de Liberação (Master)
   const [unlockRequestsCount, setUnlockRequestsCount] = useState(0);
   const [unlockRequestsHistory, setUnlockRequestsHistory] = useState([]);
@@ -153,6 +160,7 @@ export default function App() {
   // Master panel states
   const [allUsers, setAllUsers] = useState([]);
   const [auditLogs, setAuditLogs] = useState([]);
+  const [auditLogsCursor, setAuditLogsCursor] = useState(null);
   const [stats, setStats] = useState(null);
   
   // Comparison states
@@ -390,7 +398,7 @@ export default function App() {
       fetchCurrentTime();
       
       const interval = setInterval(() => {
-        fetchEntries();
+        if (!liveConnectedRef.current) fetchEntries();
         fetchCurrentTime();
       }, 30000);
       
@@ -602,7 +610,7 @@ export default function App() {
     }
   };
   
-  const fetchAuditLogs = async () => {
+  const fetchAuditLogs = async (cursor = null) => {
     try {
       const res = await fetch('/api/audit/logs', {
         method: 'POST',
@@ -610,11 +618,13 @@ export default function App() {
           'Content-Type': 'application/json',
           'Authorization': `Bearer ${token}`
         },
-        body: JSON.stringify({ limit: 50 })
+        body: JSON.stringify({ limit: 50, cursor })
       });
       const data = await res.json();
       if (data.logs) {
-        setAuditLogs(data.logs);
+        // Com cursor, anexa a próxima página; sem cursor, recarrega a primeira
+        setAuditLogs(prev => cursor ? [...prev, ...data.logs] : data.logs);
+        setAuditLogsCursor(data.nextCursor || null);
       }
     } catch (error) {
       console.error('Error fetching audit logs:', error);
@@ -640,7 +650,9 @@ export default function App() {
     if (isAuthenticated && activeTab === 'calendar' && token && user?.role !== 'master') {
       fetchMyUnlockStatus();
       // Atualizar a cada 10 segundos para detectar aprovações
-      const interval = setInterval(fetchMyUnlockStatus, 10000);
+      const interval = setInterval(() => {
+        if (!liveConnectedRef.current) fetchMyUnlockStatus();
+      }, 10000);
       return () => clearInterval(interval);
     }
   }, [isAuthenticated, activeTab, currentDate, token, user]);
@@ -687,12 +699,86 @@ export default function App() {
     
     // Atualizar lista a cada 10 segundos
     const intervalId = setInterval(() => {
+      if (liveConnectedRef.current) return;
       fetchCostsList(costsFilterStatus, costsFilterChurch, costsFilterMonth, costsFilterYear);
     }, 10000);
     
     return () => clearInterval(intervalId);
   }, [isAuthenticated, token, activeTab, user?.role, costsFilterStatus, costsFilterChurch]);
   
+  // Handlers do canal de eventos sempre com o estado atual (mês, aba, filtros)
+  useEffect(() => {
+    const isOnCostsTab = (activeTab === 'custos' && user?.role === 'master') || 
+                         (activeTab === 'costs-pastor' && user?.role !== 'master');
+    const refetchCosts = () => {
+      if (isOnCostsTab) fetchCostsList(costsFilterStatus, costsFilterChurch, costsFilterMonth, costsFilterYear);
+    };
+    
+    liveHandlersRef.current = {
+      onEntry: (data) => {
+        const sameMonth = data.year === currentDate.getFullYear() && data.month === currentDate.getMonth() + 1;
+        if (data.cleared || data.locked || sameMonth) fetchEntries();
+      },
+      onCost: (data, type) => {
+        if (user?.role !== 'master' && type === 'cost.approved') {
+          toast.success('✅ Custo aprovado pelo Líder Máximo!');
+        } else if (user?.role !== 'master' && type === 'cost.rejected') {
+          toast.error('❌ Custo reprovado' + (data.reason ? `: ${data.reason}` : ''));
+        }
+        refetchCosts();
+      },
+      onUnlock: (data, type) => {
+        if (user?.role === 'master') {
+          fetchUnlockRequests(type === 'unlock.requested');
+          return;
+        }
+        if (type === 'unlock.approved') {
+          toast.success('✅ Sua solicitação foi APROVADA! Card liberado para edição.', { duration: 7000 });
+          fetchEntries();
+        } else if (type === 'unlock.rejected') {
+          toast.error('❌ Sua solicitação de liberação foi rejeitada.');
+        }
+        if (activeTab === 'calendar') fetchMyUnlockStatus();
+      },
+      onResync: () => {
+        fetchEntries();
+        refetchCosts();
+        if (user?.role === 'master') fetchUnlockRequests();
+      }
+    };
+  });
+  
+  // Canal de eventos: substitui o polling enquanto a conexão estiver aberta
+  useEffect(() => {
+    if (!isAuthenticated || !token || typeof EventSource === 'undefined') return;
+    
+    const source = new EventSource(`/api/events/stream?token=${encodeURIComponent(token)}`);
+    const listen = (types, handlerName) => {
+      types.forEach(type => source.addEventListener(type, (event) => {
+        const data = event.data ? JSON.parse(event.data) : {};
+        liveHandlersRef.current[handlerName]?.(data, type);
+      }));
+    };
+    
+    source.addEventListener('ready', () => {
+      // Reconexão: eventos perdidos chegam por Last-Event-ID ou via 'resync'
+      liveConnectedRef.current = true;
+    });
+    source.onerror = () => {
+      liveConnectedRef.current = false;
+    };
+    
+    listen(['entry.changed', 'entry.locked'], 'onEntry');
+    listen(['cost.created', 'cost.updated', 'cost.paid', 'cost.approved', 'cost.rejected', 'cost.deleted'], 'onCost');
+    listen(['unlock.requested', 'unlock.approved', 'unlock.rejected'], 'onUnlock');
+    listen(['resync'], 'onResync');
+    
+    return () => {
+      source.close();
+      liveConnectedRef.current = false;
+    };
+  }, [isAuthenticated, token]);
+  
   // Carregar usuários e igrejas quando entrar na aba usuarios
   useEffect(() => {
     if (isAuthenticated && activeTab === 'usuarios' && token && user?.role === 'master') {
@@ -758,6 +844,7 @@ export default function App() {
       
       // Verificar a cada 30 segundos
       const interval = setInterval(() => {
+        if (liveConnectedRef.current) return;
         console.log('[POLLING PASTOR] Verificando liberações aprovadas...');
         checkMyUnlockStatus(true);
       }, 30000);
@@ -772,6 +859,7 @@ export default function App() {
       fetchUnlockRequests(false); // Carregamento inicial sem notificação
       
       const interval = setInterval(() => {
+        if (liveConnectedRef.current) return;
         console.log('[POLLING MASTER] Verificando novas solicitações...');
         fetchUnlockRequests(true); // Verificações periódicas COM notificação
       }, 30000); // 30 segundos para resposta mais rápida
@@ -1953,7 +2041,9 @@ export default function App() {
         },
         body: JSON.stringify({ 
           status: filterStatus,
-          churchId: filterChurch !== 'ALL' ? filterChurch : null
+          churchId: filterChurch !== 'ALL' ? filterChurch : null,
+          month: filterMonth,
+          year: filterYear
         })
       });
       
@@ -1972,14 +2062,7 @@ export default function App() {
           });
         }
         
-        // Filtrar por mês/ano se especificado
-        if (filterMonth && filterMonth !== 'ALL' && filterYear) {
-          costs = costs.filter(cost => {
-            const dueDate = new Date(cost.dueDate);
-            return dueDate.getMonth() + 1 === parseInt(filterMonth) && 
-                   dueDate.getFullYear() === parseInt(filterYear);
-          });
-        }
+        // Filtro por mês/ano de vencimento já aplicado no servidor
         
         // Ordenar por data de vencimento (mais próximos primeiro)
         costs.sort((a, b) => new Date(a.dueDate) - new Date(b.dueDate));
@@ -5761,7 +5844,7 @@ export default function App() {
                                       <div className="flex-shrink-0">
                                         {usuario.photoUrl ? (
                                           <img 
-                                            src={usuario.photoUrl} 
+                                            src={sizedImage(usuario.photoUrl, 'thumb')} 
                                             alt={usuario.name} 
                                             className="w-12 h-12 rounded-full object-cover"
                                           />
@@ -6290,7 +6373,7 @@ export default function App() {
                       <div className="flex items-center gap-4">
                         {selectedUsuario.photoUrl ? (
                           <img 
-                            src={selectedUsuario.photoUrl} 
+                            src={sizedImage(selectedUsuario.photoUrl, 'thumb')} 
                             alt={selectedUsuario.name} 
                             className="w-20 h-20 rounded-full object-cover"
                           />
@@ -6982,7 +7065,7 @@ export default function App() {
                                   <div className="flex gap-4">
                                     {church.photoUrl ? (
                                       <img 
-                                        src={church.photoUrl} 
+                                        src={sizedImage(church.photoUrl, 'thumb')} 
                                         alt={church.name}
                                         className="w-32 h-32 rounded-lg object-cover border-2 border-gray-300"
                                         onError={(e) => {
@@ -7007,7 +7090,7 @@ export default function App() {
                                             <>
                                               {church.pastor.photoUrl ? (
                                                 <img 
-                                                  src={church.pastor.photoUrl} 
+                                                  src={sizedImage(church.pastor.photoUrl, 'thumb')} 
                                                   alt={church.pastor.name}
                                                   className="w-14 h-14 rounded-full object-cover border-2 border-blue-300"
                                                   onError={(e) => {
@@ -8105,7 +8188,7 @@ export default function App() {
                       <Eye className="w-6 h-6" />
                       Logs de Auditoria
                     </CardTitle>
-                    <Button onClick={fetchAuditLogs}>Atualizar</Button>
+                    <Button onClick={() => fetchAuditLogs()}>Atualizar</Button>
                   </div>
                 </CardHeader>
                 <CardContent>
@@ -8131,6 +8214,13 @@ export default function App() {
                           )}
                         </div>
                       ))}
+                      {auditLogsCursor && (
+                        <div className="text-center pt-2">
+                          <Button variant="outline" onClick={() => fetchAuditLogs(auditLogsCursor)}>
+                            Carregar mais
+                          </Button>
+                        </div>
+                      )}
                     </div>
                   )}
                 </CardContent>
@@ -8426,7 +8516,7 @@ export default function App() {
                 ) : (
                   <div className="flex items-center justify-center min-h-[400px]">
                     <img
-                      src={`/api/view/receipt/${viewingReceipts.receipts[viewingReceipts.currentIndex]?.filepath}`}
+                      src={`/api/view/receipt/${viewingReceipts.receipts[viewingReceipts.currentIndex]?.filepath}?size=preview`}
                       alt="Comprovante"
                       className="max-w-full max-h-[600px] object-contain"
                       onError={(e) => {
@@ -8995,7 +9085,7 @@ export default function App() {
                       <div className="flex items-center gap-3">
                         {pastor.photoUrl ? (
                           <img 
-                            src={pastor.photoUrl} 
+                            src={sizedImage(pastor.photoUrl, 'thumb')} 
                             alt={pastor.name}
                             className="w-14 h-14 rounded-full object-cover border-2 border-purple-300"
                             onError={(e) => {
@@ -9142,7 +9232,7 @@ export default function App() {
               <div className="flex gap-4">
                 {selectedChurch.photoUrl ? (
                   <img 
-                    src={selectedChurch.photoUrl} 
+                    src={sizedImage(selectedChurch.photoUrl, 'thumb')} 
                     alt={selectedChurch.name}
                     className="w-32 h-32 rounded-lg object-cover border-2"
                     onError={(e) => {
@@ -9196,7 +9286,7 @@ export default function App() {
                   <div className="flex items-center gap-3 bg-gray-50 p-3 rounded">
                     {selectedChurch.pastor.photoUrl ? (
                       <img 
-                        src={selectedChurch.pastor.photoUrl} 
+                        src={sizedImage(selectedChurch.pastor.photoUrl, 'thumb')} 
                         alt={selectedChurch.pastor.name}
                         className="w-16 h-16 rounded-full object-cover border-2"
                       />
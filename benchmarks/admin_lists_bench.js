@@ -0,0 +1,136 @@
+/**
+ * Benchmark - users/list e churches/list: N+1 (findOne por item) × aggregate com $lookup
+ * Popula um banco descartável com N igrejas e USERS_PER_CHURCH usuários por igreja, para cada N,
+ * e mede as duas estratégias direto no MongoDB (sem HTTP).
+ *
+ *   node benchmarks/admin_lists_bench.js
+ *   MONGO_URL=mongodb://localhost:27017 SIZES=50,200,1000,5000 ITERATIONS=20 node benchmarks/admin_lists_bench.js
+ */
+
+const fs = require('fs');
+const path = require('path');
+const crypto = require('crypto');
+const { MongoClient } = require('mongodb');
+const { ensureIndexes } = require('../lib/db-indexes.js');
+const { listUsersWithChurch, listChurchesWithPastor } = require('../lib/admin-lists.js');
+
+const MONGO_URL = process.env.MONGO_URL || 'mongodb://localhost:27017';
+const DB_NAME = process.env.BENCH_ADMIN_DB_NAME || 'iudp_bench_admin';
+const SIZES = (process.env.SIZES || '50,200,1000,5000').split(',').map(Number);
+const USERS_PER_CHURCH = parseInt(process.env.USERS_PER_CHURCH || '4');
+const ITERATIONS = parseInt(process.env.ITERATIONS || '20');
+const RESULTS_DIR = path.join(__dirname, 'results');
+
+// Implementação anterior, mantida aqui só como referência de comparação
+async function legacyUsersList(db) {
+  const users = await db.collection('users').find({}, { projection: { password: 0 } }).toArray();
+  return Promise.all(users.map(async (u) => {
+    if (u.churchId) {
+      const church = await db.collection('churches').findOne({ churchId: u.churchId }, { projection: { name: 1 } });
+      return { ...u, churchName: church?.name || 'Sem igreja' };
+    }
+    return { ...u, churchName: u.church || 'Sem igreja' };
+  }));
+}
+
+async function legacyChurchesList(db) {
+  const churches = await db.collection('churches').find({}).sort({ createdAt: -1 }).toArray();
+  for (const church of churches) {
+    if (church.pastorId) {
+      church.pastor = await db.collection('users').findOne({ userId: church.pastorId }, { projection: { password: 0 } });
+    }
+  }
+  return churches;
+}
+
+async function seed(db, churchCount) {
+  await db.collection('churches').deleteMany({});
+  await db.collection('users').deleteMany({});
+
+  const churches = [];
+  const users = [];
+  for (let i = 0; i < churchCount; i++) {
+    const churchId = crypto.randomUUID();
+    const members = Array.from({ length: USERS_PER_CHURCH }, (_, j) => ({
+      userId: crypto.randomUUID(),
+      name: `Bench Usuário ${i}-${j}`,
+      email: `bench.${i}.${j}@iudp.local`,
+      password: 'x',
+      role: j === 0 ? 'pastor' : 'leader',
+      cargo: j === 0 ? 'Pastor(a)' : 'Tesoureiro(a)',
+      church: `Igreja Bench ${i}`,
+      churchId
+    }));
+    users.push(...members);
+    churches.push({
+      churchId,
+      name: `Igreja Bench ${i}`,
+      pastorId: members[0].userId,
+      createdAt: new Date(Date.UTC(2025, 0, 1) + i * 60000).toISOString()
+    });
+  }
+
+  await db.collection('churches').insertMany(churches);
+  await db.collection('users').insertMany(users);
+}
+
+async function timeIt(fn) {
+  await fn(); // aquecimento
+  const samples = [];
+  for (let i = 0; i < ITERATIONS; i++) {
+    const started = process.hrtime.bigint();
+    await fn();
+    samples.push(Number(process.hrtime.bigint() - started) / 1e6);
+  }
+  samples.sort((a, b) => a - b);
+  return {
+    p50_ms: Math.round(samples[Math.floor(samples.length * 0.5)] * 100) / 100,
+    p95_ms: Math.round(samples[Math.min(samples.length - 1, Math.floor(samples.length * 0.95))] * 100) / 100
+  };
+}
+
+async function main() {
+  const client = await MongoClient.connect(MONGO_URL);
+  const db = client.db(DB_NAME);
+  const results = [];
+
+  console.log('⏱️  BENCHMARK - users/list e churches/list (N+1 × $lookup)');
+  console.log('='.repeat(78));
+  console.log(`${'igrejas'.padEnd(9)}${'usuários'.padEnd(10)}${'users N+1'.padStart(12)}${'users agg'.padStart(12)}${'churches N+1'.padStart(15)}${'churches agg'.padStart(15)}`);
+  console.log('-'.repeat(78));
+
+  try {
+    await ensureIndexes(db);
+    for (const size of SIZES) {
+      await seed(db, size);
+      const row = {
+        churches: size,
+        users: size * USERS_PER_CHURCH,
+        usersLegacy: await timeIt(() => legacyUsersList(db)),
+        usersAggregate: await timeIt(() => listUsersWithChurch(db)),
+        churchesLegacy: await timeIt(() => legacyChurchesList(db)),
+        churchesAggregate: await timeIt(() => listChurchesWithPastor(db))
+      };
+      results.push(row);
+      console.log(
+        `${String(row.churches).padEnd(9)}${String(row.users).padEnd(10)}` +
+        `${(row.usersLegacy.p50_ms + 'ms').padStart(12)}${(row.usersAggregate.p50_ms + 'ms').padStart(12)}` +
+        `${(row.churchesLegacy.p50_ms + 'ms').padStart(15)}${(row.churchesAggregate.p50_ms + 'ms').padStart(15)}`
+      );
+    }
+  } finally {
+    await client.db(DB_NAME).dropDatabase();
+    await client.close();
+  }
+
+  fs.mkdirSync(RESULTS_DIR, { recursive: true });
+  const output = path.join(RESULTS_DIR, `admin-lists-${Date.now()}.json`);
+  fs.writeFileSync(output, JSON.stringify({ iterations: ITERATIONS, usersPerChurch: USERS_PER_CHURCH, results }, null, 2));
+  console.log('='.repeat(78));
+  console.log(`📄 Resultados (p50/p95) gravados em ${output}`);
+}
+
+main().catch(error => {
+  console.error(error);
+  process.exitCode = 1;
+});
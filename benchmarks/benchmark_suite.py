@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite - Cenários cronometrados por endpoint contra um MongoDB local
+1. Restaura database_export/mongodb_dump (como RESTORE_MONGODB.sh) num banco dedicado;
+   sem o dump BSON, importa database_export/json com mongoimport
+2. Multiplica entries/costs_entries/audit_logs com scale_collections.js (10x-1000x)
+3. Sobe o app Next.js localmente apontando para esse banco
+4. Executa cada cenário de forma sequencial e repetível e grava JSON em benchmarks/results/
+
+Exemplos:
+    python benchmarks/benchmark_suite.py --scale 100
+    python benchmarks/benchmark_suite.py --scale 10 --skip-restore --no-server --base-url http://localhost:3000/api
+    python benchmarks/benchmark_suite.py --scale 100 --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from load_test import BRAZIL_TZ, current_slot, percentile  # noqa: E402
+
+DUMP_DIR = os.path.join(ROOT_DIR, 'database_export', 'mongodb_dump', 'cardenodigital')
+JSON_DIR = os.path.join(ROOT_DIR, 'database_export', 'json')
+SCALE_SCRIPT = os.path.join(ROOT_DIR, 'benchmarks', 'scale_collections.js')
+RESULTS_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'results')
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("BENCH_DB_NAME", "iudp_bench")
+
+# Usuários próprios do benchmark (criados via auth/register, senhas conhecidas)
+BENCH_MASTER = {"name": "Bench Master", "email": "bench.master@iudp.local", "password": "BenchMaster2025!", "role": "master"}
+BENCH_PASTOR = {"name": "Bench Pastor", "email": "bench.pastor@iudp.local", "password": "BenchPastor2025!", "role": "pastor"}
+
+
+def log_step(message):
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+
+def run(cmd, env=None):
+    log_step(f"$ {' '.join(cmd)}")
+    subprocess.run(cmd, check=True, env=env)
+
+
+def list_files(directory, suffix):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if name.endswith(suffix))
+
+
+def require_tool(name):
+    if shutil.which(name) is None:
+        sys.exit(f"❌ '{name}' não encontrado no PATH (MongoDB Database Tools) - use --skip-restore com um banco já populado")
+
+
+def restore_database():
+    """Popula o banco do benchmark: dump BSON se existir, senão o export JSON (uma coleção por arquivo)"""
+    if list_files(DUMP_DIR, '.bson'):
+        require_tool('mongorestore')
+        # Renomeia cardenodigital.* → DB_NAME.*
+        run([
+            'mongorestore', f'--uri={MONGO_URL}', '--drop',
+            '--nsFrom=cardenodigital.*', f'--nsTo={DB_NAME}.*',
+            f'--dir={os.path.dirname(DUMP_DIR)}'
+        ])
+        return
+
+    json_files = list_files(JSON_DIR, '.json')
+    if not json_files:
+        sys.exit(f"❌ Nenhum dado para restaurar: {DUMP_DIR} e {JSON_DIR} estão vazios ou ausentes")
+
+    require_tool('mongoimport')
+    log_step(f"Dump BSON ausente - importando {len(json_files)} coleções de {JSON_DIR}")
+    for name in json_files:
+        # Arrays em Extended JSON ({"$oid": ...}), como exportados por mongoexport --jsonArray
+        run([
+            'mongoimport', f'--uri={MONGO_URL}', f'--db={DB_NAME}', f'--collection={name[:-len(".json")]}',
+            '--drop', '--jsonArray', f'--file={os.path.join(JSON_DIR, name)}'
+        ])
+
+
+def scale_database(scale):
+    env = {**os.environ, 'BENCH_SCALE': str(scale)}
+    run(['mongosh', f'{MONGO_URL}/{DB_NAME}', '--quiet', SCALE_SCRIPT], env=env)
+
+
+def start_server(port, mode):
+    """Sobe o Next.js (build + start, ou dev) apontando para o banco do benchmark"""
+    env = {**os.environ, 'MONGO_URL': MONGO_URL, 'DB_NAME': DB_NAME, 'PORT': str(port)}
+    if mode == 'start':
+        run(['npx', 'next', 'build'], env=env)
+        cmd = ['npx', 'next', 'start', '-p', str(port)]
+    else:
+        cmd = ['npx', 'next', 'dev', '-p', str(port)]
+    log_step(f"$ {' '.join(cmd)}")
+    return subprocess.Popen(cmd, cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+
+
+def wait_for_server(base_url, timeout=180):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/time/current", timeout=5).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(1)
+    raise RuntimeError(f"Servidor não respondeu em {timeout}s: {base_url}")
+
+
+def ensure_token(base_url, user):
+    """Registra o usuário do benchmark se necessário e devolve o token"""
+    response = requests.post(f"{base_url}/auth/login", json={"email": user['email'], "password": user['password']})
+    if response.status_code != 200:
+        response = requests.post(f"{base_url}/auth/register", json={**user, "state": "SP", "region": "Bench"})
+        response.raise_for_status()
+    return response.json()['token']
+
+
+def build_scenarios(master, pastor):
+    """(nome, método, endpoint, token, payload) - um cenário por endpoint de leitura relevante"""
+    now = datetime.now(BRAZIL_TZ)
+    month = {"month": now.month, "year": now.year}
+    previous = {"month": 12 if now.month == 1 else now.month - 1, "year": now.year - 1 if now.month == 1 else now.year}
+    return [
+        ('entries/month (master)', 'POST', 'entries/month', master, month),
+        ('entries/month (pastor)', 'POST', 'entries/month', pastor, month),
+        ('dashboard/data', 'POST', 'dashboard/data', master, month),
+        ('stats/overview', 'POST', 'stats/overview', master, {}),
+        ('compare/months', 'POST', 'compare/months', master, {
+            "month1": previous['month'], "year1": previous['year'], "month2": now.month, "year2": now.year
+        }),
+        ('costs-entries/list (master)', 'POST', 'costs-entries/list', master, {"status": "ALL"}),
+        ('costs-entries/list (pastor)', 'POST', 'costs-entries/list', pastor, {"status": "ALL"}),
+        ('costs-entries/list (página)', 'POST', 'costs-entries/list', master, {"status": "ALL", "limit": 50}),
+        ('unlock/requests (POST)', 'POST', 'unlock/requests', master, {}),
+        ('unlock/requests (página)', 'POST', 'unlock/requests', master, {"limit": 50}),
+        ('unlock/requests (GET)', 'GET', 'unlock/requests', master, None),
+        ('unlock/my-status', 'POST', 'unlock/my-status', pastor, {}),
+        ('audit/logs', 'POST', 'audit/logs', master, {"limit": 100}),
+        ('users/list', 'POST', 'users/list', master, {}),
+        ('churches/list', 'POST', 'churches/list', master, {}),
+        ('custos/list', 'POST', 'custos/list', pastor, {}),
+        ('roles/list', 'POST', 'roles/list', master, {}),
+        ('public/churches', 'POST', 'public/churches', None, {}),
+        ('public/roles', 'POST', 'public/roles', None, {}),
+        ('privacy/list', 'POST', 'privacy/list', master, {}),
+        ('export/csv', 'POST', 'export/csv', master, month),
+        ('export/csv (12 meses)', 'POST', 'export/csv', master, {
+            "startMonth": now.month, "startYear": now.year - 1, "endMonth": now.month, "endYear": now.year
+        }),
+        ('export/csv (custos)', 'POST', 'export/csv', master, {**month, "type": "costs"}),
+        ('entries/save', 'POST', 'entries/save', pastor, {
+            **month, "day": now.day, "timeSlot": current_slot(now), "dinheiro": 100, "pix": 0, "maquineta": 0
+        }),
+        ('time/current', 'GET', 'time/current', None, None),
+    ]
+
+
+def time_scenario(base_url, method, endpoint, token, payload, warmup, iterations):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    session = requests.Session()
+    url = f"{base_url}/{endpoint}"
+
+    def call():
+        if method == 'GET':
+            return session.get(url, headers=headers, timeout=60)
+        return session.post(url, json=payload, headers=headers, timeout=60)
+
+    for _ in range(warmup):
+        call()
+
+    latencies = []
+    statuses = {}
+    response_bytes = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = call()
+        latencies.append((time.perf_counter() - started) * 1000)
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        response_bytes = len(response.content)
+
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'mean_ms': round(sum(latencies) / len(latencies), 2),
+        'min_ms': round(latencies[0], 2),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'max_ms': round(latencies[-1], 2),
+        'response_bytes': response_bytes,
+        'status': statuses,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare_results(current, baseline_path, threshold):
+    """Compara p50 com um resultado anterior; devolve a lista de regressões"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    regressions = []
+    print(f"\n📊 Comparação com {baseline_path} (commit {baseline.get('commit')})")
+    print(f"{'Cenário':<32}{'antes p50':>11}{'agora p50':>11}{'delta':>9}")
+    print("-" * 63)
+    for name, result in current['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before or not before['p50_ms']:
+            continue
+        delta = (result['p50_ms'] - before['p50_ms']) / before['p50_ms']
+        flag = ' ⚠️' if delta > threshold else ''
+        print(f"{name:<32}{before['p50_ms']:>11}{result['p50_ms']:>11}{delta * 100:>8.1f}%{flag}")
+        if delta > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline da API do Caderno de Controle IUDP")
+    parser.add_argument('--scale', type=int, default=10, help="Fator de multiplicação das coleções (10-1000)")
+    parser.add_argument('--port', type=int, default=3100)
+    parser.add_argument('--mode', choices=['start', 'dev'], default='start')
+    parser.add_argument('--base-url', default=None, help="Usa um servidor já em execução")
+    parser.add_argument('--no-server', action='store_true', help="Não sobe o Next.js (requer --base-url)")
+    parser.add_argument('--skip-restore', action='store_true', help="Reutiliza o banco já restaurado/escalado")
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--only', default=None, help="Executa apenas cenários que contenham este texto")
+    parser.add_argument('--output', default=None, help="Arquivo JSON de saída")
+    parser.add_argument('--compare', default=None, help="JSON de uma execução anterior para comparar")
+    parser.add_argument('--verify-plans', action='store_true', help="Falha se alguma consulta dos endpoints usar COLLSCAN")
+    parser.add_argument('--regression-threshold', type=float, default=0.2, help="Aumento de p50 considerado regressão")
+    args = parser.parse_args()
+
+    random.seed(42)
+    base_url = args.base_url or f"http://localhost:{args.port}/api"
+
+    print("⏱️  BENCHMARK OFFLINE - Caderno de Controle IUDP")
+    print("=" * 63)
+
+    if not args.skip_restore:
+        restore_database()
+        scale_database(args.scale)
+
+    if args.verify_plans:
+        run(['node', os.path.join(ROOT_DIR, 'tests', 'query-plans.test.js')],
+            env={**os.environ, 'MONGO_URL': MONGO_URL, 'DB_NAME': DB_NAME})
+
+    server = None
+    if not args.no_server:
+        server = start_server(args.port, args.mode)
+
+    try:
+        wait_for_server(base_url)
+        master = ensure_token(base_url, BENCH_MASTER)
+        pastor = ensure_token(base_url, BENCH_PASTOR)
+
+        results = {
+            'commit': git_commit(),
+            'timestamp': datetime.now(BRAZIL_TZ).isoformat(),
+            'scale': args.scale,
+            'database': DB_NAME,
+            'mode': args.mode,
+            'python': platform.python_version(),
+            'iterations': args.iterations,
+            'scenarios': {},
+        }
+
+        for name, method, endpoint, token, payload in build_scenarios(master, pastor):
+            if args.only and args.only not in name:
+                continue
+            result = time_scenario(base_url, method, endpoint, token, payload, args.warmup, args.iterations)
+            results['scenarios'][name] = result
+            log_step(f"{name:<32} p50 {result['p50_ms']:>8}ms  p95 {result['p95_ms']:>8}ms  {result['response_bytes']}B")
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['commit']}-x{args.scale}.json")
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    log_step(f"📄 Resultados gravados em {output}")
+
+    regressions = compare_results(results, args.compare, args.regression_threshold) if args.compare else []
+    print("=" * 63)
+    if regressions:
+        print(f"⚠️  Regressões detectadas: {', '.join(regressions)}")
+    return not regressions
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,91 @@
+/**
+ * Benchmark - login sob concorrência: bcryptjs no event loop × pool de workers (argon2id / bcrypt legado)
+ * Simula CONCURRENCY logins simultâneos (LOGINS no total) e mede vazão, latência de cada login e o
+ * atraso do event loop (p99), que é o que as demais requisições sentem durante o pico de logins.
+ * Não usa MongoDB nem HTTP: só a etapa de verificação da senha.
+ *
+ *   node benchmarks/password_bench.js
+ *   LOGINS=400 CONCURRENCY=1,8,32 PASSWORD_HASH_WORKERS=4 node benchmarks/password_bench.js
+ */
+
+const fs = require('fs');
+const path = require('path');
+const { monitorEventLoopDelay } = require('perf_hooks');
+const bcrypt = require('bcryptjs');
+const { hashPassword, verifyPassword, getPasswordHashingStats } = require('../lib/password-hashing.js');
+
+const LOGINS = parseInt(process.env.LOGINS || '200');
+const CONCURRENCY = (process.env.CONCURRENCY || '1,8,32').split(',').map(Number);
+const PASSWORD = 'senha-de-teste-123';
+const RESULTS_DIR = path.join(__dirname, 'results');
+
+async function runScenario(verify, concurrency) {
+  const latencies = [];
+  const loopDelay = monitorEventLoopDelay({ resolution: 5 });
+  let issued = 0;
+
+  const client = async () => {
+    while (issued < LOGINS) {
+      issued++;
+      const started = performance.now();
+      const valid = await verify();
+      if (!valid) throw new Error('Senha recusada no benchmark');
+      latencies.push(performance.now() - started);
+    }
+  };
+
+  loopDelay.enable();
+  const started = performance.now();
+  await Promise.all(Array.from({ length: concurrency }, client));
+  const seconds = (performance.now() - started) / 1000;
+  loopDelay.disable();
+
+  latencies.sort((a, b) => a - b);
+  const pick = (q) => Math.round(latencies[Math.min(latencies.length - 1, Math.floor(latencies.length * q))] * 10) / 10;
+  return {
+    loginsPerSecond: Math.round(LOGINS / seconds),
+    p50_ms: pick(0.5),
+    p95_ms: pick(0.95),
+    loopDelayP99_ms: Math.round(loopDelay.percentile(99) / 1e5) / 10
+  };
+}
+
+async function main() {
+  const legacyHash = await bcrypt.hash(PASSWORD, 10);
+  const argonHash = await hashPassword(PASSWORD);
+
+  const scenarios = {
+    'bcryptjs (event loop)': () => bcrypt.compare(PASSWORD, legacyHash),
+    'pool bcrypt legado': () => verifyPassword(PASSWORD, legacyHash),
+    'pool argon2id': () => verifyPassword(PASSWORD, argonHash)
+  };
+
+  const results = [];
+  console.log(`⏱️  BENCHMARK - verificação de senha (${LOGINS} logins, pool de ${getPasswordHashingStats().size} workers)`);
+  console.log('='.repeat(86));
+  console.log(`${'cenário'.padEnd(24)}${'conc.'.padStart(6)}${'logins/s'.padStart(11)}${'p50'.padStart(10)}${'p95'.padStart(10)}${'atraso do loop p99'.padStart(22)}`);
+  console.log('-'.repeat(86));
+
+  for (const concurrency of CONCURRENCY) {
+    for (const [name, verify] of Object.entries(scenarios)) {
+      await verify(); // aquecimento (carrega a lib no worker)
+      const row = { scenario: name, concurrency, ...(await runScenario(verify, concurrency)) };
+      results.push(row);
+      console.log(
+        `${name.padEnd(24)}${String(concurrency).padStart(6)}${String(row.loginsPerSecond).padStart(11)}` +
+        `${(row.p50_ms + 'ms').padStart(10)}${(row.p95_ms + 'ms').padStart(10)}${(row.loopDelayP99_ms + 'ms').padStart(22)}`
+      );
+    }
+  }
+
+  fs.mkdirSync(RESULTS_DIR, { recursive: true });
+  const output = path.join(RESULTS_DIR, `password-${Date.now()}.json`);
+  fs.writeFileSync(output, JSON.stringify({ logins: LOGINS, pool: getPasswordHashingStats(), results }, null, 2));
+  console.log('='.repeat(86));
+  console.log(`📄 Resultados gravados em ${output}`);
+}
+
+main().catch(error => {
+  console.error(error);
+  process.exitCode = 1;
+});
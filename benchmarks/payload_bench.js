@@ -0,0 +1,172 @@
+/**
+ * Benchmark - tamanho e serialização das listas pesadas: documento inteiro × projeção por endpoint
+ * Usa os documentos de database_export/json multiplicados por SCALE (sem MongoDB nem HTTP) e mede,
+ * para cada endpoint, bytes do JSON, bytes com gzip/br e o tempo de JSON.stringify + compressão.
+ *
+ *   node benchmarks/payload_bench.js
+ *   SCALE=50 ITERATIONS=20 node benchmarks/payload_bench.js
+ */
+
+const fs = require('fs');
+const path = require('path');
+const crypto = require('crypto');
+const { aggregateCalendarEntries } = require('../lib/calendar-view.js');
+const { groupUsersByChurchAndCargo } = require('../lib/admin-lists.js');
+const { projectList, resolveFields, RECEIPT_FIELDS } = require('../lib/response-fields.js');
+const { compressBody } = require('../lib/json-response.js');
+
+const SCALE = parseInt(process.env.SCALE || '20');
+const ITERATIONS = parseInt(process.env.ITERATIONS || '10');
+const EXPORT_DIR = path.join(__dirname, '..', 'database_export', 'json');
+const RESULTS_DIR = path.join(__dirname, 'results');
+
+// Export estendido do mongoexport → formato que o driver devolve ao JSON.stringify
+function load(name) {
+  const docs = JSON.parse(fs.readFileSync(path.join(EXPORT_DIR, `${name}.json`), 'utf8'));
+  return docs.map(doc => JSON.parse(JSON.stringify(doc), (key, value) =>
+    value && typeof value === 'object' && value.$oid ? value.$oid : value));
+}
+
+// Cópia i de cada documento em outra igreja/usuário, com ids novos
+function scale(docs, idField, mutate = () => ({})) {
+  const out = [];
+  for (let copy = 0; copy < SCALE; copy++) {
+    for (const doc of docs) {
+      out.push({ ...doc, _id: crypto.randomBytes(12).toString('hex'), [idField]: crypto.randomUUID(), ...mutate(doc, copy) });
+    }
+  }
+  return out;
+}
+
+function fakeReceipt(userId) {
+  const fileId = crypto.randomUUID();
+  return {
+    receiptId: fileId,
+    filename: `comprovante-${fileId.slice(0, 8)}.jpg`,
+    filepath: `${crypto.randomBytes(32).toString('hex')}.jpg`,
+    fileType: 'image/jpeg',
+    fileSize: 180000 + Math.floor(Math.random() * 50000),
+    uploadedBy: userId,
+    uploadedAt: new Date().toISOString()
+  };
+}
+
+function buildPayloads() {
+  const churches = load('churches');
+  const users = load('users').map(({ password, ...u }) => u);
+  const rawEntries = load('entries');
+  const costs = load('costs_entries');
+  const logs = load('audit_logs');
+
+  const scaledChurches = scale(churches, 'churchId', (doc, copy) => ({ name: `${doc.name} ${copy}` }));
+  const scaledUsers = scale(users, 'userId', (doc, copy) => ({
+    churchName: scaledChurches[copy * churches.length]?.name || 'Sem igreja',
+    email: `${copy}.${doc.email}`
+  }));
+  const churchesWithPastor = scaledChurches.map((church, i) => ({ ...church, pastor: scaledUsers[i % scaledUsers.length] }));
+  const entries = scale(rawEntries, 'entryId', (doc, copy) => ({
+    church: `Igreja ${copy}`,
+    churchId: `church-${copy}`,
+    receipts: [fakeReceipt(doc.userId), fakeReceipt(doc.userId)]
+  }));
+
+  // Respostas anteriores: documentos inteiros (e a cópia agrupada em users/list)
+  const before = {
+    'entries/month': { entries: aggregateCalendarEntries(entries) },
+    'costs-entries/list': { costs: scale(costs, 'costId') },
+    'users/list': {
+      users: scaledUsers,
+      grouped: (() => {
+        const grouped = {};
+        for (const u of scaledUsers) {
+          ((grouped[u.churchName] ||= {})[u.cargo || 'Sem cargo'] ||= []).push(u);
+        }
+        return grouped;
+      })()
+    },
+    'churches/list': { churches: churchesWithPastor },
+    'audit/logs': { logs: scale(logs, 'logId').slice(0, 100) }
+  };
+
+  // Respostas atuais: projeção padrão de cada endpoint
+  const trimmedEntries = entries.map(entry => ({
+    ...entry,
+    receipts: entry.receipts.map(r => Object.fromEntries(RECEIPT_FIELDS.map(f => [f, r[f]])))
+  }));
+  const after = {
+    'entries/month': { entries: projectList('entries/month', aggregateCalendarEntries(trimmedEntries), resolveFields('entries/month')) },
+    'costs-entries/list': { costs: projectList('costs-entries/list', before['costs-entries/list'].costs, resolveFields('costs-entries/list')) },
+    'users/list': {
+      users: projectList('users/list', scaledUsers, resolveFields('users/list')),
+      grouped: groupUsersByChurchAndCargo(scaledUsers)
+    },
+    'churches/list': { churches: projectList('churches/list', churchesWithPastor, resolveFields('churches/list')) },
+    'audit/logs': { logs: projectList('audit/logs', before['audit/logs'].logs, resolveFields('audit/logs')) }
+  };
+
+  return { before, after };
+}
+
+function median(samples) {
+  samples.sort((a, b) => a - b);
+  return Math.round(samples[Math.floor(samples.length / 2)] * 100) / 100;
+}
+
+async function measure(payload) {
+  const timings = { serialize: [], gzip: [], br: [] };
+  let body = null;
+  let sizes = null;
+  for (let i = 0; i < ITERATIONS; i++) {
+    let started = performance.now();
+    body = Buffer.from(JSON.stringify(payload));
+    timings.serialize.push(performance.now() - started);
+
+    sizes = { raw: body.length };
+    for (const encoding of ['gzip', 'br']) {
+      started = performance.now();
+      sizes[encoding] = (await compressBody(body, encoding)).length;
+      timings[encoding].push(performance.now() - started);
+    }
+  }
+  return {
+    bytes: sizes,
+    serializeMs: median(timings.serialize),
+    gzipMs: median(timings.gzip),
+    brMs: median(timings.br)
+  };
+}
+
+function kb(bytes) {
+  return `${(bytes / 1024).toFixed(1)}KB`;
+}
+
+async function main() {
+  const { before, after } = buildPayloads();
+  const results = [];
+
+  console.log(`⏱️  BENCHMARK - payload das listas (SCALE=${SCALE}, mediana de ${ITERATIONS})`);
+  console.log('='.repeat(96));
+  console.log(`${'endpoint'.padEnd(20)}${'antes'.padStart(10)}${'depois'.padStart(10)}${'depois+br'.padStart(11)}${'depois+gz'.padStart(11)}${'stringify antes'.padStart(17)}${'depois'.padStart(9)}${'br'.padStart(8)}`);
+  console.log('-'.repeat(96));
+
+  for (const endpoint of Object.keys(before)) {
+    const row = { endpoint, before: await measure(before[endpoint]), after: await measure(after[endpoint]) };
+    results.push(row);
+    console.log(
+      `${endpoint.padEnd(20)}${kb(row.before.bytes.raw).padStart(10)}${kb(row.after.bytes.raw).padStart(10)}` +
+      `${kb(row.after.bytes.br).padStart(11)}${kb(row.after.bytes.gzip).padStart(11)}` +
+      `${(row.before.serializeMs + 'ms').padStart(17)}${(row.after.serializeMs + 'ms').padStart(9)}${(row.after.brMs + 'ms').padStart(8)}`
+    );
+  }
+
+  fs.mkdirSync(RESULTS_DIR, { recursive: true });
+  const output = path.join(RESULTS_DIR, `payload-${Date.now()}.json`);
+  fs.writeFileSync(output, JSON.stringify({ scale: SCALE, iterations: ITERATIONS, results }, null, 2));
+  console.log('='.repeat(96));
+  console.log(`📄 Resultados gravados em ${output}`);
+}
+
+main().catch(error => {
+  console.error(error);
+  process.exitCode = 1;
+});
@@ -0,0 +1,197 @@
+/**
+ * Benchmark - roteador da API: cadeia de `if (endpoint === ...)` × tabela (lib/api-router.js)
+ *
+ * 1. Despacho (sempre, sem MongoDB): resolve os endpoints reais de route-table.js pela cadeia
+ *    linear (mesma ordem, uma comparação por rota) e pelo Map do roteador, e mede o custo do
+ *    dispatch completo (auth + import já em cache + handler vazio).
+ * 2. Cold start (COLD_START=1): sobe `next start` (build já feito com `npx next build`) COLD_RUNS
+ *    vezes e mede o tempo até a primeira resposta e a 1ª × 2ª requisição de cada módulo de
+ *    handlers. Para comparar com a rota monolítica, rode o mesmo script no commit anterior.
+ *
+ *   node benchmarks/router_bench.js
+ *   ITERATIONS=2000000 node benchmarks/router_bench.js
+ *   COLD_START=1 COLD_RUNS=5 PORT=3100 BENCH_TOKEN=<jwt master> node benchmarks/router_bench.js
+ */
+
+const fs = require('fs');
+const path = require('path');
+const { spawn } = require('child_process');
+const { createRouter } = require('../lib/api-router.js');
+const { ROUTE_TABLE } = require('../app/api/[[...path]]/route-table.js');
+
+const ITERATIONS = parseInt(process.env.ITERATIONS || '1000000');
+const DISPATCH_ITERATIONS = parseInt(process.env.DISPATCH_ITERATIONS || '100000');
+const COLD_START = process.env.COLD_START === '1';
+const COLD_RUNS = parseInt(process.env.COLD_RUNS || '3');
+const PORT = parseInt(process.env.PORT || '3100');
+const BENCH_TOKEN = process.env.BENCH_TOKEN || '';
+const RESULTS_DIR = path.join(__dirname, 'results');
+
+// Uma requisição por módulo; as públicas importam o módulo mesmo sem token
+const COLD_PROBES = [
+  { method: 'GET', endpoint: 'time/current', module: 'system' },
+  { method: 'GET', endpoint: 'uploads/bench/nao-existe.png', module: 'files' },
+  { method: 'POST', endpoint: 'public/churches', module: 'public' },
+  { method: 'POST', endpoint: 'auth/login', module: 'auth', body: {} },
+  { method: 'POST', endpoint: 'entries/month', module: 'entries', body: { month: 1, year: 2025 }, token: true },
+  { method: 'POST', endpoint: 'dashboard/data', module: 'analytics', body: { month: 1, year: 2025 }, token: true },
+  { method: 'POST', endpoint: 'costs-entries/list', module: 'costs', body: {}, token: true },
+  { method: 'POST', endpoint: 'users/list', module: 'users', body: {}, token: true }
+];
+
+function endpointsOf(method) {
+  return Object.values(ROUTE_TABLE).flatMap(entry => Object.keys(entry[method] || {}));
+}
+
+// Cadeia linear equivalente à rota antiga (prefixos por startsWith no fim, como no GET)
+function buildLegacyChain(endpoints) {
+  const body = endpoints.map((endpoint, i) => endpoint.endsWith('/*')
+    ? `if (endpoint.startsWith(${JSON.stringify(endpoint.slice(0, -1))})) return ${i};`
+    : `if (endpoint === ${JSON.stringify(endpoint)}) return ${i};`).join('\n');
+  return new Function('endpoint', `${body}\nreturn -1;`);
+}
+
+function nsPerOp(fn, inputs, iterations) {
+  let sink = 0;
+  for (let i = 0; i < 10000; i++) sink += fn(inputs[i % inputs.length]) ? 1 : 0; // aquecimento
+  const started = process.hrtime.bigint();
+  for (let i = 0; i < iterations; i++) sink += fn(inputs[i % inputs.length]) ? 1 : 0;
+  const elapsed = Number(process.hrtime.bigint() - started);
+  return { ns_per_op: Math.round(elapsed / iterations * 10) / 10, sink };
+}
+
+async function benchDispatch() {
+  const endpoints = endpointsOf('POST');
+  const legacy = buildLegacyChain(endpoints);
+  const router = createRouter(ROUTE_TABLE);
+  const concrete = endpoints.map(e => e.replace('/*', '/x'));
+
+  const cases = {
+    'todos (uniforme)': concrete,
+    'primeiro': [concrete[0]],
+    'último': [concrete[concrete.length - 1]],
+    'inexistente (404)': ['nao/existe']
+  };
+
+  const resolve = {};
+  for (const [name, inputs] of Object.entries(cases)) {
+    resolve[name] = {
+      if_chain: nsPerOp(e => legacy(e) >= 0, inputs, ITERATIONS).ns_per_op,
+      table: nsPerOp(e => router.resolve('POST', e) !== null, inputs, ITERATIONS).ns_per_op
+    };
+  }
+
+  // Dispatch completo com handlers vazios e módulos já importados
+  const response = new Response('{}');
+  const table = Object.fromEntries(Object.entries(ROUTE_TABLE).map(([name, entry]) => {
+    const handlers = {};
+    for (const method of ['POST', 'GET']) {
+      handlers[method] = Object.fromEntries(Object.keys(entry[method] || {}).map(key => [key, async () => response]));
+    }
+    return [name, { ...entry, load: async () => handlers }];
+  }));
+  const fast = createRouter(table, {
+    connect: async () => ({}),
+    authenticate: () => ({ userId: 'bench', role: 'master' }),
+    loadUserData: async () => ({ userId: 'bench', role: 'master' })
+  });
+  await fast.preload();
+
+  const requests = concrete.map(e => new Request(`http://localhost/api/${e}`, { method: 'POST' }));
+  for (let i = 0; i < 1000; i++) await fast.dispatch('POST', requests[i % requests.length]);
+  const started = process.hrtime.bigint();
+  for (let i = 0; i < DISPATCH_ITERATIONS; i++) await fast.dispatch('POST', requests[i % requests.length]);
+  const dispatchUs = Number(process.hrtime.bigint() - started) / DISPATCH_ITERATIONS / 1000;
+
+  return { routes: endpoints.length, resolve, dispatch_us: Math.round(dispatchUs * 100) / 100 };
+}
+
+async function timedFetch(probe) {
+  const started = performance.now();
+  const response = await fetch(`http://localhost:${PORT}/api/${probe.endpoint}`, {
+    method: probe.method,
+    headers: {
+      'Content-Type': 'application/json',
+      ...(probe.token ? { Authorization: `Bearer ${BENCH_TOKEN}` } : {})
+    },
+    body: probe.body ? JSON.stringify(probe.body) : undefined
+  });
+  await response.arrayBuffer();
+  return { status: response.status, ms: Math.round((performance.now() - started) * 10) / 10 };
+}
+
+async function coldStartRun() {
+  const started = performance.now();
+  const server = spawn('npx', ['next', 'start', '-p', String(PORT)], {
+    cwd: path.join(__dirname, '..'),
+    env: process.env,
+    stdio: 'ignore',
+    detached: true
+  });
+
+  try {
+    let ready = null;
+    while (!ready && performance.now() - started < 60000) {
+      try {
+        ready = await timedFetch(COLD_PROBES[0]);
+      } catch {
+        await new Promise(resolve => setTimeout(resolve, 25));
+      }
+    }
+    if (!ready) throw new Error('next start não respondeu em 60s');
+    const firstResponseMs = Math.round(performance.now() - started);
+
+    const probes = {};
+    for (const probe of COLD_PROBES.slice(1)) {
+      if (probe.token && !BENCH_TOKEN) continue;
+      const first = await timedFetch(probe);
+      const second = await timedFetch(probe);
+      probes[`${probe.method} ${probe.endpoint}`] = { module: probe.module, status: first.status, first_ms: first.ms, second_ms: second.ms };
+    }
+    return { first_response_ms: firstResponseMs, probes };
+  } finally {
+    process.kill(-server.pid, 'SIGTERM');
+    await new Promise(resolve => server.once('exit', resolve));
+  }
+}
+
+async function main() {
+  console.log(`⏱️  BENCHMARK - roteador da API (${ITERATIONS} resoluções, ${DISPATCH_ITERATIONS} dispatches)`);
+
+  const dispatch = await benchDispatch();
+  console.log('='.repeat(64));
+  console.log(`${'resolução'.padEnd(32)}${'if-chain'.padStart(16)}${'tabela'.padStart(16)}`);
+  console.log('-'.repeat(64));
+  for (const [name, { if_chain, table }] of Object.entries(dispatch.resolve)) {
+    console.log(`${name.padEnd(32)}${`${if_chain}ns`.padStart(16)}${`${table}ns`.padStart(16)}`);
+  }
+  console.log(`${'dispatch completo (tabela)'.padEnd(32)}${''.padStart(16)}${`${dispatch.dispatch_us}µs`.padStart(16)}`);
+
+  const cold = [];
+  if (COLD_START) {
+    if (!fs.existsSync(path.join(__dirname, '..', '.next', 'BUILD_ID'))) {
+      console.warn('⚠️  Sem build (.next/BUILD_ID): rode `npx next build` antes do cold start');
+    } else {
+      for (let run = 0; run < COLD_RUNS; run++) {
+        const result = await coldStartRun();
+        cold.push(result);
+        console.log('-'.repeat(64));
+        console.log(`cold start ${run + 1}: primeira resposta em ${result.first_response_ms}ms`);
+        for (const [name, probe] of Object.entries(result.probes)) {
+          console.log(`  ${name.padEnd(38)}${`${probe.first_ms}ms → ${probe.second_ms}ms`.padStart(24)}`);
+        }
+      }
+    }
+  }
+
+  fs.mkdirSync(RESULTS_DIR, { recursive: true });
+  const output = path.join(RESULTS_DIR, `router-${Date.now()}.json`);
+  fs.writeFileSync(output, JSON.stringify({ iterations: ITERATIONS, dispatch, cold }, null, 2));
+  console.log('='.repeat(64));
+  console.log(`📄 Resultados gravados em ${output}`);
+}
+
+main().catch(error => {
+  console.error(error);
+  process.exitCode = 1;
+});
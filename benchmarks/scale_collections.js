@@ -0,0 +1,113 @@
+// Multiplica sinteticamente entries, costs_entries e audit_logs do dump restaurado
+// Uso: BENCH_SCALE=100 mongosh mongodb://localhost:27017/iudp_bench benchmarks/scale_collections.js
+//
+// Cada cópia i (1..SCALE-1) é deslocada i % 24 meses para trás e atribuída a uma
+// igreja sintética floor(i / 24), de modo que cresçam tanto o histórico quanto a
+// densidade de cada mês. Os IDs seguem os formatos usados em route.js.
+
+const crypto = require('crypto');
+
+const SCALE = parseInt(process.env.BENCH_SCALE || '10');
+const BATCH_SIZE = 1000;
+const MONTHS_OF_HISTORY = 24;
+
+function pad(n) {
+  return String(n).padStart(2, '0');
+}
+
+function shiftMonth(month, year, offset) {
+  const index = (year * 12 + (month - 1)) - offset;
+  return { month: (index % 12) + 1, year: Math.floor(index / 12) };
+}
+
+function benchChurch(copy) {
+  const n = Math.floor(copy / MONTHS_OF_HISTORY);
+  return { churchId: `bench-church-${n}`, church: `Igreja Bench ${n}` };
+}
+
+function insertBatched(collection, docs) {
+  for (let i = 0; i < docs.length; i += BATCH_SIZE) {
+    db.getCollection(collection).insertMany(docs.slice(i, i + BATCH_SIZE), { ordered: false });
+  }
+}
+
+function scaleEntries() {
+  const originals = db.entries.find({}, { _id: 0 }).toArray();
+  let docs = [];
+  for (let copy = 1; copy < SCALE; copy++) {
+    const church = benchChurch(copy);
+    for (const entry of originals) {
+      const { month, year } = shiftMonth(entry.month, entry.year, copy % MONTHS_OF_HISTORY);
+      docs.push({
+        ...entry,
+        entryId: `${year}-${pad(month)}-${pad(entry.day)}-${entry.timeSlot}`,
+        month,
+        year,
+        church: copy < MONTHS_OF_HISTORY ? entry.church : church.church,
+        churchId: copy < MONTHS_OF_HISTORY ? entry.churchId : church.churchId,
+        timeWindowLocked: true
+      });
+      if (docs.length >= BATCH_SIZE) {
+        insertBatched('entries', docs);
+        docs = [];
+      }
+    }
+  }
+  insertBatched('entries', docs);
+}
+
+function scaleCostsEntries() {
+  const originals = db.costs_entries.find({}, { _id: 0 }).toArray();
+  let docs = [];
+  for (let copy = 1; copy < SCALE; copy++) {
+    const church = benchChurch(copy);
+    for (const cost of originals) {
+      const createdAt = new Date(new Date(cost.createdAt).getTime() - copy * 86400000).toISOString();
+      docs.push({
+        ...cost,
+        costId: crypto.randomUUID(),
+        churchId: copy < MONTHS_OF_HISTORY ? cost.churchId : church.churchId,
+        churchName: copy < MONTHS_OF_HISTORY ? cost.churchName : church.church,
+        createdAt,
+        updatedAt: createdAt
+      });
+      if (docs.length >= BATCH_SIZE) {
+        insertBatched('costs_entries', docs);
+        docs = [];
+      }
+    }
+  }
+  insertBatched('costs_entries', docs);
+}
+
+function scaleAuditLogs() {
+  const originals = db.audit_logs.find({}, { _id: 0 }).toArray();
+  let docs = [];
+  for (let copy = 1; copy < SCALE; copy++) {
+    for (const log of originals) {
+      docs.push({
+        ...log,
+        logId: crypto.randomUUID(),
+        timestamp: new Date(new Date(log.timestamp).getTime() - copy * 3600000).toISOString()
+      });
+      if (docs.length >= BATCH_SIZE) {
+        insertBatched('audit_logs', docs);
+        docs = [];
+      }
+    }
+  }
+  insertBatched('audit_logs', docs);
+}
+
+if (SCALE > 1) {
+  scaleEntries();
+  scaleCostsEntries();
+  scaleAuditLogs();
+}
+
+print(JSON.stringify({
+  scale: SCALE,
+  entries: db.entries.countDocuments({}),
+  costs_entries: db.costs_entries.countDocuments({}),
+  audit_logs: db.audit_logs.countDocuments({})
+}));
@@ -0,0 +1,239 @@
+/**
+ * Benchmark - motores de armazenamento: MongoDB × SQLite embutido (lib/repositories.js)
+ * Popula os dois motores com os mesmos dados (pelos próprios repositórios) e roda as mesmas
+ * cargas das rotas quentes: login, entries/month, save-batch, costs-entries/list (1ª e 2ª
+ * página), audit/logs, users/list, churches/list e a busca de overrides da validação.
+ * Motor indisponível (sem mongod ou sem better-sqlite3) é pulado com aviso.
+ *
+ *   node benchmarks/storage_bench.js
+ *   ENGINES=sqlite,mongo CHURCHES=50 MONTHS=12 ITERATIONS=50 node benchmarks/storage_bench.js
+ */
+
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { MongoClient } = require('mongodb');
+const { ensureIndexes } = require('../lib/db-indexes.js');
+const { createRepositories } = require('../lib/repositories.js');
+const { resolveFields, toProjection } = require('../lib/response-fields.js');
+
+const MONGO_URL = process.env.MONGO_URL || 'mongodb://localhost:27017';
+const DB_NAME = process.env.BENCH_STORAGE_DB_NAME || 'iudp_bench_storage';
+const SQLITE_FILE = process.env.BENCH_SQLITE_FILE || path.join(os.tmpdir(), 'iudp_bench_storage.sqlite');
+const ENGINES = (process.env.ENGINES || 'sqlite,mongo').split(',');
+const CHURCHES = parseInt(process.env.CHURCHES || '50');
+const USERS_PER_CHURCH = parseInt(process.env.USERS_PER_CHURCH || '4');
+const MONTHS = parseInt(process.env.MONTHS || '12');
+const ITERATIONS = parseInt(process.env.ITERATIONS || '50');
+const RESULTS_DIR = path.join(__dirname, 'results');
+
+const SLOTS = ['08:00', '10:00', '12:00', '15:00', '19:30'];
+const YEAR = 2025;
+const pad = (n) => String(n).padStart(2, '0');
+
+// Mesmos documentos para os dois motores (sem aleatoriedade)
+function buildDataset() {
+  const churches = [];
+  const users = [];
+  const entries = [];
+  const costs = [];
+  const audit = [];
+  const overrides = [];
+
+  for (let c = 0; c < CHURCHES; c++) {
+    const churchId = `church-${c}`;
+    const church = `Igreja Bench ${c}`;
+    const state = ['SP', 'RJ', 'MG', 'PR'][c % 4];
+    for (let u = 0; u < USERS_PER_CHURCH; u++) {
+      users.push({
+        userId: `user-${c}-${u}`,
+        name: `Bench Usuário ${c}-${u}`,
+        email: `bench.${c}.${u}@iudp.local`,
+        password: 'x',
+        role: u === 0 ? 'pastor' : 'leader',
+        cargo: u === 0 ? 'Pastor(a)' : 'Tesoureiro(a)',
+        church,
+        churchId
+      });
+    }
+    churches.push({ churchId, name: church, state, pastorId: `user-${c}-0`, createdAt: `2024-01-01T00:${pad(c % 60)}:00.000Z` });
+
+    for (let month = 1; month <= MONTHS; month++) {
+      for (let day = 1; day <= 28; day++) {
+        for (const timeSlot of SLOTS) {
+          entries.push({
+            entryId: `${YEAR}-${pad(month)}-${pad(day)}-${timeSlot}-${churchId}`,
+            year: YEAR, month, day, timeSlot,
+            value: (day * 13 + c) % 500, dinheiro: 10, pix: 5, maquineta: 0,
+            userId: `user-${c}-1`, userName: `Bench Usuário ${c}-1`,
+            church, churchId, state, region: 'Centro',
+            receipts: [{ receiptId: `r-${c}-${month}-${day}`, filename: 'r.pdf', filepath: 'r.pdf', fileType: 'application/pdf', size: 1000 }],
+            createdAt: `${YEAR}-${pad(month)}-${pad(day)}T12:00:00.000Z`
+          });
+        }
+      }
+      for (let k = 0; k < 5; k++) {
+        costs.push({
+          costId: `cost-${c}-${month}-${k}`,
+          churchId, churchName: church, costTypeName: 'Energia',
+          dueDate: `${YEAR}-${pad(month)}-${pad(5 + k)}`, value: 100 + k,
+          status: ['PENDING', 'PAID', 'APPROVED'][k % 3],
+          createdAt: `${YEAR}-${pad(month)}-${pad(1 + k)}T09:00:00.000Z`
+        });
+        audit.push({
+          logId: `log-${c}-${month}-${k}`,
+          action: ['ENTRY_CREATED', 'ENTRY_UPDATED', 'export_csv'][k % 3],
+          userId: `user-${c}-1`,
+          timestamp: `${YEAR}-${pad(month)}-${pad(1 + k)}T10:${pad(c % 60)}:00.000Z`,
+          details: { month }
+        });
+      }
+    }
+    overrides.push({
+      overrideId: `ov-${c}`, churchId, userId: `user-${c}-1`,
+      year: YEAR, month: 1, day: 5, timeSlot: '08:00', expiresAt: '2999-01-01T00:00:00.000Z'
+    });
+  }
+
+  return { churches, users, entries, costs, audit, overrides };
+}
+
+async function seed(repos, data) {
+  const started = performance.now();
+  await repos.churches.insertMany(data.churches);
+  await repos.users.insertMany(data.users);
+  for (let i = 0; i < data.entries.length; i += 5000) {
+    await repos.entries.insertMany(data.entries.slice(i, i + 5000));
+  }
+  await repos.costs.insertMany(data.costs);
+  await repos.audit.insertMany(data.audit);
+  for (const override of data.overrides) await repos.overrides.insertTimeOverride(override);
+  return Math.round(performance.now() - started);
+}
+
+function workloads(data) {
+  const monthProjection = toProjection('entries/month', resolveFields('entries/month'));
+  const church = data.churches[Math.floor(CHURCHES / 2)];
+  const { _id, ...base } = data.entries[0]; // insertMany do MongoDB acrescenta _id aos documentos
+  const batch = SLOTS.map(timeSlot => ({ ...base, timeSlot, entryId: `batch-${timeSlot}`, value: 42 }));
+  const nowISO = '2025-06-01T12:00:00.000Z';
+  let batchRound = 0;
+
+  return {
+    'auth/login (email)': (repos) => repos.users.findByEmail(`bench.${CHURCHES - 1}.2@iudp.local`),
+    'entries/month (igreja)': (repos) => repos.entries.find({ month: Math.min(6, MONTHS), year: YEAR, church: church.name }, { projection: monthProjection }),
+    'entries/month (estado)': (repos) => repos.entries.find({ month: 1, year: YEAR, state: 'SP' }, { projection: monthProjection }),
+    'entries/save-batch': async (repos) => {
+      batchRound++;
+      await Promise.all([
+        repos.entries.findByEntryIds(batch.map(e => e.entryId)),
+        repos.overrides.findActiveTimeOverrides({ churchId: church.churchId, userId: 'user-x' }, nowISO),
+        repos.overrides.findActiveEditOverrides(batch.map(e => e.entryId), nowISO)
+      ]);
+      await repos.entries.upsertMany(batch.map(e => ({ ...e, value: batchRound })));
+    },
+    'override (slot)': (repos) => repos.overrides.findActiveTimeOverride(
+      { churchId: church.churchId, userId: 'user-x', month: 1, year: YEAR, day: 5, timeSlot: '08:00' }, nowISO
+    ),
+    'costs-entries/list (p1)': (repos) => repos.costs.listPage({ churchId: church.churchId }, { limit: 20 }),
+    'costs-entries/list (p2)': async (repos) => {
+      const first = await repos.costs.listPage({ status: 'PAID' }, { limit: 50 });
+      return repos.costs.listPage({ status: 'PAID' }, { limit: 50, cursor: first.nextCursor });
+    },
+    'audit/logs (ação)': (repos) => repos.audit.listPage({ action: 'export_csv', timestamp: { $gte: `${YEAR}-03-01` } }, { limit: 100 }),
+    'users/list': (repos) => repos.users.listWithChurch(),
+    'churches/list': (repos) => repos.churches.listWithPastor()
+  };
+}
+
+async function timeIt(fn) {
+  await fn(); // aquecimento
+  const samples = [];
+  for (let i = 0; i < ITERATIONS; i++) {
+    const started = performance.now();
+    await fn();
+    samples.push(performance.now() - started);
+  }
+  samples.sort((a, b) => a - b);
+  const pick = (q) => Math.round(samples[Math.min(samples.length - 1, Math.floor(samples.length * q))] * 100) / 100;
+  return { p50_ms: pick(0.5), p95_ms: pick(0.95) };
+}
+
+async function openEngine(engine) {
+  if (engine === 'sqlite') {
+    for (const suffix of ['', '-wal', '-shm']) fs.rmSync(SQLITE_FILE + suffix, { force: true });
+    const repos = await createRepositories({ engine: 'sqlite', file: SQLITE_FILE });
+    return { repos, close: () => repos.close() };
+  }
+
+  const client = await MongoClient.connect(MONGO_URL, { serverSelectionTimeoutMS: 3000 });
+  const db = client.db(DB_NAME);
+  await db.dropDatabase();
+  await ensureIndexes(db);
+  const repos = await createRepositories({ engine: 'mongo', db });
+  return { repos, close: () => client.close() };
+}
+
+async function main() {
+  const data = buildDataset();
+  const results = {};
+
+  console.log(`⏱️  BENCHMARK - motores de armazenamento (${CHURCHES} igrejas, ${data.entries.length} lançamentos, ${ITERATIONS} iterações)`);
+
+  for (const engine of ENGINES) {
+    let opened;
+    try {
+      opened = await openEngine(engine);
+    } catch (error) {
+      console.warn(`⚠️  ${engine} indisponível, pulando: ${error.message}`);
+      continue;
+    }
+
+    try {
+      const seedMs = await seed(opened.repos, data);
+      results[engine] = { seed_ms: seedMs, workloads: {} };
+      for (const [name, run] of Object.entries(workloads(data))) {
+        results[engine].workloads[name] = await timeIt(() => run(opened.repos));
+      }
+    } finally {
+      await opened.close();
+    }
+  }
+
+  const engines = Object.keys(results);
+  if (engines.length === 0) {
+    console.error('Nenhum motor disponível');
+    process.exitCode = 1;
+    return;
+  }
+
+  console.log('='.repeat(32 + engines.length * 22));
+  console.log(`${'carga'.padEnd(32)}${engines.map(e => `${e} p50/p95`.padStart(22)).join('')}`);
+  console.log('-'.repeat(32 + engines.length * 22));
+  console.log(`${'carga inicial'.padEnd(32)}${engines.map(e => `${results[e].seed_ms}ms`.padStart(22)).join('')}`);
+  for (const name of Object.keys(results[engines[0]].workloads)) {
+    const cells = engines.map(e => {
+      const { p50_ms, p95_ms } = results[e].workloads[name];
+      return `${p50_ms}/${p95_ms}ms`.padStart(22);
+    });
+    console.log(`${name.padEnd(32)}${cells.join('')}`);
+  }
+
+  fs.mkdirSync(RESULTS_DIR, { recursive: true });
+  const output = path.join(RESULTS_DIR, `storage-${Date.now()}.json`);
+  fs.writeFileSync(output, JSON.stringify({
+    churches: CHURCHES,
+    usersPerChurch: USERS_PER_CHURCH,
+    months: MONTHS,
+    entries: data.entries.length,
+    iterations: ITERATIONS,
+    results
+  }, null, 2));
+  console.log('='.repeat(32 + engines.length * 22));
+  console.log(`📄 Resultados gravados em ${output}`);
+}
+
+main().catch(error => {
+  console.error(error);
+  process.exitCode = 1;
+});
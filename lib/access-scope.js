@@ -0,0 +1,46 @@
+/**
+ * ESCOPO DE ACESSO (quem vê quais lançamentos)
+ * Master/global vê tudo; líderes veem por estado, região (dentro do estado) ou igreja;
+ * usuário comum vê apenas os próprios lançamentos. Usado por entries/month, dashboard/data,
+ * compare/months e stats/overview.
+ */
+
+/**
+ * Condições do filtro do MongoDB para o escopo do usuário ({} = sem restrição)
+ */
+export function buildScopeFilter(userData) {
+  if (userData.role === 'master' || userData.scope === 'global') return {};
+  if (userData.scope === 'state') return { state: userData.state };
+  if (userData.scope === 'region') return { region: userData.region, state: userData.state };
+  if (userData.scope === 'church') return { church: userData.church };
+  return { userId: userData.userId };
+}
+
+/**
+ * Filtro de um mês dentro do escopo do usuário (entries/month, dashboard/data)
+ */
+export function buildMonthScopeFilter(userData, month, year) {
+  return {
+    month: parseInt(month),
+    year: parseInt(year),
+    ...buildScopeFilter(userData)
+  };
+}
+
+/**
+ * Mesma regra para um lançamento já carregado
+ */
+export function canUserAccessEntry(user, entry) {
+  if (user.role === 'master') return true;
+  if (user.scope === 'global') return true;
+
+  if (user.scope === 'state') {
+    return entry.state === user.state;
+  } else if (user.scope === 'region') {
+    return entry.region === user.region && entry.state === user.state;
+  } else if (user.scope === 'church') {
+    return entry.church === user.church;
+  }
+
+  return false;
+}
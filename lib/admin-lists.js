@@ -0,0 +1,91 @@
+/**
+ * LISTAS ADMINISTRATIVAS (users/list e churches/list)
+ * Os vínculos usuário → igreja e igreja → pastor são resolvidos num único aggregate com
+ * $lookup (um round trip), em vez de um findOne por item.
+ */
+
+/**
+ * Usuários (sem senha) com churchName resolvido pela igreja vinculada
+ */
+export async function listUsersWithChurch(db, { maxTimeMS } = {}) {
+  const users = await db.collection('users').aggregate([
+    { $project: { password: 0 } },
+    {
+      $lookup: {
+        from: 'churches',
+        localField: 'churchId',
+        foreignField: 'churchId',
+        as: 'linkedChurch'
+      }
+    },
+    { $addFields: { linkedChurchName: { $arrayElemAt: ['$linkedChurch.name', 0] } } },
+    { $project: { linkedChurch: 0 } }
+  ], maxTimeMS ? { maxTimeMS } : undefined).toArray();
+
+  return users.map(({ linkedChurchName, ...u }) => withChurchName(u, linkedChurchName));
+}
+
+/**
+ * Com churchId vale a igreja cadastrada; sem ele, o nome gravado no usuário
+ */
+export function withChurchName(user, linkedChurchName) {
+  return {
+    ...user,
+    churchName: user.churchId ? (linkedChurchName || 'Sem igreja') : (user.church || 'Sem igreja')
+  };
+}
+
+/**
+ * Agrupa por igreja → cargo, com userIds em ordem alfabética de nome
+ * (só os ids: os documentos já vão em `users` e não são repetidos na resposta)
+ */
+export function groupUsersByChurchAndCargo(users) {
+  const grouped = users.reduce((acc, u) => {
+    const churchKey = u.churchName || 'Sem igreja';
+    const cargoKey = u.cargo || 'Sem cargo';
+
+    if (!acc[churchKey]) acc[churchKey] = {};
+    if (!acc[churchKey][cargoKey]) acc[churchKey][cargoKey] = [];
+
+    acc[churchKey][cargoKey].push(u);
+    return acc;
+  }, {});
+
+  Object.keys(grouped).forEach(church => {
+    Object.keys(grouped[church]).forEach(cargo => {
+      grouped[church][cargo] = grouped[church][cargo]
+        .sort((a, b) => (a.name || '').localeCompare(b.name || ''))
+        .map(u => u.userId);
+    });
+  });
+
+  return grouped;
+}
+
+/**
+ * Igrejas (mais recentes primeiro) com o documento do pastor (sem senha) em `pastor`
+ */
+export async function listChurchesWithPastor(db, { maxTimeMS } = {}) {
+  const churches = await db.collection('churches').aggregate([
+    { $sort: { createdAt: -1 } },
+    {
+      $lookup: {
+        from: 'users',
+        localField: 'pastorId',
+        foreignField: 'userId',
+        as: 'pastorDocs'
+      }
+    },
+    { $addFields: { pastor: { $arrayElemAt: ['$pastorDocs', 0] } } },
+    { $project: { pastorDocs: 0, 'pastor.password': 0 } }
+  ], maxTimeMS ? { maxTimeMS } : undefined).toArray();
+
+  return churches.map(church => withPastor(church, church.pastor));
+}
+
+/**
+ * Igreja com pastorId ganha `pastor` (null se o usuário não existe mais)
+ */
+export function withPastor(church, pastor) {
+  return church.pastorId ? { ...church, pastor: pastor || null } : church;
+}
@@ -0,0 +1,143 @@
+/**
+ * ROTEADOR DA API (tabela de rotas + handlers carregados sob demanda)
+ * Substitui a cadeia de `if (endpoint === ...)` da rota catch-all: o endpoint é resolvido
+ * num Map (rotas `prefixo/*` por startsWith) e o módulo do handler só é importado na
+ * primeira requisição que precisa dele. A conexão com o banco e o import do módulo correm
+ * em paralelo.
+ *
+ * Middleware comum por rota:
+ *   auth 'public'  → sem token
+ *   auth 'user'    → token válido, senão 401
+ *   auth 'master'  → token de Master, senão 403
+ *   userData: true → documento do usuário (cache) em ctx.userData
+ *   db: false      → não conecta ao banco (métricas, health)
+ *
+ * Tabela: { módulo: { load: () => import(...), POST: { endpoint: spec }, GET: {...} } }
+ * spec é a string de auth ou { auth, userData, db }. O módulo exporta POST/GET com os
+ * handlers nas mesmas chaves; cada handler recebe { request, db, url, endpoint, user, userData }.
+ */
+
+export const METHODS = ['GET', 'POST'];
+
+const DEFAULT_SPEC = { auth: 'public', userData: false, db: true };
+
+function errorResponse(error, status) {
+  return Response.json({ error }, { status });
+}
+
+function normalizeSpec(spec) {
+  const normalized = { ...DEFAULT_SPEC, ...(typeof spec === 'string' ? { auth: spec } : spec) };
+  if (!['public', 'user', 'master'].includes(normalized.auth)) {
+    throw new Error(`[ROUTER] auth inválido: ${normalized.auth}`);
+  }
+  return normalized;
+}
+
+/**
+ * Endpoint a partir do caminho (/api/users/list → users/list)
+ */
+export function endpointFromUrl(url) {
+  return url.pathname.replace('/api/', '');
+}
+
+/**
+ * Monta o roteador
+ *   connect()                  → Db (chamado só para rotas com db)
+ *   authenticate(request)      → payload do token ou null
+ *   loadUserData(db, user)     → documento do usuário
+ *   onError(error, ctx)        → resposta para exceções não tratadas no handler
+ */
+export function createRouter(table, { connect, authenticate, loadUserData, onError } = {}) {
+  const modules = new Map();
+  const exact = Object.fromEntries(METHODS.map(method => [method, new Map()]));
+  const prefixes = Object.fromEntries(METHODS.map(method => [method, []]));
+  const stats = { dispatched: 0, notFound: 0, modulesLoaded: 0, loadMs: {} };
+
+  for (const [name, entry] of Object.entries(table)) {
+    const module = { name, load: entry.load, loaded: null };
+    modules.set(name, module);
+
+    for (const method of METHODS) {
+      for (const [key, spec] of Object.entries(entry[method] || {})) {
+        const route = { method, key, module, ...normalizeSpec(spec) };
+        if (key.endsWith('/*')) {
+          prefixes[method].push({ prefix: key.slice(0, -1), route });
+        } else {
+          if (exact[method].has(key)) {
+            throw new Error(`[ROUTER] Rota duplicada: ${method} ${key}`);
+          }
+          exact[method].set(key, route);
+        }
+      }
+    }
+  }
+
+  function resolve(method, endpoint) {
+    const route = exact[method]?.get(endpoint);
+    if (route) return route;
+    return prefixes[method]?.find(({ prefix }) => endpoint.startsWith(prefix))?.route || null;
+  }
+
+  // Import único por módulo; falha não fica em cache
+  function loadModule(module) {
+    if (!module.loaded) {
+      const started = performance.now();
+      module.loaded = Promise.resolve().then(module.load).then(exports => {
+        stats.modulesLoaded++;
+        stats.loadMs[module.name] = Math.round((performance.now() - started) * 10) / 10;
+        return exports;
+      }, error => {
+        module.loaded = null;
+        throw error;
+      });
+    }
+    return module.loaded;
+  }
+
+  async function loadHandler(route) {
+    const exports = await loadModule(route.module);
+    const handler = exports[route.method]?.[route.key];
+    if (typeof handler !== 'function') {
+      throw new Error(`[ROUTER] ${route.module.name} não exporta ${route.method} ${route.key}`);
+    }
+    return handler;
+  }
+
+  async function dispatch(method, request) {
+    const url = new URL(request.url);
+    const endpoint = endpointFromUrl(url);
+    const route = resolve(method, endpoint);
+    if (!route) {
+      stats.notFound++;
+      return errorResponse('Endpoint não encontrado', 404);
+    }
+    stats.dispatched++;
+
+    const ctx = { request, db: null, url, endpoint, user: null, userData: null };
+    try {
+      if (route.auth !== 'public') {
+        ctx.user = authenticate(request);
+        if (route.auth === 'master' && ctx.user?.role !== 'master') return errorResponse('Acesso negado', 403);
+        if (!ctx.user) return errorResponse('Não autenticado', 401);
+      }
+
+      const [db, handler] = await Promise.all([route.db ? connect() : null, loadHandler(route)]);
+      ctx.db = db;
+      if (route.userData) ctx.userData = await loadUserData(db, ctx.user);
+
+      return await handler(ctx);
+    } catch (error) {
+      if (onError) return onError(error, ctx);
+      console.error('API Error:', error);
+      return errorResponse(error.message, 500);
+    }
+  }
+
+  return {
+    resolve,
+    dispatch,
+    // Carrega todos os módulos (aquecimento opcional depois do primeiro request)
+    preload: () => Promise.all([...modules.values()].map(loadModule)),
+    stats: () => ({ routes: METHODS.reduce((n, m) => n + exact[m].size + prefixes[m].length, 0), modules: modules.size, ...stats })
+  };
+}
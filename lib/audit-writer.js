@@ -0,0 +1,175 @@
+/**
+ * GRAVAÇÃO ASSÍNCRONA DE AUDITORIA
+ * As rotas enfileiram os registros em memória e respondem sem esperar o banco; o buffer é
+ * gravado com insertMany ao atingir AUDIT_BATCH_SIZE ou a cada AUDIT_FLUSH_MS.
+ *
+ * Se o Mongo falhar ou demorar, o lote vai para um arquivo JSONL local (append-only) e é
+ * reenviado no próximo flush bem-sucedido. logId é único, então reenvios não duplicam.
+ * O ciclo de vida do processo fica com a conexão: initializeDatabase registra stopAuditWriter em
+ * onMongoShutdown, que grava o que ainda estiver em memória antes de o cliente fechar.
+ */
+
+import { randomUUID } from 'crypto';
+import { appendFileSync, existsSync, mkdirSync, readFileSync, renameSync, unlinkSync } from 'fs';
+import path from 'path';
+
+export const AUDIT_BATCH_SIZE = 200;
+export const AUDIT_FLUSH_MS = 1000;
+export const AUDIT_INSERT_TIMEOUT_MS = 5000;
+
+const DUPLICATE_KEY = 11000;
+
+export function auditFallbackPath() {
+  return process.env.AUDIT_FALLBACK_FILE || path.join(process.cwd(), 'logs', 'audit-fallback.jsonl');
+}
+
+const state = globalThis.__iudpAuditWriter || (globalThis.__iudpAuditWriter = {
+  db: null,
+  buffer: [],
+  timer: null,
+  flushing: null,
+  stats: { queued: 0, written: 0, fallback: 0, replayed: 0, failedFlushes: 0 }
+});
+
+function withTimeout(promise, ms) {
+  let timer;
+  const timeout = new Promise((_, reject) => {
+    timer = setTimeout(() => reject(new Error(`insertMany excedeu ${ms}ms`)), ms);
+  });
+  return Promise.race([promise, timeout]).finally(() => clearTimeout(timer));
+}
+
+// Duplicados (reenvio de um lote que já tinha entrado) não são erro
+async function insertRecords(db, records) {
+  try {
+    await withTimeout(db.collection('audit_logs').insertMany(records, { ordered: false }), AUDIT_INSERT_TIMEOUT_MS);
+  } catch (error) {
+    const writeErrors = error.writeErrors || [];
+    const onlyDuplicates = writeErrors.length > 0 && writeErrors.every(e => (e.code ?? e.err?.code) === DUPLICATE_KEY);
+    if (!onlyDuplicates) throw error;
+  }
+}
+
+function appendFallback(records) {
+  if (records.length === 0) return;
+  const file = auditFallbackPath();
+  mkdirSync(path.dirname(file), { recursive: true });
+  appendFileSync(file, records.map(r => JSON.stringify(r)).join('\n') + '\n');
+  state.stats.fallback += records.length;
+}
+
+/**
+ * Reenvia o arquivo de fallback (renomeado antes para não competir com novos appends)
+ */
+async function replayFallback(db) {
+  const file = auditFallbackPath();
+  if (!existsSync(file)) return;
+
+  const replaying = `${file}.replay`;
+  if (!existsSync(replaying)) renameSync(file, replaying);
+
+  const records = readFileSync(replaying, 'utf8')
+    .split('\n')
+    .filter(Boolean)
+    .map(line => {
+      try {
+        return JSON.parse(line);
+      } catch {
+        return null;
+      }
+    })
+    .filter(Boolean);
+
+  for (let i = 0; i < records.length; i += AUDIT_BATCH_SIZE) {
+    await insertRecords(db, records.slice(i, i + AUDIT_BATCH_SIZE));
+  }
+  unlinkSync(replaying);
+  state.stats.replayed += records.length;
+  console.log('[AUDIT] Registros reenviados do arquivo local:', records.length);
+}
+
+async function runFlush() {
+  const db = state.db;
+  const batch = state.buffer.splice(0, state.buffer.length);
+  if (!db) {
+    appendFallback(batch);
+    return;
+  }
+
+  try {
+    if (batch.length > 0) {
+      await insertRecords(db, batch);
+      state.stats.written += batch.length;
+    }
+  } catch (error) {
+    state.stats.failedFlushes++;
+    console.error('[AUDIT] Falha ao gravar lote, usando arquivo local:', error.message);
+    appendFallback(batch);
+    return;
+  }
+
+  try {
+    await replayFallback(db);
+  } catch (error) {
+    console.error('[AUDIT] Falha ao reenviar arquivo local (nova tentativa no próximo flush):', error.message);
+  }
+}
+
+/**
+ * Grava o buffer agora (um flush por vez; chamadas concorrentes esperam o atual e repetem)
+ */
+export async function flushAuditLog() {
+  if (state.timer) {
+    clearTimeout(state.timer);
+    state.timer = null;
+  }
+  while (state.flushing) await state.flushing;
+  const file = auditFallbackPath();
+  if (state.buffer.length === 0 && !existsSync(file) && !existsSync(`${file}.replay`)) return;
+
+  state.flushing = runFlush().finally(() => {
+    state.flushing = null;
+  });
+  await state.flushing;
+}
+
+function scheduleFlush() {
+  if (state.timer) return;
+  state.timer = setTimeout(() => {
+    state.timer = null;
+    flushAuditLog().catch(error => console.error('[AUDIT] Erro no flush:', error));
+  }, AUDIT_FLUSH_MS);
+  state.timer.unref?.();
+}
+
+/**
+ * Encerramento: grava o buffer e, se algo não chegar ao banco, salva no arquivo local
+ */
+export async function stopAuditWriter() {
+  try {
+    await flushAuditLog();
+  } catch (error) {
+    console.error('[AUDIT] Erro no flush de encerramento:', error.message);
+  }
+  appendFallback(state.buffer.splice(0, state.buffer.length));
+}
+
+/**
+ * Enfileira um registro de auditoria (não espera o banco)
+ */
+export function recordAudit(db, record) {
+  state.db = db;
+
+  state.buffer.push({ logId: record.logId || randomUUID(), ...record });
+  state.stats.queued++;
+
+  if (state.buffer.length >= AUDIT_BATCH_SIZE) {
+    flushAuditLog().catch(error => console.error('[AUDIT] Erro no flush:', error));
+  } else {
+    scheduleFlush();
+  }
+}
+
+export function getAuditWriterStats() {
+  return { ...state.stats, pending: state.buffer.length };
+}
@@ -0,0 +1,266 @@
+/**
+ * ARMAZENAMENTO DE UPLOADS ENDEREÇADO POR CONTEÚDO
+ * Cada arquivo é gravado como <sha256>.<ext> dentro da pasta da sua área (receipts, costs,
+ * users, churches), então o mesmo arquivo enviado duas vezes ocupa o disco uma vez só e as
+ * URLs continuam no formato de antes (/api/view/receipt/<arquivo>, /api/uploads/<área>/<arquivo>).
+ *
+ * As referências são contadas a partir dos próprios documentos (BLOB_REFERENCES), sem um
+ * contador paralelo que possa divergir. Um arquivo sem referências só é apagado depois de
+ * BLOB_GRACE_MS: o upload acontece antes do lançamento/custo que vai referenciá-lo.
+ */
+
+import { createHash, randomUUID } from 'crypto';
+import { existsSync } from 'fs';
+import { mkdir, readdir, rename, stat, unlink, utimes, writeFile } from 'fs/promises';
+import path from 'path';
+import { DERIVATIVE_SIZES, derivativePath } from './image-derivatives.js';
+import { resolveInside } from './file-server.js';
+
+export const BLOB_GRACE_MS = 24 * 60 * 60 * 1000;
+export const SWEEP_INTERVAL_MS = 24 * 60 * 60 * 1000;
+const FIRST_SWEEP_DELAY_MS = 10 * 60 * 1000;
+
+/**
+ * Campos que referenciam uploads. Com `area`, o campo guarda só o nome do arquivo;
+ * sem ela, guarda a URL /api/uploads/<área>/<arquivo>.
+ */
+export const BLOB_REFERENCES = [
+  { collection: 'entries', field: 'receipts.filepath', unwind: 'receipts', area: 'receipts' },
+  { collection: 'costs_entries', field: 'billFile' },
+  { collection: 'costs_entries', field: 'proofFile' },
+  { collection: 'users', field: 'photoUrl' },
+  { collection: 'churches', field: 'photoUrl' }
+];
+
+const DERIVATIVE_SUFFIX = new RegExp(`\\.(${Object.keys(DERIVATIVE_SIZES).join('|')})\\.webp$`);
+
+export function hashBuffer(buffer) {
+  return createHash('sha256').update(buffer).digest('hex');
+}
+
+export function blobFilename(hash, originalName) {
+  const ext = String(originalName || '').split('.').pop().toLowerCase();
+  return `${hash}.${/^[a-z0-9]{1,8}$/.test(ext) ? ext : 'bin'}`;
+}
+
+export function parseUploadUrl(url) {
+  const match = /^\/api\/uploads\/([a-z]+)\/([^/?#]+)$/.exec(url || '');
+  return match ? { area: match[1], filename: match[2] } : null;
+}
+
+/**
+ * Move um arquivo temporário (já com o hash calculado) para o nome definitivo.
+ * Se o conteúdo já existe, descarta o temporário e renova o mtime do existente
+ * (reinicia a carência para o varredor não apagá-lo antes de ser referenciado).
+ */
+export async function commitBlob(dir, tempPath, hash, originalName) {
+  const filename = blobFilename(hash, originalName);
+  const filepath = path.join(dir, filename);
+
+  if (existsSync(filepath)) {
+    await unlink(tempPath);
+    const now = new Date();
+    await utimes(filepath, now, now);
+    return { filename, filepath, hash, deduplicated: true };
+  }
+
+  await rename(tempPath, filepath);
+  return { filename, filepath, hash, deduplicated: false };
+}
+
+export async function storeBlob(dir, buffer, originalName) {
+  await mkdir(dir, { recursive: true });
+  const tempPath = path.join(dir, `.upload-${randomUUID()}.tmp`);
+  await writeFile(tempPath, buffer);
+  const blob = await commitBlob(dir, tempPath, hashBuffer(buffer), originalName);
+  return { ...blob, size: buffer.length };
+}
+
+function referenceKey(ref, value) {
+  if (ref.area) return `${ref.area}/${value}`;
+  const parsed = parseUploadUrl(value);
+  return parsed ? `${parsed.area}/${parsed.filename}` : null;
+}
+
+/**
+ * Contagem de referências de todos os arquivos: Map '<área>/<arquivo>' → quantidade
+ */
+export async function collectReferences(db) {
+  const counts = new Map();
+
+  for (const ref of BLOB_REFERENCES) {
+    const pipeline = [
+      ...(ref.unwind ? [{ $unwind: `$${ref.unwind}` }] : []),
+      { $match: { [ref.field]: { $type: 'string' } } },
+      { $group: { _id: `$${ref.field}`, count: { $sum: 1 } } }
+    ];
+    for await (const { _id, count } of db.collection(ref.collection).aggregate(pipeline)) {
+      const key = referenceKey(ref, _id);
+      if (key) counts.set(key, (counts.get(key) || 0) + count);
+    }
+  }
+
+  return counts;
+}
+
+export async function countReferences(db, area, filename) {
+  const counts = await Promise.all(
+    BLOB_REFERENCES
+      .filter(ref => !ref.area || ref.area === area)
+      .map(ref => db.collection(ref.collection).countDocuments({
+        [ref.field]: ref.area ? filename : `/api/uploads/${area}/${filename}`
+      }))
+  );
+  return counts.reduce((sum, n) => sum + n, 0);
+}
+
+async function removeWithDerivatives(filepath) {
+  let bytes = (await stat(filepath)).size;
+  await unlink(filepath);
+  for (const size of Object.keys(DERIVATIVE_SIZES)) {
+    const derivative = derivativePath(filepath, size);
+    if (existsSync(derivative)) {
+      bytes += (await stat(derivative)).size;
+      await unlink(derivative);
+    }
+  }
+  return bytes;
+}
+
+/**
+ * Apaga o arquivo se ninguém mais o referencia (e já passou da carência).
+ * Usado logo após excluir/trocar a referência; nunca lança erro. Devolve os bytes liberados.
+ */
+export async function releaseBlob(db, areas, area, filename, { graceMs = BLOB_GRACE_MS, now = Date.now() } = {}) {
+  try {
+    const filepath = areas[area] && filename ? resolveInside(areas[area], filename) : null;
+    if (!filepath || !existsSync(filepath)) return 0;
+    if ((await stat(filepath)).mtimeMs > now - graceMs) return 0;
+    if (await countReferences(db, area, filename) > 0) return 0;
+
+    const bytes = await removeWithDerivatives(filepath);
+    console.log('[BLOB STORE] Arquivo sem referências removido:', `${area}/${filename}`, bytes, 'bytes');
+    return bytes;
+  } catch (error) {
+    console.error('[BLOB STORE] Erro ao liberar arquivo:', error.message);
+    return 0;
+  }
+}
+
+export function releaseBlobUrl(db, areas, url, options) {
+  const parsed = parseUploadUrl(url);
+  return parsed ? releaseBlob(db, areas, parsed.area, parsed.filename, options) : Promise.resolve(0);
+}
+
+/**
+ * Varre as pastas de upload e apaga arquivos sem referência (mais antigos que a carência),
+ * derivados cujo original sumiu e temporários de uploads interrompidos.
+ */
+export async function sweepUploads(db, areas, { dryRun = false, graceMs = BLOB_GRACE_MS, now = Date.now() } = {}) {
+  const started = Date.now();
+  const references = await collectReferences(db);
+  const cutoff = now - graceMs;
+  const report = {
+    dryRun,
+    graceMs,
+    scannedFiles: 0,
+    referencedFiles: 0,
+    sharedFiles: 0,
+    recentFiles: 0,
+    reclaimedFiles: 0,
+    reclaimedBytes: 0,
+    areas: {}
+  };
+
+  for (const [area, dir] of Object.entries(areas)) {
+    const areaReport = { scannedFiles: 0, reclaimedFiles: 0, reclaimedBytes: 0 };
+    report.areas[area] = areaReport;
+    if (!existsSync(dir)) continue;
+
+    const reclaim = async (filepath, size, withDerivatives) => {
+      let bytes = size;
+      if (!dryRun && withDerivatives) {
+        bytes = await removeWithDerivatives(filepath);
+      } else if (!dryRun) {
+        await unlink(filepath);
+      }
+      areaReport.reclaimedFiles++;
+      areaReport.reclaimedBytes += bytes;
+    };
+
+    const removed = new Set();
+    for (const dirent of await readdir(dir, { withFileTypes: true })) {
+      if (!dirent.isFile()) continue;
+      const filepath = path.join(dir, dirent.name);
+      const stats = await stat(filepath);
+
+      if (dirent.name.startsWith('.')) {
+        // Temporário de upload interrompido
+        if (dirent.name.endsWith('.tmp') && stats.mtimeMs < cutoff) await reclaim(filepath, stats.size, false);
+        continue;
+      }
+
+      areaReport.scannedFiles++;
+      const count = references.get(`${area}/${dirent.name}`) || 0;
+      if (count > 0) {
+        report.referencedFiles++;
+        if (count > 1) report.sharedFiles++;
+        continue;
+      }
+      if (stats.mtimeMs >= cutoff) {
+        report.recentFiles++;
+        continue;
+      }
+
+      removed.add(dirent.name);
+      await reclaim(filepath, stats.size, true);
+    }
+
+    const derivativesDir = path.join(dir, '.derivatives');
+    if (existsSync(derivativesDir)) {
+      for (const name of await readdir(derivativesDir)) {
+        const original = name.replace(DERIVATIVE_SUFFIX, '');
+        if (original === name || (!removed.has(original) && !existsSync(path.join(dir, original)))) {
+          const filepath = path.join(derivativesDir, name);
+          await reclaim(filepath, (await stat(filepath)).size, false);
+        } else if (dryRun && removed.has(original)) {
+          areaReport.reclaimedBytes += (await stat(path.join(derivativesDir, name))).size;
+        }
+      }
+    }
+
+    report.scannedFiles += areaReport.scannedFiles;
+    report.reclaimedFiles += areaReport.reclaimedFiles;
+    report.reclaimedBytes += areaReport.reclaimedBytes;
+  }
+
+  report.durationMs = Date.now() - started;
+  return report;
+}
+
+/**
+ * Varredura periódica (uma vez por processo)
+ */
+export function startUploadSweeper(db, areas) {
+  if (globalThis.__iudpUploadSweepTimer !== undefined) return;
+
+  const run = async () => {
+    try {
+      const report = await sweepUploads(db, areas);
+      if (report.reclaimedFiles > 0) {
+        console.log('[UPLOAD SWEEPER] Arquivos removidos:', report.reclaimedFiles, '- bytes liberados:', report.reclaimedBytes);
+      }
+    } catch (error) {
+      console.error('[UPLOAD SWEEPER] Erro na varredura:', error);
+    }
+    schedule(SWEEP_INTERVAL_MS);
+  };
+
+  const schedule = (delay) => {
+    const timer = setTimeout(run, delay);
+    timer.unref?.();
+    globalThis.__iudpUploadSweepTimer = timer;
+  };
+
+  schedule(FIRST_SWEEP_DELAY_MS);
+}
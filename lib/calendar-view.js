@@ -0,0 +1,382 @@
+/**
+ * VISÃO MATERIALIZADA DO CALENDÁRIO DO MASTER
+ * entries/month (Master, todas as igrejas) agrega os lançamentos por dia + horário. Em vez de
+ * refazer isso a cada consulta, calendar_views guarda um documento por dia com os buckets já
+ * agregados, e um change stream em `entries` recalcula só o bucket (dia, horário) afetado.
+ * Um documento por dia (e não por mês) mantém cada um bem abaixo do limite de 16MB do BSON
+ * mesmo com centenas de igrejas e comprovantes; o mês é lido com uma consulta por (year, month).
+ *
+ * Quem grava em entries e avisa os clientes (entry.changed) chama syncCalendarSlots antes de
+ * publicar: o bucket é recalculado na hora e a releitura do cliente já vê o valor novo. O change
+ * stream continua cobrindo qualquer outra escrita (e corrige corridas entre gravações).
+ *
+ * Change streams exigem replica set (um nó local basta: mongod --replSet rs0 + rs.initiate()).
+ * Em standalone a visão fica desligada e entries/month continua agregando na hora.
+ *
+ *   calendar_views:       { viewId: 'YYYY-MM-DD', year, month, day, slots: { '<dia>-<horário>': bucket },
+ *                           entrySlots: { '<_id>': '<dia>-<horário>' }, updatedAt }
+ *   calendar_view_state:  { stateId: 'entries', resumeToken, version, updatedAt }
+ *
+ * VIEW_VERSION muda quando o formato dos buckets muda: na próxima inicialização o ponto de
+ * retomada salvo com outra versão é descartado e as visões são reconstruídas.
+ */
+
+import { RECEIPT_FIELDS } from './response-fields.js';
+
+export const VIEW_COLLECTION = 'calendar_views';
+const STATE_COLLECTION = 'calendar_view_state';
+const STATE_ID = 'entries';
+const VIEW_VERSION = 3; // 2: comprovantes com fileSize e uploadedAt; 3: um documento por dia
+
+const FLUSH_DELAY_MS = 50;
+const RETRY_DELAY_MS = 5000;
+const HISTORY_LOST = 286; // ChangeStreamHistoryLost
+
+const ENTRY_PROJECTION = {
+  entryId: 1, month: 1, year: 1, day: 1, timeSlot: 1,
+  value: 1, dinheiro: 1, pix: 1, maquineta: 1, notes: 1,
+  church: 1, churchId: 1, userId: 1, userName: 1,
+  timeWindowLocked: 1, masterUnlocked: 1, createdAt: 1, updatedAt: 1,
+  // Comprovantes só com os campos que a tela usa
+  ...Object.fromEntries(RECEIPT_FIELDS.map(field => [`receipts.${field}`, 1]))
+};
+
+const state = globalThis.__iudpCalendarView || (globalThis.__iudpCalendarView = {
+  started: false,
+  ready: false,
+  stream: null,
+  pendingSlots: new Map(),
+  pendingDeletes: new Set(),
+  flushTimer: null,
+  flushing: null,
+  stats: { events: 0, slotRefreshes: 0, rebuilds: 0, lastEventAt: null }
+});
+
+export function slotKey(day, timeSlot) {
+  return `${parseInt(day)}-${timeSlot}`;
+}
+
+export function viewIdFor(year, month, day) {
+  return `${parseInt(year)}-${String(parseInt(month)).padStart(2, '0')}-${String(parseInt(day)).padStart(2, '0')}`;
+}
+
+/**
+ * Agregação do calendário do Master: um bucket por dia + horário, com totais e a lista
+ * de igrejas (com comprovantes). Usada tanto na visão quanto na consulta ao vivo.
+ */
+export function aggregateCalendarEntries(entries) {
+  const aggregatedEntries = {};
+
+  entries.forEach(entry => {
+    // Chave de agregação: dia + timeSlot (agrupa todas as igrejas do mesmo horário)
+    const key = `${entry.day}-${entry.timeSlot}`;
+
+    if (!aggregatedEntries[key]) {
+      aggregatedEntries[key] = {
+        entryId: entry.entryId, // Mantém o primeiro entryId encontrado
+        month: entry.month,
+        year: entry.year,
+        day: entry.day,
+        timeSlot: entry.timeSlot,
+        totalValue: 0,
+        totalDinheiro: 0,
+        totalPix: 0,
+        totalMaquineta: 0,
+        value: 0, // Campo usado pelo frontend
+        dinheiro: 0,
+        pix: 0,
+        maquineta: 0,
+        churchCount: 0,
+        churches: [],
+        timeWindowLocked: entry.timeWindowLocked,
+        masterUnlocked: entry.masterUnlocked,
+        createdAt: entry.createdAt,
+        updatedAt: entry.updatedAt
+      };
+    }
+
+    const bucket = aggregatedEntries[key];
+    const entryValue = entry.value || 0;
+    const entryDinheiro = entry.dinheiro || 0;
+    const entryPix = entry.pix || 0;
+    const entryMaquineta = entry.maquineta || 0;
+
+    bucket.totalValue += entryValue;
+    bucket.totalDinheiro += entryDinheiro;
+    bucket.totalPix += entryPix;
+    bucket.totalMaquineta += entryMaquineta;
+
+    // 'value' e os demais espelham os totais (usados pelo frontend)
+    bucket.value = bucket.totalValue;
+    bucket.dinheiro = bucket.totalDinheiro;
+    bucket.pix = bucket.totalPix;
+    bucket.maquineta = bucket.totalMaquineta;
+
+    bucket.churchCount++;
+
+    bucket.churches.push({
+      churchId: entry.churchId,
+      churchName: entry.church,
+      value: entryValue,
+      dinheiro: entryDinheiro,
+      pix: entryPix,
+      maquineta: entryMaquineta,
+      notes: entry.notes || '',
+      userName: entry.userName,
+      userId: entry.userId,
+      receipts: entry.receipts || [],
+      hasReceipts: (entry.receipts || []).length > 0
+    });
+  });
+
+  return Object.values(aggregatedEntries);
+}
+
+/**
+ * Buckets do mês em ordem de dia e horário
+ */
+export function viewToEntries(view) {
+  return Object.values(view?.slots || {}).sort((a, b) =>
+    (parseInt(a.day) - parseInt(b.day)) || String(a.timeSlot).localeCompare(String(b.timeSlot))
+  );
+}
+
+/**
+ * Recalcula um bucket (dia, horário) a partir de entries e grava só ele na visão do dia
+ */
+export async function refreshCalendarSlot(db, year, month, day, timeSlot) {
+  const y = parseInt(year);
+  const m = parseInt(month);
+  const d = parseInt(day);
+  const key = slotKey(d, timeSlot);
+  const viewId = viewIdFor(y, m, d);
+
+  const entries = await db.collection('entries')
+    .find({ year: y, month: m, day: d, timeSlot }, { projection: ENTRY_PROJECTION })
+    .sort({ _id: 1 })
+    .toArray();
+
+  const update = {
+    $setOnInsert: { viewId, year: y, month: m, day: d },
+    $set: { updatedAt: new Date().toISOString() }
+  };
+
+  if (entries.length > 0) {
+    const [bucket] = aggregateCalendarEntries(entries);
+    update.$set[`slots.${key}`] = bucket;
+    for (const entry of entries) update.$set[`entrySlots.${entry._id}`] = key;
+  } else {
+    update.$unset = { [`slots.${key}`]: '' };
+  }
+
+  await db.collection(VIEW_COLLECTION).updateOne({ viewId }, update, { upsert: true });
+  state.stats.slotRefreshes++;
+}
+
+/**
+ * Recalcula na hora os buckets dos lançamentos recém-gravados ou excluídos ({ year, month,
+ * day, timeSlot }), antes de responder e publicar entry.changed. Falha aqui não desfaz a
+ * gravação: fica registrada e o change stream refaz o bucket.
+ */
+export async function syncCalendarSlots(db, entries) {
+  if (!state.ready) return;
+  const slots = new Map(entries.map(e => [`${viewIdFor(e.year, e.month, e.day)}|${e.timeSlot}`, e]));
+  try {
+    for (const e of slots.values()) await refreshCalendarSlot(db, e.year, e.month, e.day, e.timeSlot);
+  } catch (error) {
+    console.error('[CALENDAR VIEW] Erro ao atualizar bucket após gravação:', error.message);
+  }
+}
+
+/**
+ * Reconstrói todas as visões a partir de entries (primeira carga ou histórico perdido)
+ */
+export async function rebuildCalendarViews(db) {
+  const byDay = new Map();
+  const cursor = db.collection('entries')
+    .find({}, { projection: ENTRY_PROJECTION })
+    .sort({ _id: 1 });
+
+  for await (const entry of cursor) {
+    const id = viewIdFor(entry.year, entry.month, entry.day);
+    if (!byDay.has(id)) {
+      byDay.set(id, { year: parseInt(entry.year), month: parseInt(entry.month), day: parseInt(entry.day), entries: [] });
+    }
+    byDay.get(id).entries.push(entry);
+  }
+
+  const now = new Date().toISOString();
+  const views = db.collection(VIEW_COLLECTION);
+  for (const [viewId, { year, month, day, entries }] of byDay) {
+    const slots = {};
+    for (const bucket of aggregateCalendarEntries(entries)) slots[slotKey(bucket.day, bucket.timeSlot)] = bucket;
+    const entrySlots = Object.fromEntries(entries.map(e => [String(e._id), slotKey(e.day, e.timeSlot)]));
+    await views.replaceOne({ viewId }, { viewId, year, month, day, slots, entrySlots, updatedAt: now }, { upsert: true });
+  }
+
+  // Também remove os documentos de um formato anterior (ex.: um por mês)
+  await views.deleteMany({ viewId: { $nin: [...byDay.keys()] } });
+  state.stats.rebuilds++;
+  return byDay.size;
+}
+
+/**
+ * Visão do mês (buckets de todos os dias), ou null se a sincronização não está ativa
+ * (quem chama agrega na hora)
+ */
+export async function getCalendarView(db, month, year) {
+  if (!state.ready) return null;
+  const days = await db.collection(VIEW_COLLECTION)
+    .find({ year: parseInt(year), month: parseInt(month) }, { projection: { slots: 1 } })
+    .toArray();
+  return { slots: Object.assign({}, ...days.map(view => view.slots)) };
+}
+
+export function isCalendarViewReady() {
+  return state.ready;
+}
+
+export function getCalendarViewStats() {
+  return { ready: state.ready, ...state.stats, pending: state.pendingSlots.size + state.pendingDeletes.size };
+}
+
+// ========== PROCESSAMENTO DO CHANGE STREAM ==========
+
+function queueChange(change) {
+  state.stats.events++;
+  state.stats.lastEventAt = new Date().toISOString();
+
+  const id = String(change.documentKey?._id);
+  const doc = change.fullDocument;
+  if (doc && change.operationType !== 'delete') {
+    state.pendingSlots.set(`${viewIdFor(doc.year, doc.month, doc.day)}|${slotKey(doc.day, doc.timeSlot)}`, doc);
+  }
+  // O bucket antigo (exclusão ou mudança de dia/horário) é achado pelo mapa entrySlots
+  state.pendingDeletes.add(id);
+}
+
+async function flushChanges(db, resumeToken) {
+  const slots = [...state.pendingSlots.values()];
+  const ids = [...state.pendingDeletes];
+  state.pendingSlots.clear();
+  state.pendingDeletes.clear();
+
+  const targets = new Map(slots.map(doc => [`${viewIdFor(doc.year, doc.month, doc.day)}|${slotKey(doc.day, doc.timeSlot)}`, doc]));
+
+  // Buckets onde esses lançamentos estavam antes
+  const views = db.collection(VIEW_COLLECTION);
+  if (ids.length > 0) {
+    const previous = await views
+      .find({ $or: ids.map(id => ({ [`entrySlots.${id}`]: { $exists: true } })) }, { projection: { year: 1, month: 1, day: 1, entrySlots: 1 } })
+      .toArray();
+    const stillThere = new Set(slots.map(doc => String(doc._id)));
+
+    for (const view of previous) {
+      const unset = {};
+      for (const id of ids) {
+        const key = view.entrySlots?.[id];
+        if (!key) continue;
+        const [day, ...rest] = key.split('-');
+        const targetKey = `${viewIdFor(view.year, view.month, view.day)}|${key}`;
+        if (!targets.has(targetKey)) targets.set(targetKey, { year: view.year, month: view.month, day, timeSlot: rest.join('-') });
+        if (!stillThere.has(id)) unset[`entrySlots.${id}`] = '';
+      }
+      if (Object.keys(unset).length > 0) await views.updateOne({ _id: view._id }, { $unset: unset });
+    }
+  }
+
+  for (const { year, month, day, timeSlot } of targets.values()) {
+    await refreshCalendarSlot(db, year, month, day, timeSlot);
+  }
+
+  if (resumeToken) {
+    await db.collection(STATE_COLLECTION).updateOne(
+      { stateId: STATE_ID },
+      { $set: { resumeToken, version: VIEW_VERSION, updatedAt: new Date().toISOString() } },
+      { upsert: true }
+    );
+  }
+}
+
+function scheduleFlush(db, resumeToken) {
+  state.lastResumeToken = resumeToken;
+  if (state.flushTimer) return;
+  state.flushTimer = setTimeout(async () => {
+    state.flushTimer = null;
+    while (state.flushing) await state.flushing;
+    state.flushing = flushChanges(db, state.lastResumeToken)
+      .catch(error => console.error('[CALENDAR VIEW] Erro ao atualizar visão:', error))
+      .finally(() => { state.flushing = null; });
+  }, FLUSH_DELAY_MS);
+}
+
+async function isReplicaSet(db) {
+  try {
+    const hello = await db.admin().command({ hello: 1 });
+    return hello.setName ? hello : null;
+  } catch {
+    return null;
+  }
+}
+
+async function openStream(db) {
+  const saved = await db.collection(STATE_COLLECTION).findOne({ stateId: STATE_ID });
+  const hello = await isReplicaSet(db);
+
+  let options = { fullDocument: 'updateLookup' };
+  if (saved?.resumeToken && saved.version === VIEW_VERSION) {
+    options.resumeAfter = saved.resumeToken;
+  } else {
+    // Sem ponto de retomada (ou visão em formato antigo): começa agora e reconstrói tudo
+    // (eventos repetidos são inofensivos)
+    options.startAtOperationTime = hello.operationTime;
+    await rebuildCalendarViews(db);
+  }
+
+  return db.collection('entries').watch(
+    [{ $match: { operationType: { $in: ['insert', 'update', 'replace', 'delete'] } } }],
+    options
+  );
+}
+
+async function consume(db) {
+  while (true) {
+    try {
+      state.stream = await openStream(db);
+      state.ready = true;
+      console.log('[CALENDAR VIEW] Sincronizando calendar_views pelo change stream');
+
+      for await (const change of state.stream) {
+        queueChange(change);
+        scheduleFlush(db, change._id);
+      }
+    } catch (error) {
+      state.ready = false;
+      await state.stream?.close().catch(() => {});
+      state.stream = null;
+
+      if (error.code === HISTORY_LOST) {
+        console.warn('[CALENDAR VIEW] Ponto de retomada expirou - reconstruindo visões');
+        await db.collection(STATE_COLLECTION).deleteOne({ stateId: STATE_ID }).catch(() => {});
+      } else {
+        console.error('[CALENDAR VIEW] Change stream interrompido, tentando novamente:', error.message);
+      }
+      await new Promise(resolve => setTimeout(resolve, RETRY_DELAY_MS).unref?.());
+    }
+  }
+}
+
+/**
+ * Inicia a sincronização (uma vez por processo). Em standalone não faz nada.
+ */
+export async function startCalendarViewSync(db) {
+  if (state.started || process.env.CALENDAR_VIEW === 'off') return;
+  state.started = true;
+
+  if (!(await isReplicaSet(db))) {
+    console.log('[CALENDAR VIEW] MongoDB sem replica set - calendário do Master agregado na consulta');
+    return;
+  }
+
+  consume(db).catch(error => console.error('[CALENDAR VIEW] Erro fatal na sincronização:', error));
+}
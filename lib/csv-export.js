@@ -0,0 +1,133 @@
+/**
+ * EXPORTAÇÃO CSV EM STREAMING
+ * Gera as linhas conforme o cursor do Mongo entrega os documentos, sem montar o arquivo
+ * inteiro em memória. Suporta intervalos de meses, filtro por igrejas e costs_entries.
+ */
+
+const encoder = new TextEncoder();
+
+function pad(n) {
+  return String(n).padStart(2, '0');
+}
+
+/**
+ * Escapa um campo CSV: textos sempre entre aspas, com aspas internas duplicadas
+ */
+export function csvEscape(value) {
+  if (value === null || value === undefined) return '';
+  if (typeof value === 'number' || typeof value === 'boolean') return String(value);
+  return `"${String(value).replace(/"/g, '""')}"`;
+}
+
+export function csvLine(values) {
+  return values.map(csvEscape).join(',') + '\n';
+}
+
+export const ENTRY_COLUMNS = [
+  ['Ano', e => e.year],
+  ['Mês', e => e.month],
+  ['Dia', e => e.day],
+  ['Horário', e => e.timeSlot],
+  ['Valor', e => e.value],
+  ['Dinheiro', e => e.dinheiro],
+  ['Pix', e => e.pix],
+  ['Maquineta', e => e.maquineta],
+  ['Igreja', e => e.church || ''],
+  ['Região', e => e.region || ''],
+  ['Estado', e => e.state || ''],
+  ['Observações', e => e.notes || ''],
+  ['Data de Criação', e => e.createdAt]
+];
+
+export const COST_COLUMNS = [
+  ['Igreja', c => c.churchName || ''],
+  ['Tipo de Custo', c => c.costTypeName || ''],
+  ['Vencimento', c => c.dueDate || ''],
+  ['Valor', c => c.value],
+  ['Status', c => c.status || ''],
+  ['Data de Pagamento', c => c.paymentDate || ''],
+  ['Valor Pago', c => c.valuePaid],
+  ['Diferença', c => c.difference],
+  ['Descrição', c => c.description || ''],
+  ['Solicitado por', c => c.userName || ''],
+  ['Criado em', c => c.createdAt]
+];
+
+/**
+ * Normaliza o período pedido: { month, year } (um mês) ou { startMonth, startYear, endMonth, endYear }
+ */
+export function resolveExportRange({ month, year, startMonth, startYear, endMonth, endYear }) {
+  const start = { month: parseInt(startMonth ?? month), year: parseInt(startYear ?? year) };
+  const end = { month: parseInt(endMonth ?? startMonth ?? month), year: parseInt(endYear ?? startYear ?? year) };
+
+  if ([start.month, start.year, end.month, end.year].some(Number.isNaN)) {
+    return null;
+  }
+  if (end.year * 12 + end.month < start.year * 12 + start.month) {
+    return null;
+  }
+  return { start, end };
+}
+
+/**
+ * Filtro de entries por intervalo de meses (usa os índices year+month)
+ */
+export function buildEntryRangeFilter({ start, end }) {
+  if (start.year === end.year) {
+    return { year: start.year, month: { $gte: start.month, $lte: end.month } };
+  }
+  return {
+    $or: [
+      { year: start.year, month: { $gte: start.month } },
+      { year: { $gt: start.year, $lt: end.year } },
+      { year: end.year, month: { $lte: end.month } }
+    ]
+  };
+}
+
+/**
+ * Filtro de costs_entries por vencimento dentro do intervalo (dueDate 'YYYY-MM-DD')
+ */
+export function buildCostRangeFilter({ start, end }) {
+  const nextMonth = end.month === 12 ? { month: 1, year: end.year + 1 } : { month: end.month + 1, year: end.year };
+  return {
+    dueDate: {
+      $gte: `${start.year}-${pad(start.month)}-01`,
+      $lt: `${nextMonth.year}-${pad(nextMonth.month)}-01`
+    }
+  };
+}
+
+/**
+ * ReadableStream que consome o cursor sob demanda (pull) e emite o CSV linha a linha
+ */
+export function streamCsv(cursor, columns) {
+  let headerSent = false;
+
+  return new ReadableStream({
+    async pull(controller) {
+      try {
+        if (!headerSent) {
+          headerSent = true;
+          controller.enqueue(encoder.encode(csvLine(columns.map(([header]) => header))));
+          return;
+        }
+
+        const doc = await cursor.next();
+        if (!doc) {
+          await cursor.close();
+          controller.close();
+          return;
+        }
+        controller.enqueue(encoder.encode(csvLine(columns.map(([, getValue]) => getValue(doc)))));
+      } catch (error) {
+        console.error('[EXPORT] Erro ao gerar CSV:', error);
+        await cursor.close().catch(() => {});
+        controller.error(error);
+      }
+    },
+    async cancel() {
+      await cursor.close();
+    }
+  });
+}
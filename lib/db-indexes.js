@@ -0,0 +1,335 @@
+/**
+ * ÍNDICES DO BANCO
+ * Índices para cada formato de filtro usado em route.js, criados na primeira conexão,
+ * e a verificação de planos (explain) usada por tests/query-plans.test.js.
+ *
+ * time_overrides/edit_overrides guardam expiresAt como string ISO; o TTL usa o campo
+ * expiresAtDate (Date), preenchido na criação e migrado aqui para registros antigos.
+ */
+
+import { buildMonthScopeFilter, buildScopeFilter } from './access-scope.js';
+import { buildCostRangeFilter, buildEntryRangeFilter, resolveExportRange } from './csv-export.js';
+import { buildPeriodsFilter } from './entry-rollups.js';
+import { buildDateRangeFilter, buildKeysetFilter, encodeCursor } from './keyset-pagination.js';
+
+export const INDEX_SPECS = {
+  users: [
+    { key: { userId: 1 } },
+    { key: { email: 1 } },
+    { key: { churchId: 1 } },
+    { key: { role: 1, name: 1 } },
+    { key: { photoUrl: 1 }, sparse: true },
+    { key: { isOnline: 1, lastActivity: 1 }, partialFilterExpression: { isOnline: true } }
+  ],
+  churches: [
+    { key: { churchId: 1 } },
+    { key: { name: 1 } },
+    { key: { createdAt: -1 } },
+    { key: { photoUrl: 1 }, sparse: true }
+  ],
+  entries: [
+    { key: { entryId: 1, userId: 1 } },
+    { key: { year: 1, month: 1, day: 1, timeSlot: 1 } },
+    { key: { year: 1, month: 1, state: 1, region: 1 } },
+    { key: { year: 1, month: 1, church: 1 } },
+    { key: { year: 1, month: 1, churchId: 1 } },
+    { key: { year: 1, month: 1, userId: 1 } },
+    { key: { 'receipts.filepath': 1 } }
+  ],
+  entries_rollup: [
+    { key: { rollupId: 1 }, unique: true },
+    { key: { year: 1, month: 1, state: 1, region: 1 } },
+    { key: { year: 1, month: 1, church: 1 } },
+    { key: { year: 1, month: 1, userId: 1 } },
+    { key: { state: 1, region: 1 } },
+    { key: { church: 1 } },
+    { key: { userId: 1 } }
+  ],
+  costs_entries: [
+    { key: { costId: 1 } },
+    { key: { dueDate: 1 } },
+    { key: { churchId: 1, dueDate: 1 } },
+    { key: { churchId: 1, status: 1, createdAt: -1, costId: -1 } },
+    { key: { churchId: 1, createdAt: -1, costId: -1 } },
+    { key: { status: 1, createdAt: -1, costId: -1 } },
+    { key: { createdAt: -1, costId: -1 } },
+    { key: { billFile: 1 }, sparse: true },
+    { key: { proofFile: 1 }, sparse: true }
+  ],
+  audit_logs: [
+    { key: { logId: 1 }, unique: true },
+    { key: { timestamp: -1, logId: -1 } },
+    { key: { action: 1, timestamp: -1, logId: -1 } },
+    { key: { userId: 1, timestamp: -1, logId: -1 } }
+  ],
+  unlock_requests: [
+    { key: { requestId: 1 } },
+    { key: { requesterId: 1, status: 1 } },
+    { key: { requesterId: 1, createdAt: -1, requestId: -1 } },
+    { key: { status: 1, createdAt: -1, requestId: -1 } },
+    { key: { createdAt: -1, requestId: -1 } }
+  ],
+  time_overrides: [
+    { key: { churchId: 1, year: 1, month: 1, day: 1, timeSlot: 1, expiresAt: 1 } },
+    { key: { userId: 1, year: 1, month: 1, day: 1, timeSlot: 1, expiresAt: 1 } },
+    { key: { userId: 1, expiresAt: 1 } },
+    { key: { expiresAtDate: 1 }, expireAfterSeconds: 0 }
+  ],
+  edit_overrides: [
+    { key: { entryId: 1, expiresAt: 1 } },
+    { key: { expiresAtDate: 1 }, expireAfterSeconds: 0 }
+  ],
+  month_status: [
+    { key: { year: 1, month: 1 } }
+  ],
+  month_observations: [
+    { key: { obsId: 1 } },
+    { key: { year: 1, month: 1 } }
+  ],
+  day_observations: [
+    { key: { obsId: 1 } },
+    { key: { year: 1, month: 1 } }
+  ],
+  roles: [
+    { key: { roleId: 1 } },
+    { key: { name: 1 } },
+    { key: { createdAt: -1 } }
+  ],
+  custos: [
+    { key: { custoId: 1 } },
+    { key: { name: 1 } }
+  ],
+  privacy_config: [
+    { key: { roleId: 1 } },
+    { key: { roleName: 1 } }
+  ],
+  calendar_views: [
+    { key: { viewId: 1 }, unique: true },
+    { key: { year: 1, month: 1 } }
+  ],
+  calendar_view_state: [
+    { key: { stateId: 1 }, unique: true }
+  ]
+};
+
+const SAMPLE_NOW = '2025-01-05T10:00:00.000Z';
+
+// Um usuário por escopo de lib/access-scope.js
+const SCOPE_SAMPLES = {
+  master: { role: 'master', userId: 'm' },
+  state: { role: 'leader', scope: 'state', state: 'SP', userId: 'l' },
+  region: { role: 'leader', scope: 'region', state: 'SP', region: 'Sul', userId: 'l' },
+  church: { role: 'pastor', scope: 'church', church: 'Igreja', userId: 'p' },
+  user: { role: 'pastor', userId: 'u' }
+};
+
+const EXPORT_RANGE = resolveExportRange({ startMonth: 1, startYear: 2025, endMonth: 3, endYear: 2025 });
+const CROSS_YEAR_RANGE = resolveExportRange({ startMonth: 11, startYear: 2024, endMonth: 2, endYear: 2025 });
+
+function scopeShapes(endpoint, collection, buildFilter, scopes = Object.keys(SCOPE_SAMPLES)) {
+  return scopes.map(scope => ({ endpoint: `${endpoint} (${scope})`, collection, filter: buildFilter(SCOPE_SAMPLES[scope]) }));
+}
+
+// Filtro da página seguinte (findPage), com o cursor devolvido pela primeira
+function afterCursor(filter, sortField, idField) {
+  const cursor = encodeCursor({ [sortField]: SAMPLE_NOW, [idField]: 'x' }, sortField, idField);
+  return buildKeysetFilter(filter, cursor, sortField, idField);
+}
+
+/**
+ * Um formato representativo de consulta por endpoint (filtro + ordenação)
+ * Filtros compostos (escopo, intervalo de meses, cursor) vêm dos mesmos helpers dos handlers.
+ * Endpoints que varrem a coleção inteira de propósito (clear-all, cleanup-orphans,
+ * custos/list, privacy/list-all, users/list, stats/overview do Master) não entram na verificação.
+ */
+export const QUERY_SHAPES = [
+  { endpoint: 'auth/login', collection: 'users', filter: { email: 'x@iudp.com' } },
+  { endpoint: '(autenticação)', collection: 'users', filter: { userId: 'u' } },
+  { endpoint: 'churches/available-pastors', collection: 'users', filter: { role: { $in: ['pastor', 'leader', 'bispo', 'master'] } }, sort: { name: 1 } },
+  { endpoint: 'churches/delete', collection: 'users', filter: { churchId: 'c' } },
+  { endpoint: 'public/churches', collection: 'churches', filter: {}, sort: { name: 1 } },
+  { endpoint: 'churches/list', collection: 'churches', filter: {}, sort: { createdAt: -1 } },
+  { endpoint: 'churches/update', collection: 'churches', filter: { churchId: 'c' } },
+  { endpoint: 'entries/save', collection: 'entries', filter: { entryId: '2025-01-05-08:00' } },
+  { endpoint: 'entries/delete-specific', collection: 'entries', filter: { entryId: '2025-01-05-08:00', userId: 'u' } },
+  ...scopeShapes('entries/month', 'entries', userData => buildMonthScopeFilter(userData, 1, 2025)),
+  {
+    endpoint: 'entries/month (churchFilter)',
+    collection: 'entries',
+    filter: { ...buildMonthScopeFilter(SCOPE_SAMPLES.master, 1, 2025), churchId: 'c' }
+  },
+  { endpoint: 'entries/month (calendar view)', collection: 'calendar_views', filter: { year: 2025, month: 1 } },
+  { endpoint: 'calendar view (slot refresh)', collection: 'entries', filter: { year: 2025, month: 1, day: 5, timeSlot: '08:00' }, sort: { _id: 1 } },
+  { endpoint: 'export/csv', collection: 'entries', filter: buildEntryRangeFilter(EXPORT_RANGE), sort: { year: 1, month: 1, day: 1, timeSlot: 1 } },
+  { endpoint: 'export/csv (virada do ano)', collection: 'entries', filter: buildEntryRangeFilter(CROSS_YEAR_RANGE), sort: { year: 1, month: 1, day: 1, timeSlot: 1 } },
+  {
+    endpoint: 'export/csv (igrejas)',
+    collection: 'entries',
+    filter: { ...buildEntryRangeFilter(EXPORT_RANGE), churchId: { $in: ['c'] } },
+    sort: { year: 1, month: 1, day: 1, timeSlot: 1 }
+  },
+  { endpoint: 'export/csv (custos)', collection: 'costs_entries', filter: buildCostRangeFilter(EXPORT_RANGE), sort: { dueDate: 1 } },
+  {
+    endpoint: 'export/csv (custos, igrejas)',
+    collection: 'costs_entries',
+    filter: { ...buildCostRangeFilter(EXPORT_RANGE), churchId: { $in: ['c'] } },
+    sort: { dueDate: 1 }
+  },
+  ...scopeShapes('dashboard/data', 'entries_rollup', userData => buildMonthScopeFilter(userData, 1, 2025)),
+  ...scopeShapes('compare/months', 'entries_rollup', userData => buildPeriodsFilter(buildScopeFilter(userData), [
+    { month: 1, year: 2025 },
+    { month: 2, year: 2025 }
+  ])),
+  ...scopeShapes('stats/overview', 'entries_rollup', buildScopeFilter, ['state', 'region', 'church', 'user']),
+  ...scopeShapes('stats/overview', 'unlock_requests', userData => ({ ...buildScopeFilter(userData), status: 'pending' })),
+  { endpoint: 'costs-entries/list (master)', collection: 'costs_entries', filter: {}, sort: { createdAt: -1, costId: -1 } },
+  { endpoint: 'costs-entries/list (pastor)', collection: 'costs_entries', filter: { churchId: 'c', status: 'PENDING' }, sort: { createdAt: -1, costId: -1 } },
+  { endpoint: 'costs-entries/list (status)', collection: 'costs_entries', filter: { status: 'PAID' }, sort: { createdAt: -1, costId: -1 } },
+  {
+    endpoint: 'costs-entries/list (vencimento)',
+    collection: 'costs_entries',
+    filter: { churchId: 'c', ...buildCostRangeFilter(resolveExportRange({ month: 1, year: 2025 })) },
+    sort: { createdAt: -1, costId: -1 }
+  },
+  {
+    endpoint: 'costs-entries/list (criação)',
+    collection: 'costs_entries',
+    filter: { createdAt: buildDateRangeFilter('2025-01-01', '2025-01-31') },
+    sort: { createdAt: -1, costId: -1 }
+  },
+  {
+    endpoint: 'costs-entries/list (cursor)',
+    collection: 'costs_entries',
+    filter: afterCursor({ churchId: 'c' }, 'createdAt', 'costId'),
+    sort: { createdAt: -1, costId: -1 }
+  },
+  {
+    endpoint: 'costs-entries/list (master, cursor)',
+    collection: 'costs_entries',
+    filter: afterCursor({}, 'createdAt', 'costId'),
+    sort: { createdAt: -1, costId: -1 }
+  },
+  { endpoint: 'costs-entries/update', collection: 'costs_entries', filter: { costId: 'c' } },
+  { endpoint: 'entries/delete-receipt (refs)', collection: 'entries', filter: { 'receipts.filepath': 'f.pdf' } },
+  { endpoint: 'costs-entries/delete (refs)', collection: 'costs_entries', filter: { billFile: '/api/uploads/costs/f.pdf' } },
+  { endpoint: 'users/upload-photo (refs)', collection: 'users', filter: { photoUrl: '/api/uploads/users/f.png' } },
+  { endpoint: 'presença (online expirados)', collection: 'users', filter: { isOnline: true, lastActivity: { $lt: '2025-01-05T10:00:00.000Z' }, userId: { $nin: ['u'] } } },
+  { endpoint: 'audit/logs', collection: 'audit_logs', filter: {}, sort: { timestamp: -1, logId: -1 } },
+  {
+    endpoint: 'audit/logs (action)',
+    collection: 'audit_logs',
+    filter: { action: 'export_csv', timestamp: buildDateRangeFilter('2025-01-01', null) },
+    sort: { timestamp: -1, logId: -1 }
+  },
+  { endpoint: 'audit/logs (user)', collection: 'audit_logs', filter: { userId: 'u' }, sort: { timestamp: -1, logId: -1 } },
+  {
+    endpoint: 'audit/logs (cursor)',
+    collection: 'audit_logs',
+    filter: afterCursor({ userId: 'u' }, 'timestamp', 'logId'),
+    sort: { timestamp: -1, logId: -1 }
+  },
+  { endpoint: 'unlock/requests (POST)', collection: 'unlock_requests', filter: {}, sort: { createdAt: -1, requestId: -1 } },
+  { endpoint: 'unlock/requests (GET)', collection: 'unlock_requests', filter: { status: 'pending' }, sort: { createdAt: -1, requestId: -1 } },
+  {
+    endpoint: 'unlock/requests (cursor)',
+    collection: 'unlock_requests',
+    filter: afterCursor({ status: 'pending' }, 'createdAt', 'requestId'),
+    sort: { createdAt: -1, requestId: -1 }
+  },
+  { endpoint: 'unlock/my-status', collection: 'unlock_requests', filter: { requesterId: 'u', status: 'pending' } },
+  { endpoint: 'unlock/approve', collection: 'unlock_requests', filter: { requestId: 'r' } },
+  {
+    endpoint: 'entries/save (override)',
+    collection: 'time_overrides',
+    filter: {
+      $or: [
+        { churchId: 'c', month: 1, year: 2025, day: 5, timeSlot: '08:00' },
+        { userId: 'u', month: 1, year: 2025, day: 5, timeSlot: '08:00' }
+      ],
+      expiresAt: { $gt: '2025-01-05T10:00:00.000Z' }
+    }
+  },
+  { endpoint: 'entries/save-batch', collection: 'entries', filter: { entryId: { $in: ['2025-01-05-08:00', '2025-01-05-19:30'] } } },
+  {
+    endpoint: 'entries/save-batch (overrides)',
+    collection: 'time_overrides',
+    filter: { $or: [{ churchId: 'c' }, { userId: 'u' }], expiresAt: { $gt: '2025-01-05T10:00:00.000Z' } }
+  },
+  { endpoint: 'unlock/my-status (overrides)', collection: 'time_overrides', filter: { userId: 'u', expiresAt: { $gt: '2025-01-05T10:00:00.000Z' } } },
+  { endpoint: 'entries/save (edit override)', collection: 'edit_overrides', filter: { entryId: 'e', expiresAt: { $gt: '2025-01-05T10:00:00.000Z' } } },
+  { endpoint: 'month/close', collection: 'month_status', filter: { month: 1, year: 2025 } },
+  { endpoint: 'observations/month/get', collection: 'month_observations', filter: { obsId: '2025-01' } },
+  { endpoint: 'entries/month (observations)', collection: 'day_observations', filter: { month: 1, year: 2025 } },
+  { endpoint: 'roles/list', collection: 'roles', filter: {}, sort: { createdAt: -1 } },
+  { endpoint: 'public/roles', collection: 'roles', filter: {}, sort: { name: 1 } },
+  { endpoint: 'roles/delete', collection: 'roles', filter: { roleId: 'r' } },
+  { endpoint: 'custos/update', collection: 'custos', filter: { custoId: 'c' } },
+  { endpoint: 'privacy/get', collection: 'privacy_config', filter: { roleId: 'r' } },
+  { endpoint: 'privacy/list', collection: 'privacy_config', filter: {}, sort: { roleName: 1 } }
+];
+
+/**
+ * Cria os índices (idempotente) e migra expiresAtDate dos overrides antigos.
+ * Um índice por comando: um que falhe (conflito de opções, dados duplicados) não impede os
+ * demais da coleção. Devolve as falhas ({ collection, key, error })
+ */
+export async function ensureIndexes(db) {
+  const failures = [];
+  for (const [collection, specs] of Object.entries(INDEX_SPECS)) {
+    for (const spec of specs) {
+      try {
+        await db.collection(collection).createIndexes([spec]);
+      } catch (error) {
+        failures.push({ collection, key: spec.key, error: error.message });
+        console.error(`[INDEXES] Erro ao criar índice ${JSON.stringify(spec.key)} de ${collection}:`, error.message);
+      }
+    }
+  }
+
+  for (const collection of ['time_overrides', 'edit_overrides']) {
+    try {
+      await db.collection(collection).updateMany(
+        { expiresAtDate: { $exists: false }, expiresAt: { $type: 'string' } },
+        [{ $set: { expiresAtDate: { $toDate: '$expiresAt' } } }]
+      );
+    } catch (error) {
+      console.error(`[INDEXES] Erro ao migrar expiresAtDate de ${collection}:`, error.message);
+    }
+  }
+
+  return failures;
+}
+
+/**
+ * Estágios do plano vencedor (percorre inputStage/inputStages)
+ */
+export function planStages(plan) {
+  if (!plan) return [];
+  const stages = [plan.stage];
+  if (plan.inputStage) stages.push(...planStages(plan.inputStage));
+  if (plan.inputStages) plan.inputStages.forEach(s => stages.push(...planStages(s)));
+  if (plan.queryPlan) stages.push(...planStages(plan.queryPlan));
+  return stages;
+}
+
+/**
+ * Executa explain() em cada QUERY_SHAPES e devolve os que caem em COLLSCAN
+ */
+export async function verifyQueryPlans(db, shapes = QUERY_SHAPES) {
+  const results = [];
+
+  for (const shape of shapes) {
+    let cursor = db.collection(shape.collection).find(shape.filter);
+    if (shape.sort) cursor = cursor.sort(shape.sort);
+
+    const explain = await cursor.explain('queryPlanner');
+    const stages = planStages(explain.queryPlanner?.winningPlan);
+    results.push({
+      ...shape,
+      stages,
+      collscan: stages.includes('COLLSCAN')
+    });
+  }
+
+  return results;
+}
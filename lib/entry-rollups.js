@@ -0,0 +1,217 @@
+/**
+ * ROLLUP DE OFERTAS
+ * Totais pré-agregados por (ano, mês, dia, horário, igreja, usuário) na coleção entries_rollup.
+ *
+ * Mantido incrementalmente por entries/save, entries/delete-specific, entries/clear-all e
+ * entries/cleanup-orphans; lido por dashboard/data, stats/overview e compare/months no lugar
+ * de carregar todos os lançamentos do mês. Cada bucket guarda state/region/church/churchId/userId,
+ * então os mesmos filtros de escopo usados em entries funcionam direto no rollup.
+ */
+
+export const ROLLUP_COLLECTION = 'entries_rollup';
+
+const AMOUNT_FIELDS = ['value', 'dinheiro', 'pix', 'maquineta'];
+
+function pad(n) {
+  return String(n).padStart(2, '0');
+}
+
+function roundMoney(n) {
+  return Math.round((n || 0) * 100) / 100;
+}
+
+/**
+ * Dimensões do bucket de um lançamento (month/year/day sempre numéricos)
+ */
+export function rollupDimensions(entry) {
+  const year = parseInt(entry.year);
+  const month = parseInt(entry.month);
+  const day = parseInt(entry.day);
+  const churchKey = entry.churchId || entry.church || '';
+
+  return {
+    rollupId: `${year}-${pad(month)}-${pad(day)}-${entry.timeSlot}-${churchKey}-${entry.userId || ''}`,
+    year,
+    month,
+    day,
+    timeSlot: entry.timeSlot,
+    church: entry.church || '',
+    churchId: entry.churchId || null,
+    region: entry.region || '',
+    state: entry.state || '',
+    userId: entry.userId || null
+  };
+}
+
+/**
+ * Operações de bulkWrite que retiram `previous` e somam `next` aos seus buckets
+ */
+export function buildEntryRollupOps(previous, next) {
+  const ops = [];
+
+  for (const [entry, sign] of [[previous, -1], [next, 1]]) {
+    if (!entry) continue;
+
+    const { rollupId, ...dimensions } = rollupDimensions(entry);
+    const inc = { entryCount: sign };
+    for (const field of AMOUNT_FIELDS) {
+      inc[field] = sign * (parseFloat(entry[field]) || 0);
+    }
+
+    ops.push({
+      updateOne: {
+        filter: { rollupId },
+        update: sign > 0
+          ? { $inc: inc, $set: dimensions }
+          : { $inc: inc, $setOnInsert: dimensions },
+        upsert: true
+      }
+    });
+  }
+
+  return ops;
+}
+
+/**
+ * Aplica a troca previous → next no rollup (previous/next podem ser null em criação/exclusão)
+ */
+export async function applyEntryRollupDelta(db, previous, next) {
+  await applyEntryRollupDeltas(db, [[previous, next]]);
+}
+
+/**
+ * Várias trocas [previous, next] num único bulkWrite (entries/save-batch)
+ */
+export async function applyEntryRollupDeltas(db, changes) {
+  const ops = changes.flatMap(([previous, next]) => buildEntryRollupOps(previous, next));
+  if (ops.length === 0) return;
+
+  const rollups = db.collection(ROLLUP_COLLECTION);
+  await rollups.bulkWrite(ops, { ordered: true });
+
+  // Remover buckets antigos que ficaram vazios
+  const previousIds = changes.filter(([previous]) => previous).map(([previous]) => rollupDimensions(previous).rollupId);
+  if (previousIds.length > 0) {
+    await rollups.deleteMany({ rollupId: { $in: previousIds }, entryCount: { $lte: 0 } });
+  }
+}
+
+/**
+ * Recalcula todo o rollup a partir de entries (backfill e operações em massa)
+ */
+export async function rebuildEntryRollups(db) {
+  const buckets = new Map();
+  const cursor = db.collection('entries').find({}, {
+    projection: { _id: 0, year: 1, month: 1, day: 1, timeSlot: 1, church: 1, churchId: 1, region: 1, state: 1, userId: 1, value: 1, dinheiro: 1, pix: 1, maquineta: 1 }
+  });
+
+  for await (const entry of cursor) {
+    const dimensions = rollupDimensions(entry);
+    let bucket = buckets.get(dimensions.rollupId);
+    if (!bucket) {
+      bucket = { ...dimensions, value: 0, dinheiro: 0, pix: 0, maquineta: 0, entryCount: 0 };
+      buckets.set(dimensions.rollupId, bucket);
+    }
+    for (const field of AMOUNT_FIELDS) {
+      bucket[field] += parseFloat(entry[field]) || 0;
+    }
+    bucket.entryCount++;
+  }
+
+  const rollups = db.collection(ROLLUP_COLLECTION);
+  await rollups.deleteMany({});
+  if (buckets.size > 0) {
+    await rollups.insertMany(Array.from(buckets.values()), { ordered: false });
+  }
+
+  return buckets.size;
+}
+
+/**
+ * Faz o backfill na primeira conexão se o rollup ainda não existir
+ */
+export async function ensureEntryRollups(db) {
+  const rollupCount = await db.collection(ROLLUP_COLLECTION).estimatedDocumentCount();
+  if (rollupCount > 0) return;
+
+  const entryCount = await db.collection('entries').estimatedDocumentCount();
+  if (entryCount > 0) {
+    await rebuildEntryRollups(db);
+  }
+}
+
+/**
+ * Totais do mês agrupados por dia e por horário (dashboard/data) em uma única agregação
+ */
+export async function getMonthRollupSummary(db, filter) {
+  const [result] = await db.collection(ROLLUP_COLLECTION).aggregate([
+    { $match: filter },
+    {
+      $facet: {
+        byDay: [
+          { $group: { _id: '$day', total: { $sum: '$value' } } },
+          { $sort: { _id: 1 } }
+        ],
+        byTimeSlot: [
+          { $group: { _id: '$timeSlot', total: { $sum: '$value' } } },
+          { $sort: { _id: 1 } }
+        ],
+        totals: [
+          { $group: { _id: null, total: { $sum: '$value' }, entryCount: { $sum: '$entryCount' } } }
+        ]
+      }
+    }
+  ]).toArray();
+
+  const totals = result?.totals?.[0] || { total: 0, entryCount: 0 };
+
+  return {
+    dailyData: (result?.byDay || []).map(d => ({ day: d._id, total: roundMoney(d.total) })),
+    timeSlotData: (result?.byTimeSlot || []).map(s => ({ timeSlot: s._id, total: roundMoney(s.total) })),
+    total: roundMoney(totals.total),
+    entryCount: totals.entryCount
+  };
+}
+
+/**
+ * Filtro do rollup para os períodos { month, year } dentro do escopo `filter`
+ */
+export function buildPeriodsFilter(filter, periods) {
+  return {
+    ...filter,
+    $or: periods.map(p => ({ month: parseInt(p.month), year: parseInt(p.year) }))
+  };
+}
+
+/**
+ * Total e quantidade de lançamentos por período { month, year } (compare/months, stats/overview)
+ */
+export async function getPeriodRollupTotals(db, filter, periods) {
+  const rows = await db.collection(ROLLUP_COLLECTION).aggregate([
+    { $match: buildPeriodsFilter(filter, periods) },
+    {
+      $group: {
+        _id: { month: '$month', year: '$year' },
+        total: { $sum: '$value' },
+        entryCount: { $sum: '$entryCount' }
+      }
+    }
+  ]).toArray();
+
+  return periods.map(p => {
+    const row = rows.find(r => r._id.month === parseInt(p.month) && r._id.year === parseInt(p.year));
+    return { total: roundMoney(row?.total), entryCount: row?.entryCount || 0 };
+  });
+}
+
+/**
+ * Quantidade total de lançamentos visíveis para o filtro, sem varrer entries
+ */
+export async function countRollupEntries(db, filter) {
+  const [row] = await db.collection(ROLLUP_COLLECTION).aggregate([
+    { $match: filter },
+    { $group: { _id: null, entryCount: { $sum: '$entryCount' } } }
+  ]).toArray();
+
+  return row?.entryCount || 0;
+}
@@ -0,0 +1,149 @@
+/**
+ * CANAL DE EVENTOS (SSE)
+ * Barramento em memória do processo: as rotas publicam eventos (liberações, custos, lançamentos)
+ * e cada conexão de events/stream recebe apenas os que são do seu escopo.
+ *
+ * Destino de um evento: { all, masters, userIds, churchIds }
+ * Os últimos eventos ficam num buffer para reenvio quando o EventSource reconecta (Last-Event-ID).
+ *
+ * Ids no formato '<época>-<sequência>': a época muda a cada início do processo, então um
+ * Last-Event-ID de antes de um restart (buffer vazio, sequência recomeçando em 1) nunca é
+ * confundido com um id atual e o cliente recebe `resync`.
+ */
+
+import { EventEmitter } from 'events';
+import { randomUUID } from 'crypto';
+
+export const HEARTBEAT_MS = 25000;
+export const REPLAY_BUFFER_SIZE = 500;
+
+const encoder = new TextEncoder();
+
+// Sobrevive ao hot reload do Next.js em desenvolvimento (mesmo padrão do agendador de travas)
+const bus = globalThis.__iudpEventBus || (globalThis.__iudpEventBus = {
+  emitter: new EventEmitter(),
+  epoch: randomUUID().slice(0, 8),
+  buffer: [],
+  nextId: 1
+});
+bus.emitter.setMaxListeners(0);
+
+/**
+ * O assinante { userId, role, churchId } deve receber este evento?
+ */
+export function isEventForSubscriber(event, subscriber) {
+  const target = event.target || {};
+  if (target.all) return true;
+  if (target.masters && subscriber.role === 'master') return true;
+  if (target.userIds?.includes(subscriber.userId)) return true;
+  if (subscriber.churchId && target.churchIds?.includes(subscriber.churchId)) return true;
+  return false;
+}
+
+/**
+ * Publica um evento: type ('cost.approved', 'unlock.requested', 'entry.changed'...), target e data
+ */
+export function publishEvent(type, target, data = {}) {
+  const seq = bus.nextId++;
+  const event = {
+    id: formatEventId(seq),
+    seq,
+    type,
+    target: {
+      ...target,
+      userIds: (target.userIds || []).filter(Boolean),
+      churchIds: (target.churchIds || []).filter(Boolean)
+    },
+    data
+  };
+
+  bus.buffer.push(event);
+  if (bus.buffer.length > REPLAY_BUFFER_SIZE) bus.buffer.shift();
+
+  bus.emitter.emit('event', event);
+  return event;
+}
+
+function formatEventId(seq) {
+  return `${bus.epoch}-${seq}`;
+}
+
+/**
+ * Eventos perdidos desde lastEventId; null se o buffer já não cobre o intervalo (cliente deve
+ * recarregar tudo): id de outra época (restart do processo), posterior ao último publicado ou
+ * mais antigo que o buffer
+ */
+export function eventsSince(lastEventId, subscriber) {
+  const text = String(lastEventId ?? '');
+  const separator = text.lastIndexOf('-');
+  const epoch = separator === -1 ? null : text.slice(0, separator);
+  const lastId = parseInt(text.slice(separator + 1));
+  if (Number.isNaN(lastId)) return [];
+  if (epoch !== bus.epoch || lastId >= bus.nextId) return null;
+  if (bus.buffer.length > 0 && bus.buffer[0].seq > lastId + 1) return null;
+  return bus.buffer.filter(e => e.seq > lastId && isEventForSubscriber(e, subscriber));
+}
+
+export function formatSseEvent(event) {
+  return `id: ${event.id}\nevent: ${event.type}\ndata: ${JSON.stringify(event.data)}\n\n`;
+}
+
+/**
+ * ReadableStream text/event-stream para um assinante; encerra ao cancelar ou no abort da requisição
+ */
+export function createEventStream(subscriber, { lastEventId, signal } = {}) {
+  let cleanup = () => {};
+
+  return new ReadableStream({
+    start(controller) {
+      const send = (text) => {
+        try {
+          controller.enqueue(encoder.encode(text));
+        } catch {
+          cleanup();
+        }
+      };
+
+      send(`retry: 5000\n\n`);
+
+      if (lastEventId !== undefined && lastEventId !== null) {
+        const missed = eventsSince(lastEventId, subscriber);
+        if (missed === null) {
+          send(`event: resync\ndata: {}\n\n`);
+        } else {
+          missed.forEach(e => send(formatSseEvent(e)));
+        }
+      }
+      // O id no ready garante Last-Event-ID na reconexão mesmo sem nenhum evento recebido
+      const readyId = formatEventId(bus.nextId - 1);
+      send(`id: ${readyId}\nevent: ready\ndata: ${JSON.stringify({ lastEventId: readyId })}\n\n`);
+
+      const listener = (event) => {
+        if (isEventForSubscriber(event, subscriber)) send(formatSseEvent(event));
+      };
+      const heartbeat = setInterval(() => send(`: ping\n\n`), HEARTBEAT_MS);
+
+      bus.emitter.on('event', listener);
+      cleanup = () => {
+        clearInterval(heartbeat);
+        bus.emitter.off('event', listener);
+      };
+
+      signal?.addEventListener('abort', () => {
+        cleanup();
+        try {
+          controller.close();
+        } catch {
+          // já encerrado
+        }
+      });
+    },
+    cancel() {
+      cleanup();
+    }
+  });
+}
+
+export function subscriberCount() {
+  return bus.emitter.listenerCount('event');
+}
@@ -0,0 +1,189 @@
+/**
+ * SERVIDOR DE ARQUIVOS ENVIADOS (comprovantes, contas, fotos)
+ * Lê do disco em streaming (createReadStream), atende Range (PDFs grandes no visualizador)
+ * e responde 304 quando o navegador já tem a versão atual (ETag / Last-Modified).
+ *
+ * Arquivos pequenos (fotos e miniaturas) ficam num LRU em memória limitado por bytes;
+ * a entrada só é usada se o ETag (tamanho + mtime) ainda bate com o arquivo em disco.
+ */
+
+import { createReadStream } from 'fs';
+import { readFile, stat } from 'fs/promises';
+import path from 'path';
+import { Readable } from 'stream';
+
+export const SMALL_FILE_MAX_BYTES = 256 * 1024;
+export const SMALL_FILE_CACHE_BYTES = 32 * 1024 * 1024;
+
+const CONTENT_TYPES = {
+  '.jpg': 'image/jpeg',
+  '.jpeg': 'image/jpeg',
+  '.png': 'image/png',
+  '.webp': 'image/webp',
+  '.gif': 'image/gif',
+  '.pdf': 'application/pdf'
+};
+
+const state = globalThis.__iudpFileCache || (globalThis.__iudpFileCache = {
+  entries: new Map(),
+  bytes: 0,
+  hits: 0,
+  misses: 0
+});
+
+export function contentTypeFor(filepath) {
+  return CONTENT_TYPES[path.extname(filepath).toLowerCase()] || 'application/octet-stream';
+}
+
+/**
+ * Caminho dentro de baseDir, ou null se o nome tentar sair da pasta (../)
+ */
+export function resolveInside(baseDir, relativePath) {
+  const base = path.resolve(baseDir);
+  const target = path.resolve(base, relativePath);
+  return target.startsWith(base + path.sep) ? target : null;
+}
+
+export function buildEtag(stats) {
+  return `W/"${stats.size.toString(16)}-${Math.floor(stats.mtimeMs).toString(16)}"`;
+}
+
+export function isNotModified(headers, etag, mtimeMs) {
+  const ifNoneMatch = headers.get('if-none-match');
+  if (ifNoneMatch) {
+    return ifNoneMatch.split(',').some(tag => {
+      const value = tag.trim();
+      return value === '*' || value.replace(/^W\//, '') === etag.replace(/^W\//, '');
+    });
+  }
+  const ifModifiedSince = headers.get('if-modified-since');
+  if (ifModifiedSince) {
+    const since = Date.parse(ifModifiedSince);
+    // Last-Modified tem resolução de segundos
+    return !Number.isNaN(since) && Math.floor(mtimeMs / 1000) * 1000 <= since;
+  }
+  return false;
+}
+
+/**
+ * Interpreta um cabeçalho Range de intervalo único.
+ * Devolve { start, end } (inclusivo), 'unsatisfiable' ou null (ignorar e servir tudo).
+ */
+export function parseRange(header, size) {
+  const match = /^bytes=(\d*)-(\d*)$/.exec((header || '').trim());
+  if (!match || (match[1] === '' && match[2] === '')) return null;
+
+  let start;
+  let end;
+  if (match[1] === '') {
+    // bytes=-N: últimos N bytes
+    const suffix = parseInt(match[2]);
+    if (suffix === 0) return 'unsatisfiable';
+    start = Math.max(0, size - suffix);
+    end = size - 1;
+  } else {
+    start = parseInt(match[1]);
+    end = match[2] === '' ? size - 1 : Math.min(parseInt(match[2]), size - 1);
+  }
+
+  if (start >= size || start > end) return 'unsatisfiable';
+  return { start, end };
+}
+
+function cacheLookup(filepath, etag) {
+  const entry = state.entries.get(filepath);
+  if (!entry || entry.etag !== etag) {
+    state.misses++;
+    return null;
+  }
+  state.entries.delete(filepath);
+  state.entries.set(filepath, entry);
+  state.hits++;
+  return entry.buffer;
+}
+
+function cacheStore(filepath, etag, buffer) {
+  const previous = state.entries.get(filepath);
+  if (previous) {
+    state.bytes -= previous.buffer.length;
+    state.entries.delete(filepath);
+  }
+  state.entries.set(filepath, { etag, buffer });
+  state.bytes += buffer.length;
+  while (state.bytes > SMALL_FILE_CACHE_BYTES && state.entries.size > 0) {
+    const [oldestKey, oldest] = state.entries.entries().next().value;
+    state.entries.delete(oldestKey);
+    state.bytes -= oldest.buffer.length;
+  }
+}
+
+/**
+ * Monta a resposta para o arquivo (200, 206, 304 ou 416); null se ele não existir.
+ * options: contentType, cacheControl, disposition
+ */
+export async function serveFile(request, filepath, options = {}) {
+  let stats;
+  try {
+    stats = await stat(filepath);
+  } catch {
+    return null;
+  }
+  if (!stats.isFile()) return null;
+
+  const etag = buildEtag(stats);
+  const headers = {
+    'Content-Type': options.contentType || contentTypeFor(filepath),
+    'Accept-Ranges': 'bytes',
+    'ETag': etag,
+    'Last-Modified': stats.mtime.toUTCString()
+  };
+  if (options.cacheControl) headers['Cache-Control'] = options.cacheControl;
+  if (options.disposition) headers['Content-Disposition'] = options.disposition;
+
+  if (isNotModified(request.headers, etag, stats.mtimeMs)) {
+    delete headers['Content-Type'];
+    return new Response(null, { status: 304, headers });
+  }
+
+  // If-Range com outro ETag: o arquivo mudou, manda inteiro
+  const ifRange = request.headers.get('if-range');
+  const range = ifRange && ifRange !== etag ? null : parseRange(request.headers.get('range'), stats.size);
+
+  if (range === 'unsatisfiable') {
+    return new Response(null, { status: 416, headers: { ...headers, 'Content-Range': `bytes */${stats.size}` } });
+  }
+
+  if (range) {
+    return new Response(Readable.toWeb(createReadStream(filepath, range)), {
+      status: 206,
+      headers: {
+        ...headers,
+        'Content-Range': `bytes ${range.start}-${range.end}/${stats.size}`,
+        'Content-Length': String(range.end - range.start + 1)
+      }
+    });
+  }
+
+  headers['Content-Length'] = String(stats.size);
+
+  if (stats.size <= SMALL_FILE_MAX_BYTES) {
+    let buffer = cacheLookup(filepath, etag);
+    if (!buffer) {
+      buffer = await readFile(filepath);
+      cacheStore(filepath, etag, buffer);
+    }
+    return new Response(buffer, { status: 200, headers });
+  }
+
+  return new Response(Readable.toWeb(createReadStream(filepath)), { status: 200, headers });
+}
+
+export function getFileCacheStats() {
+  return {
+    files: state.entries.size,
+    bytes: state.bytes,
+    maxBytes: SMALL_FILE_CACHE_BYTES,
+    hits: state.hits,
+    misses: state.misses
+  };
+}
@@ -0,0 +1,119 @@
+/**
+ * DERIVADOS DE IMAGEM (miniaturas e prévias em WebP)
+ * Após cada upload de imagem (comprovantes, contas, fotos de usuário/igreja) os tamanhos
+ * de DERIVATIVE_SIZES são gerados numa fila em segundo plano, sem segurar a resposta.
+ * As rotas de arquivo aceitam ?size=thumb|preview e caem no original enquanto o derivado
+ * não existe (ou se o sharp não estiver instalado). PDFs não têm derivados.
+ *
+ * Os derivados ficam em <pasta do original>/.derivatives/<arquivo>.<size>.webp
+ */
+
+import { existsSync } from 'fs';
+import { mkdir, rename, unlink } from 'fs/promises';
+import path from 'path';
+
+export const DERIVATIVE_SIZES = {
+  thumb: { width: 256, height: 256, quality: 70 },
+  preview: { width: 1280, height: 1280, quality: 80 }
+};
+
+const IMAGE_EXTENSIONS = new Set(['.jpg', '.jpeg', '.png', '.webp', '.gif']);
+const CONCURRENCY = 2;
+
+const state = globalThis.__iudpImageDerivatives || (globalThis.__iudpImageDerivatives = {
+  queue: [],
+  pending: new Set(),
+  running: 0,
+  sharp: undefined,
+  stats: { generated: 0, failed: 0 }
+});
+
+/**
+ * sharp é opcional: sem ele, as rotas continuam servindo o original
+ */
+async function loadSharp() {
+  if (state.sharp === undefined) {
+    state.sharp = await import('sharp')
+      .then(mod => mod.default || mod)
+      .catch(() => {
+        console.warn('[DERIVATIVES] sharp indisponível - miniaturas desativadas');
+        return null;
+      });
+  }
+  return state.sharp;
+}
+
+export function isImageFile(filepath) {
+  return IMAGE_EXTENSIONS.has(path.extname(filepath).toLowerCase());
+}
+
+export function derivativePath(filepath, size) {
+  return path.join(path.dirname(filepath), '.derivatives', `${path.basename(filepath)}.${size}.webp`);
+}
+
+async function generate(filepath) {
+  const sharp = await loadSharp();
+  if (!sharp || !existsSync(filepath)) return;
+
+  await mkdir(path.join(path.dirname(filepath), '.derivatives'), { recursive: true });
+
+  for (const [size, { width, height, quality }] of Object.entries(DERIVATIVE_SIZES)) {
+    const target = derivativePath(filepath, size);
+    const temp = `${target}.${process.pid}.tmp`;
+    try {
+      await sharp(filepath)
+        .rotate() // respeita a orientação EXIF das fotos de celular
+        .resize({ width, height, fit: 'inside', withoutEnlargement: true })
+        .webp({ quality })
+        .toFile(temp);
+      await rename(temp, target);
+      state.stats.generated++;
+    } catch (error) {
+      state.stats.failed++;
+      await unlink(temp).catch(() => {});
+      console.error(`[DERIVATIVES] Erro ao gerar ${size} de ${filepath}:`, error.message);
+    }
+  }
+}
+
+function drain() {
+  while (state.running < CONCURRENCY && state.queue.length > 0) {
+    const filepath = state.queue.shift();
+    state.running++;
+    generate(filepath)
+      .catch(error => console.error('[DERIVATIVES] Erro na fila:', error))
+      .finally(() => {
+        state.running--;
+        state.pending.delete(filepath);
+        drain();
+      });
+  }
+}
+
+/**
+ * Agenda a geração dos derivados (ignora não-imagens e arquivos já na fila)
+ */
+export function enqueueDerivatives(filepath) {
+  if (!isImageFile(filepath) || state.pending.has(filepath)) return;
+  state.pending.add(filepath);
+  state.queue.push(filepath);
+  setImmediate(drain);
+}
+
+/**
+ * Caminho do derivado pedido, se já existir; senão agenda a geração e devolve null
+ */
+export function resolveDerivative(filepath, size) {
+  if (!size || !DERIVATIVE_SIZES[size] || !isImageFile(filepath)) return null;
+
+  const target = derivativePath(filepath, size);
+  if (existsSync(target)) return target;
+
+  // Uploads anteriores ao pipeline: gera sob demanda na primeira visualização
+  enqueueDerivatives(filepath);
+  return null;
+}
+
+export function getDerivativeStats() {
+  return { ...state.stats, queued: state.queue.length, running: state.running };
+}
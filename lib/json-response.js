@@ -0,0 +1,121 @@
+/**
+ * RESPOSTAS JSON COMPRIMIDAS (listas pesadas)
+ * Serializa uma vez, mede bytes e tempo e, acima de COMPRESSION_MIN_BYTES, comprime com o
+ * melhor encoding aceito pelo cliente (br > gzip). Brotli roda em qualidade baixa: para JSON
+ * gerado a cada requisição, a qualidade máxima (11) custa muito mais CPU do que economiza.
+ *
+ * As medições ficam em getResponseStats() (cache/stats) e no cabeçalho Server-Timing.
+ */
+
+import { promisify } from 'util';
+import zlib from 'zlib';
+
+export const COMPRESSION_MIN_BYTES = 1024;
+const BROTLI_QUALITY = 4;
+
+const brotliCompress = promisify(zlib.brotliCompress);
+const gzip = promisify(zlib.gzip);
+
+const stats = globalThis.__iudpResponseStats || (globalThis.__iudpResponseStats = new Map());
+
+/**
+ * Encoding escolhido pelo Accept-Encoding (respeita q=0); null = sem compressão
+ */
+export function negotiateEncoding(acceptEncoding) {
+  const accepted = new Map();
+  for (const part of String(acceptEncoding || '').toLowerCase().split(',')) {
+    const [name, ...params] = part.trim().split(';');
+    if (!name) continue;
+    const q = params.map(p => p.trim()).find(p => p.startsWith('q='));
+    accepted.set(name, q ? parseFloat(q.slice(2)) : 1);
+  }
+  const quality = (name) => accepted.get(name) ?? (accepted.has('*') ? accepted.get('*') : 0);
+
+  const candidates = ['br', 'gzip'].filter(name => quality(name) > 0);
+  if (candidates.length === 0) return null;
+  return candidates.reduce((best, name) => (quality(name) > quality(best) ? name : best));
+}
+
+export async function compressBody(body, encoding) {
+  if (encoding === 'br') {
+    return brotliCompress(body, {
+      params: {
+        [zlib.constants.BROTLI_PARAM_QUALITY]: BROTLI_QUALITY,
+        [zlib.constants.BROTLI_PARAM_MODE]: zlib.constants.BROTLI_MODE_TEXT,
+        [zlib.constants.BROTLI_PARAM_SIZE_HINT]: body.length
+      }
+    });
+  }
+  return gzip(body);
+}
+
+function record(name, { rawBytes, sentBytes, serializeMs, compressMs, encoding }) {
+  let entry = stats.get(name);
+  if (!entry) {
+    entry = { responses: 0, compressed: 0, rawBytes: 0, sentBytes: 0, serializeMs: 0, compressMs: 0, maxRawBytes: 0 };
+    stats.set(name, entry);
+  }
+  entry.responses++;
+  if (encoding) entry.compressed++;
+  entry.rawBytes += rawBytes;
+  entry.sentBytes += sentBytes;
+  entry.serializeMs += serializeMs;
+  entry.compressMs += compressMs;
+  entry.maxRawBytes = Math.max(entry.maxRawBytes, rawBytes);
+}
+
+const round = (ms) => Math.round(ms * 100) / 100;
+
+/**
+ * Response JSON com compressão negociada. `name` identifica o endpoint nas estatísticas.
+ */
+export async function jsonResponse(request, payload, { name = 'json', status = 200, headers = {} } = {}) {
+  const serializeStarted = performance.now();
+  let body = Buffer.from(JSON.stringify(payload));
+  const serializeMs = performance.now() - serializeStarted;
+  const rawBytes = body.length;
+
+  const encoding = rawBytes >= COMPRESSION_MIN_BYTES
+    ? negotiateEncoding(request.headers.get('accept-encoding'))
+    : null;
+
+  let compressMs = 0;
+  if (encoding) {
+    const compressStarted = performance.now();
+    body = await compressBody(body, encoding);
+    compressMs = performance.now() - compressStarted;
+  }
+
+  record(name, { rawBytes, sentBytes: body.length, serializeMs, compressMs, encoding });
+
+  const responseHeaders = {
+    ...headers,
+    'Content-Type': 'application/json; charset=utf-8',
+    'Content-Length': String(body.length),
+    'Vary': 'Accept-Encoding',
+    'Server-Timing': `serialize;dur=${round(serializeMs)}, compress;dur=${round(compressMs)}`
+  };
+  if (encoding) responseHeaders['Content-Encoding'] = encoding;
+
+  return new Response(body, { status, headers: responseHeaders });
+}
+
+/**
+ * Médias por endpoint desde o início do processo
+ */
+export function getResponseStats() {
+  const result = {};
+  for (const [name, entry] of stats) {
+    result[name] = {
+      responses: entry.responses,
+      compressed: entry.compressed,
+      avgRawBytes: Math.round(entry.rawBytes / entry.responses),
+      avgSentBytes: Math.round(entry.sentBytes / entry.responses),
+      maxRawBytes: entry.maxRawBytes,
+      compressionRatio: entry.rawBytes ? round(entry.sentBytes / entry.rawBytes) : 1,
+      avgSerializeMs: round(entry.serializeMs / entry.responses),
+      avgCompressMs: round(entry.compressMs / entry.responses)
+    };
+  }
+  return result;
+}
@@ -0,0 +1,92 @@
+/**
+ * PAGINAÇÃO POR CURSOR (KEYSET)
+ * Páginas ordenadas por (campo de data desc, id desc): a próxima página começa depois do último
+ * item devolvido, sem skip(). O cursor é opaco para o front (base64url de { v, id }).
+ */
+
+export const DEFAULT_PAGE_SIZE = 50;
+export const MAX_PAGE_SIZE = 500;
+
+export function encodeCursor(doc, sortField, idField) {
+  return Buffer.from(JSON.stringify({ v: doc[sortField], id: doc[idField] })).toString('base64url');
+}
+
+export function decodeCursor(cursor) {
+  if (!cursor || typeof cursor !== 'string') return null;
+  try {
+    const decoded = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+    return decoded && decoded.v !== undefined && decoded.id !== undefined ? decoded : null;
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Tamanho da página: ausente → fallback (null = sem limite, comportamento antigo)
+ */
+export function resolvePageSize(limit, fallback = DEFAULT_PAGE_SIZE) {
+  const parsed = parseInt(limit);
+  if (Number.isNaN(parsed) || parsed <= 0) return fallback;
+  return Math.min(parsed, MAX_PAGE_SIZE);
+}
+
+/**
+ * Filtro de intervalo para campos de data em string ISO (createdAt, timestamp)
+ * `to` no formato YYYY-MM-DD inclui o dia inteiro
+ */
+export function buildDateRangeFilter(from, to) {
+  const range = {};
+  if (from) range.$gte = from;
+  if (to) range.$lte = /^\d{4}-\d{2}-\d{2}$/.test(to) ? `${to}T23:59:59.999Z` : to;
+  return Object.keys(range).length > 0 ? range : null;
+}
+
+/**
+ * Condição "depois do cursor" para ordenação descendente em (sortField, idField)
+ */
+export function buildKeysetFilter(filter, cursor, sortField, idField) {
+  const after = decodeCursor(cursor);
+  if (!after) return filter;
+
+  const keyset = {
+    $or: [
+      { [sortField]: { $lt: after.v } },
+      { [sortField]: after.v, [idField]: { $lt: after.id } }
+    ]
+  };
+  return Object.keys(filter).length > 0 ? { $and: [filter, keyset] } : keyset;
+}
+
+/**
+ * Contagem barata: filtro vazio usa os metadados da coleção; com filtro, countDocuments no índice
+ */
+export async function countMatching(collection, filter, maxTimeMS) {
+  const options = maxTimeMS ? { maxTimeMS } : undefined;
+  if (Object.keys(filter).length === 0) {
+    return collection.estimatedDocumentCount(options);
+  }
+  return collection.countDocuments(filter, options);
+}
+
+/**
+ * Busca uma página (limit + 1 para saber se há próxima) e o total em paralelo
+ * limit null → devolve tudo, sem cursor; maxTimeMS limita a busca e a contagem no servidor
+ */
+export async function findPage(collection, filter, { sortField, idField, limit, cursor, projection, maxTimeMS }) {
+  const query = buildKeysetFilter(filter, cursor, sortField, idField);
+  let find = collection.find(query, projection ? { projection } : undefined).sort({ [sortField]: -1, [idField]: -1 });
+  if (limit) find = find.limit(limit + 1);
+  if (maxTimeMS) find = find.maxTimeMS(maxTimeMS);
+
+  const [items, total] = await Promise.all([find.toArray(), countMatching(collection, filter, maxTimeMS)]);
+
+  const hasMore = Boolean(limit) && items.length > limit;
+  if (hasMore) items.pop();
+
+  return {
+    items,
+    total,
+    hasMore,
+    nextCursor: hasMore ? encodeCursor(items[items.length - 1], sortField, idField) : null
+  };
+}
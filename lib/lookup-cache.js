@@ -0,0 +1,138 @@
+/**
+ * CACHE DE CONSULTAS (LRU + TTL)
+ * Evita reler users/roles/privacy_config/month_status a cada requisição autenticada.
+ * Cada coleção tem seu cache com limite de itens e validade; as rotas que alteram
+ * essas coleções invalidam explicitamente. O TTL limita a defasagem entre instâncias.
+ */
+
+export const CACHE_CONFIG = {
+  users: { max: 2000, ttlMs: 60 * 1000 },
+  roles: { max: 50, ttlMs: 5 * 60 * 1000 },
+  privacy_config: { max: 200, ttlMs: 5 * 60 * 1000 },
+  month_status: { max: 120, ttlMs: 30 * 1000 }
+};
+
+export class LruTtlCache {
+  constructor({ max, ttlMs, now = Date.now }) {
+    this.max = max;
+    this.ttlMs = ttlMs;
+    this.now = now;
+    this.entries = new Map();
+    this.hits = 0;
+    this.misses = 0;
+    this.evictions = 0;
+  }
+
+  // Devolve { value } (null também é um valor válido) ou undefined em caso de miss
+  lookup(key) {
+    const entry = this.entries.get(key);
+    if (!entry || entry.expiresAt <= this.now()) {
+      if (entry) this.entries.delete(key);
+      this.misses++;
+      return undefined;
+    }
+    // Reinsere para marcar como usado recentemente
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    this.hits++;
+    return entry;
+  }
+
+  set(key, value) {
+    this.entries.delete(key);
+    this.entries.set(key, { value, expiresAt: this.now() + this.ttlMs });
+    while (this.entries.size > this.max) {
+      this.entries.delete(this.entries.keys().next().value);
+      this.evictions++;
+    }
+  }
+
+  delete(key) {
+    this.entries.delete(key);
+  }
+
+  clear() {
+    this.entries.clear();
+  }
+
+  stats() {
+    const total = this.hits + this.misses;
+    return {
+      size: this.entries.size,
+      max: this.max,
+      ttlMs: this.ttlMs,
+      hits: this.hits,
+      misses: this.misses,
+      evictions: this.evictions,
+      hitRate: total > 0 ? Math.round((this.hits / total) * 1000) / 1000 : 0
+    };
+  }
+}
+
+// Um conjunto de caches por processo (sobrevive ao hot reload do Next.js)
+const caches = globalThis.__iudpLookupCaches || (globalThis.__iudpLookupCaches = Object.fromEntries(
+  Object.entries(CACHE_CONFIG).map(([name, config]) => [name, new LruTtlCache(config)])
+));
+
+// Cópia rasa: quem chama pode alterar campos do documento sem contaminar o cache
+function copy(value) {
+  if (Array.isArray(value)) return value.map(copy);
+  return value && typeof value === 'object' ? { ...value } : value;
+}
+
+async function cached(name, key, loader) {
+  const cache = caches[name];
+  const entry = cache.lookup(key);
+  if (entry) return copy(entry.value);
+
+  const value = await loader();
+  cache.set(key, value ?? null);
+  return copy(value ?? null);
+}
+
+export function getCachedUser(db, userId) {
+  return cached('users', userId, () => db.collection('users').findOne({ userId }));
+}
+
+export function getCachedMonthStatus(db, month, year) {
+  const m = parseInt(month);
+  const y = parseInt(year);
+  return cached('month_status', `${y}-${m}`, () => db.collection('month_status').findOne({ month: m, year: y }));
+}
+
+/**
+ * Todas as funções (coleção pequena); a ordenação fica com quem chama
+ */
+export function getCachedRoles(db) {
+  return cached('roles', 'all', () => db.collection('roles').find({}).toArray());
+}
+
+export function getCachedPrivacyConfig(db, roleId) {
+  return cached('privacy_config', `role:${roleId}`, () => db.collection('privacy_config').findOne({ roleId }));
+}
+
+export function getCachedPrivacyConfigs(db) {
+  return cached('privacy_config', 'all', () => db.collection('privacy_config').find({}).toArray());
+}
+
+// Sem userId: limpa todos (alterações em lote, ex.: exclusão de igreja)
+export function invalidateUser(userId) {
+  if (userId) caches.users.delete(userId);
+  else caches.users.clear();
+}
+
+export function invalidateRoles() {
+  caches.roles.clear();
+}
+
+export function invalidatePrivacyConfig() {
+  caches.privacy_config.clear();
+}
+
+export function invalidateMonthStatus(month, year) {
+  caches.month_status.delete(`${parseInt(year)}-${parseInt(month)}`);
+}
+
+export function getCacheStats() {
+  return Object.fromEntries(Object.entries(caches).map(([name, cache]) => [name, cache.stats()]));
+}
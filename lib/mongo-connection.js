@@ -0,0 +1,310 @@
+/**
+ * CONEXÃO COM O MONGODB (ciclo de vida do MongoClient)
+ * - Inicialização única: requisições simultâneas no cold start esperam a mesma conexão (e a
+ *   mesma criação de índices/agendadores em onConnect), em vez de abrir um cliente cada.
+ *   Falha na conexão não fica em cache: a próxima requisição tenta de novo.
+ * - Pool configurável por ambiente (MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE...) e tempo de
+ *   espera por conexão do pool exposto em métricas Prometheus.
+ * - maxTimeMS nas listas pesadas (MONGO_LIST_MAX_TIME_MS) e leitura opcional em secundários
+ *   para os endpoints analíticos (MONGO_ANALYTICS_READ_PREFERENCE).
+ * - Health check (ping) e encerramento gracioso em SIGTERM/SIGINT (hooks + client.close()).
+ *
+ * O módulo não importa o driver: connectDB (app/api/[[...path]]/shared.js) passa a fábrica do MongoClient.
+ */
+
+export const HEALTH_TIMEOUT_MS = 2000;
+export const SHUTDOWN_HOOK_TIMEOUT_MS = 5000;
+export const POOL_WAIT_BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5];
+
+const READ_PREFERENCES = ['primary', 'primaryPreferred', 'secondary', 'secondaryPreferred', 'nearest'];
+
+const state = globalThis.__iudpMongo || (globalThis.__iudpMongo = {
+  client: null,
+  db: null,
+  dbName: null,
+  analyticsDb: null,
+  connecting: null,
+  closing: null,
+  options: null,
+  shutdownHooks: [],
+  signalsRegistered: false,
+  instrumentedClients: new WeakSet(),
+  pool: {
+    checkouts: 0,
+    failures: new Map(), // motivo → contagem
+    waitSeconds: 0,
+    waitMaxSeconds: 0,
+    waitBuckets: POOL_WAIT_BUCKETS.map(() => 0),
+    waiting: 0,
+    checkedOut: 0,
+    created: 0,
+    closed: 0,
+    cleared: 0
+  }
+});
+
+function intEnv(env, name, fallback) {
+  const value = parseInt(env[name]);
+  return Number.isFinite(value) && value >= 0 ? value : fallback;
+}
+
+/**
+ * Opções do MongoClient a partir do ambiente
+ */
+export function getMongoOptions(env = process.env) {
+  const maxPoolSize = Math.max(1, intEnv(env, 'MONGO_MAX_POOL_SIZE', 20));
+  return {
+    appName: 'iudp-caderno',
+    maxPoolSize,
+    minPoolSize: Math.min(intEnv(env, 'MONGO_MIN_POOL_SIZE', 2), maxPoolSize),
+    maxIdleTimeMS: intEnv(env, 'MONGO_MAX_IDLE_TIME_MS', 60000),
+    waitQueueTimeoutMS: intEnv(env, 'MONGO_WAIT_QUEUE_TIMEOUT_MS', 10000),
+    serverSelectionTimeoutMS: intEnv(env, 'MONGO_SERVER_SELECTION_TIMEOUT_MS', 10000),
+    connectTimeoutMS: intEnv(env, 'MONGO_CONNECT_TIMEOUT_MS', 10000),
+    // monitorCommands: operações e tempo no MongoDB por endpoint (lib/request-metrics)
+    monitorCommands: true
+  };
+}
+
+/**
+ * Limite de execução no servidor para as listas pesadas (0 = sem limite)
+ */
+export function getListQueryMaxTimeMs(env = process.env) {
+  return intEnv(env, 'MONGO_LIST_MAX_TIME_MS', 15000);
+}
+
+/**
+ * Read preference dos endpoints analíticos (dashboard/data, compare/months, stats/overview)
+ */
+export function getAnalyticsReadPreference(env = process.env) {
+  const value = env.MONGO_ANALYTICS_READ_PREFERENCE;
+  if (!value) return 'primary';
+  if (!READ_PREFERENCES.includes(value)) {
+    console.warn(`[MONGO] MONGO_ANALYTICS_READ_PREFERENCE inválido (${value}), usando primary`);
+    return 'primary';
+  }
+  return value;
+}
+
+/**
+ * Consulta cortada por maxTimeMS ou sem conexão livre no pool a tempo
+ */
+export function isMongoOverloaded(error) {
+  return error?.code === 50 || error?.codeName === 'MaxTimeMSExpired' || error?.name === 'WaitQueueTimeoutError';
+}
+
+function recordWait(durationMS) {
+  const seconds = (durationMS || 0) / 1000;
+  state.pool.waitSeconds += seconds;
+  state.pool.waitMaxSeconds = Math.max(state.pool.waitMaxSeconds, seconds);
+  POOL_WAIT_BUCKETS.forEach((bound, i) => {
+    if (seconds <= bound) state.pool.waitBuckets[i]++;
+  });
+}
+
+/**
+ * Eventos do pool (CMAP): espera por conexão, conexões em uso, criadas/fechadas
+ * durationMS dos eventos de checkout vem do driver (6.9+)
+ */
+export function instrumentPool(client) {
+  if (state.instrumentedClients.has(client)) return;
+  state.instrumentedClients.add(client);
+  const pool = state.pool;
+
+  client.on('connectionCheckOutStarted', () => { pool.waiting++; });
+  client.on('connectionCheckedOut', (event) => {
+    pool.waiting = Math.max(0, pool.waiting - 1);
+    pool.checkouts++;
+    pool.checkedOut++;
+    recordWait(event.durationMS);
+  });
+  client.on('connectionCheckOutFailed', (event) => {
+    pool.waiting = Math.max(0, pool.waiting - 1);
+    pool.failures.set(event.reason, (pool.failures.get(event.reason) || 0) + 1);
+    recordWait(event.durationMS);
+  });
+  client.on('connectionCheckedIn', () => { pool.checkedOut = Math.max(0, pool.checkedOut - 1); });
+  client.on('connectionCreated', () => { pool.created++; });
+  client.on('connectionClosed', () => { pool.closed++; });
+  client.on('connectionPoolCleared', () => { pool.cleared++; });
+}
+
+/**
+ * Db conectado (uma única inicialização por processo)
+ *   createClient(options) → MongoClient ainda não conectado
+ *   onConnect(db, client) → índices, agendadores etc. (roda uma vez, antes de liberar o Db)
+ */
+export async function connectMongo({ createClient, dbName, onConnect }) {
+  if (state.db) return state.db;
+  if (state.connecting) return state.connecting;
+
+  state.connecting = (async () => {
+    const options = getMongoOptions();
+    const client = createClient(options);
+    instrumentPool(client);
+
+    try {
+      await client.connect();
+      const db = client.db(dbName);
+      if (onConnect) await onConnect(db, client);
+
+      state.client = client;
+      state.db = db;
+      state.dbName = dbName;
+      state.options = options;
+      state.analyticsDb = null;
+      registerSignals();
+      console.log(`[MONGO] Conectado (pool ${options.minPoolSize}-${options.maxPoolSize})`);
+      return db;
+    } catch (error) {
+      await client.close().catch(() => {});
+      throw error;
+    }
+  })().finally(() => {
+    state.connecting = null;
+  });
+
+  return state.connecting;
+}
+
+/**
+ * Db para leituras analíticas: secundários quando MONGO_ANALYTICS_READ_PREFERENCE permitir
+ * (os totais podem atrasar alguns segundos em relação ao primário)
+ */
+export function getAnalyticsDb() {
+  const readPreference = getAnalyticsReadPreference();
+  if (!state.client || readPreference === 'primary') return state.db;
+  if (!state.analyticsDb) {
+    state.analyticsDb = state.client.db(state.dbName, { readPreference });
+  }
+  return state.analyticsDb;
+}
+
+function withTimeout(promise, ms, label) {
+  let timer;
+  const timeout = new Promise((_, reject) => {
+    timer = setTimeout(() => reject(new Error(`${label} excedeu ${ms}ms`)), ms);
+  });
+  return Promise.race([promise, timeout]).finally(() => clearTimeout(timer));
+}
+
+/**
+ * Ping no banco (conecta se preciso). Nunca lança: { ok, latencyMs } ou { ok: false }
+ */
+export async function checkMongoHealth(connect, timeoutMs = HEALTH_TIMEOUT_MS) {
+  const started = performance.now();
+  try {
+    const db = await withTimeout(connect(), timeoutMs, 'Conexão');
+    await withTimeout(db.command({ ping: 1 }), timeoutMs, 'Ping');
+    return { ok: true, latencyMs: Math.round((performance.now() - started) * 10) / 10 };
+  } catch (error) {
+    console.error('[MONGO] Health check falhou:', error.message);
+    return { ok: false, latencyMs: Math.round(performance.now() - started) };
+  }
+}
+
+/**
+ * Tarefa a concluir antes de fechar o cliente (buffers de auditoria, presença...)
+ */
+export function onMongoShutdown(hook) {
+  if (!state.shutdownHooks.includes(hook)) state.shutdownHooks.push(hook);
+}
+
+/**
+ * Roda os hooks (cada um com tempo limite) e fecha o cliente
+ */
+export async function closeMongo(reason = 'shutdown') {
+  if (!state.client) return;
+  if (state.closing) return state.closing;
+
+  state.closing = (async () => {
+    console.log(`[MONGO] Encerrando conexão (${reason})`);
+    for (const hook of state.shutdownHooks) {
+      try {
+        await withTimeout(Promise.resolve().then(() => hook(state.db)), SHUTDOWN_HOOK_TIMEOUT_MS, 'Hook de encerramento');
+      } catch (error) {
+        console.error('[MONGO] Erro no encerramento:', error.message);
+      }
+    }
+    const client = state.client;
+    state.client = null;
+    state.db = null;
+    state.analyticsDb = null;
+    await client.close();
+  })().finally(() => {
+    state.closing = null;
+  });
+
+  return state.closing;
+}
+
+// Sem outro listener do sinal (ex.: servidor do Next), o processo sai ao terminar
+function registerSignals() {
+  if (state.signalsRegistered) return;
+  state.signalsRegistered = true;
+  for (const signal of ['SIGTERM', 'SIGINT']) {
+    process.once(signal, () => {
+      closeMongo(signal)
+        .catch(error => console.error('[MONGO] Erro ao fechar conexão:', error.message))
+        .finally(() => {
+          if (process.listenerCount(signal) === 0) process.exit(0);
+        });
+    });
+  }
+}
+
+export function getPoolStats() {
+  const { failures, waitBuckets, ...pool } = state.pool;
+  const waits = pool.checkouts + [...failures.values()].reduce((sum, n) => sum + n, 0);
+  return {
+    connected: Boolean(state.db),
+    maxPoolSize: state.options?.maxPoolSize ?? null,
+    minPoolSize: state.options?.minPoolSize ?? null,
+    analyticsReadPreference: getAnalyticsReadPreference(),
+    ...pool,
+    avgWaitMs: waits > 0 ? Math.round((pool.waitSeconds / waits) * 1e5) / 100 : 0,
+    failures: Object.fromEntries(failures)
+  };
+}
+
+function round(value) {
+  return Math.round(value * 1e6) / 1e6;
+}
+
+/**
+ * Métricas do pool no formato Prometheus (somadas ao texto de GET /api/metrics)
+ */
+export function renderPoolMetrics() {
+  const pool = state.pool;
+  const lines = [];
+  const metric = (name, type, help) => lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} ${type}`);
+
+  metric('iudp_mongo_pool_wait_seconds', 'histogram', 'Espera por uma conexão livre no pool');
+  POOL_WAIT_BUCKETS.forEach((bound, i) => {
+    lines.push(`iudp_mongo_pool_wait_seconds_bucket{le="${bound}"} ${pool.waitBuckets[i]}`);
+  });
+  const waits = pool.checkouts + [...pool.failures.values()].reduce((sum, n) => sum + n, 0);
+  lines.push(`iudp_mongo_pool_wait_seconds_bucket{le="+Inf"} ${waits}`);
+  lines.push(`iudp_mongo_pool_wait_seconds_sum ${round(pool.waitSeconds)}`);
+  lines.push(`iudp_mongo_pool_wait_seconds_count ${waits}`);
+
+  metric('iudp_mongo_pool_checkout_failures_total', 'counter', 'Checkouts recusados (timeout da fila, pool fechado...)');
+  for (const [reason, count] of pool.failures) {
+    lines.push(`iudp_mongo_pool_checkout_failures_total{reason="${reason}"} ${count}`);
+  }
+
+  metric('iudp_mongo_pool_checked_out', 'gauge', 'Conexões em uso');
+  lines.push(`iudp_mongo_pool_checked_out ${pool.checkedOut}`);
+  metric('iudp_mongo_pool_waiting', 'gauge', 'Operações esperando conexão');
+  lines.push(`iudp_mongo_pool_waiting ${pool.waiting}`);
+  metric('iudp_mongo_pool_max_size', 'gauge', 'maxPoolSize configurado');
+  lines.push(`iudp_mongo_pool_max_size ${state.options?.maxPoolSize ?? 0}`);
+  metric('iudp_mongo_pool_connections_created_total', 'counter', 'Conexões abertas');
+  lines.push(`iudp_mongo_pool_connections_created_total ${pool.created}`);
+  metric('iudp_mongo_pool_connections_closed_total', 'counter', 'Conexões fechadas');
+  lines.push(`iudp_mongo_pool_connections_closed_total ${pool.closed}`);
+  metric('iudp_mongo_pool_cleared_total', 'counter', 'Pool limpo após erro de rede/servidor');
+  lines.push(`iudp_mongo_pool_cleared_total ${pool.cleared}`);
+
+  return lines.join('\n') + '\n';
+}
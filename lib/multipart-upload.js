@@ -0,0 +1,241 @@
+/**
+ * UPLOAD MULTIPART EM STREAMING
+ * Lê o corpo da requisição em pedaços e grava o arquivo direto num temporário da pasta de
+ * destino, sem request.formData()/arrayBuffer() (que seguram o arquivo inteiro na memória).
+ * Enquanto grava: conta os bytes (aborta ao passar do limite), confere os bytes iniciais
+ * (assinatura do formato, não o tipo declarado pelo navegador) e calcula o SHA-256.
+ *
+ * O temporário fica na mesma pasta do destino para que commitBlob (blob-store) só precise
+ * de um rename atômico.
+ */
+
+import { createHash, randomUUID } from 'crypto';
+import { mkdir, open, unlink } from 'fs/promises';
+import path from 'path';
+
+const MAX_FIELD_BYTES = 64 * 1024;
+const MAX_HEADER_BYTES = 16 * 1024;
+// Folga para cabeçalhos e campos de texto na checagem antecipada por Content-Length
+const MULTIPART_OVERHEAD_BYTES = 64 * 1024;
+
+export class UploadError extends Error {
+  constructor(status, message, details) {
+    super(message);
+    this.status = status;
+    this.details = details;
+  }
+}
+
+const SIGNATURES = [
+  { mimeType: 'image/jpeg', bytes: [0xff, 0xd8, 0xff] },
+  { mimeType: 'image/png', bytes: [0x89, 0x50, 0x4e, 0x47, 0x0d, 0x0a, 0x1a, 0x0a] },
+  { mimeType: 'application/pdf', bytes: [0x25, 0x50, 0x44, 0x46, 0x2d] }, // %PDF-
+  { mimeType: 'image/webp', bytes: [0x52, 0x49, 0x46, 0x46], offset8: [0x57, 0x45, 0x42, 0x50] } // RIFF....WEBP
+];
+
+export const SIGNATURE_BYTES = 12;
+
+/**
+ * Tipo real pelo início do arquivo (null se não reconhecido)
+ */
+export function detectMimeType(head) {
+  const match = SIGNATURES.find(sig =>
+    sig.bytes.every((b, i) => head[i] === b) &&
+    (!sig.offset8 || sig.offset8.every((b, i) => head[8 + i] === b))
+  );
+  return match ? match.mimeType : null;
+}
+
+function formatMb(bytes) {
+  return `${(bytes / 1024 / 1024).toFixed(2)}MB`;
+}
+
+function tooLarge(maxSize, size) {
+  return new UploadError(400, '❌ Arquivo muito grande',
+    `${size ? `Tamanho: ${formatMb(size)}. ` : ''}Máximo: ${Math.round(maxSize / 1024 / 1024)}MB`);
+}
+
+function parsePartHeaders(text) {
+  const headers = {};
+  for (const line of text.split('\r\n')) {
+    const colon = line.indexOf(':');
+    if (colon > 0) headers[line.slice(0, colon).trim().toLowerCase()] = line.slice(colon + 1).trim();
+  }
+  const disposition = headers['content-disposition'] || '';
+  const name = /\bname="([^"]*)"/i.exec(disposition);
+  const filename = /\bfilename="([^"]*)"/i.exec(disposition);
+  return {
+    name: name ? name[1] : null,
+    filename: filename ? filename[1] : null,
+    contentType: headers['content-type'] || null
+  };
+}
+
+/**
+ * Receptor do arquivo: grava no temporário com validação incremental
+ */
+async function openFilePart(dir, originalName, { allowedTypes, maxSize, formatHint }) {
+  const tempPath = path.join(dir, `.upload-${randomUUID()}.tmp`);
+  const handle = await open(tempPath, 'w');
+  const hash = createHash('sha256');
+  let head = Buffer.alloc(0);
+  let mimeType = null;
+  let size = 0;
+
+  const checkType = () => {
+    mimeType = detectMimeType(head);
+    if (!mimeType || !allowedTypes.includes(mimeType)) {
+      throw new UploadError(400, '❌ Formato não suportado', formatHint);
+    }
+  };
+
+  return {
+    tempPath,
+    async write(chunk) {
+      if (chunk.length === 0) return;
+      size += chunk.length;
+      if (size > maxSize) throw tooLarge(maxSize);
+      if (!mimeType) {
+        head = Buffer.concat([head, chunk.subarray(0, SIGNATURE_BYTES - head.length)]);
+        if (head.length >= SIGNATURE_BYTES) checkType();
+      }
+      hash.update(chunk);
+      await handle.write(chunk);
+    },
+    async end() {
+      if (!mimeType && size > 0) checkType();
+      await handle.close();
+      return { tempPath, hash: hash.digest('hex'), size, mimeType, originalName };
+    },
+    async abort() {
+      await handle.close().catch(() => {});
+      await unlink(tempPath).catch(() => {});
+    }
+  };
+}
+
+function openFieldPart(name, fields) {
+  const chunks = [];
+  let size = 0;
+  return {
+    async write(chunk) {
+      size += chunk.length;
+      if (size > MAX_FIELD_BYTES) throw new UploadError(400, 'Campo do formulário muito grande');
+      chunks.push(Buffer.from(chunk));
+    },
+    async end() {
+      fields[name] = Buffer.concat(chunks).toString('utf8');
+    },
+    async abort() {}
+  };
+}
+
+const discardPart = { async write() {}, async end() {}, async abort() {} };
+
+/**
+ * Recebe um multipart/form-data com um arquivo (campo fileField) e campos de texto.
+ * Devolve { fields, file } com file = { tempPath, hash, size, mimeType, originalName } ou null.
+ * Erros de validação saem como UploadError (status + mensagem no formato das rotas).
+ */
+export async function receiveUpload(request, { dir, fileField = 'file', allowedTypes, maxSize, formatHint }) {
+  const contentType = request.headers.get('content-type') || '';
+  const boundaryMatch = /boundary=(?:"([^"]+)"|([^;\s]+))/i.exec(contentType);
+  if (!contentType.toLowerCase().startsWith('multipart/form-data') || !boundaryMatch || !request.body) {
+    throw new UploadError(400, 'Envie o arquivo como multipart/form-data');
+  }
+
+  const declaredLength = parseInt(request.headers.get('content-length'));
+  if (declaredLength > maxSize + MULTIPART_OVERHEAD_BYTES) throw tooLarge(maxSize, declaredLength);
+
+  await mkdir(dir, { recursive: true });
+
+  const delimiter = Buffer.from(`\r\n--${boundaryMatch[1] || boundaryMatch[2]}`);
+  const fields = {};
+  let file = null;
+  let part = null;
+  let state = 'preamble';
+  // CRLF inicial: o primeiro delimitador fica igual aos demais
+  let pending = Buffer.from('\r\n');
+
+  const consume = async () => {
+    while (state !== 'done') {
+      if (state === 'preamble' || state === 'body') {
+        const index = pending.indexOf(delimiter);
+        if (index === -1) {
+          // Guarda o final, que pode ser o começo de um delimitador partido entre pedaços
+          const keep = Math.min(pending.length, delimiter.length - 1);
+          if (state === 'body') await part.write(pending.subarray(0, pending.length - keep));
+          pending = Buffer.from(pending.subarray(pending.length - keep));
+          return;
+        }
+        if (state === 'body') {
+          await part.write(pending.subarray(0, index));
+          const result = await part.end();
+          if (part.tempPath) file = result;
+          part = null;
+        }
+        pending = pending.subarray(index + delimiter.length);
+        state = 'boundary';
+      }
+
+      if (state === 'boundary') {
+        if (pending.length < 2) return;
+        if (pending[0] === 0x2d && pending[1] === 0x2d) {
+          state = 'done';
+          return;
+        }
+        pending = pending.subarray(2);
+        state = 'headers';
+      }
+
+      if (state === 'headers') {
+        const end = pending.indexOf('\r\n\r\n');
+        if (end === -1) {
+          if (pending.length > MAX_HEADER_BYTES) throw new UploadError(400, 'Cabeçalho multipart inválido');
+          return;
+        }
+        const headers = parsePartHeaders(pending.subarray(0, end).toString('utf8'));
+        pending = pending.subarray(end + 4);
+
+        if (headers.filename !== null) {
+          part = headers.name === fileField && !file
+            ? await openFilePart(dir, headers.filename, { allowedTypes, maxSize, formatHint })
+            : discardPart;
+        } else if (headers.name) {
+          part = openFieldPart(headers.name, fields);
+        } else {
+          part = discardPart;
+        }
+        state = 'body';
+      }
+    }
+  };
+
+  try {
+    for await (const chunk of request.body) {
+      if (state === 'done') continue;
+      pending = pending.length > 0 ? Buffer.concat([pending, chunk]) : Buffer.from(chunk);
+      await consume();
+    }
+    if (state !== 'done') throw new UploadError(400, 'Upload incompleto');
+  } catch (error) {
+    if (part) await part.abort();
+    await discardUpload(file);
+    throw error;
+  }
+
+  // Arquivo vazio (campo presente sem conteúdo) conta como não enviado
+  if (file && file.size === 0) {
+    await discardUpload(file);
+    file = null;
+  }
+
+  return { fields, file };
+}
+
+/**
+ * Remove o temporário de um upload recebido mas não aproveitado
+ */
+export async function discardUpload(file) {
+  if (file?.tempPath) await unlink(file.tempPath).catch(() => {});
+}
@@ -0,0 +1,85 @@
+/**
+ * SENHAS (argon2id em pool de worker threads)
+ * Hash e verificação rodam em lib/password-worker.js, fora do event loop que atende as
+ * requisições: num pico de logins o bcryptjs (JS puro, custo 10) segurava o loop por dezenas de
+ * ms a cada compare. Senhas novas usam argon2id nativo; hashes bcrypt antigos continuam válidos
+ * e, no login bem-sucedido, são trocados por argon2id (rehashPassword).
+ *
+ *   PASSWORD_HASH_WORKERS   tamanho do pool (padrão: núcleos - 1, entre 1 e 4)
+ */
+
+import os from 'os';
+import { Worker } from 'worker_threads';
+import { WorkerPool } from './worker-pool.js';
+
+// Parâmetros mínimos recomendados pela OWASP para argon2id (19 MiB, 2 passadas)
+export const ARGON2_OPTIONS = { memoryCost: 19456, timeCost: 2, parallelism: 1 };
+
+function poolSize() {
+  const configured = parseInt(process.env.PASSWORD_HASH_WORKERS);
+  if (configured > 0) return configured;
+  return Math.max(1, Math.min(4, os.availableParallelism() - 1));
+}
+
+function getPool() {
+  if (!globalThis.__iudpPasswordPool) {
+    globalThis.__iudpPasswordPool = new WorkerPool(
+      () => new Worker(new URL('./password-worker.js', import.meta.url)),
+      { size: poolSize() }
+    );
+  }
+  return globalThis.__iudpPasswordPool;
+}
+
+/**
+ * Algoritmo do hash gravado ('argon2id', 'bcrypt' ou null)
+ */
+export function hashAlgorithm(hash) {
+  if (typeof hash !== 'string') return null;
+  if (hash.startsWith('$argon2id$')) return 'argon2id';
+  if (/^\$2[aby]\$\d{2}\$/.test(hash)) return 'bcrypt';
+  return null;
+}
+
+/**
+ * Hash que deve ser refeito: bcrypt legado ou argon2id com parâmetros diferentes dos atuais
+ */
+export function needsRehash(hash) {
+  const algorithm = hashAlgorithm(hash);
+  if (algorithm !== 'argon2id') return algorithm === 'bcrypt';
+  const params = /\$m=(\d+),t=(\d+),p=(\d+)\$/.exec(hash);
+  return !params ||
+    parseInt(params[1]) !== ARGON2_OPTIONS.memoryCost ||
+    parseInt(params[2]) !== ARGON2_OPTIONS.timeCost ||
+    parseInt(params[3]) !== ARGON2_OPTIONS.parallelism;
+}
+
+export function hashPassword(password) {
+  return getPool().run({ op: 'hash', password: String(password), options: ARGON2_OPTIONS });
+}
+
+/**
+ * Confere a senha; hash ausente ou em formato desconhecido é senha inválida
+ */
+export async function verifyPassword(password, hash) {
+  if (!hashAlgorithm(hash) || typeof password !== 'string') return false;
+  return getPool().run({ op: 'verify', password, hash });
+}
+
+/**
+ * Troca o hash legado do usuário por argon2id (só se ninguém alterou a senha nesse meio tempo)
+ */
+export async function rehashPassword(db, user, password) {
+  const hash = await hashPassword(password);
+  const result = await db.collection('users').updateOne(
+    { userId: user.userId, password: user.password },
+    { $set: { password: hash } }
+  );
+  if (result.modifiedCount > 0) {
+    console.log(`[PASSWORD] Hash de ${user.userId} migrado de ${hashAlgorithm(user.password)} para argon2id`);
+  }
+}
+
+export function getPasswordHashingStats() {
+  return globalThis.__iudpPasswordPool ? globalThis.__iudpPasswordPool.stats() : { size: poolSize(), workers: 0 };
+}
@@ -0,0 +1,41 @@
+/**
+ * WORKER DE SENHAS (roda fora do event loop principal, via lib/password-hashing)
+ *   { op: 'hash', password, options }   → hash argon2id
+ *   { op: 'verify', password, hash }    → boolean (argon2 ou bcrypt legado)
+ */
+
+import { parentPort } from 'worker_threads';
+
+let argon2 = null;
+let bcrypt = null;
+
+async function loadArgon2() {
+  if (!argon2) argon2 = (await import('argon2')).default;
+  return argon2;
+}
+
+// Só para hashes antigos ($2a$/$2b$) ainda não migrados
+async function loadBcrypt() {
+  if (!bcrypt) bcrypt = (await import('bcryptjs')).default;
+  return bcrypt;
+}
+
+async function handle({ op, password, hash, options }) {
+  if (op === 'hash') {
+    const lib = await loadArgon2();
+    return lib.hash(password, { ...options, type: lib.argon2id });
+  }
+  if (op === 'verify') {
+    if (hash.startsWith('$argon2')) return (await loadArgon2()).verify(hash, password);
+    return (await loadBcrypt()).compare(password, hash);
+  }
+  throw new Error(`Operação desconhecida: ${op}`);
+}
+
+parentPort.on('message', async (message) => {
+  try {
+    parentPort.postMessage({ id: message.id, result: await handle(message) });
+  } catch (error) {
+    parentPort.postMessage({ id: message.id, error: error.message });
+  }
+});
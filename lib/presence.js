@@ -0,0 +1,144 @@
+/**
+ * PRESENÇA (online/offline) EM MEMÓRIA
+ * Heartbeats, login e logout só atualizam a tabela em memória; a cada PRESENCE_FLUSH_MS as
+ * mudanças vão para `users` num único bulkWrite (isOnline/lastActivity). Antes, cada ping de
+ * cada aba abria uma escrita no documento do usuário, que todas as rotas leem.
+ *
+ * Offline por tempo: sem heartbeat por PRESENCE_TIMEOUT_MS o usuário passa a offline, mesmo
+ * sem logout explícito. O flush também corrige no banco quem ficou marcado como online por
+ * um processo anterior (reinício/queda) e não voltou a enviar heartbeat.
+ */
+
+export const PRESENCE_FLUSH_MS = 10000;
+export const PRESENCE_TIMEOUT_MS = 2 * 60 * 1000;
+
+const state = globalThis.__iudpPresence || (globalThis.__iudpPresence = {
+  users: new Map(), // userId → { online, lastActivity (ISO), dirty }
+  timer: null,
+  flushing: null,
+  stats: { heartbeats: 0, flushes: 0, written: 0, expired: 0, staleCleared: 0 }
+});
+
+// Várias batidas entre dois flushes viram uma única escrita (a mais recente)
+function mark(userId, online, nowISO) {
+  if (!userId) return;
+  state.users.set(userId, { online, lastActivity: nowISO, dirty: true });
+}
+
+/**
+ * Heartbeat/login: usuário ativo agora
+ */
+export function touchPresence(userId, nowISO = new Date().toISOString()) {
+  state.stats.heartbeats++;
+  mark(userId, true, nowISO);
+}
+
+/**
+ * Logout explícito
+ */
+export function markOffline(userId, nowISO = new Date().toISOString()) {
+  mark(userId, false, nowISO);
+}
+
+/**
+ * Online segundo a tabela em memória (null = sem informação, vale o que está no banco)
+ */
+export function isUserOnline(userId, now = Date.now()) {
+  const entry = state.users.get(userId);
+  if (!entry) return null;
+  return entry.online && now - Date.parse(entry.lastActivity) <= PRESENCE_TIMEOUT_MS;
+}
+
+/**
+ * Sobrepõe a presença em memória aos documentos lidos do banco (ex.: users/list)
+ */
+export function applyPresence(users, now = Date.now()) {
+  for (const user of users) {
+    const entry = state.users.get(user.userId);
+    if (!entry) continue;
+    user.isOnline = isUserOnline(user.userId, now);
+    user.lastActivity = entry.lastActivity;
+  }
+  return users;
+}
+
+function expire(now) {
+  for (const entry of state.users.values()) {
+    if (entry.online && now - Date.parse(entry.lastActivity) > PRESENCE_TIMEOUT_MS) {
+      entry.online = false;
+      entry.dirty = true;
+      state.stats.expired++;
+    }
+  }
+}
+
+/**
+ * Grava as mudanças pendentes num bulkWrite e marca como offline os online antigos do banco
+ */
+export async function flushPresence(db, now = Date.now()) {
+  if (state.flushing) return state.flushing;
+
+  state.flushing = (async () => {
+    expire(now);
+
+    const pending = [...state.users.entries()].filter(([, entry]) => entry.dirty);
+    for (const [, entry] of pending) entry.dirty = false;
+
+    try {
+      if (pending.length > 0) {
+        await db.collection('users').bulkWrite(
+          pending.map(([userId, entry]) => ({
+            updateOne: {
+              filter: { userId },
+              update: { $set: { isOnline: entry.online, lastActivity: entry.lastActivity } }
+            }
+          })),
+          { ordered: false }
+        );
+        state.stats.written += pending.length;
+      }
+
+      // Offline gravado: a entrada só volta se chegar novo heartbeat
+      for (const [userId, entry] of pending) {
+        if (!entry.online && state.users.get(userId) === entry && !entry.dirty) state.users.delete(userId);
+      }
+
+      const cutoff = new Date(now - PRESENCE_TIMEOUT_MS).toISOString();
+      const stale = await db.collection('users').updateMany(
+        { isOnline: true, lastActivity: { $lt: cutoff }, userId: { $nin: [...state.users.keys()] } },
+        { $set: { isOnline: false } }
+      );
+      state.stats.staleCleared += stale.modifiedCount || 0;
+      state.stats.flushes++;
+    } catch (error) {
+      // Tenta de novo no próximo ciclo
+      for (const [userId, entry] of pending) {
+        const current = state.users.get(userId);
+        if (current === entry) entry.dirty = true;
+      }
+      throw error;
+    }
+  })().finally(() => {
+    state.flushing = null;
+  });
+
+  return state.flushing;
+}
+
+export function startPresenceFlusher(db) {
+  if (state.timer) return;
+  state.timer = setInterval(() => {
+    flushPresence(db).catch(error => console.error('[PRESENCE] Erro ao gravar presença:', error.message));
+  }, PRESENCE_FLUSH_MS);
+  state.timer.unref?.();
+}
+
+export function getPresenceStats(now = Date.now()) {
+  let online = 0;
+  let pending = 0;
+  for (const [userId, entry] of state.users) {
+    if (isUserOnline(userId, now)) online++;
+    if (entry.dirty) pending++;
+  }
+  return { tracked: state.users.size, online, pending, ...state.stats };
+}
@@ -0,0 +1,100 @@
+/**
+ * REPOSITÓRIOS - MONGODB
+ * As mesmas consultas que route.js fazia direto nas coleções (e com os mesmos índices de
+ * lib/db-indexes.js), atrás da interface comum de lib/repositories.js.
+ */
+
+import { findPage } from './keyset-pagination.js';
+import { listChurchesWithPastor, listUsersWithChurch } from './admin-lists.js';
+import { getListQueryMaxTimeMs } from './mongo-connection.js';
+
+export function createMongoRepositories(db) {
+  const collection = (name) => db.collection(name);
+  // Listas pesadas: cortadas no servidor após MONGO_LIST_MAX_TIME_MS
+  const maxTimeMS = () => getListQueryMaxTimeMs() || undefined;
+
+  return {
+    engine: 'mongo',
+
+    users: {
+      findById: async (userId) => collection('users').findOne({ userId }),
+      findByEmail: async (email) => collection('users').findOne({ email }),
+      listWithChurch: async () => listUsersWithChurch(db, { maxTimeMS: maxTimeMS() }),
+      insert: async (doc) => { await collection('users').insertOne(doc); },
+      insertMany: async (docs) => (await collection('users').insertMany(docs)).insertedCount,
+      update: async (userId, changes) => (await collection('users').updateOne({ userId }, { $set: changes })).matchedCount > 0
+    },
+
+    churches: {
+      findById: async (churchId) => collection('churches').findOne({ churchId }),
+      listWithPastor: async () => listChurchesWithPastor(db, { maxTimeMS: maxTimeMS() }),
+      insert: async (doc) => { await collection('churches').insertOne(doc); },
+      insertMany: async (docs) => (await collection('churches').insertMany(docs)).insertedCount,
+      update: async (churchId, changes) => (await collection('churches').updateOne({ churchId }, { $set: changes })).matchedCount > 0
+    },
+
+    entries: {
+      findByEntryId: async (entryId) => collection('entries').findOne({ entryId }),
+      findByEntryIds: async (entryIds) => collection('entries').find({ entryId: { $in: entryIds } }).toArray(),
+      find: async (criteria, { projection } = {}) => collection('entries').find(criteria, { projection, maxTimeMS: maxTimeMS() }).toArray(),
+      // Uma escrita para todos os lançamentos (upsert por entryId)
+      upsertMany: async (entries) => {
+        await collection('entries').bulkWrite(
+          entries.map(entry => ({
+            updateOne: { filter: { entryId: entry.entryId }, update: { $set: entry }, upsert: true }
+          })),
+          { ordered: false }
+        );
+      },
+      // Upsert devolvendo o documento anterior de cada lançamento (null = criado), lido na mesma
+      // operação atômica da escrita: gravações simultâneas do mesmo horário não veem o mesmo "antes"
+      upsertReturningPrevious: async (entries) => Promise.all(entries.map(entry => collection('entries').findOneAndUpdate(
+        { entryId: entry.entryId },
+        { $set: entry },
+        { upsert: true, returnDocument: 'before' }
+      ))),
+      insertMany: async (docs) => (await collection('entries').insertMany(docs, { ordered: false })).insertedCount
+    },
+
+    costs: {
+      findById: async (costId) => collection('costs_entries').findOne({ costId }),
+      listPage: async (criteria, { limit, cursor, projection } = {}) => findPage(collection('costs_entries'), criteria, {
+        sortField: 'createdAt', idField: 'costId', limit, cursor, projection, maxTimeMS: maxTimeMS()
+      }),
+      insert: async (doc) => { await collection('costs_entries').insertOne(doc); },
+      insertMany: async (docs) => (await collection('costs_entries').insertMany(docs, { ordered: false })).insertedCount,
+      update: async (costId, changes) => (await collection('costs_entries').updateOne({ costId }, { $set: changes })).matchedCount > 0
+    },
+
+    audit: {
+      insertMany: async (records) => (await collection('audit_logs').insertMany(records, { ordered: false })).insertedCount,
+      listPage: async (criteria, { limit, cursor, projection } = {}) => findPage(collection('audit_logs'), criteria, {
+        sortField: 'timestamp', idField: 'logId', limit, cursor, projection, maxTimeMS: maxTimeMS()
+      })
+    },
+
+    overrides: {
+      findActiveTimeOverride: async ({ churchId, userId, month, year, day, timeSlot }, nowISO) => collection('time_overrides').findOne({
+        $or: [
+          { churchId, month, year, day, timeSlot },
+          { userId, month, year, day, timeSlot }
+        ],
+        expiresAt: { $gt: nowISO }
+      }),
+      findActiveTimeOverrides: async ({ churchId, userId }, nowISO) => collection('time_overrides').find({
+        $or: [{ churchId }, { userId }],
+        expiresAt: { $gt: nowISO }
+      }).toArray(),
+      findActiveEditOverride: async (entryId, nowISO) => collection('edit_overrides').findOne({ entryId, expiresAt: { $gt: nowISO } }),
+      findActiveEditOverrides: async (entryIds, nowISO) => collection('edit_overrides').find({
+        entryId: { $in: entryIds },
+        expiresAt: { $gt: nowISO }
+      }).toArray(),
+      insertTimeOverride: async (doc) => { await collection('time_overrides').insertOne(doc); },
+      insertEditOverride: async (doc) => { await collection('edit_overrides').insertOne(doc); }
+    },
+
+    // A conexão pertence a quem criou o Db (connectDB)
+    close: async () => {}
+  };
+}
@@ -0,0 +1,406 @@
+/**
+ * REPOSITÓRIOS - SQLITE EMBUTIDO (better-sqlite3)
+ * Backend em um arquivo local. Cada tabela guarda o documento inteiro em
+ * `doc` (JSON) e repete em colunas só os campos filtrados/ordenados, com os mesmos índices
+ * de lib/db-indexes.js. Os filtros aceitos são um subconjunto dos filtros do MongoDB:
+ * campo → valor ou { $gt, $gte, $lt, $lte, $in }, apenas em colunas declaradas.
+ *
+ * better-sqlite3 é síncrono: os métodos continuam async para manter a mesma interface do
+ * backend MongoDB (lib/repositories-mongo.js).
+ */
+
+import { mkdirSync } from 'fs';
+import path from 'path';
+import { decodeCursor, encodeCursor } from './keyset-pagination.js';
+import { pickFields } from './response-fields.js';
+import { withChurchName, withPastor } from './admin-lists.js';
+
+export const DEFAULT_SQLITE_FILE = 'data/iudp.sqlite';
+
+// Colunas indexáveis por tabela (o resto do documento fica só em `doc`)
+export const SQLITE_TABLES = {
+  users: {
+    key: 'userId',
+    columns: { userId: 'TEXT', email: 'TEXT', churchId: 'TEXT', role: 'TEXT', name: 'TEXT' },
+    unique: [['userId']],
+    indexes: [['email'], ['churchId'], ['role', 'name']]
+  },
+  churches: {
+    key: 'churchId',
+    columns: { churchId: 'TEXT', name: 'TEXT', pastorId: 'TEXT', createdAt: 'TEXT' },
+    unique: [['churchId']],
+    indexes: [['name'], ['createdAt']]
+  },
+  entries: {
+    // entryId não é único: save-batch/entries/save fazem upsert pelo primeiro que encontrarem
+    key: 'entryId',
+    columns: {
+      entryId: 'TEXT', userId: 'TEXT', year: 'INTEGER', month: 'INTEGER', day: 'INTEGER', timeSlot: 'TEXT',
+      state: 'TEXT', region: 'TEXT', church: 'TEXT', churchId: 'TEXT'
+    },
+    unique: [],
+    indexes: [
+      ['entryId', 'userId'],
+      ['year', 'month', 'day', 'timeSlot'],
+      ['year', 'month', 'state', 'region'],
+      ['year', 'month', 'church'],
+      ['year', 'month', 'churchId'],
+      ['year', 'month', 'userId']
+    ]
+  },
+  costs_entries: {
+    key: 'costId',
+    columns: { costId: 'TEXT', churchId: 'TEXT', status: 'TEXT', dueDate: 'TEXT', createdAt: 'TEXT' },
+    unique: [['costId']],
+    indexes: [
+      ['dueDate'],
+      ['churchId', 'dueDate'],
+      ['churchId', 'status', 'createdAt', 'costId'],
+      ['churchId', 'createdAt', 'costId'],
+      ['status', 'createdAt', 'costId'],
+      ['createdAt', 'costId']
+    ]
+  },
+  audit_logs: {
+    key: 'logId',
+    columns: { logId: 'TEXT', action: 'TEXT', userId: 'TEXT', timestamp: 'TEXT' },
+    unique: [['logId']],
+    indexes: [['timestamp', 'logId'], ['action', 'timestamp', 'logId'], ['userId', 'timestamp', 'logId']]
+  },
+  time_overrides: {
+    key: 'overrideId',
+    columns: {
+      overrideId: 'TEXT', churchId: 'TEXT', userId: 'TEXT', year: 'INTEGER', month: 'INTEGER', day: 'INTEGER',
+      timeSlot: 'TEXT', expiresAt: 'TEXT'
+    },
+    unique: [],
+    indexes: [
+      ['churchId', 'year', 'month', 'day', 'timeSlot', 'expiresAt'],
+      ['userId', 'year', 'month', 'day', 'timeSlot', 'expiresAt'],
+      ['userId', 'expiresAt'],
+      ['expiresAt']
+    ]
+  },
+  edit_overrides: {
+    key: 'overrideId',
+    columns: { overrideId: 'TEXT', entryId: 'TEXT', expiresAt: 'TEXT' },
+    unique: [],
+    indexes: [['entryId', 'expiresAt'], ['expiresAt']]
+  }
+};
+
+const RANGE_OPERATORS = { $gt: '>', $gte: '>=', $lt: '<', $lte: '<=' };
+
+function quote(name) {
+  return `"${name}"`;
+}
+
+/**
+ * CREATE TABLE/INDEX (idempotentes) de todas as tabelas
+ */
+export function schemaStatements(tables = SQLITE_TABLES) {
+  const statements = [];
+  for (const [table, spec] of Object.entries(tables)) {
+    const columns = Object.entries(spec.columns).map(([name, type]) => `${quote(name)} ${type}`);
+    statements.push(
+      `CREATE TABLE IF NOT EXISTS ${quote(table)} (id INTEGER PRIMARY KEY, ${columns.join(', ')}, doc TEXT NOT NULL)`
+    );
+    for (const [unique, list] of [[true, spec.unique], [false, spec.indexes]]) {
+      for (const fields of list) {
+        statements.push(
+          `CREATE ${unique ? 'UNIQUE INDEX' : 'INDEX'} IF NOT EXISTS ${quote(`${table}_${fields.join('_')}`)} ` +
+          `ON ${quote(table)} (${fields.map(quote).join(', ')})`
+        );
+      }
+    }
+  }
+  return statements;
+}
+
+// better-sqlite3 não aceita boolean/undefined como parâmetro
+function toParam(value) {
+  if (value === undefined) return null;
+  if (typeof value === 'boolean') return value ? 1 : 0;
+  return value;
+}
+
+/**
+ * Filtro no formato do MongoDB → { where, params }. Campo ou operador fora do subconjunto
+ * suportado é erro (melhor falhar do que varrer a tabela ou ignorar a condição).
+ */
+export function compileCriteria(table, criteria = {}) {
+  const spec = SQLITE_TABLES[table];
+  const clauses = [];
+  const params = [];
+
+  for (const [field, condition] of Object.entries(criteria)) {
+    if (!spec.columns[field]) {
+      throw new Error(`[SQLITE] Campo sem coluna em ${table}: ${field}`);
+    }
+    const column = quote(field);
+
+    if (condition === null || condition === undefined) {
+      clauses.push(`${column} IS NULL`);
+    } else if (typeof condition !== 'object') {
+      clauses.push(`${column} = ?`);
+      params.push(toParam(condition));
+    } else {
+      for (const [operator, value] of Object.entries(condition)) {
+        if (RANGE_OPERATORS[operator]) {
+          clauses.push(`${column} ${RANGE_OPERATORS[operator]} ?`);
+          params.push(toParam(value));
+        } else if (operator === '$in') {
+          if (value.length === 0) {
+            clauses.push('0');
+          } else {
+            clauses.push(`${column} IN (${value.map(() => '?').join(', ')})`);
+            params.push(...value.map(toParam));
+          }
+        } else {
+          throw new Error(`[SQLITE] Operador não suportado em ${table}.${field}: ${operator}`);
+        }
+      }
+    }
+  }
+
+  return { where: clauses.length > 0 ? clauses.join(' AND ') : '1', params };
+}
+
+/**
+ * Página keyset (sortField desc, idField desc) + contagem, como findPage de keyset-pagination
+ */
+export function buildPageQuery(table, criteria, { sortField, idField, limit, cursor }) {
+  const { where, params } = compileCriteria(table, criteria);
+  const after = decodeCursor(cursor);
+  const sort = quote(sortField);
+  const id = quote(idField);
+
+  let sql = `SELECT doc FROM ${quote(table)} WHERE ${where}`;
+  const pageParams = [...params];
+  if (after) {
+    sql += ` AND (${sort} < ? OR (${sort} = ? AND ${id} < ?))`;
+    pageParams.push(toParam(after.v), toParam(after.v), toParam(after.id));
+  }
+  sql += ` ORDER BY ${sort} DESC, ${id} DESC`;
+  if (limit) {
+    sql += ' LIMIT ?';
+    pageParams.push(limit + 1);
+  }
+
+  return {
+    sql,
+    params: pageParams,
+    countSql: `SELECT COUNT(*) AS total FROM ${quote(table)} WHERE ${where}`,
+    countParams: params
+  };
+}
+
+/**
+ * Projeção de inclusão do MongoDB ({ _id: 0, a: 1, 'b.c': 1 }, um nível de subcampo) em memória
+ */
+export function applyProjection(doc, projection) {
+  if (!projection) return doc;
+  const fields = [];
+  const nested = {};
+  for (const [pathName, include] of Object.entries(projection)) {
+    if (!include || pathName === '_id') continue;
+    const [field, sub] = pathName.split('.');
+    if (!fields.includes(field)) fields.push(field);
+    if (sub) (nested[field] = nested[field] || []).push(sub);
+  }
+  return pickFields(doc, fields, nested);
+}
+
+function parseDoc(row) {
+  return row ? JSON.parse(row.doc) : null;
+}
+
+/**
+ * Repositórios sobre uma conexão better-sqlite3 já aberta (schema criado por openSqliteRepositories)
+ */
+export function createSqliteRepositories(sqlite) {
+  const statements = new Map();
+  const prepare = (sql) => {
+    let statement = statements.get(sql);
+    if (!statement) {
+      statement = sqlite.prepare(sql);
+      statements.set(sql, statement);
+    }
+    return statement;
+  };
+
+  const rowValues = (table, doc) => Object.keys(SQLITE_TABLES[table].columns).map(field => toParam(doc[field]));
+
+  const insertSql = (table, orIgnore = false) => {
+    const columns = Object.keys(SQLITE_TABLES[table].columns);
+    return `INSERT ${orIgnore ? 'OR IGNORE ' : ''}INTO ${quote(table)} (${columns.map(quote).join(', ')}, doc) ` +
+      `VALUES (${columns.map(() => '?').join(', ')}, ?)`;
+  };
+
+  const insertDocs = (table, docs, orIgnore = false) => {
+    const statement = prepare(insertSql(table, orIgnore));
+    let inserted = 0;
+    sqlite.transaction(() => {
+      for (const { _id, ...doc } of docs) {
+        inserted += statement.run(...rowValues(table, doc), JSON.stringify(doc)).changes;
+      }
+    })();
+    return inserted;
+  };
+
+  const findBy = (table, criteria, projection) => {
+    const { where, params } = compileCriteria(table, criteria);
+    return prepare(`SELECT doc FROM ${quote(table)} WHERE ${where}`).all(...params)
+      .map(row => applyProjection(parseDoc(row), projection));
+  };
+
+  const findOne = (table, criteria) => {
+    const { where, params } = compileCriteria(table, criteria);
+    return parseDoc(prepare(`SELECT doc FROM ${quote(table)} WHERE ${where} LIMIT 1`).get(...params));
+  };
+
+  // $set do MongoDB: mescla os campos no documento existente
+  const updateByKey = (table, key, changes) => {
+    const { key: keyField } = SQLITE_TABLES[table];
+    const row = prepare(`SELECT id, doc FROM ${quote(table)} WHERE ${quote(keyField)} = ? LIMIT 1`).get(key);
+    if (!row) return false;
+    writeRow(table, row.id, { ...JSON.parse(row.doc), ...changes });
+    return true;
+  };
+
+  const writeRow = (table, id, doc) => {
+    const columns = Object.keys(SQLITE_TABLES[table].columns);
+    prepare(`UPDATE ${quote(table)} SET ${columns.map(c => `${quote(c)} = ?`).join(', ')}, doc = ? WHERE id = ?`)
+      .run(...rowValues(table, doc), JSON.stringify(doc), id);
+  };
+
+  const findPage = (table, criteria, { sortField, idField, limit, cursor, projection }) => {
+    const query = buildPageQuery(table, criteria, { sortField, idField, limit, cursor });
+    const items = prepare(query.sql).all(...query.params).map(parseDoc);
+    const { total } = prepare(query.countSql).get(...query.countParams);
+
+    const hasMore = Boolean(limit) && items.length > limit;
+    if (hasMore) items.pop();
+
+    return {
+      items: items.map(doc => applyProjection(doc, projection)),
+      total,
+      hasMore,
+      nextCursor: hasMore ? encodeCursor(items[items.length - 1], sortField, idField) : null
+    };
+  };
+
+  const slotClause = 'year = ? AND month = ? AND day = ? AND timeSlot = ? AND expiresAt > ?';
+
+  return {
+    engine: 'sqlite',
+
+    users: {
+      findById: async (userId) => findOne('users', { userId }),
+      findByEmail: async (email) => findOne('users', { email }),
+      listWithChurch: async () => prepare(
+        'SELECT u.doc, c.name AS linkedChurchName FROM users u LEFT JOIN churches c ON c.churchId = u.churchId'
+      ).all().map(row => {
+        const { password, ...user } = parseDoc(row);
+        return withChurchName(user, row.linkedChurchName);
+      }),
+      insert: async (doc) => { insertDocs('users', [doc]); },
+      insertMany: async (docs) => insertDocs('users', docs),
+      update: async (userId, changes) => updateByKey('users', userId, changes)
+    },
+
+    churches: {
+      findById: async (churchId) => findOne('churches', { churchId }),
+      listWithPastor: async () => prepare(
+        'SELECT c.doc, p.doc AS pastorDoc FROM churches c LEFT JOIN users p ON p.userId = c.pastorId ORDER BY c.createdAt DESC'
+      ).all().map(row => {
+        const pastor = row.pastorDoc ? JSON.parse(row.pastorDoc) : null;
+        if (pastor) delete pastor.password;
+        return withPastor(parseDoc(row), pastor);
+      }),
+      insert: async (doc) => { insertDocs('churches', [doc]); },
+      insertMany: async (docs) => insertDocs('churches', docs),
+      update: async (churchId, changes) => updateByKey('churches', churchId, changes)
+    },
+
+    entries: {
+      findByEntryId: async (entryId) => findOne('entries', { entryId }),
+      findByEntryIds: async (entryIds) => findBy('entries', { entryId: { $in: entryIds } }),
+      find: async (criteria, { projection } = {}) => findBy('entries', criteria, projection),
+      upsertMany: async (entries) => {
+        sqlite.transaction(() => {
+          for (const { _id, ...entry } of entries) {
+            if (!updateByKey('entries', entry.entryId, entry)) insertDocs('entries', [entry]);
+          }
+        })();
+      },
+      // Leitura e escrita na mesma transação (better-sqlite3 é síncrono: nada intercala)
+      upsertReturningPrevious: async (entries) => sqlite.transaction(() => entries.map(({ _id, ...entry }) => {
+        const previous = findOne('entries', { entryId: entry.entryId });
+        if (!updateByKey('entries', entry.entryId, entry)) insertDocs('entries', [entry]);
+        return previous;
+      }))(),
+      insertMany: async (docs) => insertDocs('entries', docs)
+    },
+
+    costs: {
+      findById: async (costId) => findOne('costs_entries', { costId }),
+      listPage: async (criteria, { limit, cursor, projection } = {}) => findPage('costs_entries', criteria, {
+        sortField: 'createdAt', idField: 'costId', limit, cursor, projection
+      }),
+      insert: async (doc) => { insertDocs('costs_entries', [doc]); },
+      insertMany: async (docs) => insertDocs('costs_entries', docs),
+      update: async (costId, changes) => updateByKey('costs_entries', costId, changes)
+    },
+
+    audit: {
+      // logId único: reenvio do audit-writer não duplica (como o insertMany não ordenado)
+      insertMany: async (records) => insertDocs('audit_logs', records, true),
+      listPage: async (criteria, { limit, cursor, projection } = {}) => findPage('audit_logs', criteria, {
+        sortField: 'timestamp', idField: 'logId', limit, cursor, projection
+      })
+    },
+
+    overrides: {
+      findActiveTimeOverride: async ({ churchId, userId, month, year, day, timeSlot }, nowISO) => {
+        const slot = [year, month, day, timeSlot, nowISO].map(toParam);
+        return parseDoc(prepare(
+          `SELECT doc FROM time_overrides WHERE (churchId = ? AND ${slotClause}) OR (userId = ? AND ${slotClause}) LIMIT 1`
+        ).get(toParam(churchId), ...slot, toParam(userId), ...slot));
+      },
+      findActiveTimeOverrides: async ({ churchId, userId }, nowISO) => prepare(
+        'SELECT doc FROM time_overrides WHERE (churchId = ? AND expiresAt > ?) OR (userId = ? AND expiresAt > ?)'
+      ).all(toParam(churchId), nowISO, toParam(userId), nowISO).map(parseDoc),
+      findActiveEditOverride: async (entryId, nowISO) => findOne('edit_overrides', { entryId, expiresAt: { $gt: nowISO } }),
+      findActiveEditOverrides: async (entryIds, nowISO) => findBy('edit_overrides', {
+        entryId: { $in: entryIds },
+        expiresAt: { $gt: nowISO }
+      }),
+      insertTimeOverride: async (doc) => { insertDocs('time_overrides', [doc]); },
+      insertEditOverride: async (doc) => { insertDocs('edit_overrides', [doc]); }
+    },
+
+    close: async () => sqlite.close()
+  };
+}
+
+/**
+ * Abre (ou cria) o arquivo SQLITE_FILE. better-sqlite3 é opcional: só é carregado aqui.
+ */
+export async function openSqliteRepositories(file = process.env.SQLITE_FILE || DEFAULT_SQLITE_FILE) {
+  let Database;
+  try {
+    ({ default: Database } = await import('better-sqlite3'));
+  } catch (error) {
+    throw new Error(`[SQLITE] O backend embutido requer o pacote better-sqlite3: ${error.message}`);
+  }
+
+  if (file !== ':memory:') mkdirSync(path.dirname(path.resolve(file)), { recursive: true });
+  const sqlite = new Database(file);
+  sqlite.pragma('journal_mode = WAL');
+  sqlite.pragma('synchronous = NORMAL');
+  for (const statement of schemaStatements()) sqlite.exec(statement);
+
+  console.log(`[SQLITE] Banco embutido aberto em ${file}`);
+  return createSqliteRepositories(sqlite);
+}
@@ -0,0 +1,46 @@
+/**
+ * CAMADA DE REPOSITÓRIOS (entries, costs, users, churches, audit, overrides)
+ * Interface única para as consultas quentes da API, com dois motores:
+ *   - mongo: as coleções atuais (lib/repositories-mongo.js)
+ *   - sqlite: arquivo embutido com better-sqlite3 (lib/repositories-sqlite.js), hoje usado
+ *     só via createRepositories (benchmarks/storage_bench.js compara os dois motores)
+ *
+ * Os handlers da API usam repositoriesFor(db) (MongoDB); as demais coleções (roles, custos,
+ * unlock_requests, month_status, observações, rollups...) ainda são acessadas direto, então a
+ * API não roda sem um servidor MongoDB: o motor SQLite não é selecionável por ela.
+ */
+
+import { createMongoRepositories } from './repositories-mongo.js';
+import { DEFAULT_SQLITE_FILE, openSqliteRepositories } from './repositories-sqlite.js';
+
+export const STORAGE_ENGINES = ['mongo', 'sqlite'];
+
+const byDb = new WeakMap();
+
+/**
+ * Cria os repositórios do motor pedido
+ *   { engine: 'mongo', db }            → sobre um Db já conectado
+ *   { engine: 'sqlite', file }         → abre/cria o arquivo (padrão SQLITE_FILE ou data/iudp.sqlite)
+ */
+export async function createRepositories({ engine = 'mongo', db, file } = {}) {
+  if (engine === 'mongo') {
+    if (!db) throw new Error('[REPOSITORIES] engine "mongo" requer um Db conectado');
+    return repositoriesFor(db);
+  }
+  if (engine === 'sqlite') {
+    return openSqliteRepositories(file || process.env.SQLITE_FILE || DEFAULT_SQLITE_FILE);
+  }
+  throw new Error(`[REPOSITORIES] Motor desconhecido: ${engine} (use ${STORAGE_ENGINES.join(' ou ')})`);
+}
+
+/**
+ * Repositórios MongoDB de um Db (um objeto por Db, reaproveitado entre requisições)
+ */
+export function repositoriesFor(db) {
+  let repositories = byDb.get(db);
+  if (!repositories) {
+    repositories = createMongoRepositories(db);
+    byDb.set(db, repositories);
+  }
+  return repositories;
+}
@@ -0,0 +1,264 @@
+/**
+ * MÉTRICAS POR ENDPOINT
+ * withRequestMetrics envolve os handlers POST/GET da rota catch-all e registra, por endpoint:
+ * tempo total, operações no MongoDB (command monitoring do driver), tempo no MongoDB e tempo
+ * em hash/verificação de senha. Cada requisição roda num AsyncLocalStorage, então um comando do driver é somado à
+ * requisição que o disparou; comandos fora de requisição (agendadores, change stream, buffer de
+ * auditoria) vão para o endpoint "_background".
+ *
+ * Exposição em formato Prometheus (renderMetrics → GET /api/metrics). Requisições acima de
+ * SLOW_REQUEST_MS (padrão 1000) saem no log como [SLOW].
+ *
+ * Em respostas em streaming (SSE, arquivos) o tempo medido vai até o envio dos cabeçalhos.
+ */
+
+import { AsyncLocalStorage } from 'async_hooks';
+import { createHash, timingSafeEqual } from 'crypto';
+
+export const DURATION_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+// Teto de rótulos distintos: caminhos desconhecidos além disso viram "other"
+const MAX_ENDPOINTS = 200;
+const BACKGROUND = '_background';
+
+const DYNAMIC_PREFIXES = [
+  ['download/receipt/', 'download/receipt/:file'],
+  ['view/receipt/', 'view/receipt/:file'],
+  ['uploads/', 'uploads/:file']
+];
+
+const state = globalThis.__iudpRequestMetrics || (globalThis.__iudpRequestMetrics = {
+  storage: new AsyncLocalStorage(),
+  endpoints: new Map(),
+  pendingCommands: new Map(),
+  instrumentedClients: new WeakSet()
+});
+
+export function getSlowRequestMs() {
+  const value = parseInt(process.env.SLOW_REQUEST_MS);
+  return Number.isFinite(value) && value >= 0 ? value : 1000;
+}
+
+/**
+ * Rótulo do endpoint a partir do caminho (arquivos e ids não viram rótulos próprios)
+ */
+export function normalizeEndpoint(pathname) {
+  const endpoint = pathname.replace(/^\/api\/?/, '').replace(/\/+$/, '');
+  for (const [prefix, label] of DYNAMIC_PREFIXES) {
+    if (endpoint.startsWith(prefix)) return label;
+  }
+  return endpoint || '/';
+}
+
+function newSeries(method, endpoint) {
+  return {
+    method,
+    endpoint,
+    requests: new Map(), // status → contagem
+    durationSum: 0,
+    buckets: DURATION_BUCKETS.map(() => 0),
+    dbOperations: 0,
+    dbSeconds: 0,
+    passwordOperations: 0,
+    passwordSeconds: 0,
+    slow: 0
+  };
+}
+
+function seriesFor(method, endpoint) {
+  let key = `${method} ${endpoint}`;
+  if (!state.endpoints.has(key) && state.endpoints.size >= MAX_ENDPOINTS) {
+    endpoint = 'other';
+    key = `${method} other`;
+  }
+  let series = state.endpoints.get(key);
+  if (!series) {
+    series = newSeries(method, endpoint);
+    state.endpoints.set(key, series);
+  }
+  return series;
+}
+
+// Requisição em andamento (null fora de requisição ou depois da resposta)
+function activeRequest() {
+  const current = state.storage.getStore();
+  return current && !current.done ? current : null;
+}
+
+function addDbTime(current, seconds) {
+  if (current) {
+    current.dbOperations++;
+    current.dbSeconds += seconds;
+  } else {
+    const series = seriesFor('-', BACKGROUND);
+    series.dbOperations++;
+    series.dbSeconds += seconds;
+  }
+}
+
+/**
+ * Liga o command monitoring do MongoClient (criado com monitorCommands: true)
+ */
+export function instrumentMongoClient(client) {
+  if (state.instrumentedClients.has(client)) return;
+  state.instrumentedClients.add(client);
+
+  client.on('commandStarted', (event) => {
+    state.pendingCommands.set(event.requestId, activeRequest());
+  });
+  const finish = (event) => {
+    if (!state.pendingCommands.has(event.requestId)) return;
+    const current = state.pendingCommands.get(event.requestId);
+    state.pendingCommands.delete(event.requestId);
+    // event.duration em ms; resposta já enviada → conta como trabalho de fundo
+    addDbTime(current && !current.done ? current : null, (event.duration || 0) / 1000);
+  };
+  client.on('commandSucceeded', finish);
+  client.on('commandFailed', finish);
+}
+
+/**
+ * Mede um hash/verificação de senha (lib/password-hashing) na requisição atual
+ */
+export async function timePasswordHashing(fn) {
+  const started = performance.now();
+  try {
+    return await fn();
+  } finally {
+    const current = activeRequest();
+    if (current) {
+      current.passwordOperations++;
+      current.passwordSeconds += (performance.now() - started) / 1000;
+    }
+  }
+}
+
+function record(current, status) {
+  const series = seriesFor(current.method, current.endpoint);
+  const seconds = (performance.now() - current.started) / 1000;
+
+  series.requests.set(status, (series.requests.get(status) || 0) + 1);
+  series.durationSum += seconds;
+  DURATION_BUCKETS.forEach((bound, i) => {
+    if (seconds <= bound) series.buckets[i]++;
+  });
+  series.dbOperations += current.dbOperations;
+  series.dbSeconds += current.dbSeconds;
+  series.passwordOperations += current.passwordOperations;
+  series.passwordSeconds += current.passwordSeconds;
+
+  const ms = Math.round(seconds * 1000);
+  if (ms >= getSlowRequestMs()) {
+    series.slow++;
+    console.warn(
+      `[SLOW] ${current.method} ${current.endpoint} ${ms}ms status=${status} ` +
+      `db=${current.dbOperations} ops/${Math.round(current.dbSeconds * 1000)}ms ` +
+      `password=${Math.round(current.passwordSeconds * 1000)}ms`
+    );
+  }
+}
+
+/**
+ * Envolve um handler de rota (request, context) com a medição por endpoint
+ */
+export function withRequestMetrics(method, handler) {
+  return async function instrumented(request, context) {
+    const current = {
+      method,
+      endpoint: normalizeEndpoint(new URL(request.url).pathname),
+      started: performance.now(),
+      dbOperations: 0,
+      dbSeconds: 0,
+      passwordOperations: 0,
+      passwordSeconds: 0,
+      done: false
+    };
+
+    return state.storage.run(current, async () => {
+      let status = 500;
+      try {
+        const response = await handler(request, context);
+        status = response?.status || 200;
+        return response;
+      } finally {
+        current.done = true;
+        record(current, status);
+      }
+    });
+  };
+}
+
+function escapeLabel(value) {
+  return String(value).replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+}
+
+function labels(values) {
+  return `{${Object.entries(values).map(([k, v]) => `${k}="${escapeLabel(v)}"`).join(',')}}`;
+}
+
+function round(value) {
+  return Math.round(value * 1e6) / 1e6;
+}
+
+/**
+ * Texto no formato de exposição do Prometheus (text/plain; version=0.0.4)
+ */
+export function renderMetrics() {
+  const lines = [];
+  const all = [...state.endpoints.values()];
+  const requestSeries = all.filter(s => s.endpoint !== BACKGROUND);
+  const metric = (name, type, help) => lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} ${type}`);
+
+  metric('iudp_http_requests_total', 'counter', 'Requisições por endpoint e status');
+  for (const s of requestSeries) {
+    for (const [status, count] of s.requests) {
+      lines.push(`iudp_http_requests_total${labels({ method: s.method, endpoint: s.endpoint, status })} ${count}`);
+    }
+  }
+
+  metric('iudp_http_request_duration_seconds', 'histogram', 'Tempo total da requisição');
+  for (const s of requestSeries) {
+    const base = { method: s.method, endpoint: s.endpoint };
+    const count = [...s.requests.values()].reduce((sum, n) => sum + n, 0);
+    DURATION_BUCKETS.forEach((bound, i) => {
+      lines.push(`iudp_http_request_duration_seconds_bucket${labels({ ...base, le: bound })} ${s.buckets[i]}`);
+    });
+    lines.push(`iudp_http_request_duration_seconds_bucket${labels({ ...base, le: '+Inf' })} ${count}`);
+    lines.push(`iudp_http_request_duration_seconds_sum${labels(base)} ${round(s.durationSum)}`);
+    lines.push(`iudp_http_request_duration_seconds_count${labels(base)} ${count}`);
+  }
+
+  metric('iudp_db_operations_total', 'counter', 'Comandos enviados ao MongoDB');
+  for (const s of all) lines.push(`iudp_db_operations_total${labels({ method: s.method, endpoint: s.endpoint })} ${s.dbOperations}`);
+
+  metric('iudp_db_seconds_total', 'counter', 'Tempo gasto em comandos do MongoDB');
+  for (const s of all) lines.push(`iudp_db_seconds_total${labels({ method: s.method, endpoint: s.endpoint })} ${round(s.dbSeconds)}`);
+
+  metric('iudp_password_hash_operations_total', 'counter', 'Hashes/verificações de senha');
+  for (const s of requestSeries) lines.push(`iudp_password_hash_operations_total${labels({ method: s.method, endpoint: s.endpoint })} ${s.passwordOperations}`);
+
+  metric('iudp_password_hash_seconds_total', 'counter', 'Tempo de hash/verificação de senha (inclui fila do pool)');
+  for (const s of requestSeries) lines.push(`iudp_password_hash_seconds_total${labels({ method: s.method, endpoint: s.endpoint })} ${round(s.passwordSeconds)}`);
+
+  metric('iudp_slow_requests_total', 'counter', 'Requisições acima de SLOW_REQUEST_MS');
+  for (const s of requestSeries) lines.push(`iudp_slow_requests_total${labels({ method: s.method, endpoint: s.endpoint })} ${s.slow}`);
+
+  return lines.join('\n') + '\n';
+}
+
+// Comparação em tempo constante (hash iguala os tamanhos)
+function sameSecret(a, b) {
+  const digest = (value) => createHash('sha256').update(value).digest();
+  return timingSafeEqual(digest(a), digest(b));
+}
+
+/**
+ * /api/metrics exige credencial: `Authorization: Bearer $METRICS_TOKEN` (coletor Prometheus)
+ * ou o token JWT de um Master (user = payload já verificado). Cabeçalhos de proxy não contam:
+ * x-forwarded-for pode faltar ou ser forjado
+ */
+export function canReadMetrics(request, user) {
+  const token = process.env.METRICS_TOKEN;
+  const header = request.headers.get('authorization') || '';
+  if (token && header.startsWith('Bearer ') && sameSecret(header.slice('Bearer '.length), token)) return true;
+  return user?.role === 'master';
+}
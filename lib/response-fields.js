@@ -0,0 +1,119 @@
+/**
+ * CAMPOS DAS LISTAS PESADAS (projeção por endpoint)
+ * Cada endpoint declara os campos que as telas usam. Sem o parâmetro `fields` a resposta traz
+ * todos eles; com `fields` (array ou "a,b,c") só os pedidos, sempre somados aos campos-chave.
+ * Campos fora da lista são ignorados: `fields` nunca expõe senha, _id ou controles internos.
+ */
+
+// Comprovantes: só o que o visualizador (nome, tipo, tamanho, data do upload) e o download usam
+export const RECEIPT_FIELDS = ['receiptId', 'filename', 'filepath', 'fileType', 'fileSize', 'uploadedAt'];
+
+// Pastor embutido em churches/list
+export const PASTOR_FIELDS = ['userId', 'name', 'email', 'role', 'cargo', 'telefone', 'photoUrl'];
+
+export const RESPONSE_FIELDS = {
+  'entries/month': {
+    // Chave + o que a trava de janela (isTimeWindowClosed) precisa
+    always: ['entryId', 'year', 'month', 'day', 'timeSlot', 'timeWindowLocked', 'masterUnlocked'],
+    fields: [
+      'value', 'dinheiro', 'pix', 'maquineta', 'notes', 'receipts',
+      'church', 'churchId', 'state', 'region', 'userId', 'userName', 'createdAt', 'updatedAt',
+      // Buckets do calendário do Master
+      'totalValue', 'totalDinheiro', 'totalPix', 'totalMaquineta', 'churchCount', 'churches'
+    ],
+    nested: { receipts: RECEIPT_FIELDS }
+  },
+  'costs-entries/list': {
+    // Keyset: campo de ordenação + desempate
+    always: ['costId', 'createdAt'],
+    fields: [
+      'churchId', 'churchName', 'userId', 'userName', 'costTypeId', 'costTypeName', 'description',
+      'dueDate', 'value', 'billFile', 'paymentDate', 'valuePaid', 'difference', 'proofFile',
+      'status', 'rejectionReason', 'paidAt', 'paidBy', 'updatedAt'
+    ]
+  },
+  'users/list': {
+    always: ['userId'],
+    fields: [
+      'name', 'email', 'role', 'roleId', 'cargo', 'church', 'churchId', 'churchName', 'scope',
+      'state', 'region', 'permissions', 'active', 'isActive', 'isOnline', 'photoUrl', 'telefone',
+      'cep', 'endereco', 'numero', 'complemento', 'cidade', 'estado', 'pais', 'createdAt', 'updatedAt'
+    ]
+  },
+  'churches/list': {
+    always: ['churchId'],
+    fields: [
+      'name', 'cep', 'address', 'number', 'complement', 'neighborhood', 'city', 'state', 'region',
+      'country', 'phone', 'photoUrl', 'pastorId', 'pastor', 'createdAt', 'updatedAt'
+    ],
+    nested: { pastor: PASTOR_FIELDS }
+  },
+  'audit/logs': {
+    always: ['logId', 'timestamp'],
+    fields: ['action', 'userId', 'userName', 'userEmail', 'details']
+  }
+};
+
+/**
+ * `fields` do corpo/query: array ou lista separada por vírgula (null = padrão do endpoint)
+ */
+export function parseFieldsParam(value) {
+  if (value === undefined || value === null || value === '') return null;
+  const list = Array.isArray(value) ? value : String(value).split(',');
+  return list.map(field => String(field).trim()).filter(Boolean);
+}
+
+/**
+ * Campos de primeiro nível da resposta: chaves + pedidos (ou todos os do endpoint)
+ */
+export function resolveFields(endpoint, requested) {
+  const spec = RESPONSE_FIELDS[endpoint];
+  const wanted = parseFieldsParam(requested);
+  const selected = wanted ? spec.fields.filter(field => wanted.includes(field)) : spec.fields;
+  return [...new Set([...spec.always, ...selected])];
+}
+
+/**
+ * Projeção do MongoDB para os campos resolvidos (subcampos conforme `nested`)
+ */
+export function toProjection(endpoint, fields) {
+  const nested = RESPONSE_FIELDS[endpoint].nested || {};
+  const projection = { _id: 0 };
+  for (const field of fields) {
+    if (nested[field]) {
+      for (const sub of nested[field]) projection[`${field}.${sub}`] = 1;
+    } else {
+      projection[field] = 1;
+    }
+  }
+  return projection;
+}
+
+function pickKeys(doc, keys) {
+  const out = {};
+  for (const key of keys) {
+    if (doc[key] !== undefined) out[key] = doc[key];
+  }
+  return out;
+}
+
+/**
+ * Mesma projeção em memória (resultados de aggregate ou montados na rota)
+ */
+export function pickFields(doc, fields, nested = {}) {
+  const out = pickKeys(doc, fields);
+  for (const [field, subfields] of Object.entries(nested)) {
+    const value = out[field];
+    if (Array.isArray(value)) out[field] = value.map(item => pickKeys(item, subfields));
+    else if (value && typeof value === 'object') out[field] = pickKeys(value, subfields);
+  }
+  return out;
+}
+
+/**
+ * Aplica a projeção do endpoint a uma lista já carregada
+ */
+export function projectList(endpoint, docs, fields) {
+  const nested = RESPONSE_FIELDS[endpoint].nested || {};
+  return docs.map(doc => pickFields(doc, fields, nested));
+}
@@ -0,0 +1,83 @@
+/**
+ * JANELAS DE CULTO
+ * Definição única dos horários usada pela API e pelo agendador de travas
+ */
+
+export const TIME_SLOTS = {
+  '08:00': { start: '08:00', end: '10:00' },
+  '10:00': { start: '10:00', end: '12:00' },
+  '12:00': { start: '12:00', end: '15:00' },
+  '15:00': { start: '15:00', end: '19:30' },
+  '19:30': { start: '19:30', end: '22:00' }
+};
+
+export const TOLERANCE_SECONDS = 59; // Tolerância para latência de rede
+
+export const BRAZIL_TIMEZONE = 'America/Sao_Paulo';
+
+// Relógio de parede de Brasília via Intl (mesma base do dayjs.tz usado por getBrazilTime)
+const brazilFormatter = new Intl.DateTimeFormat('en-US', {
+  timeZone: BRAZIL_TIMEZONE,
+  hourCycle: 'h23',
+  year: 'numeric',
+  month: '2-digit',
+  day: '2-digit',
+  hour: '2-digit',
+  minute: '2-digit',
+  second: '2-digit'
+});
+
+// Limites de cada janela em minutos desde a meia-noite, calculados uma vez
+export const SLOT_BOUNDS = Object.fromEntries(
+  Object.entries(TIME_SLOTS).map(([slot, { start, end }]) => [slot, { startMinutes: toMinutes(start), endMinutes: toMinutes(end) }])
+);
+
+export function getTimeWindowEnd(timeSlot) {
+  return TIME_SLOTS[timeSlot]?.end;
+}
+
+/**
+ * Converte 'HH:mm' em minutos desde a meia-noite
+ */
+export function toMinutes(hhmm) {
+  const [hour, minute] = hhmm.split(':').map(Number);
+  return hour * 60 + minute;
+}
+
+/**
+ * Diferença em minutos entre o horário de Brasília e UTC no instante `ms` (-180 hoje)
+ */
+export function getBrazilOffsetMinutes(ms) {
+  const parts = Object.fromEntries(brazilFormatter.formatToParts(new Date(ms)).map(p => [p.type, p.value]));
+  const wallMs = Date.UTC(+parts.year, +parts.month - 1, +parts.day, +parts.hour, +parts.minute, +parts.second);
+  return Math.round((wallMs - Math.floor(ms / 1000) * 1000) / 60000);
+}
+
+/**
+ * Epoch ms de um horário de Brasília (dia + minutos desde a meia-noite)
+ * O offset é conferido no instante resultante, como dayjs.tz faz na virada do horário de verão
+ */
+function brazilTimeToMs(year, month, day, minutes) {
+  const wallMs = Date.UTC(year, month - 1, day) + minutes * 60 * 1000;
+  const guessMs = wallMs - getBrazilOffsetMinutes(wallMs) * 60 * 1000;
+  return wallMs - getBrazilOffsetMinutes(guessMs) * 60 * 1000;
+}
+
+/**
+ * Janela de um culto em epoch ms (início, fim e fim + tolerância), sem parse de data
+ */
+export function getSlotWindow(year, month, day, timeSlot) {
+  const bounds = SLOT_BOUNDS[timeSlot];
+  if (!bounds) return null;
+
+  const [y, m, d] = [parseInt(year), parseInt(month), parseInt(day)];
+  const startMs = brazilTimeToMs(y, m, d, bounds.startMinutes);
+  const endMs = brazilTimeToMs(y, m, d, bounds.endMinutes);
+
+  return {
+    startMs,
+    endMs,
+    cutoffMs: endMs + TOLERANCE_SECONDS * 1000,
+    end: TIME_SLOTS[timeSlot].end
+  };
+}
@@ -0,0 +1,123 @@
+/**
+ * TRAVA DE JANELA DE CULTO
+ * Um agendador em segundo plano marca timeWindowLocked em lote (updateMany) quando cada
+ * janela de TIME_SLOTS fecha, e entries/month apenas calcula o estado na leitura.
+ *
+ * O relógio é recebido como { year, month, day, minutes, seconds } no horário de Brasília,
+ * montado pela API a partir de getBrazilTime().
+ */
+
+import { TIME_SLOTS, getTimeWindowEnd, toMinutes } from './time-slots.js';
+import { publishEvent } from './event-bus.js';
+
+const SLOT_END_MINUTES = Object.keys(TIME_SLOTS)
+  .map(slot => toMinutes(getTimeWindowEnd(slot)))
+  .sort((a, b) => a - b);
+
+// Margem após o fim da janela: a trava vale a partir do minuto seguinte ao fim
+const SWEEP_DELAY_MS = 61 * 1000;
+
+/**
+ * Horários cuja janela já fechou no dia do relógio
+ */
+export function closedSlotsAt(clock) {
+  return Object.keys(TIME_SLOTS).filter(slot => clock.minutes > toMinutes(getTimeWindowEnd(slot)));
+}
+
+/**
+ * Mesma regra que entries/month aplicava lançamento a lançamento
+ */
+export function isTimeWindowClosed(entry, clock, monthClosed = false) {
+  if (entry.timeWindowLocked) return true;
+  if (entry.masterUnlocked || monthClosed) return false;
+
+  const entryKey = parseInt(entry.year) * 10000 + parseInt(entry.month) * 100 + parseInt(entry.day);
+  const todayKey = clock.year * 10000 + clock.month * 100 + clock.day;
+
+  if (entryKey < todayKey) return true;
+  if (entryKey > todayKey) return false;
+
+  const windowEnd = getTimeWindowEnd(entry.timeSlot);
+  return !!windowEnd && clock.minutes > toMinutes(windowEnd);
+}
+
+/**
+ * Filtro dos lançamentos que devem ser travados agora (exceto meses fechados)
+ */
+export function buildLockSweepFilter(clock, closedMonths = []) {
+  const { year, month, day } = clock;
+  const filter = {
+    timeWindowLocked: { $ne: true },
+    masterUnlocked: { $ne: true },
+    $or: [
+      { year: { $lt: year } },
+      { year, month: { $lt: month } },
+      { year, month, day: { $lt: day } },
+      { year, month, day, timeSlot: { $in: closedSlotsAt(clock) } }
+    ]
+  };
+
+  if (closedMonths.length > 0) {
+    filter.$nor = closedMonths.map(m => ({ month: m.month, year: m.year }));
+  }
+
+  return filter;
+}
+
+/**
+ * Trava em uma única updateMany todos os lançamentos com janela encerrada
+ */
+export async function sweepTimeWindowLocks(db, clock) {
+  const closedMonths = await db.collection('month_status')
+    .find({ closed: true }, { projection: { _id: 0, month: 1, year: 1 } })
+    .toArray();
+
+  const result = await db.collection('entries').updateMany(
+    buildLockSweepFilter(clock, closedMonths),
+    { $set: { timeWindowLocked: true } }
+  );
+
+  return result.modifiedCount;
+}
+
+/**
+ * Milissegundos até o próximo fechamento de janela (+ margem)
+ */
+export function msUntilNextSweep(clock) {
+  const nowMs = (clock.minutes * 60 + (clock.seconds || 0)) * 1000;
+  for (const endMinutes of SLOT_END_MINUTES) {
+    const target = endMinutes * 60 * 1000 + SWEEP_DELAY_MS;
+    if (target > nowMs) return target - nowMs;
+  }
+  // Próximo dia: primeiro fechamento de amanhã
+  return 24 * 60 * 60 * 1000 - nowMs + SLOT_END_MINUTES[0] * 60 * 1000 + SWEEP_DELAY_MS;
+}
+
+/**
+ * Inicia o agendador (uma vez por processo): varre na partida e a cada fechamento de janela
+ */
+export function startTimeWindowLockScheduler(db, getClock) {
+  if (globalThis.__iudpTimeWindowLockTimer !== undefined) return;
+
+  const run = async () => {
+    try {
+      const locked = await sweepTimeWindowLocks(db, getClock());
+      if (locked > 0) {
+        console.log('[LOCK SWEEPER] Lançamentos travados:', locked);
+        publishEvent('entry.locked', { all: true }, { locked });
+      }
+    } catch (error) {
+      console.error('[LOCK SWEEPER] Erro ao travar janelas:', error);
+    }
+    schedule();
+  };
+
+  const schedule = () => {
+    const timer = setTimeout(run, msUntilNextSweep(getClock()));
+    timer.unref?.();
+    globalThis.__iudpTimeWindowLockTimer = timer;
+  };
+
+  globalThis.__iudpTimeWindowLockTimer = null;
+  run();
+}
@@ -0,0 +1,121 @@
+/**
+ * POOL DE WORKER THREADS
+ * Mantém até `size` workers (criados sob demanda por createWorker) e uma fila de tarefas.
+ * createWorker deve conter o `new Worker(new URL('./arquivo.js', import.meta.url))` literal,
+ * que é o formato que o webpack (Next.js) reconhece para empacotar o script do worker.
+ *
+ * Cada worker responde { id, result } ou { id, error } para a mensagem { id, ...task }. Worker
+ * que morre rejeita a tarefa em andamento e é substituído na próxima tarefa; workers ociosos
+ * por idleMs encerram.
+ */
+
+export class WorkerPool {
+  constructor(createWorker, { size = 2, idleMs = 30000 } = {}) {
+    this.createWorker = createWorker;
+    this.size = size;
+    this.idleMs = idleMs;
+    this.workers = new Set();
+    this.idle = [];
+    this.queue = [];
+    this.nextId = 1;
+    this.completed = 0;
+    this.failed = 0;
+    this.peakQueue = 0;
+  }
+
+  run(task) {
+    return new Promise((resolve, reject) => {
+      this.queue.push({ task, resolve, reject });
+      this.peakQueue = Math.max(this.peakQueue, this.queue.length);
+      this.dispatch();
+    });
+  }
+
+  dispatch() {
+    while (this.queue.length > 0) {
+      const slot = this.idle.pop() || (this.workers.size < this.size ? this.spawn() : null);
+      if (!slot) return;
+      clearTimeout(slot.idleTimer);
+      const job = this.queue.shift();
+      slot.job = { ...job, id: this.nextId++ };
+      slot.worker.ref();
+      slot.worker.postMessage({ id: slot.job.id, ...job.task });
+    }
+  }
+
+  spawn() {
+    const worker = this.createWorker();
+    const slot = { worker, job: null, idleTimer: null };
+    this.workers.add(slot);
+
+    worker.on('message', ({ id, result, error }) => {
+      const job = slot.job;
+      if (!job || job.id !== id) return;
+      slot.job = null;
+      if (error) {
+        this.failed++;
+        job.reject(new Error(error));
+      } else {
+        this.completed++;
+        job.resolve(result);
+      }
+      this.release(slot);
+    });
+
+    const fail = (error) => {
+      if (!this.workers.has(slot)) return;
+      this.workers.delete(slot);
+      this.idle = this.idle.filter(s => s !== slot);
+      clearTimeout(slot.idleTimer);
+      if (slot.job) {
+        this.failed++;
+        slot.job.reject(error instanceof Error ? error : new Error(`Worker encerrado (código ${error})`));
+        slot.job = null;
+      }
+      this.dispatch();
+    };
+    worker.on('error', fail);
+    worker.on('exit', fail);
+
+    return slot;
+  }
+
+  release(slot) {
+    // Worker ocioso não segura o processo aberto
+    slot.worker.unref();
+    this.idle.push(slot);
+    this.dispatch();
+    if (this.idle.includes(slot) && this.idleMs > 0) {
+      slot.idleTimer = setTimeout(() => {
+        this.idle = this.idle.filter(s => s !== slot);
+        this.workers.delete(slot);
+        slot.worker.terminate();
+      }, this.idleMs);
+      slot.idleTimer.unref?.();
+    }
+  }
+
+  async destroy() {
+    const slots = [...this.workers];
+    this.workers.clear();
+    this.idle = [];
+    for (const { reject } of this.queue.splice(0)) reject(new Error('Pool encerrado'));
+    await Promise.all(slots.map(slot => {
+      clearTimeout(slot.idleTimer);
+      if (slot.job) slot.job.reject(new Error('Pool encerrado'));
+      return slot.worker.terminate();
+    }));
+  }
+
+  stats() {
+    return {
+      size: this.size,
+      workers: this.workers.size,
+      busy: this.workers.size - this.idle.length,
+      queued: this.queue.length,
+      peakQueue: this.peakQueue,
+      completed: this.completed,
+      failed: this.failed
+    };
+  }
+}
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Load Test - Geração de carga concorrente contra a API
+Reaproveita os fluxos de login/lançamento/listagem dos scripts de teste
+(backend_test.py, focused_test.py, dashboard_test.py) e dispara um mix
+configurável de endpoints com N usuários virtuais em paralelo.
+
+Relatório por endpoint: p50/p95/p99 de latência, throughput e taxa de erro.
+
+Exemplos:
+    python load_test.py --users 20 --duration 60
+    python load_test.py --stages 10,25,50,100 --duration 30 --max-error-rate 0.05
+    python load_test.py --mix "entries/save=3,entries/month=5" --json resultado.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+# Configuração da API (mesmo host dos demais scripts, sobrescrevível por env/CLI)
+BASE_URL = os.environ.get("BASE_URL", "https://caderno-online.preview.emergentagent.com/api")
+
+# Credenciais usadas pelos usuários virtuais (pastor do focused_test.py)
+LOAD_EMAIL = os.environ.get("LOAD_EMAIL", "pastor.teste@iudp.com")
+LOAD_PASSWORD = os.environ.get("LOAD_PASSWORD", "PastorTeste2025!")
+
+# Mix padrão: proporção aproximada do tráfego de um domingo (polling > escrita)
+DEFAULT_MIX = "entries/month=5,dashboard/data=2,costs-entries/list=2,entries/save=1"
+
+# Janelas de culto (espelho de TIME_SLOTS em route.js)
+TIME_SLOTS = {
+    '08:00': ('08:00', '10:00'),
+    '10:00': ('10:00', '12:00'),
+    '12:00': ('12:00', '15:00'),
+    '15:00': ('15:00', '19:30'),
+    '19:30': ('19:30', '22:00'),
+}
+
+BRAZIL_TZ = timezone(timedelta(hours=-3))
+
+
+def with_retry(func, max_retries=3):
+    """Executa func com retry (mesma lógica de test_with_retry do focused_test.py)"""
+    for attempt in range(max_retries):
+        try:
+            return func()
+        except Exception as e:
+            if attempt == max_retries - 1:
+                raise e
+            time.sleep(2)
+
+
+def parse_mix(mix):
+    """Converte 'endpoint=peso,endpoint=peso' em lista de (endpoint, peso)"""
+    weights = []
+    for part in mix.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        endpoint, _, weight = part.partition('=')
+        endpoint = endpoint.strip()
+        if endpoint not in ACTIONS:
+            raise ValueError(f"Endpoint não suportado no mix: {endpoint} (use: {', '.join(ACTIONS)})")
+        weights.append((endpoint, float(weight or 1)))
+    if not weights:
+        raise ValueError("Mix vazio")
+    return weights
+
+
+def current_slot(now):
+    """Retorna o horário de culto aberto agora, ou o primeiro do dia se nenhum estiver aberto"""
+    hhmm = now.strftime('%H:%M')
+    for slot, (start, end) in TIME_SLOTS.items():
+        if start <= hhmm < end:
+            return slot
+    return '08:00'
+
+
+def percentile(sorted_values, pct):
+    """Percentil por posição mais próxima (nearest-rank)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+# ========== PAYLOADS POR ENDPOINT ==========
+
+def payload_entries_save(now):
+    value = round(random.uniform(10, 500), 2)
+    return {
+        "month": now.month,
+        "year": now.year,
+        "day": now.day,
+        "timeSlot": current_slot(now),
+        "dinheiro": value,
+        "pix": 0,
+        "maquineta": 0,
+        "notes": "load_test",
+    }
+
+
+def payload_month(now):
+    return {"month": now.month, "year": now.year}
+
+
+def payload_costs_list(now):
+    return {"status": "ALL"}
+
+
+ACTIONS = {
+    'entries/save': payload_entries_save,
+    'entries/month': payload_month,
+    'dashboard/data': payload_month,
+    'costs-entries/list': payload_costs_list,
+}
+
+
+class LoadStats:
+    """Acumula latências e status por endpoint (thread-safe)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+
+    def record(self, endpoint, elapsed_ms, status_code):
+        with self.lock:
+            bucket = self.samples.setdefault(endpoint, {'latencies': [], 'status': {}, 'errors': 0, 'rejected': 0})
+            bucket['latencies'].append(elapsed_ms)
+            bucket['status'][status_code] = bucket['status'].get(status_code, 0) + 1
+            if status_code == 0 or status_code >= 500:
+                bucket['errors'] += 1
+            elif status_code >= 400:
+                bucket['rejected'] += 1
+
+    def summary(self, wall_seconds):
+        result = {}
+        for endpoint, bucket in sorted(self.samples.items()):
+            latencies = sorted(bucket['latencies'])
+            count = len(latencies)
+            result[endpoint] = {
+                'requests': count,
+                'throughput_rps': round(count / wall_seconds, 2) if wall_seconds > 0 else 0,
+                'p50_ms': round(percentile(latencies, 50), 1),
+                'p95_ms': round(percentile(latencies, 95), 1),
+                'p99_ms': round(percentile(latencies, 99), 1),
+                'max_ms': round(latencies[-1], 1) if latencies else 0,
+                'errors': bucket['errors'],
+                'rejected_4xx': bucket['rejected'],
+                'error_rate': round(bucket['errors'] / count, 4) if count else 0,
+                'status': {str(k): v for k, v in sorted(bucket['status'].items())},
+            }
+        return result
+
+
+class VirtualUser:
+    """Usuário virtual: faz login uma vez e dispara requisições do mix até o prazo"""
+
+    def __init__(self, base_url, email, password, mix, stats, think_time, timeout):
+        self.base_url = base_url
+        self.email = email
+        self.password = password
+        self.mix = mix
+        self.stats = stats
+        self.think_time = think_time
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.token = None
+
+    def login(self):
+        def do_login():
+            response = self.session.post(f"{self.base_url}/auth/login", json={
+                "email": self.email,
+                "password": self.password
+            }, timeout=self.timeout)
+            if response.status_code == 200:
+                return response.json()['token']
+            raise Exception(f"Login failed: {response.status_code}")
+
+        started = time.perf_counter()
+        self.token = with_retry(do_login)
+        self.stats.record('auth/login', (time.perf_counter() - started) * 1000, 200)
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+
+    def pick_endpoint(self):
+        endpoints = [endpoint for endpoint, _ in self.mix]
+        weights = [weight for _, weight in self.mix]
+        return random.choices(endpoints, weights=weights, k=1)[0]
+
+    def request(self, endpoint):
+        payload = ACTIONS[endpoint](datetime.now(BRAZIL_TZ))
+        started = time.perf_counter()
+        try:
+            response = self.session.post(f"{self.base_url}/{endpoint}", json=payload, timeout=self.timeout)
+            status_code = response.status_code
+        except Exception:
+            status_code = 0
+        self.stats.record(endpoint, (time.perf_counter() - started) * 1000, status_code)
+
+    def run(self, deadline):
+        try:
+            self.login()
+        except Exception:
+            self.stats.record('auth/login', 0, 0)
+            return
+        while time.time() < deadline:
+            self.request(self.pick_endpoint())
+            if self.think_time > 0:
+                time.sleep(random.uniform(0, self.think_time))
+
+
+def run_stage(args, mix, users):
+    """Executa uma etapa com `users` usuários virtuais e retorna o resumo"""
+    stats = LoadStats()
+    started = time.time()
+    deadline = started + args.ramp + args.duration
+
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        for index in range(users):
+            vu = VirtualUser(args.base_url, args.email, args.password, mix, stats, args.think_time, args.timeout)
+            executor.submit(vu.run, deadline)
+            if args.ramp > 0 and users > 1:
+                time.sleep(args.ramp / users)
+
+    wall_seconds = time.time() - started
+    endpoints = stats.summary(wall_seconds)
+    total = sum(e['requests'] for e in endpoints.values())
+    errors = sum(e['errors'] for e in endpoints.values())
+    return {
+        'users': users,
+        'duration_s': round(wall_seconds, 2),
+        'total_requests': total,
+        'throughput_rps': round(total / wall_seconds, 2) if wall_seconds > 0 else 0,
+        'error_rate': round(errors / total, 4) if total else 0,
+        'endpoints': endpoints,
+    }
+
+
+def print_stage(stage):
+    print(f"\n👥 {stage['users']} usuários | {stage['total_requests']} requisições em {stage['duration_s']}s "
+          f"| {stage['throughput_rps']} req/s | erro {stage['error_rate'] * 100:.2f}%")
+    print(f"{'Endpoint':<22}{'Req':>7}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'4xx':>6}{'Erros':>7}")
+    print("-" * 87)
+    for endpoint, e in stage['endpoints'].items():
+        print(f"{endpoint:<22}{e['requests']:>7}{e['throughput_rps']:>9}{e['p50_ms']:>9}{e['p95_ms']:>9}"
+              f"{e['p99_ms']:>9}{e['max_ms']:>9}{e['rejected_4xx']:>6}{e['errors']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API do Caderno de Controle IUDP")
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--email', default=LOAD_EMAIL)
+    parser.add_argument('--password', default=LOAD_PASSWORD)
+    parser.add_argument('--users', type=int, default=10, help="Usuários virtuais simultâneos")
+    parser.add_argument('--stages', default=None, help="Lista de usuários por etapa, ex: 10,25,50,100")
+    parser.add_argument('--duration', type=float, default=30, help="Duração de cada etapa (s)")
+    parser.add_argument('--ramp', type=float, default=5, help="Tempo para subir todos os usuários (s)")
+    parser.add_argument('--think-time', type=float, default=0.5, help="Pausa máxima aleatória entre requisições (s)")
+    parser.add_argument('--timeout', type=float, default=10)
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="Pesos por endpoint, ex: entries/month=5,entries/save=1")
+    parser.add_argument('--max-error-rate', type=float, default=0.05, help="Interrompe as etapas acima desta taxa de erro")
+    parser.add_argument('--json', default=None, help="Grava os resultados em JSON neste arquivo")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    stages = [int(s) for s in args.stages.split(',')] if args.stages else [args.users]
+
+    print("🚀 TESTE DE CARGA - Caderno de Controle IUDP")
+    print("=" * 87)
+    print(f"API: {args.base_url}")
+    print(f"Mix: {', '.join(f'{e}={w:g}' for e, w in mix)}")
+
+    results = []
+    breaking_point = None
+    for users in stages:
+        stage = run_stage(args, mix, users)
+        results.append(stage)
+        print_stage(stage)
+        if stage['error_rate'] > args.max_error_rate:
+            breaking_point = users
+            print(f"\n⚠️  Taxa de erro acima de {args.max_error_rate * 100:.1f}% com {users} usuários - interrompendo")
+            break
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'baseUrl': args.base_url,
+                'mix': dict(mix),
+                'timestamp': datetime.now(BRAZIL_TZ).isoformat(),
+                'breakingPointUsers': breaking_point,
+                'stages': results,
+            }, f, indent=2)
+        print(f"\n📄 Resultados gravados em {args.json}")
+
+    print("=" * 87)
+    return breaking_point is None
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -4,7 +4,7 @@ const nextConfig = {
     unoptimized: true,
   },
   experimental: {
-    serverComponentsExternalPackages: ['mongodb'],
+    serverComponentsExternalPackages: ['mongodb', 'argon2', 'better-sqlite3'],
   },
   productionBrowserSourceMaps: false,
   reactStrictMode: false,
@@ -0,0 +1,135 @@
+/**
+ * TESTES AUTOMATIZADOS - ROTEADOR DA API
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir resolução por tabela, import único dos handlers e o middleware de acesso
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const fs = require('fs');
+const path = require('path');
+const { createRouter } = require('../lib/api-router.js');
+const { buildScopeFilter } = require('../lib/access-scope.js');
+const { ROUTE_TABLE } = require('../app/api/[[...path]]/route-table.js');
+
+const HANDLERS_DIR = path.join(__dirname, '..', 'app', 'api', '[[...path]]', 'handlers');
+const request = (endpoint, token) => new Request(`http://localhost/api/${endpoint}`, {
+  method: 'POST',
+  headers: token ? { authorization: `Bearer ${token}` } : {}
+});
+const tokens = {
+  master: { userId: 'm1', role: 'master' },
+  pastor: { userId: 'p1', role: 'pastor' }
+};
+
+// Tabela em memória: handlers devolvem o que receberam
+function fakeRouter({ loadDelayMs = 0, failFirstLoad = false } = {}) {
+  const calls = { loads: 0, connects: 0, userData: 0 };
+  const echo = (name) => async ({ endpoint, user, userData, db }) =>
+    Response.json({ name, endpoint, user: user?.userId || null, userData, db });
+  const router = createRouter({
+    costs: {
+      load: async () => {
+        calls.loads++;
+        await new Promise(resolve => setTimeout(resolve, loadDelayMs));
+        if (failFirstLoad && calls.loads === 1) throw new Error('chunk indisponível');
+        return { POST: { 'costs-entries/list': echo('list'), 'costs-entries/approve': echo('approve') } };
+      },
+      POST: { 'costs-entries/list': 'user', 'costs-entries/approve': 'master' }
+    },
+    system: {
+      load: async () => ({ POST: { 'metrics': echo('metrics'), 'uploads/*': echo('uploads'), 'dashboard/data': echo('dashboard') } }),
+      POST: { 'metrics': { auth: 'public', db: false }, 'uploads/*': 'public', 'dashboard/data': { auth: 'user', userData: true } }
+    }
+  }, {
+    connect: async () => { calls.connects++; return 'db'; },
+    authenticate: (req) => tokens[(req.headers.get('authorization') || '').replace('Bearer ', '')] || null,
+    loadUserData: async (db, user) => { calls.userData++; return { userId: user.userId, scope: 'church', church: 'Sede' }; },
+    onError: (error) => Response.json({ error: error.message }, { status: 500 })
+  });
+  return { router, calls };
+}
+
+test('Resolução por tabela e prefixo', async () => {
+  const { router } = fakeRouter();
+  const upload = await (await router.dispatch('POST', request('uploads/users/foto.webp'))).json();
+  const missing = await router.dispatch('POST', request('nao/existe'));
+  const wrongMethod = await router.dispatch('GET', request('metrics'));
+
+  assert.equal(upload.name, 'uploads');
+  assert.equal(upload.endpoint, 'uploads/users/foto.webp');
+  assert.equal(missing.status, 404);
+  assert.equal(wrongMethod.status, 404);
+  assert.throws(
+    () => createRouter({ a: { load: () => ({}), POST: { x: 'public' } }, b: { load: () => ({}), POST: { x: 'public' } } }),
+    { message: '[ROUTER] Rota duplicada: POST x' }
+  );
+
+  // Cada rota da tabela real tem o handler exportado pelo módulo correspondente
+  const real = createRouter(ROUTE_TABLE);
+  const unmatched = [];
+  let routeCount = 0;
+  for (const [name, entry] of Object.entries(ROUTE_TABLE)) {
+    const source = fs.readFileSync(path.join(HANDLERS_DIR, `${name}.js`), 'utf8');
+    for (const method of ['POST', 'GET']) {
+      const exported = source.split(`export const ${method} = {`)[1]?.split('};')[0] || '';
+      for (const key of Object.keys(entry[method] || {})) {
+        routeCount++;
+        if (!exported.includes(`'${key}':`)) unmatched.push(`${method} ${key}`);
+      }
+    }
+  }
+
+  assert.deepEqual(unmatched, []);
+  assert.equal(real.stats().routes, routeCount);
+  assert.equal(real.resolve('GET', 'unlock/requests').method, 'GET');
+  assert.equal(real.resolve('POST', 'unlock/requests').method, 'POST');
+  assert.equal(real.resolve('GET', 'view/receipt/abc.pdf').key, 'view/receipt/*');
+});
+
+test('Handlers carregados sob demanda uma única vez', async () => {
+  const { router, calls } = fakeRouter({ loadDelayMs: 20, failFirstLoad: true });
+  const failed = await router.dispatch('POST', request('costs-entries/list', 'pastor'));
+  const responses = await Promise.all(
+    Array.from({ length: 10 }, () => router.dispatch('POST', request('costs-entries/list', 'pastor')))
+  );
+  const bodies = await Promise.all(responses.map(r => r.json()));
+  const metrics = await (await router.dispatch('POST', request('metrics'))).json();
+  const stats = router.stats();
+
+  // A falha do primeiro import não fica em cache; as 10 simultâneas dividem o segundo
+  assert.equal(failed.status, 500);
+  assert.equal(calls.loads, 2);
+  assert.ok(bodies.every(b => b.name === 'list' && b.user === 'p1' && b.db === 'db'));
+  assert.equal(metrics.db, null);
+  assert.equal(calls.connects, 11);
+  assert.equal(stats.modulesLoaded, 2);
+  assert.equal(typeof stats.loadMs.costs, 'number');
+});
+
+test('Middleware de acesso e escopo', async () => {
+  const { router, calls } = fakeRouter();
+  const anonymous = await router.dispatch('POST', request('costs-entries/list'));
+  const notMaster = await router.dispatch('POST', request('costs-entries/approve', 'pastor'));
+  const master = await (await router.dispatch('POST', request('costs-entries/approve', 'master'))).json();
+  const withData = await (await router.dispatch('POST', request('dashboard/data', 'pastor'))).json();
+
+  assert.equal(anonymous.status, 401);
+  assert.equal((await anonymous.json()).error, 'Não autenticado');
+  assert.equal(notMaster.status, 403);
+  assert.equal((await notMaster.json()).error, 'Acesso negado');
+  assert.equal(master.user, 'm1');
+  assert.equal(calls.connects, 2);
+  assert.equal(withData.userData.church, 'Sede');
+  assert.equal(calls.userData, 1);
+
+  const scopes = [
+    buildScopeFilter({ role: 'master', scope: 'church', church: 'Sede' }),
+    buildScopeFilter({ role: 'leader', scope: 'global' }),
+    buildScopeFilter({ role: 'leader', scope: 'state', state: 'SP', region: 'Norte' }),
+    buildScopeFilter({ role: 'leader', scope: 'region', state: 'SP', region: 'Norte' }),
+    buildScopeFilter({ role: 'pastor', scope: 'church', church: 'Sede' }),
+    buildScopeFilter({ role: 'pastor', userId: 'p1' })
+  ];
+  assert.deepEqual(scopes, [{}, {}, { state: 'SP' }, { region: 'Norte', state: 'SP' }, { church: 'Sede' }, { userId: 'p1' }]);
+});
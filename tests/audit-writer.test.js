@@ -0,0 +1,81 @@
+/**
+ * TESTES AUTOMATIZADOS - GRAVAÇÃO ASSÍNCRONA DE AUDITORIA
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir gravação em lote, fallback em arquivo e reenvio sem duplicar
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+// Lido pelo módulo na importação
+process.env.AUDIT_FALLBACK_FILE = path.join(os.tmpdir(), `iudp-audit-test-${process.pid}.jsonl`);
+
+const { recordAudit, flushAuditLog, getAuditWriterStats, stopAuditWriter } = require('../lib/audit-writer.js');
+
+// Banco falso: guarda por logId e pode ser colocado "fora do ar"
+function fakeDb() {
+  const stored = new Map();
+  const db = {
+    down: false,
+    batches: 0,
+    stored,
+    collection: () => ({
+      insertMany: async (records) => {
+        db.batches++;
+        if (db.down) throw new Error('MongoNetworkError');
+        records.forEach(r => stored.set(r.logId, r));
+      }
+    })
+  };
+  return db;
+}
+
+test.after(() => fs.rmSync(process.env.AUDIT_FALLBACK_FILE, { force: true }));
+
+test('Registros gravados em lote', async () => {
+  const db = fakeDb();
+  for (let i = 0; i < 5; i++) recordAudit(db, { action: 'TEST', details: { i } });
+  await flushAuditLog();
+
+  assert.equal(db.batches, 1);
+  assert.deepEqual([...db.stored.values()].map(r => r.details.i), [0, 1, 2, 3, 4]);
+});
+
+test('Fallback em arquivo e reenvio posterior', async () => {
+  const db = fakeDb();
+  db.down = true;
+  recordAudit(db, { logId: 'fallback-1', action: 'TEST' });
+  await flushAuditLog();
+  assert.ok(fs.existsSync(process.env.AUDIT_FALLBACK_FILE), 'fallback não gravado');
+
+  db.down = false;
+  recordAudit(db, { logId: 'after-1', action: 'TEST' });
+  await flushAuditLog();
+
+  assert.ok(db.stored.has('fallback-1'));
+  assert.ok(db.stored.has('after-1'));
+  assert.ok(!fs.existsSync(process.env.AUDIT_FALLBACK_FILE), 'fallback não removido');
+  assert.equal(getAuditWriterStats().replayed, 1);
+});
+
+test('Encerramento grava o pendente sem instalar handlers no processo', async (t) => {
+  const listeners = ['exit', 'beforeExit', 'SIGTERM', 'SIGINT'].map(event => process.listenerCount(event));
+  const db = fakeDb();
+  recordAudit(db, { logId: 'stop-1', action: 'TEST' });
+  assert.deepEqual(['exit', 'beforeExit', 'SIGTERM', 'SIGINT'].map(event => process.listenerCount(event)), listeners);
+
+  await stopAuditWriter();
+  assert.ok(db.stored.has('stop-1'));
+  assert.equal(getAuditWriterStats().pending, 0);
+
+  // Banco fora no encerramento: o registro fica no arquivo para o próximo processo
+  db.down = true;
+  t.mock.method(console, 'error', () => {});
+  recordAudit(db, { logId: 'stop-2', action: 'TEST' });
+  await stopAuditWriter();
+  const saved = fs.readFileSync(process.env.AUDIT_FALLBACK_FILE, 'utf8').trim().split('\n').map(line => JSON.parse(line));
+  assert.deepEqual(saved.map(r => r.logId), ['stop-2']);
+});
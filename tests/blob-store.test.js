@@ -0,0 +1,87 @@
+/**
+ * TESTES AUTOMATIZADOS - UPLOADS ENDEREÇADOS POR CONTEÚDO
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir deduplicação, contagem de referências e varredura de órfãos
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { storeBlob, parseUploadUrl, collectReferences, sweepUploads } = require('../lib/blob-store.js');
+
+// Banco em memória: aggregate devolve os grupos já calculados por coleção/campo
+function groupsDb(groups) {
+  return {
+    collection: (name) => ({
+      aggregate: (pipeline) => {
+        const field = pipeline[pipeline.length - 1].$group._id.slice(1);
+        return (async function* () {
+          yield* (groups[`${name}.${field}`] || []);
+        })();
+      }
+    })
+  };
+}
+
+test('Uploads endereçados por conteúdo', async (t) => {
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'iudp-blobs-'));
+  t.after(() => fs.rmSync(dir, { recursive: true, force: true }));
+  let first;
+  let other;
+
+  await t.test('Deduplicação por hash do conteúdo', async () => {
+    first = await storeBlob(dir, Buffer.from('conta de luz'), 'Conta.JPG');
+    const again = await storeBlob(dir, Buffer.from('conta de luz'), 'foto-celular.jpg');
+    other = await storeBlob(dir, Buffer.from('conta de água'), 'agua.pdf');
+    const files = fs.readdirSync(dir).filter(name => !name.startsWith('.'));
+
+    assert.equal(again.filename, first.filename);
+    assert.ok(again.deduplicated);
+    assert.ok(!first.deduplicated);
+    assert.match(first.filename, /^[0-9a-f]{64}\.jpg$/);
+    assert.ok(other.filename.endsWith('.pdf'));
+    assert.equal(files.length, 2);
+  });
+
+  await t.test('Contagem de referências', async () => {
+    const refs = await collectReferences(groupsDb({
+      'entries.receipts.filepath': [{ _id: 'a.pdf', count: 2 }],
+      'costs_entries.billFile': [{ _id: '/api/uploads/costs/b.jpg', count: 1 }],
+      'costs_entries.proofFile': [{ _id: '/api/uploads/costs/b.jpg', count: 1 }],
+      'users.photoUrl': [{ _id: 'https://externo/foto.png', count: 1 }]
+    }));
+
+    assert.equal(refs.get('receipts/a.pdf'), 2);
+    assert.equal(refs.get('costs/b.jpg'), 2);
+    assert.equal(refs.size, 2);
+    assert.equal(parseUploadUrl('/api/uploads/users/x.png').area, 'users');
+    assert.equal(parseUploadUrl('/api/uploads/../x'), null);
+  });
+
+  await t.test('Varredura de órfãos com relatório de bytes', async () => {
+    fs.mkdirSync(path.join(dir, '.derivatives'));
+    fs.writeFileSync(path.join(dir, '.derivatives', `${other.filename}.thumb.webp`), 'mini');
+    fs.writeFileSync(path.join(dir, '.derivatives', 'sumiu.png.thumb.webp'), 'velho');
+
+    const db = groupsDb({ 'costs_entries.billFile': [{ _id: `/api/uploads/costs/${first.filename}`, count: 1 }] });
+    const later = Date.now() + 2 * 24 * 60 * 60 * 1000;
+    const expectedBytes = Buffer.byteLength('conta de água') + 'mini'.length + 'velho'.length;
+
+    const dry = await sweepUploads(db, { costs: dir }, { dryRun: true, now: later });
+    assert.ok(fs.existsSync(other.filepath), 'dryRun apagou o arquivo');
+    assert.equal(dry.reclaimedBytes, expectedBytes);
+
+    const report = await sweepUploads(db, { costs: dir }, { now: later });
+    assert.equal(report.reclaimedBytes, expectedBytes);
+    assert.equal(report.referencedFiles, 1);
+    assert.ok(!fs.existsSync(other.filepath));
+    assert.ok(fs.existsSync(first.filepath));
+    assert.equal(fs.readdirSync(path.join(dir, '.derivatives')).length, 0);
+
+    // Órfãos recentes ficam (upload em andamento)
+    const fresh = await sweepUploads(db, { costs: dir });
+    assert.equal(fresh.reclaimedFiles, 0);
+  });
+});
@@ -0,0 +1,159 @@
+/**
+ * TESTES AUTOMATIZADOS - CALENDÁRIO MATERIALIZADO DO MASTER
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir que a visão por bucket (dia + horário) bate com a agregação ao vivo
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const {
+  aggregateCalendarEntries,
+  getCalendarView,
+  refreshCalendarSlot,
+  syncCalendarSlots,
+  viewToEntries,
+  slotKey
+} = require('../lib/calendar-view.js');
+
+const RECEIPT = { receiptId: 'r1', filename: 'recibo.pdf', filepath: 'x.pdf', fileType: 'application/pdf', fileSize: 2048, uploadedAt: '2025-03-02T11:05:00.000Z' };
+const ENTRIES = [
+  { _id: 'a1', entryId: '2025-03-02-08:00', year: 2025, month: 3, day: 2, timeSlot: '08:00', value: 100, dinheiro: 60, pix: 40, maquineta: 0, church: 'Central', churchId: 'c1', receipts: [RECEIPT] },
+  { _id: 'a2', entryId: '2025-03-02-08:00', year: 2025, month: 3, day: 2, timeSlot: '08:00', value: 50, dinheiro: 0, pix: 0, maquineta: 50, church: 'Norte', churchId: 'c2' },
+  { _id: 'a3', entryId: '2025-03-01-19:30', year: 2025, month: 3, day: 1, timeSlot: '19:30', value: 30, dinheiro: 30, pix: 0, maquineta: 0, church: 'Central', churchId: 'c1' }
+];
+
+// Projeção de inclusão como a do MongoDB ('campo' ou 'lista.campo'); _id sempre vem
+function project(doc, projection) {
+  const out = { _id: doc._id };
+  for (const path of Object.keys(projection)) {
+    const [head, field] = path.split('.');
+    if (doc[head] === undefined) continue;
+    if (field === undefined) out[head] = doc[head];
+    else out[head] = doc[head].map((item, i) => ({ ...out[head]?.[i], [field]: item[field] }));
+  }
+  return out;
+}
+
+// Banco em memória: filtros por igualdade e updateOne com $set/$unset/$setOnInsert em
+// caminhos de um nível ('slots.<chave>')
+function memoryDb(data) {
+  const rows = (name) => data[name] || (data[name] = []);
+  const matches = (filter) => (doc) => Object.entries(filter).every(([k, v]) => doc[k] === v);
+  return {
+    data,
+    collection: (name) => ({
+      find: (filter, { projection } = {}) => {
+        const found = rows(name).filter(matches(filter)).map(doc => (projection ? project(doc, projection) : doc));
+        const cursor = { sort: () => cursor, toArray: async () => found };
+        return cursor;
+      },
+      findOne: async (filter) => rows(name).find(matches(filter)) || null,
+      updateOne: async (filter, update, { upsert } = {}) => {
+        let doc = rows(name).find(matches(filter));
+        if (!doc && !upsert) return;
+        if (!doc) rows(name).push(doc = { ...filter, ...update.$setOnInsert });
+        for (const [path, value] of Object.entries(update.$set || {})) {
+          const [head, key] = path.split('.');
+          if (key === undefined) doc[head] = value;
+          else (doc[head] = doc[head] || {})[key] = value;
+        }
+        for (const path of Object.keys(update.$unset || {})) {
+          const [head, key] = path.split('.');
+          if (key === undefined) delete doc[head];
+          else if (doc[head]) delete doc[head][key];
+        }
+      }
+    })
+  };
+}
+
+// Sincronização ativa (como com o change stream aberto) só durante o teste
+function withViewReady(t) {
+  globalThis.__iudpCalendarView.ready = true;
+  t.after(() => { globalThis.__iudpCalendarView.ready = false; });
+}
+
+test('Agregação por dia + horário', () => {
+  const buckets = aggregateCalendarEntries(ENTRIES);
+  const morning = buckets.find(b => b.day === 2);
+
+  assert.equal(buckets.length, 2);
+  assert.equal(morning.totalValue, 150);
+  assert.equal(morning.value, 150);
+  assert.equal(morning.dinheiro, 60);
+  assert.equal(morning.pix, 40);
+  assert.equal(morning.maquineta, 50);
+  assert.equal(morning.churchCount, 2);
+  assert.ok(morning.churches[0].hasReceipts);
+  assert.ok(!morning.churches[1].hasReceipts);
+});
+
+test('Recalcula e grava apenas o bucket alterado', async () => {
+  const db = memoryDb({ entries: [...ENTRIES] });
+  const key = slotKey(2, '08:00');
+
+  await refreshCalendarSlot(db, 2025, 3, 2, '08:00');
+  const [view] = db.data.calendar_views;
+  // Um documento por dia: o mês inteiro nunca se aproxima do limite de 16MB
+  assert.equal(view.viewId, '2025-03-02');
+  assert.equal(view.day, 2);
+  assert.deepEqual(Object.keys(view.slots), [key]);
+  assert.equal(view.slots[key].totalValue, 150);
+  assert.equal(view.entrySlots.a2, key);
+
+  // Comprovantes do bucket com os campos que o visualizador exibe (tamanho e data inclusos)
+  assert.deepEqual(view.slots[key].churches[0].receipts, [RECEIPT]);
+
+  // Outro dia ganha o próprio documento; horário esvaziado sai da visão
+  await refreshCalendarSlot(db, 2025, 3, 1, '19:30');
+  db.data.entries = db.data.entries.filter(e => e.day !== 2);
+  await refreshCalendarSlot(db, 2025, 3, 2, '08:00');
+
+  assert.deepEqual(db.data.calendar_views.map(v => v.viewId), ['2025-03-02', '2025-03-01']);
+  assert.deepEqual(view.slots, {});
+  assert.equal(db.data.calendar_views[1].slots['1-19:30'].totalValue, 30);
+});
+
+test('Buckets da visão ordenados', () => {
+  const slots = {};
+  for (const bucket of aggregateCalendarEntries(ENTRIES)) slots[slotKey(bucket.day, bucket.timeSlot)] = bucket;
+  const entries = viewToEntries({ slots });
+
+  assert.deepEqual(entries.map(e => e.day), [1, 2]);
+  assert.equal(viewToEntries(null).length, 0);
+});
+
+test('Gravação recalcula os buckets antes de publicar', async (t) => {
+  const db = memoryDb({ entries: [...ENTRIES] });
+
+  // Sem change stream (standalone) não há visão a manter
+  await syncCalendarSlots(db, ENTRIES);
+  assert.equal(db.data.calendar_views, undefined);
+
+  withViewReady(t);
+  await syncCalendarSlots(db, ENTRIES);
+  const view = await getCalendarView(db, 3, 2025);
+  assert.deepEqual(viewToEntries(view).map(e => [e.day, e.timeSlot, e.totalValue]), [[1, '19:30', 30], [2, '08:00', 150]]);
+
+  // Erro na visão não derruba a gravação já feita
+  const failing = { collection: () => ({ find: () => { throw new Error('mongo fora'); } }) };
+  t.mock.method(console, 'error', () => {});
+  await assert.doesNotReject(syncCalendarSlots(failing, ENTRIES));
+});
+
+test('Mês lido dos documentos por dia', async (t) => {
+  const april = { year: 2025, month: 4, day: 6, timeSlot: '10:00', value: 70, dinheiro: 70, pix: 0, maquineta: 0, church: 'Sul', churchId: 'c3' };
+  const views = [];
+  for (const bucket of aggregateCalendarEntries([...ENTRIES, april])) {
+    views.push({ year: bucket.year, month: bucket.month, day: bucket.day, slots: { [slotKey(bucket.day, bucket.timeSlot)]: bucket } });
+  }
+  const db = memoryDb({ calendar_views: views });
+
+  assert.equal(await getCalendarView(db, '3', '2025'), null);
+
+  withViewReady(t);
+  const view = await getCalendarView(db, '3', '2025');
+  assert.deepEqual(viewToEntries(view).map(e => `${e.day}-${e.timeSlot}`), ['1-19:30', '2-08:00']);
+  assert.deepEqual(Object.keys((await getCalendarView(db, 4, 2025)).slots), ['6-10:00']);
+  assert.deepEqual(await getCalendarView(db, 5, 2025), { slots: {} });
+});
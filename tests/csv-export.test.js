@@ -0,0 +1,60 @@
+/**
+ * TESTES AUTOMATIZADOS - EXPORTAÇÃO CSV
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir escape correto e filtros de período da exportação em streaming
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const {
+  csvEscape,
+  resolveExportRange,
+  buildEntryRangeFilter,
+  buildCostRangeFilter,
+  streamCsv,
+  ENTRY_COLUMNS
+} = require('../lib/csv-export.js');
+
+test('Escape de aspas, vírgulas e valores vazios', () => {
+  assert.equal(csvEscape('Culto "especial", noite\nsegunda linha'), '"Culto ""especial"", noite\nsegunda linha"');
+  assert.equal(csvEscape(150.5), '150.5');
+  assert.equal(csvEscape(null), '');
+});
+
+test('Filtros de período de um mês e multi-ano', () => {
+  const single = buildEntryRangeFilter(resolveExportRange({ month: '3', year: '2025' }));
+  const multi = buildEntryRangeFilter(resolveExportRange({ startMonth: 11, startYear: 2023, endMonth: 2, endYear: 2025 }));
+  const invalid = resolveExportRange({ startMonth: 5, startYear: 2025, endMonth: 1, endYear: 2025 });
+
+  assert.equal(single.year, 2025);
+  assert.equal(single.month.$gte, 3);
+  assert.equal(single.month.$lte, 3);
+  assert.equal(multi.$or.length, 3);
+  assert.equal(multi.$or[1].year.$gt, 2023);
+  assert.equal(multi.$or[1].year.$lt, 2025);
+  assert.equal(invalid, null);
+});
+
+test('Intervalo de vencimento dos custos', () => {
+  const filter = buildCostRangeFilter(resolveExportRange({ startMonth: 11, startYear: 2024, endMonth: 12, endYear: 2024 }));
+  assert.equal(filter.dueDate.$gte, '2024-11-01');
+  assert.equal(filter.dueDate.$lt, '2025-01-01');
+});
+
+test('Streaming linha a linha a partir do cursor', async () => {
+  const docs = [
+    { year: 2025, month: 3, day: 9, timeSlot: '10:00', value: 10, church: 'Igreja "Central"' },
+    { year: 2025, month: 3, day: 9, timeSlot: '15:00', value: 20, church: 'Igreja Sul' }
+  ];
+  let closed = false;
+  const cursor = {
+    next: async () => docs.shift() || null,
+    close: async () => { closed = true; }
+  };
+
+  const lines = (await new Response(streamCsv(cursor, ENTRY_COLUMNS)).text()).trim().split('\n');
+  assert.equal(lines.length, 3);
+  assert.ok(lines[0].startsWith('"Ano"'));
+  assert.ok(lines[1].includes('"Igreja ""Central"""'));
+  assert.ok(closed, 'cursor não fechado');
+});
@@ -0,0 +1,41 @@
+/**
+ * TESTES AUTOMATIZADOS - CRIAÇÃO DE ÍNDICES
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir que um índice com erro não impeça a criação dos demais
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const { INDEX_SPECS, ensureIndexes } = require('../lib/db-indexes.js');
+
+// Banco em memória: guarda os índices criados por coleção; `broken` falha como um conflito de opções
+function indexesDb(broken) {
+  const indexes = {};
+  return {
+    indexes,
+    collection: (name) => ({
+      createIndexes: async (specs) => {
+        if (specs.includes(broken)) throw new Error('Index with name: year_1 already exists with different options');
+        (indexes[name] = indexes[name] || []).push(...specs);
+      },
+      updateMany: async () => ({ modifiedCount: 0 })
+    })
+  };
+}
+
+test('Índice com erro não impede os demais da coleção', async (t) => {
+  const [, broken] = INDEX_SPECS.entries;
+  const db = indexesDb(broken);
+  const logged = [];
+  t.mock.method(console, 'error', (...args) => logged.push(args.join(' ')));
+
+  const failures = await ensureIndexes(db);
+
+  assert.deepEqual(db.indexes.entries, INDEX_SPECS.entries.filter(spec => spec !== broken));
+  for (const [collection, specs] of Object.entries(INDEX_SPECS)) {
+    if (collection !== 'entries') assert.deepEqual(db.indexes[collection], specs, collection);
+  }
+  assert.deepEqual(failures.map(f => [f.collection, f.key]), [['entries', broken.key]]);
+  assert.equal(logged.length, 1);
+  assert.match(logged[0], /\[INDEXES\].*entries/);
+});
@@ -0,0 +1,139 @@
+/**
+ * TESTES AUTOMATIZADOS - ROLLUP DE OFERTAS
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir que o rollup incremental acompanhe criação, edição e exclusão de lançamentos
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const { rollupDimensions, applyEntryRollupDelta } = require('../lib/entry-rollups.js');
+const { repositoriesFor } = require('../lib/repositories.js');
+
+const baseEntry = {
+  entryId: '2025-03-09-19:30',
+  month: 3,
+  year: 2025,
+  day: 9,
+  timeSlot: '19:30',
+  value: 150,
+  dinheiro: 100,
+  pix: 50,
+  maquineta: 0,
+  userId: 'user-1',
+  church: 'Igreja Central',
+  churchId: 'church-1',
+  region: 'Sul',
+  state: 'SP'
+};
+const entry = (overrides) => ({ ...baseEntry, ...overrides });
+
+// Filtro por igualdade, $in e $lte (o suficiente para os filtros do rollup)
+const matches = (filter) => (doc) => Object.entries(filter).every(([field, cond]) => {
+  if (cond && typeof cond === 'object' && '$in' in cond) return cond.$in.includes(doc[field]);
+  if (cond && typeof cond === 'object' && '$lte' in cond) return doc[field] <= cond.$lte;
+  return doc[field] === cond;
+});
+
+// entries_rollup em memória: bulkWrite com $inc/$set/$setOnInsert (upsert) e exclusão por filtro;
+// entries com findOneAndUpdate atômico (cada chamada vê o documento deixado pela anterior)
+function rollupDb() {
+  const buckets = new Map();
+  const entries = new Map();
+  const remove = (filter, limit) => {
+    for (const doc of [...buckets.values()].filter(matches(filter)).slice(0, limit)) buckets.delete(doc.rollupId);
+  };
+  const collections = {
+    entries: {
+      findOneAndUpdate: async ({ entryId }, update, options = {}) => {
+        const before = entries.get(entryId) || null;
+        if (!before && !options.upsert) return null;
+        const after = { ...before, ...update.$set };
+        entries.set(entryId, after);
+        return options.returnDocument === 'after' ? after : before;
+      }
+    },
+    entries_rollup: {
+      bulkWrite: async (ops) => {
+        for (const { updateOne: { filter, update } } of ops) {
+          const doc = buckets.get(filter.rollupId) || { ...filter, ...update.$setOnInsert };
+          Object.assign(doc, update.$set);
+          for (const [field, delta] of Object.entries(update.$inc)) doc[field] = (doc[field] || 0) + delta;
+          buckets.set(filter.rollupId, doc);
+        }
+      },
+      deleteOne: async (filter) => remove(filter, 1),
+      deleteMany: async (filter) => remove(filter)
+    }
+  };
+  return { buckets, entries, collection: (name) => collections[name] };
+}
+
+test('Chave do rollup normaliza valores em string', () => {
+  const numeric = rollupDimensions(baseEntry);
+  const strings = rollupDimensions(entry({ month: '3', year: '2025', day: '9' }));
+
+  assert.equal(strings.rollupId, numeric.rollupId);
+  assert.equal(strings.month, 3);
+  assert.equal(strings.day, 9);
+});
+
+test('Criação de lançamento soma no bucket', async () => {
+  const db = rollupDb();
+  await applyEntryRollupDelta(db, null, baseEntry);
+  const [bucket] = db.buckets.values();
+
+  assert.equal(bucket.value, 150);
+  assert.equal(bucket.pix, 50);
+  assert.equal(bucket.entryCount, 1);
+  assert.equal(bucket.church, 'Igreja Central');
+});
+
+test('Edição aplica apenas a diferença', async () => {
+  const db = rollupDb();
+  await applyEntryRollupDelta(db, null, baseEntry);
+  await applyEntryRollupDelta(db, baseEntry, entry({ value: 200, dinheiro: 150 }));
+  const [bucket] = db.buckets.values();
+
+  assert.equal(db.buckets.size, 1);
+  assert.equal(bucket.value, 200);
+  assert.equal(bucket.dinheiro, 150);
+  assert.equal(bucket.entryCount, 1);
+});
+
+test('Exclusão zera e remove o bucket', async () => {
+  const db = rollupDb();
+  await applyEntryRollupDelta(db, null, baseEntry);
+  await applyEntryRollupDelta(db, baseEntry, null);
+
+  assert.equal(db.buckets.size, 0);
+});
+
+test('Troca de igreja move o valor para o novo bucket', async () => {
+  const db = rollupDb();
+  const moved = entry({ userId: 'user-2', church: 'Igreja Norte', churchId: 'church-2' });
+  await applyEntryRollupDelta(db, null, baseEntry);
+  await applyEntryRollupDelta(db, baseEntry, moved);
+  const buckets = [...db.buckets.values()];
+
+  assert.equal(buckets.length, 1);
+  assert.equal(buckets[0].rollupId, rollupDimensions(moved).rollupId);
+  assert.equal(buckets[0].churchId, 'church-2');
+  assert.equal(buckets[0].value, 150);
+});
+
+test('Gravações simultâneas do mesmo lançamento não somam duas vezes', async () => {
+  const db = rollupDb();
+  const repos = repositoriesFor(db);
+  const save = async (next) => {
+    const [previous] = await repos.entries.upsertReturningPrevious([next]);
+    await applyEntryRollupDelta(db, previous, next);
+  };
+
+  await Promise.all([save(baseEntry), save(entry({ value: 200, dinheiro: 150 }))]);
+  const [bucket] = db.buckets.values();
+
+  assert.equal(db.buckets.size, 1);
+  assert.equal(bucket.entryCount, 1);
+  assert.equal(bucket.value, 200);
+  assert.equal(db.entries.get(baseEntry.entryId).value, 200);
+});
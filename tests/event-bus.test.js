@@ -0,0 +1,83 @@
+/**
+ * TESTES AUTOMATIZADOS - CANAL DE EVENTOS (SSE)
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir que cada usuário receba apenas os eventos do seu escopo
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const path = require('path');
+const { pathToFileURL } = require('url');
+const { publishEvent, isEventForSubscriber, eventsSince, createEventStream } = require('../lib/event-bus.js');
+
+// Assinantes: Master, pastor da igreja c1 e pastor de outra igreja
+const master = { userId: 'm1', role: 'master', churchId: null };
+const pastor = { userId: 'p1', role: 'pastor', churchId: 'c1' };
+const otherPastor = { userId: 'p2', role: 'pastor', churchId: 'c2' };
+
+// Lê o stream até o evento `ready` (inclusive)
+async function readUntilReady(reader) {
+  const decoder = new TextDecoder();
+  let text = '';
+  while (!text.includes('event: ready')) {
+    text += decoder.decode((await reader.read()).value);
+  }
+  return text;
+}
+
+test('Eventos entregues só ao dono, à igreja e aos Masters', () => {
+  const cost = { type: 'cost.approved', target: { masters: true, userIds: ['p1'], churchIds: ['c1'] } };
+  const request = { type: 'unlock.requested', target: { masters: true } };
+
+  assert.ok(isEventForSubscriber(cost, master));
+  assert.ok(isEventForSubscriber(cost, pastor));
+  assert.ok(!isEventForSubscriber(cost, otherPastor));
+  assert.ok(!isEventForSubscriber(request, pastor));
+});
+
+test('Reenvio por Last-Event-ID respeita o escopo', () => {
+  const first = publishEvent('cost.paid', { masters: true, userIds: ['p2'] }, { costId: 'x' });
+  publishEvent('entry.changed', { all: true }, { year: 2025, month: 3 });
+  const previous = first.id.replace(/-\d+$/, `-${first.seq - 1}`);
+  const missed = eventsSince(previous, pastor);
+
+  assert.deepEqual(missed.map(event => event.type), ['entry.changed']);
+  assert.equal(eventsSince(first.id, pastor).length, 1);
+  assert.equal(eventsSince('abc', pastor).length, 0);
+  // Id à frente do último publicado: não é deste processo
+  assert.equal(eventsSince(first.id.replace(/-\d+$/, '-999'), pastor), null);
+});
+
+test('Stream SSE emite eventos do usuário', async () => {
+  const reader = createEventStream(pastor).getReader();
+  const decoder = new TextDecoder();
+
+  const text = await readUntilReady(reader);
+  assert.match(text, /id: [0-9a-f]+-\d+\nevent: ready/);
+  publishEvent('cost.rejected', { userIds: ['p1'] }, { costId: 'y' });
+  const chunk = decoder.decode((await reader.read()).value);
+  await reader.cancel();
+
+  assert.ok(chunk.includes('event: cost.rejected'), chunk);
+  assert.ok(chunk.includes('"costId":"y"'), chunk);
+});
+
+test('Reconexão após restart do processo recebe resync', async () => {
+  const first = publishEvent('entry.changed', { all: true }, { year: 2025, month: 3 });
+
+  // Restart: barramento novo (buffer vazio, sequência recomeçando em 1) numa nova instância do módulo
+  delete globalThis.__iudpEventBus;
+  const restarted = await import(`${pathToFileURL(path.join(__dirname, '..', 'lib', 'event-bus.js')).href}?restart`);
+  restarted.publishEvent('entry.changed', { all: true }, { year: 2025, month: 4 });
+
+  // Mesmo número de sequência, época diferente: não vale como id atual
+  assert.equal(restarted.eventsSince(first.id, pastor), null);
+  assert.equal(restarted.eventsSince(first.seq, pastor), null);
+
+  const reader = restarted.createEventStream(pastor, { lastEventId: first.id }).getReader();
+  const text = await readUntilReady(reader);
+  await reader.cancel();
+
+  assert.ok(text.includes('event: resync'), text);
+  assert.ok(!text.includes('"month":4'), text);
+});
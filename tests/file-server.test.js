@@ -0,0 +1,55 @@
+/**
+ * TESTES AUTOMATIZADOS - SERVIDOR DE ARQUIVOS
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir Range, respostas condicionais (304) e bloqueio de ../ nos uploads
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { parseRange, resolveInside, serveFile } = require('../lib/file-server.js');
+
+test('Interpretação do cabeçalho Range', () => {
+  const first = parseRange('bytes=0-99', 1000);
+  const suffix = parseRange('bytes=-100', 1000);
+
+  assert.equal(first.start, 0);
+  assert.equal(first.end, 99);
+  assert.equal(suffix.start, 900);
+  assert.equal(suffix.end, 999);
+  assert.equal(parseRange('bytes=900-5000', 1000).end, 999);
+  assert.equal(parseRange('bytes=1000-', 1000), 'unsatisfiable');
+  assert.equal(parseRange('bytes=0-1,5-9', 1000), null);
+});
+
+test('Bloqueio de caminhos fora da pasta', () => {
+  assert.equal(resolveInside('/app/uploads/receipts', 'abc.pdf'), '/app/uploads/receipts/abc.pdf');
+  assert.equal(resolveInside('/app/uploads/receipts', '../../etc/passwd'), null);
+  assert.equal(resolveInside('/app/uploads', 'users/../../secret'), null);
+});
+
+test('Respostas 200/304/206/416', async (t) => {
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'iudp-files-'));
+  t.after(() => fs.rmSync(dir, { recursive: true, force: true }));
+  const filepath = path.join(dir, 'comprovante.pdf');
+  fs.writeFileSync(filepath, Buffer.from('0123456789'));
+
+  const full = await serveFile(new Request('http://x/'), filepath);
+  assert.equal(full.status, 200);
+  assert.equal(Buffer.from(await full.arrayBuffer()).toString(), '0123456789');
+  assert.equal(full.headers.get('content-type'), 'application/pdf');
+
+  const revalidated = await serveFile(new Request('http://x/', { headers: { 'If-None-Match': full.headers.get('etag') } }), filepath);
+  assert.equal(revalidated.status, 304);
+
+  const partial = await serveFile(new Request('http://x/', { headers: { Range: 'bytes=2-5' } }), filepath);
+  assert.equal(partial.status, 206);
+  assert.equal(partial.headers.get('content-range'), 'bytes 2-5/10');
+  assert.equal(await new Response(partial.body).text(), '2345');
+
+  const outside = await serveFile(new Request('http://x/', { headers: { Range: 'bytes=50-' } }), filepath);
+  assert.equal(outside.status, 416);
+  assert.equal(await serveFile(new Request('http://x/'), path.join(dir, 'nao-existe.pdf')), null);
+});
@@ -0,0 +1,39 @@
+/**
+ * TESTES AUTOMATIZADOS - MINIATURAS E PRÉVIAS
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir a resolução de ?size= (derivado pronto, pendente ou não aplicável)
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const {
+  derivativePath,
+  resolveDerivative,
+  isImageFile
+} = require('../lib/image-derivatives.js');
+
+test('Caminho do derivado e detecção de imagem', () => {
+  assert.equal(derivativePath('/app/uploads/costs/bill_abc.JPG', 'thumb'), '/app/uploads/costs/.derivatives/bill_abc.JPG.thumb.webp');
+  assert.ok(isImageFile('/x/foto.JPG'));
+  assert.ok(!isImageFile('/x/comprovante.pdf'));
+});
+
+test('Sem derivado para PDF ou tamanho inválido', () => {
+  assert.equal(resolveDerivative('/x/comprovante.pdf', 'thumb'), null);
+  assert.equal(resolveDerivative('/x/foto.png', 'huge'), null);
+  assert.equal(resolveDerivative('/x/foto.png', null), null);
+});
+
+test('Derivado existente é resolvido', (t) => {
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'iudp-derivatives-'));
+  t.after(() => fs.rmSync(dir, { recursive: true, force: true }));
+  const original = path.join(dir, 'user_1.png');
+  fs.writeFileSync(original, 'png');
+  fs.mkdirSync(path.join(dir, '.derivatives'));
+  fs.writeFileSync(derivativePath(original, 'preview'), 'webp');
+
+  assert.equal(resolveDerivative(original, 'preview'), derivativePath(original, 'preview'));
+});
@@ -0,0 +1,75 @@
+/**
+ * TESTES AUTOMATIZADOS - PROJEÇÃO E COMPRESSÃO DAS LISTAS
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir o parâmetro `fields` (com lista branca) e a negociação br/gzip
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const zlib = require('zlib');
+const { resolveFields, toProjection, projectList } = require('../lib/response-fields.js');
+const { jsonResponse, negotiateEncoding, COMPRESSION_MIN_BYTES } = require('../lib/json-response.js');
+
+// Campos do comprovante lidos pelo visualizador e pelo download (app/page.js)
+const UI_RECEIPT_FIELDS = ['filename', 'fileType', 'fileSize', 'uploadedAt', 'filepath'];
+
+const request = (acceptEncoding) => new Request('http://localhost/api/users/list', {
+  method: 'POST',
+  headers: acceptEncoding ? { 'accept-encoding': acceptEncoding } : {}
+});
+
+test('Projeção por endpoint com lista branca', () => {
+  const fields = resolveFields('costs-entries/list', 'status, value,password,_id');
+  const projection = toProjection('costs-entries/list', fields);
+  const churches = projectList('churches/list', [{
+    _id: 'x', churchId: 'c1', name: 'Central', pastor: { userId: 'u1', name: 'Ana', password: 'hash', permissions: {} }
+  }], resolveFields('churches/list', ['name', 'pastor']));
+
+  assert.deepEqual(fields, ['costId', 'createdAt', 'value', 'status']);
+  assert.equal(projection._id, 0);
+  assert.equal(projection.value, 1);
+  assert.ok(!('password' in projection));
+  assert.equal(toProjection('entries/month', ['receipts'])['receipts.filepath'], 1);
+  assert.deepEqual(churches[0], { churchId: 'c1', name: 'Central', pastor: { userId: 'u1', name: 'Ana' } });
+});
+
+test('Comprovantes trazem os campos exibidos na tela', () => {
+  const projection = toProjection('entries/month', ['receipts']);
+  const receipt = { receiptId: 'r1', filename: 'recibo.jpg', filepath: 'abc.jpg', fileType: 'image/jpeg', fileSize: 2048, uploadedAt: '2025-03-09T22:00:00.000Z', hash: 'x' };
+  const [entry] = projectList('entries/month', [{ entryId: 'e1', receipts: [receipt] }], resolveFields('entries/month', ['receipts']));
+
+  for (const field of UI_RECEIPT_FIELDS) {
+    assert.equal(projection[`receipts.${field}`], 1, field);
+    assert.equal(entry.receipts[0][field], receipt[field], field);
+  }
+  assert.ok(!('hash' in entry.receipts[0]));
+});
+
+test('Negociação do Accept-Encoding', () => {
+  assert.equal(negotiateEncoding('gzip, deflate, br'), 'br');
+  assert.equal(negotiateEncoding('gzip, br;q=0'), 'gzip');
+  assert.equal(negotiateEncoding('br;q=0.5, gzip;q=0.8'), 'gzip');
+  assert.equal(negotiateEncoding('identity'), null);
+  assert.equal(negotiateEncoding('*'), 'br');
+  assert.equal(negotiateEncoding(''), null);
+});
+
+test('Compressão acima do limite mínimo', async () => {
+  const payload = { users: Array.from({ length: 200 }, (_, i) => ({ userId: `u${i}`, name: `Usuário ${i}`, cargo: 'Obreiro(a)' })) };
+  const big = await jsonResponse(request('gzip, br'), payload, { name: 'users/list' });
+  const body = Buffer.from(await big.arrayBuffer());
+
+  assert.equal(big.headers.get('content-encoding'), 'br');
+  assert.equal(big.headers.get('vary'), 'Accept-Encoding');
+  assert.equal(JSON.parse(zlib.brotliDecompressSync(body).toString()).users.length, 200);
+  assert.ok(body.length < JSON.stringify(payload).length / 3, `${body.length} bytes`);
+  assert.ok(big.headers.get('server-timing').startsWith('serialize;dur='));
+
+  const small = await jsonResponse(request('gzip, br'), { ok: true });
+  assert.ok(!small.headers.get('content-encoding'));
+  assert.ok(JSON.stringify({ ok: true }).length < COMPRESSION_MIN_BYTES);
+
+  const plain = await jsonResponse(request(null), payload);
+  assert.ok(!plain.headers.get('content-encoding'));
+  assert.equal((await plain.json()).users.length, 200);
+});
@@ -0,0 +1,38 @@
+/**
+ * TESTES AUTOMATIZADOS - PAGINAÇÃO POR CURSOR
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir que as páginas de custos, liberações e auditoria não repitam nem pulem itens
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const { encodeCursor, decodeCursor, buildKeysetFilter, buildDateRangeFilter, resolvePageSize } = require('../lib/keyset-pagination.js');
+
+test('Codificação e leitura do cursor', () => {
+  const decoded = decodeCursor(encodeCursor({ timestamp: '2025-03-09T13:00:00.000Z', logId: 'abc' }, 'timestamp', 'logId'));
+
+  assert.equal(decoded.v, '2025-03-09T13:00:00.000Z');
+  assert.equal(decoded.id, 'abc');
+  assert.equal(decodeCursor('lixo'), null);
+});
+
+test('Próxima página começa após (data, id) do último item', () => {
+  const cursor = encodeCursor({ createdAt: '2025-03-09T13:00:00.000Z', costId: 'c9' }, 'createdAt', 'costId');
+  const [base, keyset] = buildKeysetFilter({ churchId: 'c' }, cursor, 'createdAt', 'costId').$and;
+
+  assert.equal(base.churchId, 'c');
+  assert.equal(keyset.$or[0].createdAt.$lt, '2025-03-09T13:00:00.000Z');
+  assert.equal(keyset.$or[1].createdAt, '2025-03-09T13:00:00.000Z');
+  assert.equal(keyset.$or[1].costId.$lt, 'c9');
+});
+
+test('Intervalo de datas e tamanho de página', () => {
+  const range = buildDateRangeFilter('2025-03-01', '2025-03-31');
+
+  assert.equal(range.$gte, '2025-03-01');
+  assert.equal(range.$lte, '2025-03-31T23:59:59.999Z');
+  assert.equal(buildDateRangeFilter(null, null), null);
+  assert.equal(resolvePageSize(undefined, null), null);
+  assert.equal(resolvePageSize('20'), 20);
+  assert.equal(resolvePageSize(10000), 500);
+});
@@ -0,0 +1,48 @@
+/**
+ * TESTES AUTOMATIZADOS - CACHE DE CONSULTAS
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir expiração, descarte LRU e invalidação do cache de users/roles/privacy/month_status
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const { LruTtlCache, getCachedUser, invalidateUser, getCacheStats } = require('../lib/lookup-cache.js');
+
+test('Expiração por TTL', () => {
+  let now = 0;
+  const cache = new LruTtlCache({ max: 10, ttlMs: 1000, now: () => now });
+  cache.set('a', 1);
+  assert.equal(cache.lookup('a')?.value, 1);
+
+  now = 1000;
+  assert.equal(cache.lookup('a'), undefined);
+});
+
+test('Descarte LRU ao atingir o limite', () => {
+  const cache = new LruTtlCache({ max: 2, ttlMs: 60000 });
+  cache.set('a', 1);
+  cache.set('b', 2);
+  cache.lookup('a');
+  cache.set('c', 3);
+
+  assert.equal(cache.lookup('b'), undefined);
+  assert.equal(cache.lookup('a')?.value, 1);
+  assert.equal(cache.stats().evictions, 1);
+});
+
+test('Leitura de usuário com cache e invalidação explícita', async () => {
+  const users = new Map([['u-cache-test', { userId: 'u-cache-test', role: 'pastor', name: 'Ana' }]]);
+  const db = { collection: () => ({ findOne: async ({ userId }) => ({ ...users.get(userId) }) }) };
+
+  const first = await getCachedUser(db, 'u-cache-test');
+  first.name = 'alterado pelo chamador';
+  users.get('u-cache-test').name = 'Ana Paula';
+  const second = await getCachedUser(db, 'u-cache-test');
+  invalidateUser('u-cache-test');
+  const third = await getCachedUser(db, 'u-cache-test');
+
+  // Cópia protegida do chamador; mudança no banco só aparece após a invalidação
+  assert.equal(second.name, 'Ana');
+  assert.equal(third.name, 'Ana Paula');
+  assert.ok(getCacheStats().users.hits >= 1);
+});
@@ -0,0 +1,158 @@
+/**
+ * TESTES AUTOMATIZADOS - CONEXÃO COM O MONGODB
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir inicialização única no cold start, opções do pool e métricas de espera
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const { spawnSync } = require('child_process');
+const { EventEmitter } = require('events');
+const os = require('os');
+const path = require('path');
+const {
+  closeMongo,
+  connectMongo,
+  getMongoOptions,
+  getPoolStats,
+  onMongoShutdown,
+  renderPoolMetrics
+} = require('../lib/mongo-connection.js');
+
+// Linha de uma métrica no texto do Prometheus
+const metricLine = (text, prefix) => text.split('\n').find(line => line.startsWith(prefix));
+
+// Cliente em memória: conecta após `ms`, emite os eventos do pool como o driver
+class FakeClient extends EventEmitter {
+  constructor(options, { ms = 20, fail = false } = {}) {
+    super();
+    this.options = options;
+    this.ms = ms;
+    this.fail = fail;
+    this.closed = false;
+  }
+
+  async connect() {
+    await new Promise(resolve => setTimeout(resolve, this.ms));
+    if (this.fail) throw new Error('servidor fora');
+  }
+
+  db(name) {
+    return { name, client: this };
+  }
+
+  async close() {
+    this.closed = true;
+  }
+}
+
+test('Opções do pool por ambiente', () => {
+  const defaults = getMongoOptions({});
+  const tuned = getMongoOptions({ MONGO_MAX_POOL_SIZE: '8', MONGO_MIN_POOL_SIZE: '50', MONGO_WAIT_QUEUE_TIMEOUT_MS: 'abc' });
+
+  assert.equal(defaults.maxPoolSize, 20);
+  assert.equal(defaults.minPoolSize, 2);
+  assert.equal(defaults.monitorCommands, true);
+  // Valor inválido volta ao padrão; mínimo nunca passa do máximo
+  assert.equal(tuned.maxPoolSize, 8);
+  assert.equal(tuned.minPoolSize, 8);
+  assert.equal(tuned.waitQueueTimeoutMS, 10000);
+});
+
+test('Inicialização única no cold start', async () => {
+  const clients = [];
+  let initialized = 0;
+  const factory = (fail) => (options) => {
+    const client = new FakeClient(options, { fail });
+    clients.push(client);
+    return client;
+  };
+  const onConnect = async () => {
+    await new Promise(resolve => setTimeout(resolve, 10));
+    initialized++;
+  };
+
+  // Falha não fica em cache e o cliente é fechado
+  await assert.rejects(connectMongo({ createClient: factory(true), dbName: 'iudp', onConnect }), { message: 'servidor fora' });
+  assert.ok(clients[0].closed);
+
+  const dbs = await Promise.all(
+    Array.from({ length: 10 }, () => connectMongo({ createClient: factory(false), dbName: 'iudp', onConnect }))
+  );
+  const again = await connectMongo({ createClient: factory(false), dbName: 'iudp', onConnect });
+
+  assert.equal(clients.length, 2);
+  assert.equal(initialized, 1);
+  assert.ok(dbs.every(db => db === dbs[0]));
+  assert.equal(again, dbs[0]);
+  assert.equal(dbs[0].name, 'iudp');
+  assert.equal(getPoolStats().connected, true);
+  assert.equal(getPoolStats().maxPoolSize, 20);
+});
+
+test('Métricas de espera no pool e encerramento', async (t) => {
+  // Reaproveita a conexão aberta no teste anterior
+  const client = (await connectMongo({ createClient: () => null, dbName: 'iudp' })).client;
+  client.emit('connectionCheckOutStarted', {});
+  client.emit('connectionCheckedOut', { durationMS: 3 });
+  client.emit('connectionCheckOutStarted', {});
+  client.emit('connectionCheckOutFailed', { reason: 'timeout', durationMS: 2000 });
+  client.emit('connectionCheckedIn', {});
+
+  const text = renderPoolMetrics();
+  const stats = getPoolStats();
+  assert.ok(metricLine(text, 'iudp_mongo_pool_wait_seconds_bucket{le="0.005"}').endsWith(' 1'));
+  assert.ok(metricLine(text, 'iudp_mongo_pool_wait_seconds_bucket{le="+Inf"}').endsWith(' 2'));
+  assert.ok(metricLine(text, 'iudp_mongo_pool_checkout_failures_total{reason="timeout"}').endsWith(' 1'));
+  assert.ok(metricLine(text, 'iudp_mongo_pool_checked_out').endsWith(' 0'));
+  assert.equal(stats.checkouts, 1);
+  assert.equal(stats.waiting, 0);
+  assert.equal(stats.avgWaitMs, 1001.5);
+
+  const flushed = [];
+  onMongoShutdown((db) => { flushed.push(db.name); });
+  onMongoShutdown(() => { throw new Error('hook com erro não impede o fechamento'); });
+  t.mock.method(console, 'error', () => {});
+  await closeMongo('teste');
+
+  assert.deepEqual(flushed, ['iudp']);
+  assert.ok(client.closed);
+  assert.equal(getPoolStats().connected, false);
+});
+
+test('SIGTERM espera os hooks e o fechamento do cliente antes de sair', () => {
+  // Processo separado: o sinal encerra o processo inteiro
+  const script = `
+    const { EventEmitter } = require('events');
+    const { connectMongo, onMongoShutdown } = require(${JSON.stringify(path.join(__dirname, '../lib/mongo-connection.js'))});
+    const { recordAudit, stopAuditWriter } = require(${JSON.stringify(path.join(__dirname, '../lib/audit-writer.js'))});
+    const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+    const log = (event) => process.stdout.write(event + '\\n');
+
+    class Client extends EventEmitter {
+      async connect() {}
+      db(name) {
+        return { name, collection: () => ({ insertMany: async (records) => { await sleep(30); log('audit:' + records.length); } }) };
+      }
+      async close() { await sleep(10); log('client.close'); }
+    }
+
+    connectMongo({ createClient: () => new Client(), dbName: 'iudp' }).then((db) => {
+      recordAudit(db, { action: 'TEST' });
+      onMongoShutdown(stopAuditWriter);
+      onMongoShutdown(async () => { await sleep(50); log('presence'); });
+      process.kill(process.pid, 'SIGTERM');
+    });
+    // Como o servidor: mantém o processo vivo até o sinal
+    setInterval(() => {}, 1000);
+  `;
+  const child = spawnSync(process.execPath, ['-e', script], {
+    encoding: 'utf8',
+    timeout: 10000,
+    env: { ...process.env, AUDIT_FALLBACK_FILE: path.join(os.tmpdir(), `iudp-sigterm-${process.pid}.jsonl`) }
+  });
+
+  assert.equal(child.status, 0, child.stderr);
+  const events = child.stdout.split('\n').filter(line => line && !line.startsWith('['));
+  assert.deepEqual(events, ['audit:1', 'presence', 'client.close']);
+});
@@ -0,0 +1,88 @@
+/**
+ * TESTES AUTOMATIZADOS - UPLOAD MULTIPART EM STREAMING
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir gravação direta em disco com hash, assinatura e limite de tamanho
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const crypto = require('crypto');
+const { receiveUpload, UploadError } = require('../lib/multipart-upload.js');
+
+const OPTIONS = { allowedTypes: ['image/jpeg', 'application/pdf'], maxSize: 64 * 1024 };
+const JPEG = Buffer.concat([Buffer.from([0xff, 0xd8, 0xff, 0xe0]), crypto.randomBytes(20000)]);
+
+// Pasta temporária removida ao fim do teste
+function tempDir(t) {
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'iudp-multipart-'));
+  t.after(() => fs.rmSync(dir, { recursive: true, force: true }));
+  return dir;
+}
+
+// Monta o corpo multipart como o navegador e o entrega em pedaços de chunkSize bytes
+async function buildRequest(parts, chunkSize) {
+  const form = new FormData();
+  for (const [name, value, filename] of parts) {
+    if (filename) form.append(name, new Blob([value]), filename);
+    else form.append(name, value);
+  }
+  const encoded = new Response(form);
+  const body = Buffer.from(await encoded.arrayBuffer());
+  const stream = new ReadableStream({
+    start(controller) {
+      for (let i = 0; i < body.length; i += chunkSize) controller.enqueue(new Uint8Array(body.subarray(i, i + chunkSize)));
+      controller.close();
+    }
+  });
+  return new Request('http://localhost/api/upload/receipt', {
+    method: 'POST',
+    headers: { 'content-type': encoded.headers.get('content-type') },
+    body: stream,
+    duplex: 'half'
+  });
+}
+
+const tempFiles = (dir) => fs.readdirSync(dir).filter(name => name.endsWith('.tmp'));
+
+test('Arquivo gravado em streaming com hash e campos', async (t) => {
+  const dir = tempDir(t);
+  // Pedaços de 7 bytes partem o delimitador entre leituras
+  const request = await buildRequest([['file', JPEG, 'recibo.jpg'], ['entryId', '2025-01-05-08:00']], 7);
+  const { fields, file } = await receiveUpload(request, { dir, ...OPTIONS });
+
+  assert.equal(fields.entryId, '2025-01-05-08:00');
+  assert.equal(file.size, JPEG.length);
+  assert.ok(fs.readFileSync(file.tempPath).equals(JPEG));
+  assert.equal(file.mimeType, 'image/jpeg');
+  assert.equal(file.originalName, 'recibo.jpg');
+  assert.equal(file.hash, crypto.createHash('sha256').update(JPEG).digest('hex'));
+});
+
+test('Assinatura inválida rejeitada sem deixar temporário', async (t) => {
+  const dir = tempDir(t);
+  const request = await buildRequest([['file', Buffer.from('<html>não é imagem</html>'), 'foto.jpg']], 1024);
+
+  await assert.rejects(receiveUpload(request, { dir, ...OPTIONS, formatHint: 'Use: JPEG ou PDF' }), (error) => {
+    assert.ok(error instanceof UploadError);
+    assert.equal(error.status, 400);
+    assert.equal(error.details, 'Use: JPEG ou PDF');
+    return true;
+  });
+  assert.equal(tempFiles(dir).length, 0);
+});
+
+test('Arquivo acima do limite interrompido', async (t) => {
+  const dir = tempDir(t);
+  const big = Buffer.concat([Buffer.from('%PDF-1.4\n'), Buffer.alloc(100 * 1024)]);
+  const request = await buildRequest([['file', big, 'conta.pdf']], 16 * 1024);
+
+  await assert.rejects(receiveUpload(request, { dir, ...OPTIONS }), (error) => {
+    assert.ok(error instanceof UploadError);
+    assert.ok(error.message.includes('muito grande'), error.message);
+    return true;
+  });
+  assert.equal(tempFiles(dir).length, 0);
+});
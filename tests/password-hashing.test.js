@@ -0,0 +1,63 @@
+/**
+ * TESTES AUTOMATIZADOS - SENHAS EM POOL DE WORKERS
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir a detecção de hashes a migrar e o comportamento do pool de worker threads
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const { Worker } = require('worker_threads');
+const { hashAlgorithm, needsRehash, verifyPassword } = require('../lib/password-hashing.js');
+const { WorkerPool } = require('../lib/worker-pool.js');
+
+// Worker de teste: espera `ms` e devolve `value` (ou encerra o processo do worker com crash)
+const ECHO_WORKER = `
+const { parentPort } = require('worker_threads');
+parentPort.on('message', ({ id, ms, value, crash }) => {
+  if (crash) process.exit(3);
+  setTimeout(() => parentPort.postMessage(value === 'erro' ? { id, error: 'falhou' } : { id, result: value }), ms);
+});
+`;
+const echoPool = (size) => new WorkerPool(() => new Worker(ECHO_WORKER, { eval: true }), { size });
+
+test('Detecção de hashes a migrar', async () => {
+  const legacy = '$2b$10$bj3csln3r5Mbf0.Ln6jw5e3buVRLADgzVnMdzgi1YlDCvn0I7fIxK';
+  const current = '$argon2id$v=19$m=19456,t=2,p=1$c2FsdHNhbHQ$aGFzaGhhc2hoYXNo';
+  const weaker = '$argon2id$v=19$m=4096,t=3,p=1$c2FsdHNhbHQ$aGFzaGhhc2hoYXNo';
+
+  assert.equal(hashAlgorithm(legacy), 'bcrypt');
+  assert.ok(needsRehash(legacy));
+  assert.equal(hashAlgorithm(current), 'argon2id');
+  assert.ok(!needsRehash(current));
+  assert.ok(needsRehash(weaker));
+  assert.equal(hashAlgorithm('texto-puro'), null);
+  assert.equal(await verifyPassword('123456', 'texto-puro'), false);
+  assert.equal(await verifyPassword('123456', undefined), false);
+});
+
+test('Fila e limite de workers', async (t) => {
+  const pool = echoPool(2);
+  t.after(() => pool.destroy());
+
+  const started = Date.now();
+  const results = await Promise.all([1, 2, 3, 4].map(value => pool.run({ ms: 60, value })));
+  const elapsed = Date.now() - started;
+  await assert.rejects(pool.run({ ms: 1, value: 'erro' }), { message: 'falhou' });
+  const stats = pool.stats();
+
+  assert.deepEqual(results, [1, 2, 3, 4]);
+  // 4 tarefas de 60ms em 2 workers: pelo menos duas rodadas
+  assert.ok(elapsed >= 115, `${elapsed}ms`);
+  assert.equal(stats.workers, 2);
+  assert.ok(stats.peakQueue >= 2);
+  assert.equal(stats.completed, 4);
+  assert.equal(stats.failed, 1);
+});
+
+test('Recuperação após queda do worker', async (t) => {
+  const pool = echoPool(1);
+  t.after(() => pool.destroy());
+
+  await assert.rejects(pool.run({ crash: true }), { message: /código 3/ });
+  assert.equal(await pool.run({ ms: 1, value: 'ok' }), 'ok');
+});
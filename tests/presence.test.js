@@ -0,0 +1,88 @@
+/**
+ * TESTES AUTOMATIZADOS - PRESENÇA EM MEMÓRIA
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir heartbeats agrupados num bulkWrite e offline por tempo sem logout
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const {
+  applyPresence,
+  flushPresence,
+  markOffline,
+  touchPresence,
+  PRESENCE_TIMEOUT_MS
+} = require('../lib/presence.js');
+
+const T0 = Date.parse('2025-03-02T11:00:00.000Z');
+const iso = (ms) => new Date(ms).toISOString();
+
+// users em memória: bulkWrite e updateMany aplicam o $set; `batches` guarda os userIds de cada lote
+function usersDb(users) {
+  const byId = (userId) => users.find(user => user.userId === userId);
+  const db = {
+    batches: [],
+    user: byId,
+    collection: () => ({
+      bulkWrite: async (ops) => {
+        db.batches.push(ops.map(op => op.updateOne.filter.userId));
+        for (const { updateOne: { filter, update } } of ops) Object.assign(byId(filter.userId), update.$set);
+      },
+      updateMany: async ({ lastActivity, userId }, update) => {
+        const stale = users.filter(u => u.isOnline && u.lastActivity < lastActivity.$lt && !userId.$nin.includes(u.userId));
+        stale.forEach(u => Object.assign(u, update.$set));
+        return { modifiedCount: stale.length };
+      }
+    })
+  };
+  return db;
+}
+
+// Os testes compartilham o banco e o estado em memória do módulo e rodam em sequência
+const db = usersDb([
+  { userId: 'ana', isOnline: false, lastActivity: iso(T0 - 86400000) },
+  { userId: 'bia', isOnline: false, lastActivity: iso(T0 - 86400000) },
+  { userId: 'caio', isOnline: true, lastActivity: iso(T0 - 86400000) }
+]);
+
+test('Heartbeats agrupados num bulkWrite', async () => {
+  for (let i = 0; i < 10; i++) {
+    touchPresence('ana', iso(T0 + i * 1000));
+    touchPresence('bia', iso(T0 + i * 500));
+  }
+  await flushPresence(db, T0 + 10000);
+  await flushPresence(db, T0 + 11000);
+
+  // Várias abas → uma escrita por usuário, com o horário mais recente; nada novo, nada gravado
+  assert.deepEqual(db.batches.map(ids => ids.sort()), [['ana', 'bia']]);
+  assert.deepEqual(db.user('ana'), { userId: 'ana', isOnline: true, lastActivity: iso(T0 + 9000) });
+  assert.equal(db.user('bia').lastActivity, iso(T0 + 4500));
+  // Online no banco sem heartbeat em memória (processo anterior): sai por tempo
+  assert.equal(db.user('caio').isOnline, false);
+});
+
+test('Offline por tempo sem heartbeat', async () => {
+  touchPresence('ana', iso(T0 + PRESENCE_TIMEOUT_MS));
+  await flushPresence(db, T0 + PRESENCE_TIMEOUT_MS + 30000);
+  const users = applyPresence([{ userId: 'ana', isOnline: false }, { userId: 'bia', isOnline: true }], T0 + PRESENCE_TIMEOUT_MS + 30000);
+
+  assert.equal(db.user('bia').isOnline, false);
+  assert.equal(db.user('ana').isOnline, true);
+  assert.equal(db.user('ana').lastActivity, iso(T0 + PRESENCE_TIMEOUT_MS));
+  assert.equal(users[0].isOnline, true);
+  assert.equal(users[1].isOnline, true); // bia: sem dado em memória, vale o banco
+});
+
+test('Logout e nova tentativa após falha', async () => {
+  const now = T0 + PRESENCE_TIMEOUT_MS + 40000;
+  markOffline('ana', iso(now));
+  const failing = { collection: () => ({ bulkWrite: async () => { throw new Error('mongo fora'); } }) };
+  await assert.rejects(flushPresence(failing, now), { message: 'mongo fora' });
+  assert.equal(db.user('ana').isOnline, true);
+
+  await flushPresence(db, now + 1000);
+
+  assert.deepEqual(db.batches.at(-1), ['ana']);
+  assert.equal(db.user('ana').isOnline, false);
+  assert.equal(applyPresence([{ userId: 'ana', isOnline: true }])[0].isOnline, true);
+});
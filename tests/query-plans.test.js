@@ -0,0 +1,40 @@
+/**
+ * TESTES AUTOMATIZADOS - PLANOS DE CONSULTA
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir que nenhuma consulta dos endpoints caia em COLLSCAN
+ *
+ * Requer o driver `mongodb` e um MongoDB acessível (sem eles o teste é pulado):
+ *   MONGO_URL=mongodb://localhost:27017 DB_NAME=iudp_bench node --test tests/query-plans.test.js
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+
+// Motivo para pular (false = MongoDB disponível)
+function mongoUnavailable() {
+  try {
+    require.resolve('mongodb');
+  } catch {
+    return 'mongodb não instalado';
+  }
+  return !process.env.MONGO_URL && 'MONGO_URL não definido';
+}
+
+const skip = mongoUnavailable();
+
+test('Consultas dos endpoints usam índice', { skip }, async (t) => {
+  const { MongoClient } = require('mongodb');
+  const { ensureIndexes, verifyQueryPlans } = require('../lib/db-indexes.js');
+
+  const client = await MongoClient.connect(process.env.MONGO_URL);
+  t.after(() => client.close());
+
+  const db = client.db(process.env.DB_NAME || 'iudp_control');
+  await ensureIndexes(db);
+
+  for (const result of await verifyQueryPlans(db)) {
+    await t.test(`${result.endpoint} (${result.collection})`, () => {
+      assert.ok(!result.collscan, `COLLSCAN: ${result.stages.join(' < ')}`);
+    });
+  }
+});
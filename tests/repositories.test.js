@@ -0,0 +1,85 @@
+/**
+ * TESTES AUTOMATIZADOS - CAMADA DE REPOSITÓRIOS
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir a tradução dos filtros para SQL (SQLite) e as escritas do backend MongoDB
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const {
+  applyProjection,
+  buildPageQuery,
+  compileCriteria,
+  schemaStatements
+} = require('../lib/repositories-sqlite.js');
+const { repositoriesFor } = require('../lib/repositories.js');
+const { encodeCursor } = require('../lib/keyset-pagination.js');
+
+// entries em memória: bulkWrite com updateOne/upsert, findOne e find por $in; `batches` conta as escritas
+function entriesDb() {
+  const docs = new Map();
+  const db = {
+    batches: 0,
+    collection: () => ({
+      bulkWrite: async (ops) => {
+        db.batches++;
+        for (const { updateOne: { filter, update, upsert } } of ops) {
+          if (docs.has(filter.entryId) || upsert) docs.set(filter.entryId, { ...docs.get(filter.entryId), ...update.$set });
+        }
+      },
+      findOne: async ({ entryId }) => docs.get(entryId) || null,
+      find: ({ entryId }) => ({ toArray: async () => entryId.$in.filter(id => docs.has(id)).map(id => docs.get(id)) })
+    })
+  };
+  return db;
+}
+
+test('Filtros traduzidos para SQL', () => {
+  const { where, params } = compileCriteria('costs_entries', {
+    churchId: 'c1',
+    status: 'PAID',
+    dueDate: { $gte: '2025-01-01', $lt: '2025-02-01' },
+    createdAt: undefined
+  });
+
+  assert.equal(where, '"churchId" = ? AND "status" = ? AND "dueDate" >= ? AND "dueDate" < ? AND "createdAt" IS NULL');
+  assert.deepEqual(params, ['c1', 'PAID', '2025-01-01', '2025-02-01']);
+  assert.equal(compileCriteria('entries', { entryId: { $in: [] } }).where, '0');
+  assert.equal(compileCriteria('audit_logs', {}).where, '1');
+  // Campo sem coluna é erro (não vira varredura em JSON)
+  assert.throws(() => compileCriteria('entries', { 'receipts.filepath': 'f.pdf' }), /Campo sem coluna em entries: receipts.filepath/);
+});
+
+test('Paginação keyset e índices no SQLite', () => {
+  const cursor = encodeCursor({ createdAt: '2025-01-05T10:00:00.000Z', costId: 'x' }, 'createdAt', 'costId');
+  const query = buildPageQuery('costs_entries', { churchId: 'c1' }, { sortField: 'createdAt', idField: 'costId', limit: 50, cursor });
+  const schema = schemaStatements();
+
+  // Mesma ordem do MongoDB: desc, desempate pelo id
+  assert.equal(query.sql, 'SELECT doc FROM "costs_entries" WHERE "churchId" = ? AND ("createdAt" < ? OR ("createdAt" = ? AND "costId" < ?)) ' +
+    'ORDER BY "createdAt" DESC, "costId" DESC LIMIT ?');
+  assert.deepEqual(query.params, ['c1', '2025-01-05T10:00:00.000Z', '2025-01-05T10:00:00.000Z', 'x', 51]);
+  assert.deepEqual(query.countParams, ['c1']);
+  assert.ok(schema.includes('CREATE INDEX IF NOT EXISTS "costs_entries_churchId_createdAt_costId" ON "costs_entries" ("churchId", "createdAt", "costId")'));
+  assert.ok(schema.includes('CREATE UNIQUE INDEX IF NOT EXISTS "audit_logs_logId" ON "audit_logs" ("logId")'));
+});
+
+test('Backend MongoDB e projeção', async () => {
+  const db = entriesDb();
+  const repos = repositoriesFor(db);
+  await repos.entries.upsertMany([{ entryId: 'e1', value: 10 }, { entryId: 'e2', value: 20 }]);
+  await repos.entries.upsertMany([{ entryId: 'e2', value: 25, notes: 'corrigido' }]);
+
+  // Grava como a rota gravava: upsert por entryId, uma escrita por chamada
+  assert.equal(repositoriesFor(db), repos);
+  assert.equal(repos.engine, 'mongo');
+  assert.equal(db.batches, 2);
+  assert.deepEqual(await repos.entries.findByEntryId('e2'), { entryId: 'e2', value: 25, notes: 'corrigido' });
+  assert.deepEqual((await repos.entries.findByEntryIds(['e1', 'e3'])).map(e => e.value), [10]);
+
+  const projected = applyProjection(
+    { _id: 'x', entryId: 'e1', value: 10, notes: 'n', receipts: [{ filepath: 'a.pdf', size: 9 }] },
+    { _id: 0, entryId: 1, value: 1, 'receipts.filepath': 1 }
+  );
+  assert.deepEqual(projected, { entryId: 'e1', value: 10, receipts: [{ filepath: 'a.pdf' }] });
+});
@@ -0,0 +1,107 @@
+/**
+ * TESTES AUTOMATIZADOS - MÉTRICAS POR ENDPOINT
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir atribuição de comandos do MongoDB/hash de senha à requisição e o texto Prometheus
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const { EventEmitter } = require('events');
+const {
+  canReadMetrics,
+  instrumentMongoClient,
+  normalizeEndpoint,
+  renderMetrics,
+  timePasswordHashing,
+  withRequestMetrics
+} = require('../lib/request-metrics.js');
+
+const apiRequest = (endpoint, method = 'POST') => new Request(`http://localhost/api/${endpoint}`, { method });
+const metricLine = (text, prefix) => text.split('\n').find(line => line.startsWith(prefix));
+
+// Cliente falso: emite os mesmos eventos do command monitoring do driver
+const client = new EventEmitter();
+let nextRequestId = 1;
+async function fakeCommand(durationMs) {
+  const requestId = nextRequestId++;
+  client.emit('commandStarted', { requestId, commandName: 'find' });
+  await new Promise(resolve => setTimeout(resolve, 1));
+  client.emit('commandSucceeded', { requestId, duration: durationMs });
+}
+
+const endsWith = (text, prefix, value) => {
+  const line = metricLine(text, prefix);
+  assert.ok(line?.endsWith(` ${value}`), `${prefix} → ${line}`);
+};
+
+test('Normalização do endpoint', () => {
+  // Rótulos sem ids nem nomes de arquivo
+  assert.equal(normalizeEndpoint('/api/entries/month'), 'entries/month');
+  assert.equal(normalizeEndpoint('/api/view/receipt/abc123.jpg'), 'view/receipt/:file');
+  assert.equal(normalizeEndpoint('/api/uploads/users/x.png'), 'uploads/:file');
+  assert.equal(normalizeEndpoint('/api/observations/month/get/'), 'observations/month/get');
+});
+
+test('Atribuição de MongoDB e hash de senha por requisição', async () => {
+  instrumentMongoClient(client);
+
+  const login = withRequestMetrics('POST', async () => {
+    await fakeCommand(4);
+    await timePasswordHashing(() => new Promise(resolve => setTimeout(() => resolve(true), 5)));
+    return new Response('{}', { status: 200 });
+  });
+  const list = withRequestMetrics('POST', async () => {
+    await Promise.all([fakeCommand(10), fakeCommand(20), fakeCommand(30)]);
+    return new Response('{}', { status: 403 });
+  });
+
+  // Requisições concorrentes não misturam os contadores
+  await Promise.all([login(apiRequest('auth/login')), list(apiRequest('users/list'))]);
+  await fakeCommand(7); // fora de requisição
+
+  const text = renderMetrics();
+  endsWith(text, 'iudp_db_operations_total{method="POST",endpoint="auth/login"}', 1);
+  endsWith(text, 'iudp_db_operations_total{method="POST",endpoint="users/list"}', 3);
+  endsWith(text, 'iudp_db_seconds_total{method="POST",endpoint="users/list"}', 0.06);
+  endsWith(text, 'iudp_db_operations_total{method="-",endpoint="_background"}', 1);
+  endsWith(text, 'iudp_password_hash_operations_total{method="POST",endpoint="auth/login"}', 1);
+  endsWith(text, 'iudp_password_hash_operations_total{method="POST",endpoint="users/list"}', 0);
+  endsWith(text, 'iudp_http_requests_total{method="POST",endpoint="users/list",status="403"}', 1);
+});
+
+test('Histograma, status 500 e log [SLOW]', async (t) => {
+  const warn = t.mock.method(console, 'warn', () => {});
+  process.env.SLOW_REQUEST_MS = '0';
+  t.after(() => { delete process.env.SLOW_REQUEST_MS; });
+
+  const failing = withRequestMetrics('GET', async () => { throw new Error('falhou'); });
+  await assert.rejects(failing(apiRequest('dashboard/data', 'GET')), { message: 'falhou' });
+
+  const text = renderMetrics();
+  endsWith(text, 'iudp_http_requests_total{method="GET",endpoint="dashboard/data",status="500"}', 1);
+  endsWith(text, 'iudp_http_request_duration_seconds_bucket{method="GET",endpoint="dashboard/data",le="+Inf"}', 1);
+  endsWith(text, 'iudp_http_request_duration_seconds_count{method="GET",endpoint="dashboard/data"}', 1);
+  assert.ok(text.includes('# TYPE iudp_http_request_duration_seconds histogram'));
+  assert.ok(warn.mock.calls.some(call => String(call.arguments[0]).startsWith('[SLOW] GET dashboard/data')));
+});
+
+test('Acesso às métricas só com credencial', (t) => {
+  const request = (headers) => new Request('http://localhost/api/metrics', { headers });
+  const previous = process.env.METRICS_TOKEN;
+  t.after(() => {
+    if (previous === undefined) delete process.env.METRICS_TOKEN;
+    else process.env.METRICS_TOKEN = previous;
+  });
+
+  // Sem x-forwarded-for (proxy que não o envia) não é mais sinal de acesso local
+  delete process.env.METRICS_TOKEN;
+  assert.equal(canReadMetrics(request({}), null), false);
+  assert.equal(canReadMetrics(request({ authorization: 'Bearer qualquer' }), null), false);
+  assert.equal(canReadMetrics(request({}), { role: 'pastor' }), false);
+  assert.equal(canReadMetrics(request({}), { role: 'master' }), true);
+
+  process.env.METRICS_TOKEN = 'segredo-do-coletor';
+  assert.equal(canReadMetrics(request({ authorization: 'Bearer segredo-do-coletor' }), null), true);
+  assert.equal(canReadMetrics(request({ authorization: 'Bearer segredo-do' }), null), false);
+  assert.equal(canReadMetrics(request({ 'x-forwarded-for': '10.0.0.1', authorization: 'Bearer segredo-do-coletor' }), null), true);
+});
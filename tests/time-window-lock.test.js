@@ -0,0 +1,61 @@
+/**
+ * TESTES AUTOMATIZADOS - TRAVA DE JANELA DE CULTO
+ * Sistema: Caderno de Controle Online - IUDP
+ * Objetivo: Garantir que o agendador e a leitura de entries/month travem as mesmas janelas
+ */
+
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const { isTimeWindowClosed, buildLockSweepFilter, msUntilNextSweep } = require('../lib/time-window-lock.js');
+const { getBrazilOffsetMinutes, getSlotWindow } = require('../lib/time-slots.js');
+
+// Domingo 09/03/2025 às 12:00:30 (horário de Brasília)
+const clock = { year: 2025, month: 3, day: 9, minutes: 12 * 60, seconds: 30 };
+const entry = { year: 2025, month: 3, day: 9, timeSlot: '10:00', timeWindowLocked: false, masterUnlocked: false };
+
+test('Janela trava somente após o minuto de encerramento', () => {
+  // Janela das 10:00 só trava no minuto seguinte ao fim (12:00 + tolerância)
+  assert.equal(isTimeWindowClosed(entry, clock), false);
+  assert.equal(isTimeWindowClosed(entry, { ...clock, minutes: 12 * 60 + 1 }), true);
+});
+
+test('Dias anteriores travam, exceto override ou mês fechado', () => {
+  assert.equal(isTimeWindowClosed({ ...entry, day: 8, timeSlot: '19:30' }, clock), true);
+  assert.equal(isTimeWindowClosed({ ...entry, day: 8, masterUnlocked: true }, clock), false);
+  assert.equal(isTimeWindowClosed({ ...entry, day: 8 }, clock, true), false);
+});
+
+test('Filtro em lote cobre janelas encerradas e ignora mês fechado', () => {
+  const filter = buildLockSweepFilter({ ...clock, minutes: 12 * 60 + 1 }, [{ month: 2, year: 2025 }]);
+
+  assert.deepEqual(filter.$or[3].timeSlot.$in, ['08:00', '10:00']);
+  assert.equal(filter.$nor.length, 1);
+});
+
+test('Agendamento da próxima varredura', () => {
+  // Logo após o fim da janela em curso: 12:01:01 - 12:00:30
+  assert.equal(msUntilNextSweep(clock), 31 * 1000);
+  // Depois da última janela do dia: até 10:01:01 de amanhã
+  assert.equal(msUntilNextSweep({ ...clock, minutes: 23 * 60, seconds: 0 }), (60 * 60 + 10 * 60 * 60 + 61) * 1000);
+});
+
+test('Janela pré-calculada com tolerância de 59s', () => {
+  // Limites em UTC-3 (sem horário de verão): culto das 19:30 termina 22:00 → 01:00Z do dia seguinte
+  const w = getSlotWindow('2025', '3', 9, '19:30');
+
+  assert.equal(w.startMs, Date.parse('2025-03-09T22:30:00.000Z'));
+  assert.equal(w.endMs, Date.parse('2025-03-10T01:00:00.000Z'));
+  assert.equal(w.cutoffMs, Date.parse('2025-03-10T01:00:59.000Z'));
+  assert.equal(w.end, '22:00');
+  assert.equal(getSlotWindow(2025, 3, 9, '09:00'), null);
+});
+
+test('Offset de Brasília vem do fuso America/Sao_Paulo', () => {
+  assert.equal(getBrazilOffsetMinutes(Date.parse('2025-03-09T12:00:00.000Z')), -180);
+  // Horário de verão de 2018/2019 (UTC-2): a janela acompanha o fuso, não um offset fixo
+  assert.equal(getBrazilOffsetMinutes(Date.parse('2018-12-09T12:00:00.000Z')), -120);
+
+  const w = getSlotWindow(2018, 12, 9, '19:30');
+  assert.equal(w.startMs, Date.parse('2018-12-09T21:30:00.000Z'));
+  assert.equal(w.endMs, Date.parse('2018-12-10T00:00:00.000Z'));
+});